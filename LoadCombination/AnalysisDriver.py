@@ -0,0 +1,436 @@
+# coding=utf-8
+
+"""
+This file contains an ``AnalysisDriver`` class, which runs a solver once per
+combination generated by a ``LoadCase`` or ``LoadCombinations`` object, e.g.
+for a non-linear analysis where the results of the loads cannot be
+superposed.
+
+* The solver is run across a thread or process pool, with a bounded no. of
+  combinations in flight, so the combinations are never all held in memory.
+* Combinations with the same factors on the same loads (e.g. the same
+  combination generated by two cases) are identified by a canonical key and
+  solved once.
+* Each result is saved to a SQLite database as it completes, so if a run is
+  interrupted, re-running it skips the combinations already solved. The
+  database records the solver that produced the results, so results from a
+  different solver are never re-used.
+"""
+
+import functools
+import json
+import pickle
+import sqlite3
+import time
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+from LoadCombination.HelperFuncs import content_hash
+
+EXECUTORS = {'thread': ThreadPoolExecutor,
+             'process': ProcessPoolExecutor}
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    factors TEXT,
+    result BLOB
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+'''
+
+
+def canonical_factors(factors: Dict[int, float], *,
+                      precision: int = 12) -> Tuple[Tuple[int, float], ...]:
+    """
+    Converts the factors of a combination into a canonical form, so that
+    combinations with the same loads and factors compare equal.
+
+    Loads with a factor of 0.0 are removed, the factors are rounded to
+    ``precision`` significant figures to remove floating point noise, and the
+    loads are sorted by ``load_no``.
+
+    :param factors: A dictionary of ``{load_no: factor}``.
+    :param precision: The no. of significant figures to keep.
+    :return: A tuple of ``(load_no, factor)`` tuples.
+    """
+
+    canonical = []
+
+    for l, f in sorted(factors.items()):
+        f = float(f'{f:.{precision}g}')
+
+        if f != 0.0:
+            canonical.append((int(l), f))
+
+    return tuple(canonical)
+
+
+def combination_key(factors: Dict[int, float], *,
+                    precision: int = 12) -> str:
+    """
+    Calculates the canonical key of a combination. See
+    ``canonical_factors``.
+
+    :param factors: A dictionary of ``{load_no: factor}``.
+    :param precision: The no. of significant figures to keep.
+    :return: The key as a hex string.
+    """
+
+    return content_hash(canonical_factors(factors, precision = precision))
+
+
+def solver_key(solver) -> str:
+    """
+    Calculates a key identifying a solver, so that results saved by one solver
+    are not re-used by another.
+
+    Functions and methods are identified by their ``callable_key`` (their
+    name, source code, constants, defaults and closure), and
+    ``functools.partial`` objects by their function and arguments. Other
+    callable objects are identified by their class and its ``__call__``
+    method only, so changes to their attributes are not detected - pass a
+    ``run_id`` to the ``AnalysisDriver`` for these.
+
+    :param solver: The solver.
+    :return: The key as a hex string.
+    """
+
+    if isinstance(solver, functools.partial):
+        return content_hash(type(solver).__name__, solver_key(solver.func),
+                            solver.args, sorted(solver.keywords.items()))
+
+    if hasattr(solver, '__code__'):
+        return content_hash(solver)
+
+    cls = type(solver)
+
+    return content_hash(cls.__module__, cls.__qualname__, cls.__call__)
+
+
+class AnalysisDriver:
+    """
+    Runs a solver for every combination of a ``LoadCase`` or
+    ``LoadCombinations`` object.
+    """
+
+    def __init__(self, source,
+                 solver: Callable[[Dict[int, float]], Any], *,
+                 path: str = None, executor: str = 'thread',
+                 max_workers: int = None, max_in_flight: int = None,
+                 precision: int = 12, run_id: str = None):
+        """
+        Constructor for the ``AnalysisDriver`` object.
+
+        :param source: A ``LoadCase`` or ``LoadCombinations`` object.
+        :param solver: A function that takes the factors of a combination as a
+            dictionary of ``{load_no: factor}`` (without loads with a factor of
+            0.0) and returns the result. The result must be picklable if a
+            ``path`` is given or ``executor`` is ``'process'``, and the solver
+            itself must be picklable if ``executor`` is ``'process'``.
+        :param path: An optional SQLite database to save the results in. If it
+            already contains results from the same solver, they are used
+            rather than re-solved.
+        :param executor: ``'thread'`` or ``'process'``.
+        :param max_workers: The no. of workers in the pool. If ``None``, the
+            ``concurrent.futures`` default is used.
+        :param max_in_flight: The max. no. of combinations submitted to the
+            pool and not yet completed. If ``None``, twice the no. of workers
+            (or 32 if ``max_workers`` is ``None``).
+        :param precision: The no. of significant figures of the factors used
+            to decide if two combinations are the same.
+        :param run_id: An optional id for the solver, recorded in the database
+            at ``path``. If ``None``, the ``solver_key`` of the solver is
+            used. Change it to prevent the results of an earlier version of
+            the solver being used.
+        """
+
+        if executor not in EXECUTORS:
+            raise ValueError(f'Unknown executor: {executor}. Expected one of '
+                             + f'{list(EXECUTORS.keys())}.')
+
+        if max_in_flight is None:
+            max_in_flight = 32 if max_workers is None else 2 * max_workers
+
+        self.source = source
+        self.solver = solver
+        self.path = path
+        self.executor = executor
+        self.max_workers = max_workers
+        self.max_in_flight = max(max_in_flight, 1)
+        self.precision = precision
+        self.run_id = solver_key(solver) if run_id is None else str(run_id)
+
+        self._stats = {}
+        self._start = None
+        self._end = None
+
+    def _cases(self) -> list:
+        """
+        Gets the ``LoadCase`` objects of the source.
+        """
+
+        if hasattr(self.source, 'load_cases'):
+            return list(self.source.load_cases.values())
+
+        return [self.source]
+
+    @staticmethod
+    def _combinations(load_case) -> Iterator[Tuple[int, Dict[int, float]]]:
+        """
+        Generates the factors of each combination of a ``LoadCase``, from its
+        ``FactorTable`` where possible.
+
+        :return: A generator of ``(comb_id, {load_no: factor})`` tuples.
+        """
+
+        if len(load_case.filters) > 0:
+            # combination filters cannot be applied to a FactorTable.
+            for i, comb in enumerate(load_case.iter_cases()):
+                yield i, {l: f for l, (f, load, LFs)
+                          in comb.list_loads_with_factors.items()}
+
+            return
+
+        table = load_case.factor_table()
+        load_nos = [int(l) for l in table.load_nos]
+
+        for s, rows in table.chunks(chunk_size = 1024):
+            for i, row in enumerate(rows.tolist()):
+                yield s + i, dict(zip(load_nos, row))
+
+    def total(self) -> int:
+        """
+        The no. of combinations to run. Combination filters are not taken into
+        account, so this is an upper bound if any of the cases have filters.
+        """
+
+        return sum(lc.no_combinations for lc in self._cases())
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Gets the progress of the current or last run:
+
+        * ``total``: The no. of combinations. Until a case with combination
+          filters has been generated, its combinations before filtering are
+          counted, so ``total`` (and ``eta``) may be an over-estimate until
+          then.
+        * ``done``: The no. of combinations with a result.
+        * ``solved``: The no. of combinations run by the solver.
+        * ``memoized``: The no. of combinations with the same key as an
+          earlier combination in the run.
+        * ``stored``: The no. of combinations loaded from the database.
+        * ``in_flight``: The no. of combinations submitted to the pool but not
+          completed.
+        * ``elapsed``: The seconds since the run started, or the length of
+          the run once it has finished.
+        * ``throughput``: The combinations solved per second.
+        * ``eta``: The estimated seconds to finish, or ``None`` if nothing has
+          been solved yet.
+
+        :return: A dictionary of the statistics.
+        """
+
+        s = dict(self._stats)
+
+        if self._start is None:
+            return s
+
+        end = time.perf_counter() if self._end is None else self._end
+
+        s['elapsed'] = end - self._start
+        s['throughput'] = (s['solved'] / s['elapsed'] if s['elapsed'] > 0
+                           else 0.0)
+
+        remaining = max(s['total'] - s['done'], 0)
+
+        if remaining == 0:
+            s['eta'] = 0.0
+        elif s['throughput'] > 0:
+            # the remaining combinations are assumed to need solving.
+            s['eta'] = remaining / s['throughput']
+        else:
+            s['eta'] = None
+
+        return s
+
+    def _open(self) -> sqlite3.Connection:
+        """
+        Opens the results database, or an in-memory database if no ``path``
+        was given, and checks that it was created with the same solver.
+
+        :raises ValueError: If the database contains results from a different
+            solver.
+        """
+
+        connection = sqlite3.connect(':memory:' if self.path is None
+                                     else self.path)
+
+        try:
+            connection.executescript(SCHEMA)
+
+            row = connection.execute('SELECT value FROM meta '
+                                     + "WHERE name = 'run_id'").fetchone()
+
+            if row is None:
+                with connection:
+                    connection.execute('INSERT INTO meta VALUES (?, ?)',
+                                       ('run_id', self.run_id))
+            elif row[0] != self.run_id:
+                raise ValueError(f'The results in {self.path} were saved with '
+                                 + f'a different solver (run_id {row[0]}, '
+                                 + f'expected {self.run_id}). Use a new path, '
+                                 + 'or pass the original run_id to re-use '
+                                 + 'them.')
+        except BaseException:
+            connection.close()
+            raise
+
+        return connection
+
+    def run(self, *, progress: Callable[[Dict[str, float]], None] = None
+            ) -> Dict[Tuple[int, int], Any]:
+        """
+        Runs the solver for every combination that does not already have a
+        result in the database.
+
+        :param progress: An optional function called with the ``stats`` each
+            time a combination completes.
+        :return: A dictionary of ``{(case_no, comb_id): result}``, where
+            ``comb_id`` is the position of the combination in the list
+            returned by ``LoadCase.generate_cases``.
+        :raises ValueError: If the database at ``path`` contains results from
+            a different solver.
+        """
+
+        self._start = time.perf_counter()
+        self._end = None
+        self._stats = {'total': self.total(), 'done': 0, 'solved': 0,
+                       'memoized': 0, 'stored': 0, 'in_flight': 0}
+
+        connection = self._open()
+
+        # the results of this run, and the combinations waiting for each key
+        # that is in flight.
+        results = {}
+        memo = {}
+        waiting = {}
+        futures = {}
+
+        def finish(ids, result):
+            for comb in ids:
+                results[comb] = result
+                self._stats['done'] += 1
+
+            if progress is not None:
+                progress(self.stats())
+
+        def collect(done):
+            for future in done:
+                key, factors = futures.pop(future)
+                result = future.result()
+
+                with connection:
+                    connection.execute('INSERT OR REPLACE INTO results '
+                                       + 'VALUES (?, ?, ?)',
+                                       (key, json.dumps(factors),
+                                        pickle.dumps(result)))
+
+                memo[key] = result
+                self._stats['solved'] += 1
+                self._stats['in_flight'] = len(futures)
+
+                finish(waiting.pop(key), result)
+
+        try:
+            with EXECUTORS[self.executor](max_workers = self.max_workers) \
+                    as pool:
+                try:
+                    for lc in self._cases():
+                        count = 0
+
+                        for comb_id, factors in self._combinations(lc):
+
+                            count += 1
+                            comb = (lc.case_no, comb_id)
+                            canonical = canonical_factors(
+                                factors, precision = self.precision)
+                            key = content_hash(canonical)
+
+                            if key in memo:
+                                self._stats['memoized'] += 1
+                                finish([comb], memo[key])
+                                continue
+
+                            if key in waiting:
+                                self._stats['memoized'] += 1
+                                waiting[key].append(comb)
+                                continue
+
+                            row = connection.execute(
+                                'SELECT result FROM results WHERE key = ?',
+                                (key,)).fetchone()
+
+                            if row is not None:
+                                memo[key] = pickle.loads(row[0])
+                                self._stats['stored'] += 1
+                                finish([comb], memo[key])
+                                continue
+
+                            # bound the no. of combinations in flight.
+                            while len(futures) >= self.max_in_flight:
+                                done, _ = wait(futures,
+                                               return_when = FIRST_COMPLETED)
+                                collect(done)
+
+                            factors = dict(canonical)
+
+                            waiting[key] = [comb]
+                            futures[pool.submit(self.solver, factors)] = \
+                                (key, factors)
+                            self._stats['in_flight'] = len(futures)
+
+                        # remove any combinations removed by filters from
+                        # the total.
+                        self._stats['total'] -= lc.no_combinations - count
+
+                    while len(futures) > 0:
+                        done, _ = wait(futures, return_when = FIRST_COMPLETED)
+                        collect(done)
+
+                except BaseException:
+                    # don't start any more combinations. The results already
+                    # saved are used if the run is restarted.
+                    for future in futures:
+                        future.cancel()
+
+                    raise
+
+        finally:
+            connection.close()
+            self._end = time.perf_counter()
+
+        return results
+
+    def __str__(self):
+
+        return (f'{type(self).__name__}: '
+                + f'executor: {self.executor}, '
+                + f'path: {self.path}')
+
+    def __repr__(self):
+
+        return (f'{type(self).__name__}('
+                + f'source = {repr(self.source)}, '
+                + f'solver = {repr(self.solver)}, '
+                + f'path = {repr(self.path)}, '
+                + f'executor = {repr(self.executor)}, '
+                + f'max_workers = {repr(self.max_workers)}, '
+                + f'max_in_flight = {repr(self.max_in_flight)}, '
+                + f'precision = {repr(self.precision)}, '
+                + f'run_id = {repr(self.run_id)}'
+                + ')')
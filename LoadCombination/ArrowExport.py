@@ -0,0 +1,258 @@
+# coding=utf-8
+
+"""
+This file contains functions to stream the combinations generated by
+``LoadCase`` and ``LoadCombinations`` objects into Apache Arrow record batches
+and Parquet files, for use by pandas / Arrow based tools.
+
+``pyarrow`` is an optional dependency - it is only imported when one of the
+functions that needs it is called.
+
+Two layouts are supported:
+
+* ``'wide'``: one row per combination with the columns ``case_no``,
+  ``comb_no``, ``title``, ``angles`` (a list of the distinct angles in the
+  combination) and a ``load_<load_no>`` column with the total factor applied
+  to each ``Load``.
+* ``'long'``: one row per ``Load`` per combination, with the columns
+  ``case_no``, ``comb_no``, ``title``, ``load_no``, ``factor`` and ``angle``
+  (null if the ``Load`` has no angle).
+
+The combinations are generated one batch at a time by ``LoadCase.iter_cases``
+so the memory used depends on the ``batch_size``, not the no. of combinations.
+"""
+
+from typing import Dict, Iterator, List
+
+LAYOUTS = ('wide', 'long')
+
+
+def _require_pyarrow():
+    """
+    Imports ``pyarrow``, raising a helpful error if it is not installed.
+    """
+
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError('pyarrow is required to export combinations to '
+                          + 'Arrow or Parquet. Install it with '
+                          + '"pip install pyarrow".') from e
+
+    return pyarrow
+
+
+def _load_cases(source) -> List:
+    """
+    Gets the ``LoadCase`` objects to export from a ``LoadCase`` or
+    ``LoadCombinations`` object.
+    """
+
+    if hasattr(source, 'load_cases'):
+        return list(source.load_cases.values())
+
+    return [source]
+
+
+def _load_nos(load_cases) -> List[int]:
+    """
+    Gets the ``load_no`` of every ``Load`` used by a set of ``LoadCase``
+    objects. These are the factor columns of the wide layout.
+    """
+
+    load_nos = set()
+
+    for lc in load_cases:
+        for g in lc.load_groups.values():
+            load_nos.update(g.load_group.loads.keys())
+
+    return sorted(load_nos)
+
+
+def _column_batches(source, *, layout: str = 'wide',
+                    batch_size: int = 65536) -> Iterator[Dict[str, List]]:
+    """
+    Generates the combinations from a ``LoadCase`` or ``LoadCombinations``
+    object and collects them into batches of columns.
+
+    :param source: A ``LoadCase`` or ``LoadCombinations`` object.
+    :param layout: Either ``'wide'`` or ``'long'``.
+    :param batch_size: The max. no. of combinations in each batch.
+    :return: A generator of dictionaries ``{column_name: [values, ...]}``.
+    """
+
+    if layout not in LAYOUTS:
+        raise ValueError(f'layout must be one of {LAYOUTS}. '
+                         + f'layout given was {repr(layout)}.')
+
+    if batch_size < 1:
+        raise ValueError(f'batch_size must be >= 1. '
+                         + f'batch_size given was {batch_size}.')
+
+    load_cases = _load_cases(source)
+    load_nos = _load_nos(load_cases)
+
+    def new_batch():
+        columns = {'case_no': [], 'comb_no': [], 'title': []}
+
+        if layout == 'wide':
+            columns['angles'] = []
+            columns.update({f'load_{l}': [] for l in load_nos})
+        else:
+            columns.update({'load_no': [], 'factor': [], 'angle': []})
+
+        return columns
+
+    batch = new_batch()
+    count = 0
+
+    for lc in load_cases:
+        for comb_no, comb in enumerate(lc.iter_cases()):
+
+            title = comb.combination_title()
+            loads = comb.list_loads_with_factors
+
+            if layout == 'wide':
+                batch['case_no'].append(lc.case_no)
+                batch['comb_no'].append(comb_no)
+                batch['title'].append(title)
+                batch['angles'].append(sorted({LF.info['angle']
+                                               for LF in comb.list_load_factors
+                                               if 'angle' in LF.info}))
+
+                for l in load_nos:
+                    batch[f'load_{l}'].append(loads[l][0] if l in loads
+                                              else 0.0)
+
+            else:
+                for l, (factor, load, LFs) in sorted(loads.items()):
+
+                    angles = [LF.info['angle'] for LF in LFs
+                              if 'angle' in LF.info]
+
+                    batch['case_no'].append(lc.case_no)
+                    batch['comb_no'].append(comb_no)
+                    batch['title'].append(title)
+                    batch['load_no'].append(l)
+                    batch['factor'].append(factor)
+                    batch['angle'].append(angles[0] if len(angles) > 0
+                                          else None)
+
+            count += 1
+
+            if count == batch_size:
+                yield batch
+
+                batch = new_batch()
+                count = 0
+
+    if count > 0:
+        yield batch
+
+
+def schema(source, *, layout: str = 'wide'):
+    """
+    Builds the Arrow schema of the record batches generated by
+    ``record_batches``.
+
+    :param source: A ``LoadCase`` or ``LoadCombinations`` object.
+    :param layout: Either ``'wide'`` or ``'long'``.
+    :return: A ``pyarrow.Schema`` object.
+    """
+
+    pa = _require_pyarrow()
+
+    fields = [('case_no', pa.int64()),
+              ('comb_no', pa.int64()),
+              ('title', pa.string())]
+
+    if layout == 'wide':
+        fields.append(('angles', pa.list_(pa.float64())))
+        fields += [(f'load_{l}', pa.float64())
+                   for l in _load_nos(_load_cases(source))]
+    else:
+        fields += [('load_no', pa.int64()),
+                   ('factor', pa.float64()),
+                   ('angle', pa.float64())]
+
+    return pa.schema(fields)
+
+
+def record_batches(source, *, layout: str = 'wide',
+                   batch_size: int = 65536) -> Iterator:
+    """
+    Generates the combinations from a ``LoadCase`` or ``LoadCombinations``
+    object as Arrow record batches.
+
+    :param source: A ``LoadCase`` or ``LoadCombinations`` object.
+    :param layout: Either ``'wide'`` or ``'long'``.
+    :param batch_size: The max. no. of combinations in each batch.
+    :return: A generator of ``pyarrow.RecordBatch`` objects.
+    """
+
+    pa = _require_pyarrow()
+
+    batch_schema = schema(source, layout = layout)
+
+    for columns in _column_batches(source, layout = layout,
+                                   batch_size = batch_size):
+        yield pa.RecordBatch.from_pydict(columns, schema = batch_schema)
+
+
+def write_arrow(source, path: str, *, layout: str = 'wide',
+                batch_size: int = 65536) -> int:
+    """
+    Writes the combinations from a ``LoadCase`` or ``LoadCombinations``
+    object to an Arrow IPC (Feather v2) file, one record batch at a time.
+
+    :param source: A ``LoadCase`` or ``LoadCombinations`` object.
+    :param path: The file to write.
+    :param layout: Either ``'wide'`` or ``'long'``.
+    :param batch_size: The max. no. of combinations in each record batch.
+    :return: The no. of rows written.
+    """
+
+    pa = _require_pyarrow()
+
+    rows = 0
+
+    with pa.OSFile(path, 'wb') as sink:
+        with pa.ipc.new_file(sink, schema(source, layout = layout)) as writer:
+            for batch in record_batches(source, layout = layout,
+                                        batch_size = batch_size):
+                writer.write_batch(batch)
+                rows += batch.num_rows
+
+    return rows
+
+
+def write_parquet(source, path: str, *, layout: str = 'wide',
+                  batch_size: int = 65536,
+                  compression: str = 'snappy') -> int:
+    """
+    Writes the combinations from a ``LoadCase`` or ``LoadCombinations``
+    object to a Parquet file, with one row group per batch.
+
+    :param source: A ``LoadCase`` or ``LoadCombinations`` object.
+    :param path: The file to write.
+    :param layout: Either ``'wide'`` or ``'long'``.
+    :param batch_size: The max. no. of combinations in each row group.
+    :param compression: The compression codec passed to
+        ``pyarrow.parquet.ParquetWriter``.
+    :return: The no. of rows written.
+    """
+
+    pa = _require_pyarrow()
+
+    import pyarrow.parquet as pq
+
+    rows = 0
+
+    with pq.ParquetWriter(path, schema(source, layout = layout),
+                          compression = compression) as writer:
+        for batch in record_batches(source, layout = layout,
+                                    batch_size = batch_size):
+            writer.write_table(pa.Table.from_batches([batch]))
+            rows += batch.num_rows
+
+    return rows
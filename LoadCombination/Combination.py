@@ -710,6 +710,14 @@ class Combination:
                 + f'allow_duplicates = {repr(self.allow_duplicates)}'
                 + f')')
 
+    def __reduce__(self):
+        # pickle the LoadFactors as a flat tuple, as many Combination objects
+        # are sent between processes.
+        return _combination, (self.load_case_no, self.load_case,
+                              self.load_case_abbrev, self.allow_duplicates,
+                              tuple(LF for LFs in self.load_factors.values()
+                                    for LF in LFs))
+
     def __eq__(self, other):
         """
         Override the equality test.
@@ -728,4 +736,28 @@ class Combination:
         if isinstance(other, self.__class__):
             return not self.__eq__(other)
 
-        return NotImplemented
\ No newline at end of file
+        return NotImplemented
+
+
+def _combination(load_case_no: int, load_case: str, load_case_abbrev: str,
+                 allow_duplicates: bool,
+                 load_factors: Tuple[LoadFactor, ...]) -> Combination:
+    """
+    Re-builds a ``Combination`` pickled by ``Combination.__reduce__``. The
+    constructor is bypassed as the ``LoadFactor`` objects have already been
+    checked for duplicates.
+    """
+
+    comb = Combination.__new__(Combination)
+
+    comb._load_factors = {}
+
+    for LF in load_factors:
+        comb._load_factors.setdefault(LF.load.load_no, []).append(LF)
+
+    comb._load_case_no = load_case_no
+    comb._load_case = load_case
+    comb._load_case_abbrev = load_case_abbrev
+    comb._allow_duplicates = allow_duplicates
+
+    return comb
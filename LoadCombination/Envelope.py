@@ -0,0 +1,211 @@
+# coding=utf-8
+
+"""
+This file contains an ``Envelope`` class, which calculates the max. and min.
+value of a set of effects (e.g. member forces or reactions) over every
+combination generated by a ``LoadCase``, without generating the combinations.
+"""
+
+from typing import List, Tuple
+import numpy as np
+
+
+class Envelope:
+    """
+    The envelope of a set of effects over every combination generated by a
+    ``LoadCase``, calculated from the value of each effect under each ``Load``
+    with a factor of 1.0.
+
+    As each combination uses one option from each ``LoadGroup``, and the
+    effects of each option are independent of the options chosen from the
+    other groups, the max. value of an effect is the sum of the max.
+    contribution from each group (and similarly for the min.). The
+    contribution of each option of each group is cached, so after a change to
+    the case only the groups that have changed are re-calculated, and a change
+    to a ``group_factor`` only re-scales the cached contributions.
+    """
+
+    def __init__(self, load_case, *, load_nos, effects):
+        """
+        Constructor for the ``Envelope`` object.
+
+        :param load_case: The ``LoadCase`` to calculate the envelope for. It
+            cannot have combination filters.
+        :param load_nos: The ``load_no`` of each ``Load`` with results.
+        :param effects: An array of shape ``(len(load_nos), no_effects)``
+            containing the value of each effect under each ``Load`` with a
+            factor of 1.0. A 1D array is treated as a single effect.
+        """
+
+        load_nos = np.asarray(load_nos, dtype = np.int64)
+        effects = np.asarray(effects, dtype = np.float64).reshape(
+            (len(load_nos), -1))
+
+        order = np.argsort(load_nos)
+
+        self.load_case = load_case
+        self.load_nos = load_nos[order]
+        self.effects = effects[order]
+
+        # the cached contributions of each group: {group_name: (state,
+        # no_options, max, argmax, min, argmin)}
+        self._groups = {}
+
+        self.max = None
+        self.min = None
+        self.argmax = None
+        self.argmin = None
+
+        self.update()
+
+    @property
+    def no_effects(self) -> int:
+        """
+        The no. of effects in the envelope.
+        """
+
+        return self.effects.shape[1]
+
+    def _unit_effects(self, load_nos: np.ndarray) -> np.ndarray:
+        """
+        Gets the rows of ``self.effects`` for a set of loads.
+
+        :param load_nos: The ``load_no`` of each load.
+        :return: An array of shape ``(len(load_nos), no_effects)``.
+        """
+
+        rows = np.searchsorted(self.load_nos, load_nos)
+        rows = np.minimum(rows, len(self.load_nos) - 1)
+
+        found = (len(self.load_nos) > 0) & (self.load_nos[rows] == load_nos)
+
+        if not np.all(found):
+            missing = [int(l) for l in np.asarray(load_nos)[~found]]
+
+            raise ValueError(f'No effects provided for loads: {missing}.')
+
+        return self.effects[rows]
+
+    def _group_state(self, group_name: str) -> Tuple:
+        """
+        Records the state of a ``LoadGroup`` so that changes to it can be
+        detected. The ``group_factor`` is only included if the group has group
+        filters, as otherwise the contributions are re-scaled rather than
+        re-calculated.
+        """
+
+        group_id, version, group_factor, filters = \
+            self.load_case._group_state(group_name)
+
+        if len(filters) == 0:
+            return group_id, version, filters
+
+        return group_id, version, group_factor, filters
+
+    def _contribution(self, group_name: str) -> Tuple:
+        """
+        Calculates the contribution of each option of a ``LoadGroup`` to the
+        effects, with a ``group_factor`` of 1.0, and finds the max. and min.
+
+        :param group_name: The ``group_name`` of the ``LoadGroup``.
+        :return: A tuple of ``(no_options, max, argmax, min, argmin)``.
+        """
+
+        g = self.load_case.load_groups[group_name]
+
+        table = g.load_group.group_table()
+
+        keep = self.load_case._kept_options(group_name)
+
+        if keep is not None:
+            table = table.take(keep)
+
+        if table.no_options == 0:
+            raise ValueError(f'LoadGroup {group_name} has no options after '
+                             + f'the group filters are applied.')
+
+        contribution = table.factors @ self._unit_effects(table.load_nos)
+
+        return (table.no_options,
+                contribution.max(axis = 0),
+                contribution.argmax(axis = 0),
+                contribution.min(axis = 0),
+                contribution.argmin(axis = 0))
+
+    def update(self) -> List[str]:
+        """
+        Re-calculates the envelope after a change to the ``LoadCase``. Only the
+        contributions of groups whose loads, properties, factors or filters
+        have changed are re-calculated.
+
+        :return: The ``group_name`` of each group whose contributions were
+            re-calculated.
+        """
+
+        self.load_case._check_product_space()
+
+        if len(self.load_case.load_groups) == 0:
+            raise ValueError('Cannot calculate the envelope of a LoadCase '
+                             + 'with no LoadGroups.')
+
+        recalculated = []
+        groups = {}
+
+        for k in self.load_case.load_groups:
+
+            state = self._group_state(k)
+            cached = self._groups.get(k)
+
+            if cached is None or cached[0] != state:
+                cached = (state,) + self._contribution(k)
+                recalculated.append(k)
+
+            groups[k] = cached
+
+        self._groups = groups
+
+        shape = []
+        maxima = np.zeros(self.no_effects)
+        minima = np.zeros(self.no_effects)
+        max_options = []
+        min_options = []
+
+        for k, (state, no_options, g_max, g_argmax, g_min,
+                g_argmin) in groups.items():
+
+            group_factor = self.load_case.load_groups[k].group_factor
+
+            if group_factor < 0:
+                # a negative factor swaps the max. and min.
+                g_max, g_argmax, g_min, g_argmin = g_min, g_argmin, g_max, g_argmax
+
+            maxima += group_factor * g_max
+            minima += group_factor * g_min
+            max_options.append(g_argmax)
+            min_options.append(g_argmin)
+            shape.append(no_options)
+
+        self.max = maxima
+        self.min = minima
+
+        # order = 'F' so that the first group varies fastest, as in
+        # LoadCase.generate_cases.
+        self.argmax = np.ravel_multi_index(tuple(max_options), tuple(shape),
+                                           order = 'F').astype(np.int64)
+        self.argmin = np.ravel_multi_index(tuple(min_options), tuple(shape),
+                                           order = 'F').astype(np.int64)
+
+        return recalculated
+
+    def __str__(self):
+
+        return (f'{type(self).__name__}: {self.load_case.case_name}, '
+                + f'effects: {self.no_effects}')
+
+    def __repr__(self):
+
+        return (f'{type(self).__name__}('
+                + f'load_case = {repr(self.load_case)}, '
+                + f'load_nos = {repr(self.load_nos)}, '
+                + f'effects = {repr(self.effects)}'
+                + ')')
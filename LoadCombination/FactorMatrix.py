@@ -0,0 +1,276 @@
+# coding=utf-8
+
+"""
+This file contains a ``FactorMatrix`` class, which stores the full matrix of
+load factors for one or more ``LoadCase`` objects in NumPy files so that it
+can be shared with other processes without pickling.
+
+Two formats are supported:
+
+* A directory of ``.npy`` files plus a ``meta.json`` file. The matrix is
+  written in chunks, so it never has to be held in memory, and is re-loaded
+  with ``np.load(mmap_mode = 'r')`` so that many processes can share a single
+  copy through the operating system's page cache.
+* A single ``.npz`` file. This is more convenient to move around, but is
+  loaded fully into memory as ``.npz`` files cannot be memory-mapped.
+"""
+
+import json
+import os
+from typing import Dict, List, Union
+import numpy as np
+
+from LoadCombination.FactorTable import FactorTable
+
+
+class FactorMatrix:
+    """
+    The load factors for every combination of one or more ``LoadCase``
+    objects, as a single matrix with one row per combination and one column
+    per ``Load``.
+    """
+
+    # incremented if the layout of the files changes.
+    FORMAT_VERSION = 1
+
+    FACTORS = 'factors.npy'
+    LOAD_NOS = 'load_nos.npy'
+    CASE_NOS = 'case_nos.npy'
+    COMB_IDS = 'comb_ids.npy'
+    META = 'meta.json'
+
+    def __init__(self, *, factors: np.ndarray, load_nos: np.ndarray,
+                 case_nos: np.ndarray, comb_ids: np.ndarray,
+                 cases: List[Dict]):
+        """
+        Constructor for the ``FactorMatrix`` object. Typically a
+        ``FactorMatrix`` is created with the ``load`` method rather than
+        directly.
+
+        :param factors: An array of shape ``(no_combinations, len(load_nos))``
+            containing the total factor applied to each load.
+        :param load_nos: The ``load_no`` of each column.
+        :param case_nos: The ``case_no`` of the ``LoadCase`` of each row.
+        :param comb_ids: The position of each row's combination in the list
+            returned by ``LoadCase.generate_cases``.
+        :param cases: A dictionary of metadata for each ``LoadCase``, with
+            keys ``case_no``, ``case_name``, ``abbrev``, ``groups``, ``start``
+            and ``stop``, where ``start`` and ``stop`` are the rows of the case.
+        """
+
+        self.factors = factors
+        self.load_nos = load_nos
+        self.case_nos = case_nos
+        self.comb_ids = comb_ids
+        self.cases = cases
+
+    @staticmethod
+    def _tables(tables: Union[FactorTable, Dict[int, FactorTable],
+                              List[FactorTable]]) -> List[FactorTable]:
+        """
+        Converts the tables passed to ``save`` into a list.
+        """
+
+        if isinstance(tables, FactorTable):
+            return [tables]
+
+        if isinstance(tables, dict):
+            return list(tables.values())
+
+        return list(tables)
+
+    @classmethod
+    def _layout(cls, tables: List[FactorTable]):
+        """
+        Works out the columns and rows of each table in the matrix.
+
+        :return: A tuple of ``(load_nos, cases)``.
+        """
+
+        if len(tables) == 0:
+            load_nos = np.empty(0, dtype = np.int64)
+        else:
+            load_nos = np.unique(np.concatenate([t.load_nos for t in tables]))
+
+        cases = []
+        start = 0
+
+        for t in tables:
+            cases.append({'case_no': t.case_no,
+                          'case_name': t.case_name,
+                          'abbrev': t.abbrev,
+                          'groups': [g.group_name for g in t.groups],
+                          'start': start,
+                          'stop': start + len(t)})
+
+            start += len(t)
+
+        return load_nos, cases
+
+    @classmethod
+    def save(cls, tables: Union[FactorTable, Dict[int, FactorTable],
+                                List[FactorTable]],
+             path: str, *, chunk_size: int = 65536):
+        """
+        Saves the factor matrix of one or more ``FactorTable`` objects.
+
+        :param tables: A single ``FactorTable``, a list of them or a dictionary
+            ``{case_no: FactorTable}`` as returned by
+            ``LoadCombinations.factor_tables``.
+        :param path: If the path ends in ``.npz`` a single ``.npz`` file is
+            written. Otherwise the path is treated as a directory (created if
+            it does not exist) and ``.npy`` files are written into it.
+        :param chunk_size: The no. of rows written at a time when writing a
+            directory.
+        """
+
+        tables = cls._tables(tables)
+        load_nos, cases = cls._layout(tables)
+
+        no_rows = cases[-1]['stop'] if len(cases) > 0 else 0
+
+        case_nos = np.empty(no_rows, dtype = np.int64)
+        comb_ids = np.empty(no_rows, dtype = np.int64)
+
+        for t, c in zip(tables, cases):
+            case_nos[c['start']:c['stop']] = t.case_no
+            comb_ids[c['start']:c['stop']] = np.arange(len(t))
+
+        meta = {'version': cls.FORMAT_VERSION, 'cases': cases}
+
+        if path.endswith('.npz'):
+            factors = np.zeros((no_rows, len(load_nos)))
+
+            for t, c in zip(tables, cases):
+                cols = np.searchsorted(load_nos, t.load_nos)
+                factors[c['start']:c['stop'], cols] = t.matrix()
+
+            np.savez(path,
+                     factors = factors,
+                     load_nos = load_nos,
+                     case_nos = case_nos,
+                     comb_ids = comb_ids,
+                     meta = np.array(json.dumps(meta)))
+
+            return
+
+        os.makedirs(path, exist_ok = True)
+
+        meta_path = os.path.join(path, cls.META)
+
+        if os.path.exists(meta_path):
+            # mark any existing matrix in the directory as incomplete.
+            os.remove(meta_path)
+
+        np.save(os.path.join(path, cls.LOAD_NOS), load_nos)
+        np.save(os.path.join(path, cls.CASE_NOS), case_nos)
+        np.save(os.path.join(path, cls.COMB_IDS), comb_ids)
+
+        if no_rows == 0 or len(load_nos) == 0:
+            # an empty file cannot be memory-mapped.
+            np.save(os.path.join(path, cls.FACTORS),
+                    np.zeros((no_rows, len(load_nos))))
+
+            with open(meta_path, 'w') as f:
+                json.dump(meta, f)
+
+            return
+
+        # write the matrix straight into a memory-mapped .npy file, one chunk
+        # at a time, so that the full matrix is never held in memory.
+        factors = np.lib.format.open_memmap(os.path.join(path, cls.FACTORS),
+                                            mode = 'w+',
+                                            dtype = np.float64,
+                                            shape = (no_rows, len(load_nos)))
+
+        for t, c in zip(tables, cases):
+            cols = np.searchsorted(load_nos, t.load_nos)
+
+            for s, rows in t.chunks(chunk_size = chunk_size):
+                s += c['start']
+                factors[s:s + len(rows), cols] = rows
+
+        factors.flush()
+        del factors
+
+        # the metadata is written last, so a directory without it is known to
+        # be incomplete.
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, path: str, *, mmap_mode: str = 'r') -> 'FactorMatrix':
+        """
+        Loads a factor matrix saved with the ``save`` method.
+
+        :param path: The ``.npz`` file or directory passed to ``save``.
+        :param mmap_mode: The ``mmap_mode`` passed to ``np.load`` when loading
+            a directory. The default of ``'r'`` maps the files read-only so
+            that they are shared between processes. Use ``None`` to load the
+            arrays into memory. Ignored for ``.npz`` files.
+        :return: A ``FactorMatrix`` object.
+        """
+
+        if path.endswith('.npz'):
+            with np.load(path, allow_pickle = False) as data:
+                meta = json.loads(str(data['meta']))
+                arrays = {k: data[k] for k in ('factors', 'load_nos',
+                                               'case_nos', 'comb_ids')}
+        else:
+            with open(os.path.join(path, cls.META)) as f:
+                meta = json.load(f)
+
+            arrays = {k: np.load(os.path.join(path, f), mmap_mode = mmap_mode,
+                                 allow_pickle = False)
+                      for k, f in (('factors', cls.FACTORS),
+                                   ('load_nos', cls.LOAD_NOS),
+                                   ('case_nos', cls.CASE_NOS),
+                                   ('comb_ids', cls.COMB_IDS))}
+
+        if meta['version'] != cls.FORMAT_VERSION:
+            raise ValueError(f'Unsupported FactorMatrix version: '
+                             + f'{meta["version"]}. Expected version '
+                             + f'{cls.FORMAT_VERSION}.')
+
+        return cls(cases = meta['cases'], **arrays)
+
+    def case(self, case_no: int) -> np.ndarray:
+        """
+        Gets the rows of the matrix for a single ``LoadCase``. If the matrix
+        is memory-mapped the rows are a view onto the file, not a copy.
+
+        :param case_no: The ``case_no`` of the ``LoadCase``.
+        :return: An array of shape ``(no_combinations, len(self.load_nos))``.
+        """
+
+        for c in self.cases:
+            if c['case_no'] == case_no:
+                return self.factors[c['start']:c['stop']]
+
+        raise KeyError(f'LoadCase {case_no} is not in the FactorMatrix.')
+
+    def column(self, load_no: int) -> np.ndarray:
+        """
+        Gets the factors applied to a single ``Load`` in every combination.
+
+        :param load_no: The ``load_no`` of the ``Load``.
+        :return: An array with one factor per row of the matrix.
+        """
+
+        col = int(np.searchsorted(self.load_nos, load_no))
+
+        if col >= len(self.load_nos) or self.load_nos[col] != load_no:
+            raise KeyError(f'Load {load_no} is not in the FactorMatrix.')
+
+        return self.factors[:, col]
+
+    def __len__(self):
+
+        return len(self.factors)
+
+    def __str__(self):
+
+        return (f'{type(self).__name__}: '
+                + f'cases: {[c["case_no"] for c in self.cases]}, '
+                + f'loads: {list(self.load_nos)}, '
+                + f'combinations: {len(self)}')
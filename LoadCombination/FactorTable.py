@@ -0,0 +1,405 @@
+# coding=utf-8
+
+"""
+This file contains classes that store the load factors generated by
+``LoadGroup`` and ``LoadCase`` objects as arrays, rather than as ``Combination``
+and ``LoadFactor`` objects.
+
+A ``LoadCase`` generates every combination of the options output by its
+``LoadGroup`` objects, so rather than storing every combination the
+``FactorTable`` stores a ``GroupTable`` for each group, and any combination can
+be decoded from its index.
+"""
+
+from math import prod
+from typing import Iterator, List, Tuple
+import numpy as np
+
+from LoadCombination.LoadFactor import LoadFactor
+
+
+class GroupTable:
+    """
+    A tabulated version of the output of a ``LoadGroup.generate_groups``
+    method. Each row corresponds to one option output by the ``LoadGroup``, and
+    each column to a ``Load`` in the group.
+    """
+
+    def __init__(self, *, group_name: str,
+                 load_nos: np.ndarray,
+                 factors: np.ndarray,
+                 present: np.ndarray = None,
+                 angles: np.ndarray = None):
+        """
+        Constructor for the ``GroupTable`` object.
+
+        :param group_name: The name of the ``LoadGroup``.
+        :param load_nos: A sorted array of the ``load_no`` of each column.
+        :param factors: An array of shape ``(no_options, len(load_nos))``
+            containing the total factor applied to each load in each option.
+        :param present: An array of booleans of the same shape as ``factors``,
+            which is ``True`` where the load is part of the option. This
+            distinguishes loads with a factor of 0.0 from loads that are not in
+            the option. If ``None``, all non-zero factors are taken to be
+            present.
+        :param angles: An array of the angle of each option, for options
+            generated by a ``RotationalGroup``. ``NaN`` where the option has
+            no angle. If ``None``, no options have an angle.
+        """
+
+        self.group_name = group_name
+        self.load_nos = np.asarray(load_nos, dtype = np.int64)
+        self.factors = np.asarray(factors, dtype = np.float64).reshape(
+            (-1, len(self.load_nos)))
+
+        if present is None:
+            present = self.factors != 0.0
+
+        if angles is None:
+            angles = np.full(len(self.factors), np.nan)
+
+        self.present = np.asarray(present, dtype = bool)
+        self.angles = np.asarray(angles, dtype = np.float64)
+
+    @classmethod
+    def from_options(cls, *, group_name: str,
+                     options: Tuple[Tuple[LoadFactor, ...], ...]) -> 'GroupTable':
+        """
+        Builds a ``GroupTable`` from the output of a
+        ``LoadGroup.generate_groups`` method.
+
+        :param group_name: The name of the ``LoadGroup``.
+        :param options: The options output by the ``LoadGroup``. Each option is
+            a tuple of ``LoadFactor`` objects.
+        :return: A ``GroupTable`` object.
+        """
+
+        load_nos = sorted({LF.load.load_no for o in options for LF in o})
+        cols = {l: i for i, l in enumerate(load_nos)}
+
+        factors = np.zeros((len(options), len(load_nos)))
+        present = np.zeros((len(options), len(load_nos)), dtype = bool)
+        angles = np.full(len(options), np.nan)
+
+        for i, o in enumerate(options):
+            for LF in o:
+                c = cols[LF.load.load_no]
+
+                factors[i, c] += LF.factor
+                present[i, c] = True
+
+                if 'angle' in LF.info:
+                    angles[i] = LF.info['angle']
+
+        return cls(group_name = group_name,
+                   load_nos = np.asarray(load_nos, dtype = np.int64),
+                   factors = factors,
+                   present = present,
+                   angles = angles)
+
+    @property
+    def no_options(self) -> int:
+        """
+        The no. of options output by the ``LoadGroup``.
+        """
+
+        return len(self.factors)
+
+    def scaled(self, group_factor: float) -> 'GroupTable':
+        """
+        Returns a copy of the ``GroupTable`` with the factors multiplied by a
+        ``group_factor``.
+
+        :param group_factor: The factor to multiply the table by.
+        :return: A new ``GroupTable`` object. The ``load_nos``, ``present`` and
+            ``angles`` arrays are shared with the original.
+        """
+
+        return GroupTable(group_name = self.group_name,
+                          load_nos = self.load_nos,
+                          factors = self.factors * group_factor,
+                          present = self.present,
+                          angles = self.angles)
+
+    def take(self, options) -> 'GroupTable':
+        """
+        Returns a ``GroupTable`` containing a subset of the options. Any loads
+        that are not present in the remaining options are removed.
+
+        :param options: The option nos. to keep.
+        :return: A new ``GroupTable`` object.
+        """
+
+        options = np.asarray(options, dtype = np.int64)
+
+        present = self.present[options]
+        keep = present.any(axis = 0)
+
+        return GroupTable(group_name = self.group_name,
+                          load_nos = self.load_nos[keep],
+                          factors = self.factors[options][:, keep],
+                          present = present[:, keep],
+                          angles = self.angles[options])
+
+    def __str__(self):
+
+        return (f'{type(self).__name__}: {self.group_name}, '
+                + f'loads: {list(self.load_nos)}, '
+                + f'options: {self.no_options}')
+
+    def __repr__(self):
+
+        return (f'{type(self).__name__}('
+                + f'group_name = {repr(self.group_name)}, '
+                + f'load_nos = {repr(self.load_nos)}, '
+                + f'factors = {repr(self.factors)}, '
+                + f'present = {repr(self.present)}, '
+                + f'angles = {repr(self.angles)}'
+                + ')')
+
+
+class FactorTable:
+    """
+    Stores the load factors of every combination generated by a ``LoadCase``
+    in factorised form: a ``GroupTable`` for each ``LoadGroup`` in the case.
+
+    Combination ``i`` uses one option from each ``GroupTable``. The options are
+    numbered in mixed radix with the first group varying fastest, matching the
+    order of ``LoadCase.generate_cases``.
+    """
+
+    def __init__(self, *, case_no: int, case_name: str, abbrev: str = '',
+                 groups: List[GroupTable]):
+        """
+        Constructor for the ``FactorTable`` object.
+
+        :param case_no: The ``case_no`` of the ``LoadCase``.
+        :param case_name: The ``case_name`` of the ``LoadCase``.
+        :param abbrev: The abbreviation of the ``LoadCase``.
+        :param groups: A ``GroupTable`` for each ``LoadGroup`` in the case, in
+            the same order as ``LoadCase.load_groups``. The ``group_factor``
+            should already have been applied.
+        """
+
+        self.case_no = case_no
+        self.case_name = case_name
+        self.abbrev = abbrev
+        self.groups = groups
+
+    @property
+    def groups(self) -> List[GroupTable]:
+        """
+        The ``GroupTable`` objects that make up the ``FactorTable``.
+        """
+
+        return self._groups
+
+    @groups.setter
+    def groups(self, groups: List[GroupTable]):
+        """
+        The ``GroupTable`` objects that make up the ``FactorTable``.
+
+        :param groups: A ``GroupTable`` for each ``LoadGroup`` in the case.
+        """
+
+        self._groups = list(groups)
+
+        if len(self._groups) == 0:
+            self._load_nos = np.empty(0, dtype = np.int64)
+        else:
+            self._load_nos = np.unique(np.concatenate([g.load_nos
+                                                       for g in self._groups]))
+
+        # the columns in the full table that each group's loads map to
+        self._cols = [np.searchsorted(self._load_nos, g.load_nos)
+                      for g in self._groups]
+
+    def replace_group(self, group_no: int, group: GroupTable):
+        """
+        Replaces a single ``GroupTable`` in the table, e.g. after the
+        ``group_factor`` of the group has changed. If the new group contains
+        the same loads as the old group the column layout of the table is
+        unchanged.
+
+        :param group_no: The position of the group in ``self.groups``.
+        :param group: The new ``GroupTable``.
+        """
+
+        if np.array_equal(self._groups[group_no].load_nos, group.load_nos):
+            self._groups[group_no] = group
+            return
+
+        groups = list(self._groups)
+        groups[group_no] = group
+
+        self.groups = groups
+
+    @property
+    def load_nos(self) -> np.ndarray:
+        """
+        A sorted array of the ``load_no`` of every ``Load`` in the table. This
+        gives the column order of the rows returned by the ``rows`` method.
+        """
+
+        return self._load_nos
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        """
+        The no. of options in each ``GroupTable``.
+        """
+
+        return tuple(g.no_options for g in self.groups)
+
+    def __len__(self):
+        """
+        The no. of combinations in the table.
+        """
+
+        if len(self.groups) == 0:
+            return 0
+
+        return prod(self.shape)
+
+    def _indices(self, indices) -> np.ndarray:
+        """
+        Converts indices into an array, checking they are in range.
+        """
+
+        indices = np.asarray(indices, dtype = np.int64)
+
+        if indices.size > 0 and (indices.min() < 0 or indices.max() >= len(self)):
+            raise IndexError(f'Combination index out of range. The table has '
+                             + f'{len(self)} combinations.')
+
+        return indices
+
+    def unravel(self, indices) -> np.ndarray:
+        """
+        Converts combination indices into the option used from each group.
+
+        :param indices: An array of combination indices.
+        :return: An array of shape ``(len(indices), len(self.groups))`` with
+            the option no. from each group.
+        """
+
+        indices = self._indices(indices)
+
+        if len(self.groups) == 0:
+            return np.empty((len(indices), 0), dtype = np.int64)
+
+        # order = 'F' so that the first group varies fastest.
+        options = np.unravel_index(indices, self.shape, order = 'F')
+
+        return np.stack(options, axis = -1).astype(np.int64)
+
+    def ravel(self, options) -> np.ndarray:
+        """
+        Converts the option used from each group into combination indices.
+        This is the inverse of the ``unravel`` method.
+
+        :param options: An array of shape ``(n, len(self.groups))`` with the
+            option no. from each group.
+        :return: An array of combination indices.
+        """
+
+        options = np.asarray(options, dtype = np.int64)
+
+        return np.ravel_multi_index(tuple(options.T), self.shape,
+                                    order = 'F').astype(np.int64)
+
+    def rows(self, indices) -> np.ndarray:
+        """
+        Gets the total factor applied to each load in a set of combinations.
+
+        :param indices: An array of combination indices.
+        :return: An array of shape ``(len(indices), len(self.load_nos))``.
+        """
+
+        options = self.unravel(indices)
+
+        rows = np.zeros((len(options), len(self.load_nos)))
+
+        for g, (table, cols) in enumerate(zip(self.groups, self._cols)):
+            rows[:, cols] += table.factors[options[:, g]]
+
+        return rows
+
+    def present_rows(self, indices) -> np.ndarray:
+        """
+        Gets whether each load is part of a set of combinations. This
+        distinguishes loads with a factor of 0.0 from loads that are not in the
+        combination.
+
+        :param indices: An array of combination indices.
+        :return: An array of booleans of shape
+            ``(len(indices), len(self.load_nos))``.
+        """
+
+        options = self.unravel(indices)
+
+        present = np.zeros((len(options), len(self.load_nos)), dtype = bool)
+
+        for g, (table, cols) in enumerate(zip(self.groups, self._cols)):
+            present[:, cols] |= table.present[options[:, g]]
+
+        return present
+
+    def angles(self, indices) -> np.ndarray:
+        """
+        Gets the angle of the option used from each group for a set of
+        combinations.
+
+        :param indices: An array of combination indices.
+        :return: An array of shape ``(len(indices), len(self.groups))``. ``NaN``
+            where the group's option has no angle.
+        """
+
+        options = self.unravel(indices)
+
+        angles = np.full(options.shape, np.nan)
+
+        for g, table in enumerate(self.groups):
+            angles[:, g] = table.angles[options[:, g]]
+
+        return angles
+
+    def matrix(self) -> np.ndarray:
+        """
+        Gets the full table of factors for every combination.
+
+        :return: An array of shape ``(len(self), len(self.load_nos))``.
+        """
+
+        return self.rows(np.arange(len(self)))
+
+    def chunks(self, chunk_size: int = 65536,
+               start: int = 0) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Iterates through the table in chunks of rows, so that the full table
+        does not need to be held in memory.
+
+        :param chunk_size: The max. no. of rows in each chunk.
+        :param start: The combination index to start from.
+        :return: A generator of ``(start_index, rows)`` tuples.
+        """
+
+        for s in range(start, len(self), chunk_size):
+            e = min(s + chunk_size, len(self))
+
+            yield s, self.rows(np.arange(s, e))
+
+    def __str__(self):
+
+        return (f'{type(self).__name__}: {self.case_name}, '
+                + f'loads: {list(self.load_nos)}, '
+                + f'combinations: {len(self)}')
+
+    def __repr__(self):
+
+        return (f'{type(self).__name__}('
+                + f'case_no = {repr(self.case_no)}, '
+                + f'case_name = {repr(self.case_name)}, '
+                + f'abbrev = {repr(self.abbrev)}, '
+                + f'groups = {repr(self.groups)}'
+                + ')')
@@ -0,0 +1,138 @@
+# coding=utf-8
+
+"""
+This file contains functions to build pandas ``DataFrame`` objects directly
+from the ``FactorTable`` of one or more ``LoadCase`` objects, without building
+any ``Combination`` objects.
+
+``pandas`` is an optional dependency - it is only imported when a
+``DataFrame`` is built.
+"""
+
+from typing import Dict, List, Tuple, Union
+import numpy as np
+
+from LoadCombination.FactorTable import FactorTable
+
+
+def _require_pandas():
+    """
+    Imports ``pandas``, raising a helpful error if it is not installed.
+    """
+
+    try:
+        import pandas
+    except ImportError as e:
+        raise ImportError('pandas is required to build a DataFrame. Install '
+                          + 'it with "pip install pandas".') from e
+
+    return pandas
+
+
+def _frame_data(tables: Union[FactorTable, Dict[int, FactorTable],
+                              List[FactorTable]]) -> Tuple[Dict, np.ndarray,
+                                                           List[str]]:
+    """
+    Builds the arrays that make up the ``DataFrame`` returned by
+    ``factor_frame``.
+
+    :param tables: A single ``FactorTable``, a list of them or a dictionary
+        ``{case_no: FactorTable}``.
+    :return: A tuple of ``(metadata, factors, factor_columns)``, where
+        ``metadata`` is a dictionary of column arrays. The ``case_name`` and
+        ``abbrev`` columns are given as ``(codes, categories)`` tuples.
+    """
+
+    if isinstance(tables, FactorTable):
+        tables = [tables]
+    elif isinstance(tables, dict):
+        tables = list(tables.values())
+
+    if len(tables) == 0:
+        load_nos = np.empty(0, dtype = np.int64)
+    else:
+        load_nos = np.unique(np.concatenate([t.load_nos for t in tables]))
+
+    lengths = np.array([len(t) for t in tables], dtype = np.int64)
+    no_rows = int(lengths.sum())
+
+    factors = np.zeros((no_rows, len(load_nos)))
+    comb_nos = np.empty(no_rows, dtype = np.int64)
+
+    # the angle columns - one per group that has angles.
+    angles = {}
+
+    start = 0
+
+    for t in tables:
+        stop = start + len(t)
+        indices = np.arange(len(t))
+
+        cols = np.searchsorted(load_nos, t.load_nos)
+        factors[start:stop, cols] = t.rows(indices)
+        comb_nos[start:stop] = indices
+
+        table_angles = t.angles(indices)
+
+        for g, group in enumerate(t.groups):
+            if np.all(np.isnan(group.angles)):
+                continue
+
+            name = f'angle_{group.group_name}'
+
+            if name not in angles:
+                angles[name] = np.full(no_rows, np.nan)
+
+            angles[name][start:stop] = table_angles[:, g]
+
+        start = stop
+
+    def categorical(values):
+        categories, codes = np.unique(np.asarray(values, dtype = object),
+                                      return_inverse = True)
+        return np.repeat(codes, lengths), list(categories)
+
+    metadata = {'case_no': np.repeat(np.array([t.case_no for t in tables],
+                                              dtype = np.int64), lengths),
+                'case_name': categorical([t.case_name for t in tables]),
+                'abbrev': categorical([t.abbrev for t in tables]),
+                'comb_no': comb_nos}
+
+    metadata.update(angles)
+
+    return metadata, factors, [f'load_{l}' for l in load_nos]
+
+
+def factor_frame(tables: Union[FactorTable, Dict[int, FactorTable],
+                               List[FactorTable]]):
+    """
+    Builds a ``DataFrame`` with one row per combination, directly from the
+    arrays in one or more ``FactorTable`` objects.
+
+    The columns are ``case_no``, ``case_name`` and ``abbrev`` (both
+    categorical), ``comb_no``, an ``angle_<group_name>`` column for each group
+    with angles, and a ``load_<load_no>`` column with the total factor applied
+    to each ``Load``. The factor columns are created from a single 2D array
+    without copying it.
+
+    :param tables: A single ``FactorTable``, a list of them or a dictionary
+        ``{case_no: FactorTable}`` as returned by
+        ``LoadCombinations.factor_tables``.
+    :return: A ``pandas.DataFrame``.
+    """
+
+    pd = _require_pandas()
+
+    metadata, factors, factor_columns = _frame_data(tables)
+
+    frame = pd.DataFrame(factors, columns = factor_columns, copy = False)
+
+    for i, (name, values) in enumerate(metadata.items()):
+
+        if isinstance(values, tuple):
+            codes, categories = values
+            values = pd.Categorical.from_codes(codes, categories = categories)
+
+        frame.insert(i, name, values)
+
+    return frame
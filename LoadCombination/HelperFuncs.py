@@ -5,13 +5,21 @@ This file contains a number of helper functions that don't really fit under
 the Load or LoadGroup headers.
 """
 
+import functools
+import hashlib
+import inspect
 import math
+import threading
 from collections import namedtuple
 from typing import List, Tuple, Union
 
 # define a named tuple for interpolation results
 InterpResults = namedtuple('InterpResults', ['left', 'right'])
 
+# the code objects whose callable_key is being built in each thread, so that
+# recursive functions do not recurse forever.
+_KEYS_IN_PROGRESS = threading.local()
+
 
 def linear_interp(range: float, x: float):
     """
@@ -153,3 +161,269 @@ def req_angles_chooser(
         return req_angles_int(angles)
     else:
         return req_angles_list(angles)
+
+
+class AngleFilter:
+    """
+    A predicate for ``LoadCase.add_group_filter`` that keeps only the options
+    from a ``RotationalGroup`` or ``WindGroup`` at the given angles. It is a
+    class rather than a closure so that it can be pickled.
+    """
+
+    def __init__(self, angles: Union[List[float], Tuple[float, ...]]):
+        """
+        Constructor for the ``AngleFilter`` object.
+
+        :param angles: The angles to keep. All angles are taken to be in the
+            range of 0-360 degrees by taking the modulus of the angle.
+        """
+
+        self.angles = frozenset(req_angles_list(angles))
+
+    @property
+    def fingerprint(self) -> str:
+
+        return content_hash(type(self).__name__, self.angles)
+
+    def __call__(self, option) -> bool:
+
+        return all('angle' in LF.info and LF.info['angle'] % 360 in self.angles
+                   for LF in option)
+
+    def __repr__(self):
+
+        return f'{type(self).__name__}(angles = {sorted(self.angles)})'
+
+
+class LoadFilter:
+    """
+    A predicate for ``LoadCase.add_group_filter`` that keeps only the options
+    where at least one of the given loads is active. It is a class rather than
+    a closure so that it can be pickled.
+    """
+
+    def __init__(self, load_nos: Union[List[int], Tuple[int, ...], int]):
+        """
+        Constructor for the ``LoadFilter`` object.
+
+        :param load_nos: The ``load_no`` of the loads to keep. A single
+            ``int`` or a list of ``int`` can be provided.
+        """
+
+        if isinstance(load_nos, int):
+            load_nos = [load_nos]
+
+        self.load_nos = frozenset(load_nos)
+
+    @property
+    def fingerprint(self) -> str:
+
+        return content_hash(type(self).__name__, self.load_nos)
+
+    def __call__(self, option) -> bool:
+
+        return any(LF.load.load_no in self.load_nos for LF in option)
+
+    def __repr__(self):
+
+        return f'{type(self).__name__}(load_nos = {sorted(self.load_nos)})'
+
+
+def angle_filter(angles: Union[List[float], Tuple[float, ...]]) -> AngleFilter:
+    """
+    Builds a predicate for ``LoadCase.add_group_filter`` that keeps only the
+    options from a ``RotationalGroup`` or ``WindGroup`` at the given angles.
+
+    :param angles: The angles to keep. All angles are taken to be in the range
+        of 0-360 degrees by taking the modulus of the angle.
+    :return: An ``AngleFilter``, which takes a ``Tuple[LoadFactor, ...]`` and
+        returns ``True`` if the option is at one of the given angles.
+    """
+
+    return AngleFilter(angles)
+
+
+def load_filter(load_nos: Union[List[int], Tuple[int, ...], int]
+                ) -> LoadFilter:
+    """
+    Builds a predicate for ``LoadCase.add_group_filter`` that keeps only the
+    options where at least one of the given loads is active - i.e. for an
+    ``ExclusiveGroup`` only the options for the given loads are kept.
+
+    :param load_nos: The ``load_no`` of the loads to keep. A single ``int`` or
+        a list of ``int`` can be provided.
+    :return: A ``LoadFilter``, which takes a ``Tuple[LoadFactor, ...]`` and
+        returns ``True`` if any of the given loads are in the option.
+    """
+
+    return LoadFilter(load_nos)
+
+
+def code_key(code) -> Tuple:
+    """
+    Builds a key identifying a code object, made up of its constants (with any
+    nested code objects, e.g. for a lambda inside a function, converted
+    recursively), the names it uses and its arguments.
+
+    :param code: The code object to build a key for.
+    :return: A tuple identifying the code object.
+    """
+
+    consts = tuple(code_key(c) if inspect.iscode(c) else fingerprint_value(c)
+                   for c in code.co_consts)
+
+    return (code.co_name, code.co_argcount, code.co_kwonlyargcount,
+            code.co_varnames, code.co_names, consts)
+
+
+@functools.lru_cache(maxsize = 4096)
+def _source(filename: str, code) -> str:
+    """
+    Gets the source code of a code object, or its byte code if the source is
+    not available. The results are cached, as reading the source is slow. The
+    ``filename`` is part of the cache key, as code objects from different
+    files can compare equal.
+    """
+
+    try:
+        return inspect.getsource(code)
+    except (OSError, TypeError):
+        return code.co_code.hex()
+
+
+def _global_names(code) -> List[str]:
+    """
+    Gets the names used by a code object and any nested code objects. These
+    include the names of the globals it reads.
+    """
+
+    names = set(code.co_names)
+
+    for c in code.co_consts:
+        if inspect.iscode(c):
+            names.update(_global_names(c))
+
+    return sorted(names)
+
+
+def _global_value(value):
+    """
+    Converts the value of a global used by a function for use in its
+    ``callable_key``. Modules are identified by their name, and any other
+    values with ``fingerprint_value``.
+    """
+
+    if inspect.ismodule(value):
+        return ('module', value.__name__)
+
+    return fingerprint_value(value)
+
+
+def callable_key(func) -> Tuple:
+    """
+    Builds a stable key identifying a function, for use in a fingerprint. The
+    key is made up of the function's module, name and source code, the
+    constants, names and default arguments of its code, plus the values
+    captured by any closure and the values of any globals it reads, so that
+    (for example) two closures built by the same function with different
+    values have different keys. A ``functools.partial`` is identified by its
+    function and arguments.
+
+    The source code is used rather than the byte code so that the key is the
+    same across Python versions. If the source is not available (e.g. for a
+    function defined in an interactive session) the byte code is used.
+
+    :param func: The function to build a key for.
+    :return: A tuple identifying the function.
+    """
+
+    if func is None:
+        return (None,)
+
+    if isinstance(func, functools.partial):
+        return (type(func).__name__,
+                callable_key(func.func),
+                fingerprint_value(func.args),
+                tuple((k, fingerprint_value(v))
+                      for k, v in sorted(func.keywords.items())))
+
+    code = getattr(func, '__code__', None)
+    name = (getattr(func, '__module__', None),
+            getattr(func, '__qualname__', repr(func)))
+
+    if code is None:
+        return name
+
+    in_progress = getattr(_KEYS_IN_PROGRESS, 'codes', None)
+
+    if in_progress is None:
+        in_progress = _KEYS_IN_PROGRESS.codes = set()
+
+    if id(code) in in_progress:
+        # a recursive function - it is identified by the outer key.
+        return name + ('recursive',)
+
+    in_progress.add(id(code))
+
+    try:
+        closure = getattr(func, '__closure__', None) or ()
+        kwdefaults = getattr(func, '__kwdefaults__', None) or {}
+        func_globals = getattr(func, '__globals__', None) or {}
+
+        return name + (
+            _source(code.co_filename, code),
+            code_key(code),
+            fingerprint_value(getattr(func, '__defaults__', None) or ()),
+            tuple((k, fingerprint_value(v))
+                  for k, v in sorted(kwdefaults.items())),
+            tuple(fingerprint_value(c.cell_contents) for c in closure),
+            tuple((n, _global_value(func_globals[n]))
+                  for n in _global_names(code) if n in func_globals))
+    finally:
+        in_progress.discard(id(code))
+
+
+def fingerprint_value(value):
+    """
+    Converts a value into a form that has a stable ``repr``, for use in a
+    fingerprint. Objects with a ``fingerprint`` property (``Load``,
+    ``LoadGroup`` etc.) are replaced by their fingerprint, and functions by
+    their ``callable_key``.
+
+    :param value: The value to convert.
+    :return: The converted value.
+    """
+
+    if not isinstance(value, type) and hasattr(value, 'fingerprint'):
+        return value.fingerprint
+
+    if isinstance(value, dict):
+        # keep the insertion order - the order of the loads in a group changes
+        # the order of its output.
+        return tuple((k, fingerprint_value(v)) for k, v in value.items())
+
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(fingerprint_value(v) for v in value))
+
+    if isinstance(value, (list, tuple)):
+        return tuple(fingerprint_value(v) for v in value)
+
+    if callable(value):
+        return callable_key(value)
+
+    return value
+
+
+def content_hash(*parts) -> str:
+    """
+    Calculates a SHA-256 hash of a number of values. The values are passed
+    through ``fingerprint_value`` first, so they can include ``Load`` and
+    ``LoadGroup`` objects.
+
+    :param parts: The values to hash.
+    :return: The hash as a hex string.
+    """
+
+    data = repr(fingerprint_value(parts)).encode('utf-8')
+
+    return hashlib.sha256(data).hexdigest()
@@ -0,0 +1,166 @@
+# coding=utf-8
+
+"""
+This file contains a simple bounded least-recently-used cache, used to hold
+objects that are expensive to build (such as ``Combination`` objects) so that
+repeated requests for them are cheap.
+"""
+
+import sys
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class LRUCache:
+    """
+    A least-recently-used cache with a limit on the no. of entries and / or the
+    approx. no. of bytes held. When either limit is exceeded the least recently
+    used entries are discarded.
+    """
+
+    def __init__(self, *, max_entries: int = None, max_bytes: int = None,
+                 sizeof: Callable[[Any], int] = sys.getsizeof):
+        """
+        Constructor for the ``LRUCache`` object.
+
+        :param max_entries: The max. no. of entries in the cache. If ``None``
+            the no. of entries is not limited.
+        :param max_bytes: The max. approx. no. of bytes held by the cache. If
+            ``None`` the size is not limited.
+        :param sizeof: A function used to estimate the size of each value in
+            bytes. Only used if ``max_bytes`` is provided.
+        """
+
+        if max_entries is not None and max_entries < 0:
+            raise ValueError(f'max_entries must be >= 0. '
+                             + f'max_entries given was {max_entries}.')
+
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError(f'max_bytes must be >= 0. '
+                             + f'max_bytes given was {max_bytes}.')
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+
+        self._data = OrderedDict()
+        self._nbytes = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The approx. no. of bytes held by the cache. Only tracked if
+        ``max_bytes`` is provided.
+        """
+
+        return self._nbytes
+
+    def get(self, key: Hashable, default = None):
+        """
+        Gets a value from the cache, marking it as the most recently used.
+
+        :param key: The key of the value.
+        :param default: The value to return if the key is not in the cache.
+        :return: The cached value or ``default``.
+        """
+
+        if key not in self._data:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        self._data.move_to_end(key)
+
+        return self._data[key][0]
+
+    def put(self, key: Hashable, value):
+        """
+        Adds a value to the cache, discarding the least recently used values if
+        the cache is over its limits. Values larger than ``max_bytes`` are not
+        stored and the cache is left unchanged.
+
+        :param key: The key of the value.
+        :param value: The value to store.
+        """
+
+        size = 0 if self.max_bytes is None else self.sizeof(value)
+
+        if self.max_bytes is not None and size > self.max_bytes:
+            # storing the value would only empty the cache to then discard it.
+            return
+
+        if key in self._data:
+            self._nbytes -= self._data.pop(key)[1]
+
+        self._data[key] = (value, size)
+        self._nbytes += size
+
+        self._evict()
+
+    def get_or_put(self, key: Hashable, func: Callable[[], Any]):
+        """
+        Gets a value from the cache, calculating and storing it with ``func``
+        if it is not already cached.
+
+        :param key: The key of the value.
+        :param func: A function with no arguments which calculates the value.
+        :return: The cached value.
+        """
+
+        # use a sentinel so that None can be cached.
+        missing = object()
+
+        value = self.get(key, missing)
+
+        if value is missing:
+            value = func()
+            self.put(key, value)
+
+        return value
+
+    def _evict(self):
+        """
+        Discards the least recently used values until the cache is within its
+        limits.
+        """
+
+        while len(self._data) > 0 and (
+                (self.max_entries is not None
+                 and len(self._data) > self.max_entries)
+                or (self.max_bytes is not None
+                    and self._nbytes > self.max_bytes)):
+
+            key, (value, size) = self._data.popitem(last = False)
+            self._nbytes -= size
+
+    def clear(self):
+        """
+        Discards every value in the cache. The hit / miss counters are not
+        reset.
+        """
+
+        self._data.clear()
+        self._nbytes = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+
+        return key in self._data
+
+    def __len__(self):
+
+        return len(self._data)
+
+    def __str__(self):
+
+        return (f'{type(self).__name__}: entries: {len(self)}, '
+                + f'hits: {self.hits}, misses: {self.misses}')
+
+    def __repr__(self):
+
+        return (f'{type(self).__name__}('
+                + f'max_entries = {repr(self.max_entries)}, '
+                + f'max_bytes = {repr(self.max_bytes)}'
+                + ')')
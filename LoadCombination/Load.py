@@ -7,7 +7,10 @@ combinations.
 More complex loads may be implemented later if required.
 """
 
+import weakref
 from typing import Callable
+from LoadCombination.HelperFuncs import content_hash
+from LoadCombination.SharedLoads import load_reference, resolve_load
 
 class Load:
     """
@@ -15,6 +18,10 @@ class Load:
     classes, but will be acceptable for simple load cases.
     """
 
+    # attributes used for book-keeping only, which are ignored when comparing
+    # or pickling loads.
+    _transient = ('_version', '_observers', '_fingerprint')
+
     def __init__(self, *, load_name: str, load_no: int, abbrev: str = ''):
         """
         Create a Load object.mro
@@ -24,6 +31,10 @@ class Load:
         :param abbrev: an abbreviation for the load case.
         """
 
+        self._version = 0
+        self._observers = {}
+        self._fingerprint = None
+
         self.load_name = load_name
         self.load_no = load_no
         self.abbrev = abbrev
@@ -45,6 +56,7 @@ class Load:
         """
 
         self._load_name = load_name
+        self._touch()
 
     @property
     def load_no(self):
@@ -65,6 +77,7 @@ class Load:
         """
 
         self._load_no = load_no
+        self._touch()
 
     @property
     def abbrev(self) -> str:
@@ -83,6 +96,102 @@ class Load:
         """
 
         self._abbrev = abbrev
+        self._touch()
+
+    @property
+    def version(self) -> int:
+        """
+        A counter that is incremented every time a property of the load is
+        changed. Used to determine if any information derived from the load is
+        out of date.
+
+        :return: The version no. of the load.
+        """
+
+        return self._version
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        A hash of the contents of the load. Two loads with the same type and
+        properties have the same fingerprint. The hash is only re-calculated
+        when the load changes.
+
+        :return: The fingerprint as a hex string.
+        """
+
+        cached = self.__dict__.get('_fingerprint')
+
+        if cached is None or cached[0] != self._version:
+            cached = (self._version,
+                      content_hash(type(self).__name__, self._state()))
+            self._fingerprint = cached
+
+        return cached[1]
+
+    def _touch(self):
+        """
+        Records that the load has changed, and notifies any ``LoadGroup``
+        objects that contain the load so that they can discard any cached
+        output.
+        """
+
+        self._version += 1
+
+        for k, ref in list(self._observers.items()):
+            observer = ref()
+
+            if observer is None:
+                # the LoadGroup no longer exists.
+                del self._observers[k]
+            else:
+                observer._touch()
+
+    def _add_observer(self, observer):
+        """
+        Registers an object (typically a ``LoadGroup``) to be notified when the
+        load changes. Only a weak reference to the object is kept.
+
+        :param observer: An object with a ``_touch`` method.
+        """
+
+        # use setdefault as this may be called while unpickling, before the
+        # load's own state has been restored.
+        self.__dict__.setdefault('_observers', {})[id(observer)] = weakref.ref(observer)
+
+    def _remove_observer(self, observer):
+        """
+        Stops notifying an object when the load changes.
+
+        :param observer: An object previously passed to ``_add_observer``.
+        """
+
+        self._observers.pop(id(observer), None)
+
+    def __getstate__(self):
+        # weak references cannot be pickled, and the observers are not part of
+        # the load itself.
+        state = self.__dict__.copy()
+        state.pop('_observers', None)
+
+        return state
+
+    def __setstate__(self, state):
+
+        observers = self.__dict__.get('_observers', {})
+
+        self.__dict__.update(state)
+        self._observers = observers
+
+    def __reduce_ex__(self, protocol):
+        # if the load is in the active LoadTable only a reference to it is
+        # pickled. See SharedLoads.LoadTable.
+        reference = load_reference(self)
+
+        if reference is not None:
+            return resolve_load, reference
+
+        return super().__reduce_ex__(protocol)
 
     def __repr__(self):
         # Using {type(self).__name} to allow this method to be inherited by
@@ -101,13 +210,22 @@ class Load:
                 + f' {self.load_name}, '
                 + f'load no: {self.load_no}')
 
+    def _state(self):
+        """
+        Returns the attributes of the load that are compared by the equality
+        test, excluding any book-keeping attributes.
+        """
+
+        return {k: v for k, v in self.__dict__.items()
+                if k not in self._transient}
+
     def __eq__(self, other):
         """
         Override the equality test.
         """
 
         if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
+            return self._state() == other._state()
 
         return NotImplemented
 
@@ -172,6 +290,7 @@ class ScalableLoad(Load):
         """
 
         self._load_value = load_value
+        self._touch()
 
     def scale_factor(self, *, scale_to: float,
                      scale_func: Callable[[float, float], float] = None,
@@ -267,6 +386,7 @@ class RotatableLoad(ScalableLoad):
         """
 
         self._angle = angle % 360.0
+        self._touch()
 
     @property
     def symmetrical(self) -> bool:
@@ -291,6 +411,7 @@ class RotatableLoad(ScalableLoad):
         """
 
         self._symmetrical = symmetrical
+        self._touch()
 
     def __repr__(self):
         return (f'{type(self).__name__}('
@@ -356,6 +477,7 @@ class WindLoad(RotatableLoad):
         """
 
         self._load_value = wind_speed
+        self._touch()
 
     def scale_speed(self, wind_speed_to, scale):
         """
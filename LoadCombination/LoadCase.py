@@ -6,12 +6,41 @@ LoadGroup objects and use them to output relevant load combinations within the
 case.
 """
 
-from typing import Dict, List, Union
+import sys
+from itertools import product
+from typing import Callable, Dict, Iterator, List, Tuple, Union
+import numpy as np
 from LoadCombination.LoadGroup import LoadGroup
+from LoadCombination.LoadFactor import LoadFactor
 from LoadCombination.exceptions import (LoadGroupExistsException, LoadGroupNotPresentException,
                                         InvalidCombinationFactor)
 from LoadCombination.GroupFactor import GroupFactor
 from LoadCombination.Combination import Combination
+from LoadCombination.LoadIndex import LoadIndex
+from LoadCombination.FactorTable import GroupTable, FactorTable
+from LoadCombination.FactorMatrix import FactorMatrix
+from LoadCombination.FrameExport import factor_frame
+from LoadCombination.TextExport import Exporter, RecordFormat
+from LoadCombination.HelperFuncs import content_hash
+from LoadCombination.LRUCache import LRUCache
+
+
+def _combination_nbytes(combination: Combination) -> int:
+    """
+    Estimates the memory used by a ``Combination`` built by
+    ``LoadCase.combination``. The ``LoadFactor`` objects are shared with the
+    ``LoadGroup`` caches so are not counted.
+    """
+
+    size = sys.getsizeof(combination) + sys.getsizeof(combination.__dict__)
+
+    for v in combination.__dict__.values():
+        size += sys.getsizeof(v)
+
+        if isinstance(v, dict):
+            size += sum(sys.getsizeof(l) for l in v.values())
+
+    return size
 
 
 class LoadCase:
@@ -20,6 +49,10 @@ class LoadCase:
     to generate appropriate load combinations.
     """
 
+    # attributes used for book-keeping only, which are ignored when comparing
+    # load cases.
+    _transient = ('_combination_cache', '_combination_cache_state')
+
     def __init__(self, *, case_name: str, case_no: int,
                  load_groups: Union[Dict[str, GroupFactor],
                                           List[GroupFactor],
@@ -49,6 +82,11 @@ class LoadCase:
         :param abbrev: The abbreviation of the ``LoadCase``.
         """
 
+        self._group_filters = {}
+        self._filters = []
+        self._combination_cache = None
+        self._combination_cache_state = None
+
         self.case_name = case_name
         self.case_no = case_no
         self.load_groups = load_groups
@@ -253,6 +291,7 @@ class LoadCase:
 
         if group_present != False:
             self._load_groups.pop(group_present)
+            self._group_filters.pop(group_present, None)
 
         else:
             raise LoadGroupNotPresentException(f'Attempted to delete LoadGroup'
@@ -397,81 +436,573 @@ class LoadCase:
 
         self._abbrev = abbrev
 
-    def generate_cases(self) -> List[Combination]:
+    @property
+    def fingerprint(self) -> str:
+        """
+        A hash of the contents of the ``LoadCase``, built from the fingerprints
+        of its ``LoadGroup`` objects, their ``group_factor`` and any filters.
+        Two cases with the same fingerprint generate the same combinations.
+
+        The fingerprints of the ``LoadGroup`` objects are cached, so only
+        groups that have changed are re-hashed.
+
+        :return: The fingerprint as a hex string.
         """
-        Generates a generator that generates ``Combination`` objects, which
-        generates all possible load combinations from the case.
 
-        :return: Returns a generator which generates all possible load
-            combinations from the case.
+        return content_hash(type(self).__name__,
+                            self.case_name,
+                            self.case_no,
+                            self.abbrev,
+                            [(k, g.group_factor, g.load_group)
+                             for k, g in self.load_groups.items()],
+                            self.group_filters,
+                            self.filters)
+
+    @property
+    def group_filters(self) -> Dict[str, List[Callable[[Tuple[LoadFactor, ...]],
+                                                    bool]]]:
         """
+        The predicates applied to the output of each ``LoadGroup`` before the
+        combinations are generated.
 
-        comb_list = []
+        :return: A dictionary of the format ``{group_name: [predicate, ...]}``.
+        """
 
-        def copy_comb_list(comb_list: List[Combination]) -> List[Combination]:
-            """
-            Helper function that does a copy of a list of Combination objects.
+        return self._group_filters
 
-            This is needed as we add ``LoadFactors`` to the Combinations
+    @property
+    def filters(self) -> List[Callable[[Combination], bool]]:
+        """
+        The predicates applied to each ``Combination`` as it is generated.
 
-            :param comb_list: The list to copy.
-            :return: A copy of the list where each item is a shallow copy of the
-                original.
-            """
+        :return: A list of predicates.
+        """
 
-            ret_list = []
+        return self._filters
 
-            for i in comb_list:
-                ret_list.append(i.Copy())
+    def add_group_filter(self, *,
+                         predicate: Callable[[Tuple[LoadFactor, ...]], bool],
+                         group_name: str = None,
+                         load_group: LoadGroup = None):
+        """
+        Adds a predicate that filters the output of a single ``LoadGroup``.
+
+        The predicate is applied to each tuple of ``LoadFactor`` objects output
+        by the ``LoadGroup.generate_groups`` method before the combinations are
+        generated, so options that are filtered out are never expanded into
+        combinations. Only options for which the predicate returns ``True`` are
+        kept. If multiple predicates are added to a group, all must be ``True``.
+
+        The ``LoadGroup`` can either be specified by the ``group_name`` or a
+        ``LoadGroup`` object can be provided directly.
 
-            return ret_list
+        :param predicate: A function that takes a ``Tuple[LoadFactor, ...]`` and
+            returns a ``bool``. See ``HelperFuncs.angle_filter`` and
+            ``HelperFuncs.load_filter`` for common predicates.
+        :param group_name: The ``group_name`` of the ``LoadGroup`` to filter.
+        :param load_group: A ``LoadGroup`` object to filter.
+        """
+
+        if load_group != None:
+
+            group_name = self.group_exists(load_group = load_group)
+
+        elif group_name == None:
+
+            raise ValueError(f'To add a filter a LoadGroup needs to be '
+                             + f'specified - none specified.')
+
+        else:
+
+            group_name = self.group_exists(group_name = group_name)
+
+        if group_name == False:
+            raise LoadGroupNotPresentException(f'Attempted to add a filter to '
+                                               + f'a LoadGroup which did not '
+                                               + f'exist.')
+
+        if group_name not in self._group_filters:
+            self._group_filters[group_name] = []
+
+        self._group_filters[group_name].append(predicate)
+
+    def add_filter(self, predicate: Callable[[Combination], bool]):
+        """
+        Adds a predicate that filters the generated combinations.
+
+        The predicate is applied to each ``Combination`` as it is generated and
+        only combinations for which it returns ``True`` are kept. Where possible
+        prefer ``add_group_filter``, as whole-combination predicates can only be
+        applied after the combination has been built.
+
+        :param predicate: A function that takes a ``Combination`` and returns a
+            ``bool``.
+        """
+
+        self._filters.append(predicate)
+
+    def clear_filters(self):
+        """
+        Removes all group and combination filters from the ``LoadCase``.
+        """
+
+        self._group_filters = {}
+        self._filters = []
+
+    def group_options(self) -> List[Tuple[Tuple[LoadFactor, ...], ...]]:
+        """
+        Gets the output of each ``LoadGroup`` in the case, with the
+        ``group_factor`` applied and any group filters applied.
+
+        :return: A list, in the same order as ``self.load_groups``, where each
+            item is a tuple of the options output by the ``LoadGroup``.
+        """
+
+        options = []
 
-        # iterate through all the load group items
         for k, g in self.load_groups.items():
 
-            # need to get a temporary list containing everything already in
-            # the comb_list
+            group_options = g.load_group.cached_groups(group_factor = g.group_factor)
 
-            # if the list is empty, need to create combinations:
+            predicates = self._group_filters.get(k, [])
 
-            if len(comb_list) == 0:
+            if len(predicates) > 0:
+                group_options = [o for o in group_options
+                                 if all(p(o) for p in predicates)]
 
-                # for each output of the load_group, create a LoadFactor.
-                for LF in g.load_group.generate_groups(group_factor = g.group_factor):
+            options.append(tuple(group_options))
 
-                    #Using the LoadFactor, create the combination
-                    comb = Combination(load_case_no = self.case_no,
-                                       load_case = self.case_name,
-                                       load_case_abbrev = self.abbrev,
-                                       load_factors = LF
-                                       )
+        return options
 
-                    # next append the combination object into comb_list:
-                    comb_list.append(comb)
+    def iter_cases(self, load_index: LoadIndex = None) -> Iterator[Combination]:
+        """
+        A generator that yields the ``Combination`` objects from the case one
+        at a time, so that they do not all have to be held in memory. The
+        combinations are yielded in the same order as ``generate_cases``.
+
+        :param load_index: Optionally provide a ``LoadIndex`` object. If
+            provided, every generated combination is added to the index as it is
+            generated, using its position in the output as its id.
+        :return: A generator of ``Combination`` objects.
+        """
 
-            else:
-                # if there are already combinations, we need to add the
-                # LoadFactors generated to the existing combinations
+        if len(self.load_groups) == 0:
+            return
+
+        # first get the filtered output of each load_group.
+        options = self.group_options()
+
+        comb_id = 0
+
+        # itertools.product varies the last element fastest, but the
+        # combinations are ordered with the first LoadGroup varying fastest, so
+        # iterate over the options in reverse.
+        for LFs in product(*reversed(options)):
+
+            load_factors = [LF for option in reversed(LFs) for LF in option]
+
+            comb = Combination(load_case_no = self.case_no,
+                               load_case = self.case_name,
+                               load_case_abbrev = self.abbrev,
+                               load_factors = load_factors)
+
+            if not all(p(comb) for p in self._filters):
+                continue
+
+            if load_index is not None:
+                load_index.add_combination(comb_id = comb_id,
+                                           combination = comb)
+
+            comb_id += 1
+
+            yield comb
+
+    def generate_cases(self, load_index: LoadIndex = None) -> List[Combination]:
+        """
+        Generates a list of ``Combination`` objects, containing all possible
+        load combinations from the case.
+
+        The combinations are ordered so that the options of the first
+        ``LoadGroup`` in ``self.load_groups`` vary fastest.
+
+        Any group filters are applied to the output of each ``LoadGroup``
+        before the combinations are generated, and any combination filters are
+        applied as each combination is generated.
+
+        :param load_index: Optionally provide a ``LoadIndex`` object. If
+            provided, every generated combination is added to the index as it is
+            generated, using its position in the returned list as its id.
+        :return: Returns a list containing all possible load combinations from
+            the case.
+        """
+
+        return list(self.iter_cases(load_index = load_index))
+
+    def generate_index(self) -> LoadIndex:
+        """
+        Generates a ``LoadIndex`` object that maps the ``load_no`` of each
+        ``Load`` in the case to the combinations that use it.
+
+        Note that this generates all the combinations from the case - if the
+        combinations are also required it is more efficient to pass a
+        ``LoadIndex`` into the ``generate_cases`` method.
+
+        :return: A ``LoadIndex`` for the combinations generated by the case.
+        """
 
-                orig_list = copy_comb_list(comb_list)
-                comb_list = [] # cleared out so we can replace.
+        load_index = LoadIndex()
 
-                # for each output of the load_group, create a LoadFactor
-                for LF in g.load_group.generate_groups(group_factor = g.group_factor):
+        self.generate_cases(load_index = load_index)
+
+        return load_index
+
+    def _check_product_space(self):
+        """
+        Checks that the combinations of the case can be addressed by their
+        index in the product of the ``LoadGroup`` options. This is not possible
+        if combination filters have been added, as these can only be applied
+        once each combination has been generated.
+        """
+
+        if len(self._filters) > 0:
+            raise ValueError(f'Combinations cannot be addressed by index when '
+                             + f'combination filters are applied. Use '
+                             + f'add_group_filter or generate_cases instead.')
+
+    def _group_state(self, group_name: str) -> Tuple:
+        """
+        Records the state of a ``LoadGroup`` in the case, so that anything
+        derived from the group's output (e.g. its ``GroupTable``) can be
+        checked to see if it is out of date.
+
+        :param group_name: The ``group_name`` of the ``LoadGroup``.
+        :return: A tuple that changes if the ``LoadGroup`` object, its version,
+            its ``group_factor`` or its group filters change.
+        """
 
-                    # add this LoadFactor to each Combination in the original
-                    # comb_list object
+        g = self.load_groups[group_name]
 
-                    for C in orig_list:
-                        comb = C.Copy()
+        return (id(g.load_group),
+                g.load_group.version,
+                g.group_factor,
+                tuple(id(p) for p in self._group_filters.get(group_name, [])))
 
-                        # add the LoadFactor into the combination.
-                        comb.add_load_factor(LF)
+    def _kept_options(self, group_name: str) -> Union[List[int], None]:
+        """
+        Applies the group filters for a ``LoadGroup`` to its output.
+
+        :param group_name: The ``group_name`` of the ``LoadGroup``.
+        :return: The option nos. that pass the filters, or ``None`` if the
+            group has no filters.
+        """
+
+        predicates = self._group_filters.get(group_name, [])
+
+        if len(predicates) == 0:
+            return None
+
+        # the predicates are applied to the options with the group_factor
+        # applied, as they are in group_options.
+        g = self.load_groups[group_name]
+        options = g.load_group.cached_groups(group_factor = g.group_factor)
+
+        return [i for i, o in enumerate(options)
+                if all(p(o) for p in predicates)]
+
+    def group_table(self, group_name: str) -> GroupTable:
+        """
+        Gets the output of a single ``LoadGroup`` in the case as a
+        ``GroupTable``, with the ``group_factor`` and any group filters
+        applied.
+
+        The table is derived from the ``LoadGroup.group_table`` method by
+        multiplying it by the ``group_factor``, so the options of a
+        ``LoadGroup`` are only generated once, however many ``LoadCase``
+        objects use it.
+
+        :param group_name: The ``group_name`` of the ``LoadGroup``.
+        :return: A ``GroupTable`` object.
+        """
 
-                        # add the combination into the combination list
-                        comb_list.append(comb)
+        g = self.load_groups[group_name]
 
-        return comb_list
+        table = g.load_group.group_table().scaled(g.group_factor)
+
+        keep = self._kept_options(group_name)
+
+        if keep is not None:
+            table = table.take(keep)
+
+        return table
+
+    def group_tables(self) -> List[GroupTable]:
+        """
+        Gets the output of each ``LoadGroup`` in the case as a ``GroupTable``.
+        See the ``group_table`` method.
+
+        :return: A list of ``GroupTable`` objects, in the same order as
+            ``self.load_groups``.
+        """
+
+        return [self.group_table(k) for k in self.load_groups]
+
+    def factor_table(self) -> FactorTable:
+        """
+        Generates a ``FactorTable`` containing the load factors for every
+        combination in the case, in the same order as ``generate_cases``.
+
+        Any group filters are applied. Combination filters cannot be applied.
+
+        :return: A ``FactorTable`` object.
+        """
+
+        self._check_product_space()
+
+        return FactorTable(case_no = self.case_no,
+                           case_name = self.case_name,
+                           abbrev = self.abbrev,
+                           groups = self.group_tables())
+
+    def save_factor_matrix(self, path: str, *, chunk_size: int = 65536):
+        """
+        Saves the factors for every combination in the case to ``.npy`` or
+        ``.npz`` files, so they can be loaded by other processes with
+        ``FactorMatrix.load``. See ``FactorMatrix.save``.
+
+        :param path: The directory or ``.npz`` file to write.
+        :param chunk_size: The no. of rows written at a time.
+        """
+
+        FactorMatrix.save(self.factor_table(), path, chunk_size = chunk_size)
+
+    def to_frame(self):
+        """
+        Builds a pandas ``DataFrame`` with one row per combination in the case,
+        directly from the case's ``FactorTable``. See
+        ``FrameExport.factor_frame`` for the columns. Requires ``pandas``.
+
+        :return: A ``pandas.DataFrame``.
+        """
+
+        return factor_frame(self.factor_table())
+
+    def export(self, path: str, *,
+               record_format: Union[str, RecordFormat] = 'text',
+               compression: str = 'infer',
+               buffer_size: int = 1 << 20) -> int:
+        """
+        Streams the combinations in the case to a text file, one line per
+        combination, for import into an analysis program. See
+        ``TextExport.Exporter``.
+
+        :param path: The file to write.
+        :param record_format: A ``RecordFormat`` object, or the name of a
+            format in ``TextExport.FORMATS``.
+        :param compression: One of ``None``, ``'gzip'``, ``'lzma'`` or
+            ``'infer'`` to use the file extension.
+        :param buffer_size: The approx. no. of characters written at a time.
+        :return: The no. of combinations written.
+        """
+
+        return Exporter(record_format,
+                        buffer_size = buffer_size).write(self, path,
+                                                         compression = compression)
+
+    @property
+    def no_combinations(self) -> int:
+        """
+        The no. of combinations generated by the case, after any group filters
+        are applied. Combination filters are not taken into account.
+
+        :return: The no. of combinations.
+        """
+
+        if len(self.load_groups) == 0:
+            return 0
+
+        return int(np.prod([len(o) for o in self.group_options()],
+                           dtype = object))
+
+    def _decode(self, options: List[Tuple[Tuple[LoadFactor, ...], ...]],
+                option_nos) -> Combination:
+        """
+        Builds a ``Combination`` from the option no. used from each group.
+
+        :param options: The output of the ``group_options`` method.
+        :param option_nos: The option no. used from each group.
+        :return: A ``Combination`` object.
+        """
+
+        load_factors = [LF for o, i in zip(options, option_nos) for LF in o[i]]
+
+        return Combination(load_case_no = self.case_no,
+                           load_case = self.case_name,
+                           load_case_abbrev = self.abbrev,
+                           load_factors = load_factors)
+
+    @property
+    def combination_cache(self) -> LRUCache:
+        """
+        The ``LRUCache`` holding the ``Combination`` objects built by the
+        ``combination`` and ``sample`` methods, or ``None`` if caching is not
+        enabled. Use ``set_combination_cache`` to enable it.
+        """
+
+        return self._combination_cache
+
+    def set_combination_cache(self, *, max_entries: int = None,
+                              max_bytes: int = None):
+        """
+        Enables a bounded cache in front of the ``combination`` and ``sample``
+        methods, so that repeated requests for the same combination return the
+        already built ``Combination`` object. Any existing cache is discarded.
+
+        Note that the same ``Combination`` objects are returned each time, so
+        they should not be modified.
+
+        :param max_entries: The max. no. of combinations to hold.
+        :param max_bytes: The max. approx. no. of bytes of combinations to hold.
+            If both ``max_entries`` and ``max_bytes`` are ``None`` the cache is
+            disabled.
+        """
+
+        if max_entries is None and max_bytes is None:
+            self._combination_cache = None
+        else:
+            self._combination_cache = LRUCache(max_entries = max_entries,
+                                               max_bytes = max_bytes,
+                                               sizeof = _combination_nbytes)
+
+        self._combination_cache_state = None
+
+    def _cache_state(self) -> Tuple:
+        """
+        Builds a key that changes whenever the combinations generated by the
+        case could change, so that the combination cache can be cleared.
+        """
+
+        return (self.case_no,
+                self.case_name,
+                self.abbrev,
+                tuple((k, self._group_state(k)) for k in self.load_groups))
+
+    def _combinations(self, options: List[Tuple[Tuple[LoadFactor, ...], ...]],
+                      indices) -> List[Combination]:
+        """
+        Builds the ``Combination`` objects for a set of indices, using the
+        combination cache if it is enabled.
+
+        :param options: The output of the ``group_options`` method.
+        :param indices: The indices of the combinations. Must be in range.
+        :return: A list of ``Combination`` objects.
+        """
+
+        shape = tuple(len(o) for o in options)
+        indices = np.asarray(indices, dtype = np.int64)
+
+        option_nos = np.stack(np.unravel_index(indices, shape, order = 'F'),
+                              axis = -1)
+
+        cache = self._combination_cache
+
+        if cache is None:
+            return [self._decode(options, o) for o in option_nos]
+
+        state = self._cache_state()
+
+        if state != self._combination_cache_state:
+            # the case has changed, so the cached combinations are stale.
+            cache.clear()
+            self._combination_cache_state = state
+
+        return [cache.get_or_put(int(i), lambda o = o: self._decode(options, o))
+                for i, o in zip(indices, option_nos)]
+
+    def combination(self, index: int) -> Combination:
+        """
+        Builds a single ``Combination`` directly from its index, without
+        generating the other combinations in the case.
+
+        The index matches the position of the combination in the list returned
+        by ``generate_cases``. Combination filters cannot be applied.
+
+        :param index: The index of the combination.
+        :return: A ``Combination`` object.
+        """
+
+        self._check_product_space()
+
+        options = self.group_options()
+        shape = tuple(len(o) for o in options)
+
+        if len(shape) == 0 or not 0 <= index < np.prod(shape, dtype = object):
+            raise IndexError(f'Combination index {index} out of range.')
+
+        return self._combinations(options, [index])[0]
+
+    def sample_indices(self, n: int, *, seed = None,
+                       replace: bool = True) -> np.ndarray:
+        """
+        Draws uniformly distributed random combination indices from the case,
+        without generating the combinations.
+
+        :param n: The no. of indices to draw.
+        :param seed: A seed for the random number generator, so that the sample
+            is reproducible. Anything accepted by ``numpy.random.default_rng``
+            can be provided.
+        :param replace: Draw with replacement? If ``False`` every index is
+            unique and ``n`` must not be greater than the no. of combinations.
+        :return: An array of combination indices.
+        """
+
+        self._check_product_space()
+
+        total = self.no_combinations
+
+        if total == 0:
+            raise ValueError('Cannot sample from a LoadCase with no '
+                             + 'combinations.')
+
+        rng = np.random.default_rng(seed)
+
+        if replace:
+            return rng.integers(0, total, size = n, dtype = np.int64)
+
+        if n > total:
+            raise ValueError(f'Cannot sample {n} combinations without '
+                             + f'replacement from a LoadCase with {total} '
+                             + f'combinations.')
+
+        return rng.choice(total, size = n, replace = False).astype(np.int64)
+
+    def sample(self, n: int, *, seed = None, replace: bool = True,
+               as_factors: bool = False) -> Union[List[Combination],
+                                                  np.ndarray]:
+        """
+        Draws uniformly distributed random combinations from the case, without
+        generating the other combinations. The cost is proportional to ``n``
+        and the no. of ``LoadGroup`` options, and is independent of the total
+        no. of combinations.
+
+        :param n: The no. of combinations to draw.
+        :param seed: A seed for the random number generator, so that the sample
+            is reproducible. Anything accepted by ``numpy.random.default_rng``
+            can be provided.
+        :param replace: Draw with replacement? If ``False`` every combination
+            is unique.
+        :param as_factors: If ``True`` return an array of factor rows instead of
+            ``Combination`` objects. The columns are in the order given by
+            ``self.factor_table().load_nos``.
+        :return: A list of ``Combination`` objects or an array of shape
+            ``(n, no. of loads)``.
+        """
+
+        indices = self.sample_indices(n, seed = seed, replace = replace)
+
+        if as_factors:
+            return self.factor_table().rows(indices)
+
+        return self._combinations(self.group_options(), indices)
 
     def __str__(self):
         # use the {type(self).__name__} call to get the exact class name. This
@@ -494,13 +1025,22 @@ class LoadCase:
                 + f'abbrev = {repr(self.abbrev)}'
                 + ')')
 
+    def _state(self):
+        """
+        Returns the attributes of the case that are compared by the equality
+        test, excluding any book-keeping attributes.
+        """
+
+        return {k: v for k, v in self.__dict__.items()
+                if k not in self._transient}
+
     def __eq__(self, other):
         """
         Override the equality test.
         """
 
         if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
+            return self._state() == other._state()
 
         return NotImplemented
 
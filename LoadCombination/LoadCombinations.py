@@ -6,11 +6,31 @@ used to combine Loads, LoadGroups and LoadCases together into a single simple
 object for use by the end user.
 """
 
-from typing import Union, Dict, List
+from collections import namedtuple
+from typing import Union, Dict, List, Tuple
 from LoadCombination.Load import Load
 from LoadCombination.LoadGroup import LoadGroup
+from LoadCombination.LoadCase import LoadCase
+from LoadCombination.Combination import Combination
+from LoadCombination.LoadIndex import LoadIndex
+from LoadCombination.FactorTable import GroupTable, FactorTable
+from LoadCombination.HelperFuncs import content_hash
+from LoadCombination.ModelDiff import CaseDiff, diff_models
+from LoadCombination.TableCache import TableCache
+from LoadCombination.FactorMatrix import FactorMatrix
+from LoadCombination.FrameExport import factor_frame
+from LoadCombination.TextExport import Exporter, RecordFormat
+from LoadCombination.ModelFile import CompiledModel
 from LoadCombination.exceptions import (LoadExistsException, LoadNotPresentException,
-                                        LoadGroupExistsException, LoadGroupNotPresentException)
+                                        LoadGroupExistsException, LoadGroupNotPresentException,
+                                        LoadCaseExistsException, LoadCaseNotPresentException)
+
+# define a named tuple for reporting the results of an incremental update of
+# the factor tables. 'added', 'removed' and 'rebuilt' are lists of case_no,
+# 'patched' is a dictionary of {case_no: [group_name, ...]}.
+TableUpdate = namedtuple('TableUpdate', ['added', 'removed', 'rebuilt',
+                                         'patched'])
+
 
 class LoadCombinations():
     """
@@ -18,6 +38,10 @@ class LoadCombinations():
     objects in a single object to simplify the user interface.
     """
 
+    # attributes used for book-keeping only, which are ignored when comparing
+    # LoadCombinations objects.
+    _transient = ('_tables', '_table_states')
+
     def __init__(self, *,
                  loads: Union[Load, Dict[int, Load], List[Load]] = None):
         """
@@ -29,10 +53,13 @@ class LoadCombinations():
             ``Dict[int, Load]`` or a ``List[Load]``.
         """
 
+        self._tables = {}
+        self._table_states = {}
+
         self.loads = loads
 
-        self._load_groups = None
-        self._load_cases = None
+        self._load_groups = {}
+        self._load_cases = {}
 
     @property
     def loads(self):
@@ -222,12 +249,16 @@ class LoadCombinations():
             for lg in load_group:
                 self.add_group(lg)
 
+            return
+
         if isinstance(load_group, Dict):
             # if a dictionary of groups, recursively add them individually
 
             for lg in load_group.values():
                 self.add_group(lg)
 
+            return
+
         if not isinstance(load_group, LoadGroup):
             # raise an error if not a LoadGroup
 
@@ -269,7 +300,7 @@ class LoadCombinations():
 
         for load, v in overwrite.items():
             # now actually replace the loads in LoadGroup:
-            load_group.loads[l] = v
+            load_group._replace_load(v)
 
         # finally add to the self._load_groups dictionary
 
@@ -363,44 +394,418 @@ class LoadCombinations():
                              + f' to be provided. No information provided.')
 
     @property
-    def load_cases(self):
+    def load_cases(self) -> Dict[int, LoadCase]:
         """
+        Gets the ``LoadCase`` objects stored in the LoadCombination object.
 
-        :return:
+        :return: Returns a ``Dict[int, LoadCase]`` of the cases, where ``int``
+            is the ``case_no`` of the ``LoadCase``.
         """
 
         return self._load_cases
 
     @load_cases.setter
-    def load_cases(self, load_cases):
+    def load_cases(self, load_cases: Union[LoadCase,
+                                           Dict[int, LoadCase],
+                                           List[LoadCase]]):
         """
+        Sets the ``LoadCase`` objects stored in the LoadCombination object.
+        Note that this completely overwrites the existing cases.
 
-        :param load_cases:
-        :return:
+        :param load_cases: The case to add. Can be a single ``LoadCase``
+            object, a ``Dict[int, LoadCase]`` or a ``List[LoadCase]``.
         """
 
         self._load_cases = {}
 
         self.add_case(load_cases)
 
-    def add_case(self, load_cases):
+    def add_case(self, load_case: Union[LoadCase,
+                                        Dict[int, LoadCase],
+                                        List[LoadCase]]):
         """
+        Adds a ``LoadCase`` to the LoadCombination.
 
-        :param load_cases:
-        :return:
+        Any ``LoadGroup`` used by the ``LoadCase`` that is not already in the
+        LoadCombination is also added. If an identical ``LoadGroup`` is already
+        present the ``LoadCase`` is updated to refer to the existing
+        ``LoadGroup`` so that references are the same across the objects.
+
+        :param load_case: The case to add. Can be a single ``LoadCase``
+            object, a ``Dict[int, LoadCase]`` or a ``List[LoadCase]``.
         """
 
-        raise NotImplementedError
+        if isinstance(load_case, List):
+            # if a list of cases, recursively add them individually
+
+            for lc in load_case:
+                self.add_case(lc)
+
+            return
+
+        if isinstance(load_case, Dict):
+            # if a dictionary of cases, recursively add them individually
+
+            for lc in load_case.values():
+                self.add_case(lc)
+
+            return
+
+        if not isinstance(load_case, LoadCase):
+            # raise an error if not a LoadCase
+
+            raise ValueError(f'Expected a LoadCase object but instead received'
+                             + f' a {type(load_case)}')
 
-    def del_case(self, load_case_no = None, load_case = None):
+        if self.case_exists(case_no = load_case.case_no):
+
+            raise LoadCaseExistsException(f'Load case {load_case.case_no} '
+                                          + f'already exists.')
+
+        # next check the LoadGroups in the case against the existing groups.
+
+        for gf in load_case.load_groups.values():
+
+            lg = gf.load_group
+
+            if lg.group_name not in self.load_groups:
+                self.add_group(lg)
+
+            elif lg is not self.load_groups[lg.group_name]:
+
+                if lg == self.load_groups[lg.group_name]:
+                    # replace the group in the LoadCase so that references
+                    # are the same across the objects
+                    gf.load_group = self.load_groups[lg.group_name]
+
+                else:
+                    raise LoadGroupExistsException(f'Load case '
+                                                   + f'{load_case.case_no} uses'
+                                                   + f' a LoadGroup '
+                                                   + f'{lg.group_name} that '
+                                                   + f'differs from the '
+                                                   + f'existing LoadGroup with '
+                                                   + f'the same name.')
+
+        self._load_cases[load_case.case_no] = load_case
+
+    def del_case(self, load_case_no: int = None, load_case: LoadCase = None):
         """
+        A method to delete a single ``LoadCase`` from the ``self.load_cases``
+        property.
 
-        :param load_case_no:
-        :param load_case:
-        :return:
+        The ``LoadCase`` to delete can be specified by either the
+        ``load_case_no`` or a ``LoadCase`` object can be passed in directly.
+
+        Note that any ``LoadGroup`` objects used by the ``LoadCase`` are not
+        deleted.
+
+        :param load_case_no: The ``case_no`` of the ``LoadCase`` to delete.
+        :param load_case: A ``LoadCase`` object to delete.
+        """
+
+        case_present = self.case_exists(case_no = load_case_no,
+                                        load_case = load_case)
+
+        if case_present is not False:
+            self._load_cases.pop(case_present)
+
+        else:
+            raise LoadCaseNotPresentException(f'Attempted to delete LoadCase'
+                                              + f' which did not exist.')
+
+    def case_exists(self, *, case_no: int = None,
+                    load_case: LoadCase = None) -> Union[bool, int]:
+        """
+        This method searches the ``self.load_cases`` property of the
+        ``LoadCombination`` to determine if a ``LoadCase`` exists in it.
+        It will search by either the ``case_no`` property of the ``LoadCase``,
+        or can search using a given ``LoadCase`` object.
+
+        Only one parameter should be given otherwise an error is raised.
+
+        :param case_no: The ``case_no`` of the ``LoadCase`` to check for.
+        :param load_case: A ``LoadCase`` object to check for.
+        :returns: Either the ``case_no`` of the ``LoadCase`` (if found)
+            or ``False``.
+        """
+
+        args = [case_no, load_case]
+        sumargs = sum(x is not None for x in args)
+
+        if sumargs == 0:
+            raise ValueError('No LoadCase is provided to search for.')
+        elif sumargs > 1:
+            raise ValueError('More than one parameter is provided to search for'
+                             + ' - provide only a single parameter.')
+
+        if case_no is not None:
+
+            if case_no in self.load_cases:
+                return case_no
+
+            return False
+
+        if load_case.case_no in self.load_cases:
+            # if the case may be in the load_cases dictionary then check if it
+            # actually is
+
+            if load_case == self.load_cases[load_case.case_no]:
+                return load_case.case_no
+
+        return False
+
+    def generate_cases(self,
+                       load_index: LoadIndex = None
+                       ) -> Dict[int, List[Combination]]:
+        """
+        Generates the ``Combination`` objects for every ``LoadCase`` in the
+        LoadCombination.
+
+        :param load_index: Optionally provide a ``LoadIndex`` object. If
+            provided, every generated combination is added to the index as it is
+            generated.
+        :return: Returns a dictionary ``{case_no: List[Combination]}``.
+        """
+
+        return {case_no: lc.generate_cases(load_index = load_index)
+                for case_no, lc in self.load_cases.items()}
+
+    def generate_index(self) -> LoadIndex:
+        """
+        Generates a ``LoadIndex`` object that maps the ``load_no`` of each
+        ``Load`` to the combinations in every ``LoadCase`` that use it.
+
+        Note that this generates all the combinations - if the combinations
+        are also required it is more efficient to pass a ``LoadIndex`` into the
+        ``generate_cases`` method.
+
+        :return: A ``LoadIndex`` for the combinations generated by all the
+            ``LoadCase`` objects.
+        """
+
+        load_index = LoadIndex()
+
+        self.generate_cases(load_index = load_index)
+
+        return load_index
+
+    def group_tables(self) -> Dict[str, GroupTable]:
+        """
+        Gets the unscaled ``GroupTable`` of every ``LoadGroup`` in the
+        LoadCombination - i.e. the output of each group with a
+        ``group_factor`` of 1.0.
+
+        :return: A dictionary ``{group_name: GroupTable}``.
+        """
+
+        return {k: lg.group_table() for k, lg in self.load_groups.items()}
+
+    def factor_tables(self, cache: TableCache = None) -> Dict[int, FactorTable]:
+        """
+        Generates a ``FactorTable`` for every ``LoadCase`` in the
+        LoadCombination.
+
+        The options of each ``LoadGroup`` are only generated once - each
+        ``LoadCase`` scales the shared unscaled table by its ``group_factor``.
+
+        :param cache: An optional ``TableCache``. Tables for cases that are
+            already in the cache are loaded from it rather than generated, and
+            any generated tables are added to it.
+        :return: A dictionary ``{case_no: FactorTable}``.
+        """
+
+        if cache is None:
+            return {case_no: lc.factor_table()
+                    for case_no, lc in self.load_cases.items()}
+
+        return {case_no: cache.factor_table(lc)
+                for case_no, lc in self.load_cases.items()}
+
+    def save_factor_matrix(self, path: str, *, cache: TableCache = None,
+                           chunk_size: int = 65536):
+        """
+        Saves the factors for every combination of every ``LoadCase`` to
+        ``.npy`` or ``.npz`` files, so they can be loaded by other processes
+        with ``FactorMatrix.load``. See ``FactorMatrix.save``.
+
+        :param path: The directory or ``.npz`` file to write.
+        :param cache: An optional ``TableCache`` to get the tables from.
+        :param chunk_size: The no. of rows written at a time.
+        """
+
+        FactorMatrix.save(self.factor_tables(cache = cache), path,
+                          chunk_size = chunk_size)
+
+    def to_frame(self, cache: TableCache = None):
+        """
+        Builds a pandas ``DataFrame`` with one row per combination of every
+        ``LoadCase``, directly from their ``FactorTable`` objects. See
+        ``FrameExport.factor_frame`` for the columns. Requires ``pandas``.
+
+        :param cache: An optional ``TableCache`` to get the tables from.
+        :return: A ``pandas.DataFrame``.
+        """
+
+        return factor_frame(self.factor_tables(cache = cache))
+
+    def export(self, path: str, *,
+               record_format: Union[str, RecordFormat] = 'text',
+               compression: str = 'infer',
+               buffer_size: int = 1 << 20) -> int:
+        """
+        Streams the combinations of every ``LoadCase`` to a text file, one line
+        per combination, for import into an analysis program. See
+        ``TextExport.Exporter``.
+
+        :param path: The file to write.
+        :param record_format: A ``RecordFormat`` object, or the name of a
+            format in ``TextExport.FORMATS``.
+        :param compression: One of ``None``, ``'gzip'``, ``'lzma'`` or
+            ``'infer'`` to use the file extension.
+        :param buffer_size: The approx. no. of characters written at a time.
+        :return: The no. of combinations written.
+        """
+
+        return Exporter(record_format,
+                        buffer_size = buffer_size).write(self, path,
+                                                         compression = compression)
+
+    def save_model(self, path: str):
+        """
+        Saves the whole LoadCombination to a binary file, which can be opened
+        almost instantly with ``CompiledModel.open``. See
+        ``ModelFile.CompiledModel.save``.
+
+        :param path: The file to write.
+        """
+
+        CompiledModel.save(self, path)
+
+    @property
+    def tables(self) -> Dict[int, FactorTable]:
+        """
+        The ``FactorTable`` of each ``LoadCase`` as at the last call to
+        ``update_factor_tables``.
+
+        :return: A dictionary ``{case_no: FactorTable}``.
+        """
+
+        return self._tables
+
+    def update_factor_tables(self) -> TableUpdate:
+        """
+        Brings the ``FactorTable`` objects in ``self.tables`` up to date with
+        the ``LoadCase`` objects, only re-calculating what has changed since
+        the last call.
+
+        * Tables for new cases are generated, and tables for deleted cases are
+          discarded.
+        * Where a case has the same ``LoadGroup`` objects as before, only the
+          groups whose ``group_factor``, loads, properties or group filters
+          have changed are replaced in the existing table. A change of
+          ``group_factor`` only re-scales the group's shared unscaled table.
+        * Where ``LoadGroup`` objects have been added to or removed from a
+          case its table is re-built.
+
+        The existing ``FactorTable`` objects are modified in place, so any
+        references to them are also updated.
+
+        A ``ValueError`` is raised if any ``LoadCase`` has combination filters,
+        as these cannot be represented in a ``FactorTable``.
+
+        :return: A ``TableUpdate`` named tuple reporting the cases that were
+            added, removed and re-built, and the groups that were patched in
+            each case.
+        """
+
+        added = []
+        removed = []
+        rebuilt = []
+        patched = {}
+
+        for case_no in list(self._tables):
+            if case_no not in self.load_cases:
+                del self._tables[case_no]
+                del self._table_states[case_no]
+                removed.append(case_no)
+
+        for case_no, lc in self.load_cases.items():
+
+            lc._check_product_space()
+
+            states = {k: lc._group_state(k) for k in lc.load_groups}
+
+            if case_no not in self._tables:
+                self._tables[case_no] = lc.factor_table()
+                added.append(case_no)
+
+            elif list(states) != list(self._table_states[case_no]):
+                # the groups in the case have changed, so the combinations
+                # are different.
+                table = self._tables[case_no]
+                table.groups = lc.group_tables()
+                rebuilt.append(case_no)
+
+            else:
+                old_states = self._table_states[case_no]
+                table = self._tables[case_no]
+
+                for i, (k, state) in enumerate(states.items()):
+                    if state != old_states[k]:
+                        table.replace_group(i, lc.group_table(k))
+                        patched.setdefault(case_no, []).append(k)
+
+            table = self._tables[case_no]
+            table.case_no = lc.case_no
+            table.case_name = lc.case_name
+            table.abbrev = lc.abbrev
+
+            self._table_states[case_no] = states
+
+        return TableUpdate(added = added,
+                           removed = removed,
+                           rebuilt = rebuilt,
+                           patched = patched)
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        A hash of the contents of the LoadCombination, built from the
+        fingerprints of its ``Load``, ``LoadGroup`` and ``LoadCase`` objects.
+        Only objects that have changed are re-hashed.
+
+        :return: The fingerprint as a hex string.
+        """
+
+        return content_hash(type(self).__name__,
+                            self.loads,
+                            self.load_groups,
+                            self.load_cases)
+
+    def diff(self, old: 'LoadCombinations') -> Dict[int, CaseDiff]:
+        """
+        Determines the combinations that have been added, removed or changed
+        since a previous version of the LoadCombination. See
+        ``ModelDiff.diff_cases`` for details.
+
+        :param old: The previous version of the ``LoadCombinations`` object,
+            e.g. a copy made with ``copy.deepcopy`` or re-loaded with
+            ``pickle``.
+        :return: A dictionary ``{case_no: CaseDiff}`` containing only the cases
+            with differences.
+        """
+
+        return diff_models(old, self)
+
+    def _state(self):
+        """
+        Returns the attributes of the LoadCombination that are compared by the
+        equality test, excluding any book-keeping attributes.
         """
 
-        raise NotImplementedError
+        return {k: v for k, v in self.__dict__.items()
+                if k not in self._transient}
 
     def __eq__(self, other):
         """
@@ -408,7 +813,7 @@ class LoadCombinations():
         """
 
         if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
+            return self._state() == other._state()
 
         return NotImplemented
 
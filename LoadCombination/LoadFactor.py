@@ -5,7 +5,7 @@ This file contains a helper class to associate a ``Load`` with combination
 factors.
 """
 
-from typing import Dict, Union
+from typing import Dict, Tuple, Union
 from LoadCombination.Load import Load
 
 class LoadFactor:
@@ -325,6 +325,16 @@ class LoadFactor:
                 + f'info = {repr(self.info)}'
                 + ')')
 
+    def __reduce__(self):
+        # pickle the factors as a tuple rather than a dictionary, as many
+        # LoadFactor objects are sent between processes. The load is pickled by
+        # reference if it is in the active SharedLoads.LoadTable.
+        return _load_factor, (self.load,
+                              (self.base_factor, self.scale_factor,
+                               self.rotational_factor, self.symmetry_factor,
+                               self.group_factor),
+                              self.info if len(self.info) > 0 else None)
+
     def __eq__(self, other):
         """
         Override the equality test.
@@ -343,4 +353,29 @@ class LoadFactor:
         if isinstance(other, self.__class__):
             return not self.__eq__(other)
 
-        return NotImplemented
\ No newline at end of file
+        return NotImplemented
+
+
+def _load_factor(load: Load, factors: Tuple[float, ...],
+                 info: Dict[str, Union[str, float, bool]]) -> LoadFactor:
+    """
+    Re-builds a ``LoadFactor`` pickled by ``LoadFactor.__reduce__``. The
+    constructor is bypassed as the values have already been checked.
+
+    :param load: The ``Load``.
+    :param factors: The ``base_factor``, ``scale_factor``,
+        ``rotational_factor``, ``symmetry_factor`` and ``group_factor``.
+    :param info: The ``info`` dictionary.
+    """
+
+    LF = LoadFactor.__new__(LoadFactor)
+
+    LF._load = load
+    LF._factors = {}
+
+    LF.base_factor, LF.scale_factor, LF.rotational_factor, \
+        LF.symmetry_factor, LF.group_factor = factors
+
+    LF._info = {} if info is None else info
+
+    return LF
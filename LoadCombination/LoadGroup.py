@@ -7,10 +7,12 @@ appropriate list of loads through an iterator method.
 
 from typing import Dict, List, Tuple, Union, Callable
 from LoadCombination.Load import Load, ScalableLoad, RotatableLoad
-from LoadCombination.HelperFuncs import sine_interp_90, wind_interp_85, req_angles_list
+from LoadCombination.HelperFuncs import (sine_interp_90, wind_interp_85,
+                                         req_angles_list, content_hash)
 from LoadCombination.exceptions import LoadExistsException, LoadNotPresentException
 from LoadCombination.exceptions import AngleExistsException
 from LoadCombination.LoadFactor import LoadFactor
+from LoadCombination.FactorTable import GroupTable
 
 # define a named tuple for returning results.
 
@@ -25,6 +27,10 @@ class LoadGroup:
     valued iterator, with load factors of 1.0.
     """
 
+    # attributes used for book-keeping only, which are ignored when comparing
+    # or pickling load groups.
+    _transient = ('_version', '_cache')
+
     def __init__(self, *, group_name: str,
                  loads: Union[Dict[int, Load], List[Load], Load],
                  abbrev: str = ''):
@@ -36,6 +42,9 @@ class LoadGroup:
         :param abbrev: An abbreviation for the load group.
         """
 
+        self._version = 0
+        self._cache = {}
+
         self.group_name = group_name
 
         self.loads = loads
@@ -62,6 +71,7 @@ class LoadGroup:
         """
 
         self._group_name = group_name
+        self._touch()
 
 
     @property
@@ -86,7 +96,12 @@ class LoadGroup:
             to make up the LoadGroup loads.
         """
 
+        if hasattr(self, '_loads'):
+            for l in self._loads.values():
+                l._remove_observer(self)
+
         self._loads = {}
+        self._touch()
 
         self.add_load(loads) # for simplicity, call add_load which is written
                              # to handle adding multiple loads at once etc.
@@ -119,6 +134,8 @@ class LoadGroup:
 
             if self.load_exists(load = load) == False:
                 self._loads[load.load_no] = load
+                load._add_observer(self)
+                self._touch()
             else:
                 raise LoadExistsException(f'Attempted to add a load to the '
                                           + f'LoadGroup that already exists. '
@@ -155,7 +172,8 @@ class LoadGroup:
 
         if load_present != False:
 
-            self._loads.pop(load_present)
+            self._loads.pop(load_present)._remove_observer(self)
+            self._touch()
 
         else:
             raise LoadNotPresentException(f'To delete a Load a Load needs to be'
@@ -260,6 +278,123 @@ class LoadGroup:
         """
 
         self._abbrev = abbrev
+        self._touch()
+
+    @property
+    def version(self) -> int:
+        """
+        A counter that is incremented every time the ``LoadGroup``, or any of
+        the ``Load`` objects in it, are changed. Used to determine if any
+        information derived from the group is out of date.
+
+        :return: The version no. of the group.
+        """
+
+        return self._version
+
+    def _touch(self):
+        """
+        Records that the ``LoadGroup`` has changed, discarding any cached
+        output. This is also called by the ``Load`` objects in the group when
+        they change.
+        """
+
+        self._version += 1
+        self._cache = {}
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        A hash of the contents of the group, including the fingerprints of its
+        loads. Two groups with the same type, properties and loads have the
+        same fingerprint. The hash is only re-calculated when the group or any
+        of its loads change.
+
+        :return: The fingerprint as a hex string.
+        """
+
+        return self._cached('fingerprint',
+                            lambda: content_hash(type(self).__name__,
+                                                 self._state()))
+
+    def _cached(self, key, func: Callable):
+        """
+        Returns a cached value, calculating it with ``func`` if it is not
+        already cached. The cache is cleared whenever the group changes.
+
+        :param key: The key to store the value against.
+        :param func: A function with no arguments which calculates the value.
+        :return: The cached value.
+        """
+
+        if key not in self._cache:
+            self._cache[key] = func()
+
+        return self._cache[key]
+
+    def _replace_load(self, load: Load):
+        """
+        Replaces the ``Load`` with the same ``load_no`` in the group with a
+        different (but typically identical) ``Load`` object, without changing
+        the order of the loads in the group.
+
+        :param load: The ``Load`` to put into the group.
+        """
+
+        old = self._loads[load.load_no]
+        old._remove_observer(self)
+
+        self._loads[load.load_no] = load
+        load._add_observer(self)
+        self._touch()
+
+    def cached_groups(self, *, group_factor: float = 1.0,
+                      scale_func: Callable[[float, float], float] = None
+                      ) -> Tuple[Tuple[LoadFactor, ...], ...]:
+        """
+        Returns the output of the ``generate_groups`` method as a tuple. The
+        output is cached against the ``group_factor`` and ``scale_func``, and is
+        only re-generated if the group or any of its loads have changed since
+        it was last generated.
+
+        Note that the same ``LoadFactor`` objects are returned each time, so
+        they should not be modified.
+
+        :param group_factor: The ``group_factor`` to pass to
+            ``generate_groups``.
+        :param scale_func: The ``scale_func`` to pass to ``generate_groups``.
+            Only provide this for groups that accept a ``scale_func``.
+        :return: A tuple containing the output of ``generate_groups``.
+        """
+
+        def generate():
+            if scale_func is None:
+                return tuple(self.generate_groups(group_factor = group_factor))
+
+            return tuple(self.generate_groups(scale_func = scale_func,
+                                              group_factor = group_factor))
+
+        return self._cached(('generate_groups', group_factor, scale_func),
+                            generate)
+
+    def group_table(self) -> GroupTable:
+        """
+        Returns the output of the ``generate_groups`` method with a
+        ``group_factor`` of 1.0 as a ``GroupTable``. A ``LoadCase`` can derive
+        its version of the table by scaling it by its ``group_factor``, so the
+        table is only generated once no matter how many ``LoadCase`` objects
+        use the group.
+
+        The table is cached, and is only re-generated if the group or any of
+        its loads have changed since it was last generated.
+
+        :return: A ``GroupTable`` object.
+        """
+
+        return self._cached('group_table',
+                            lambda: GroupTable.from_options(
+                                group_name = self.group_name,
+                                options = self.cached_groups()))
 
     def generate_groups(self, group_factor: float = 1.0):
         """
@@ -301,13 +436,37 @@ class LoadGroup:
         # LoadGroup without change.
         return f'{type(self).__name__}: {self.group_name}, loads: {self.loads}'
 
+    def __getstate__(self):
+        # the cache is not part of the group itself, so is not pickled.
+        state = self.__dict__.copy()
+        state['_cache'] = {}
+
+        return state
+
+    def __setstate__(self, state):
+
+        self.__dict__.update(state)
+
+        # the loads do not pickle their observers, so re-register.
+        for l in self._loads.values():
+            l._add_observer(self)
+
+    def _state(self):
+        """
+        Returns the attributes of the group that are compared by the equality
+        test, excluding any book-keeping attributes.
+        """
+
+        return {k: v for k, v in self.__dict__.items()
+                if k not in self._transient}
+
     def __eq__(self, other):
         """
         Override the equality test.
         """
 
         if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
+            return self._state() == other._state()
 
         return NotImplemented
 
@@ -363,6 +522,7 @@ class FactoredGroup(LoadGroup):
         :param factors: the list of load factors.
         """
         self._factors = factors
+        self._touch()
 
     def generate_groups(self, group_factor: float = 1.0):
         """
@@ -462,6 +622,7 @@ class ScaledGroup(FactoredGroup):
         :param scale_to: The value to which all loads will be scaled to.
         """
         self._scale_to = scale_to
+        self._touch()
 
     @property
     def scale(self) -> bool:
@@ -483,6 +644,7 @@ class ScaledGroup(FactoredGroup):
             effectively the same as the factored load group.
         """
         self._scale = scale
+        self._touch()
 
     def scale_factors(self,
                       scale_func: Callable[[float, float], float] = None)\
@@ -498,10 +660,14 @@ class ScaledGroup(FactoredGroup):
             that will be applied to them: ``{load_no: scale_factor}``.
         """
 
-        return {k: l.scale_factor(scale_to = self.scale_to,
-                                  scale_func = scale_func,
-                                  scale = self.scale)
-                for k, l in self.loads.items()}
+        def scale_factors():
+            return {k: l.scale_factor(scale_to = self.scale_to,
+                                      scale_func = scale_func,
+                                      scale = self.scale)
+                    for k, l in self.loads.items()}
+
+        # return a copy so the cached dictionary cannot be modified.
+        return dict(self._cached(('scale_factors', scale_func), scale_factors))
 
     def generate_groups(self,
                         scale_func: Callable[[float, float], float] = None,
@@ -711,6 +877,8 @@ class RotationalGroup(ScaledGroup):
                 if not self.check_angle(load.angle):
 
                     self._loads[load.load_no] = load
+                    load._add_observer(self)
+                    self._touch()
                 else:
 
                     raise AngleExistsException(f'Attempted to add a load to the'
@@ -773,6 +941,16 @@ class RotationalGroup(ScaledGroup):
             used.
         """
 
+        # return a copy so the cached dictionary cannot be modified - the
+        # nearest_angles method adds to the dictionary it is given.
+        return dict(self._cached('angles_with_symmetry',
+                                 self._angles_with_symmetry))
+
+    def _angles_with_symmetry(self) -> Dict[float, Tuple[int, float]]:
+        """
+        Calculates the dictionary returned by ``self.angles_with_symmetry``.
+        """
+
         #first get a dictionary of angles with their initial symmetry factors.
 
         return_dict = {l.angle: (k, 1.0, False) for k, l in self.loads.items()}
@@ -828,6 +1006,7 @@ class RotationalGroup(ScaledGroup):
         """
 
         self._interp_func = interp_func
+        self._touch()
 
     @property
     def req_angles(self) -> Tuple[float, ...]:
@@ -851,6 +1030,7 @@ class RotationalGroup(ScaledGroup):
         """
 
         self._req_angles = req_angles_list(req_angles)
+        self._touch()
 
     def nearest_angles(self, angle: float) -> Dict[float, Tuple[int, float]]:
         """
@@ -1144,6 +1324,7 @@ class WindGroup(RotationalGroup):
         """
 
         self._scale_to = scale_speed
+        self._touch()
 
     def generate_groups(self, group_factor: float = 1.0):
         """
@@ -0,0 +1,276 @@
+# coding=utf-8
+
+"""
+This file contains a ``LoadIndex`` class, an inverted index from the
+``load_no`` of each ``Load`` to the generated combinations that use it.
+"""
+
+from typing import Dict, List, Tuple, Union
+import numpy as np
+
+from LoadCombination.Combination import Combination
+
+
+class LoadIndex:
+    """
+    An inverted index over generated load combinations. For each ``load_no``
+    the index stores the combinations that the ``Load`` appears in, and the
+    total factor applied to the ``Load`` in each of them.
+
+    Combinations are identified by the ``case_no`` of the ``LoadCase`` that
+    generated them and their position in the list returned by
+    ``LoadCase.generate_cases`` (the combination id).
+
+    The index is intended to be populated in the same pass that generates the
+    combinations - pass an empty ``LoadIndex`` into
+    ``LoadCase.generate_cases`` or ``LoadCombinations.generate_cases``.
+    """
+
+    def __init__(self):
+        """
+        Constructor for an empty ``LoadIndex`` object.
+        """
+
+        # entries are collected into lists as the combinations are generated
+        # and only converted into arrays when the index is first queried.
+        self._pending = {}
+        self._index = {}
+
+    def add(self, *, load_no: int, case_no: int, comb_id: int, factor: float):
+        """
+        Add a single entry to the index.
+
+        :param load_no: The ``load_no`` of the ``Load``.
+        :param case_no: The ``case_no`` of the ``LoadCase`` that generated the
+            combination.
+        :param comb_id: The position of the combination in the list of
+            combinations generated by the ``LoadCase``.
+        :param factor: The total factor applied to the ``Load`` in the
+            combination.
+        """
+
+        if load_no not in self._pending:
+            self._pending[load_no] = ([], [], [])
+
+        case_nos, ids, factors = self._pending[load_no]
+
+        case_nos.append(case_no)
+        ids.append(comb_id)
+        factors.append(factor)
+
+    def add_combination(self, *, comb_id: int, combination: Combination):
+        """
+        Add all the loads in a ``Combination`` object to the index.
+
+        :param comb_id: The position of the combination in the list of
+            combinations generated by the ``LoadCase``.
+        :param combination: The ``Combination`` object to add.
+        """
+
+        for load_no, LFs in combination.load_factors.items():
+
+            factor = 0.0
+
+            for LF in LFs:
+                factor += LF.factor
+
+            self.add(load_no = load_no,
+                     case_no = combination.load_case_no,
+                     comb_id = comb_id,
+                     factor = factor)
+
+    def _finalise(self):
+        """
+        Converts any pending entries into sorted arrays, merging them with any
+        entries that are already in the index.
+        """
+
+        if len(self._pending) == 0:
+            return
+
+        for load_no, (case_nos, ids, factors) in self._pending.items():
+
+            case_nos = np.asarray(case_nos, dtype = np.int64)
+            ids = np.asarray(ids, dtype = np.int64)
+            factors = np.asarray(factors, dtype = np.float64)
+
+            if load_no in self._index:
+                old = self._index[load_no]
+                case_nos = np.concatenate((old[0], case_nos))
+                ids = np.concatenate((old[1], ids))
+                factors = np.concatenate((old[2], factors))
+
+            # sort by case_no first, then by the combination id.
+            order = np.lexsort((ids, case_nos))
+
+            self._index[load_no] = (case_nos[order],
+                                    ids[order],
+                                    factors[order])
+
+        self._pending = {}
+
+    def _entry(self, load_no: int,
+               case_no: int = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Gets the arrays stored against a ``load_no``, optionally restricted to a
+        single ``LoadCase``.
+
+        :param load_no: The ``load_no`` to get.
+        :param case_no: An optional ``case_no`` to restrict the results to.
+        :return: A tuple of arrays: ``(case_nos, comb_ids, factors)``.
+        """
+
+        self._finalise()
+
+        if load_no not in self._index:
+            # a load that is not in the index feeds no combinations.
+            empty_int = np.empty(0, dtype = np.int64)
+            return (empty_int, empty_int, np.empty(0, dtype = np.float64))
+
+        case_nos, ids, factors = self._index[load_no]
+
+        if case_no is not None:
+            # case_nos is sorted so the case is a contiguous slice.
+            start = np.searchsorted(case_nos, case_no, side = 'left')
+            end = np.searchsorted(case_nos, case_no, side = 'right')
+
+            return case_nos[start:end], ids[start:end], factors[start:end]
+
+        return case_nos, ids, factors
+
+    def combinations(self, load_no: int, case_no: int = None) -> np.ndarray:
+        """
+        Returns the ids of the combinations that use a given ``Load``.
+
+        :param load_no: The ``load_no`` of the ``Load``.
+        :param case_no: Optionally restrict the results to a single
+            ``LoadCase``. If ``None`` the results for all ``LoadCase`` objects
+            are returned, sorted by ``case_no`` and then combination id - use
+            the ``cases`` method to get the matching ``case_no`` values.
+        :return: A sorted array of combination ids.
+        """
+
+        return self._entry(load_no, case_no)[1]
+
+    def cases(self, load_no: int) -> np.ndarray:
+        """
+        Returns the ``case_no`` of each combination that uses a given ``Load``,
+        aligned with the results of the ``combinations`` method.
+
+        :param load_no: The ``load_no`` of the ``Load``.
+        :return: An array of ``case_no`` values.
+        """
+
+        return self._entry(load_no)[0]
+
+    def factors(self, load_no: int, case_no: int = None) -> np.ndarray:
+        """
+        Returns the total factor applied to a given ``Load`` in each
+        combination that uses it, aligned with the results of the
+        ``combinations`` method.
+
+        :param load_no: The ``load_no`` of the ``Load``.
+        :param case_no: Optionally restrict the results to a single
+            ``LoadCase``.
+        :return: An array of factors.
+        """
+
+        return self._entry(load_no, case_no)[2]
+
+    def affected_cases(self, load_no: int) -> List[int]:
+        """
+        Returns the ``case_no`` of every ``LoadCase`` with at least one
+        combination that uses a given ``Load``.
+
+        :param load_no: The ``load_no`` of the ``Load``.
+        :return: A sorted list of ``case_no`` values.
+        """
+
+        return [int(c) for c in np.unique(self.cases(load_no))]
+
+    @property
+    def load_nos(self) -> List[int]:
+        """
+        The ``load_no`` of every ``Load`` in the index.
+
+        :return: A sorted list of ``load_no`` values.
+        """
+
+        self._finalise()
+
+        return sorted(self._index.keys())
+
+    def save(self, file):
+        """
+        Saves the index to a NumPy ``.npz`` file so that it can be stored next
+        to the generated combinations.
+
+        :param file: A file name or an open file object.
+        """
+
+        self._finalise()
+
+        load_nos = self.load_nos
+
+        # store the index in a compressed sparse row type layout - the entries
+        # for load_nos[i] are in the slice offsets[i]:offsets[i + 1].
+        lengths = [len(self._index[l][1]) for l in load_nos]
+        offsets = np.zeros(len(load_nos) + 1, dtype = np.int64)
+        offsets[1:] = np.cumsum(lengths)
+
+        def _concat(i, dtype):
+            if len(load_nos) == 0:
+                return np.empty(0, dtype = dtype)
+
+            return np.concatenate([self._index[l][i] for l in load_nos])
+
+        np.savez(file,
+                 load_nos = np.asarray(load_nos, dtype = np.int64),
+                 offsets = offsets,
+                 case_nos = _concat(0, np.int64),
+                 comb_ids = _concat(1, np.int64),
+                 factors = _concat(2, np.float64))
+
+    @classmethod
+    def load(cls, file) -> 'LoadIndex':
+        """
+        Loads an index previously saved with the ``save`` method.
+
+        :param file: A file name or an open file object.
+        :return: A ``LoadIndex`` object.
+        """
+
+        index = cls()
+
+        with np.load(file) as data:
+            load_nos = data['load_nos']
+            offsets = data['offsets']
+            case_nos = data['case_nos']
+            ids = data['comb_ids']
+            factors = data['factors']
+
+        for i, l in enumerate(load_nos):
+            s = slice(offsets[i], offsets[i + 1])
+            index._index[int(l)] = (case_nos[s], ids[s], factors[s])
+
+        return index
+
+    def __contains__(self, load_no: int) -> bool:
+
+        self._finalise()
+
+        return load_no in self._index
+
+    def __len__(self):
+
+        self._finalise()
+
+        return len(self._index)
+
+    def __str__(self):
+        # use the {type(self).__name__} call to get the exact class name. This
+        # should allow the __str__ method to be accepted for subclasses of
+        # LoadIndex without change.
+
+        return (f'{type(self).__name__}: '
+                + f'loads: {self.load_nos}')
@@ -0,0 +1,228 @@
+# coding=utf-8
+
+"""
+This file contains a ``LoadVectors`` class, which assembles the combined load
+vectors of every combination generated by a ``LoadCase`` for input to a
+finite element solver.
+
+Rather than assembling each combination from
+``Combination.list_loads_with_factors``, the unit load vectors are stored as a
+single matrix with one row per ``Load``, and the load vectors of a chunk of
+combinations are calculated with a single matrix product of the factors and
+the unit load vectors. The combined load vectors can then be solved as
+multiple right-hand sides with a single factorisation of the stiffness matrix.
+
+The unit load vectors may be a dense NumPy array or a ``scipy.sparse`` matrix.
+``scipy`` is not imported by this module, so it is only required if sparse
+load vectors are used.
+"""
+
+from typing import Callable, Iterator, Tuple, Union
+import numpy as np
+
+from LoadCombination.FactorTable import FactorTable
+from LoadCombination.FactorMatrix import FactorMatrix
+
+
+def _is_sparse(a) -> bool:
+    """
+    Checks if an object is a ``scipy.sparse`` matrix or array.
+    """
+
+    return hasattr(a, 'tocsr') and hasattr(a, 'nnz')
+
+
+class LoadVectors:
+    """
+    The load vector of each ``Load`` with a factor of 1.0, keyed by
+    ``load_no``.
+    """
+
+    def __init__(self, *, load_nos, vectors):
+        """
+        Constructor for the ``LoadVectors`` object.
+
+        :param load_nos: The ``load_no`` of each row of ``vectors``.
+        :param vectors: A dense array or ``scipy.sparse`` matrix of shape
+            ``(len(load_nos), no_dof)`` containing the load vector of each
+            ``Load``.
+        """
+
+        load_nos = np.asarray(load_nos, dtype = np.int64)
+
+        if _is_sparse(vectors):
+            vectors = vectors.tocsr()
+        else:
+            vectors = np.asarray(vectors, dtype = np.float64)
+
+        if vectors.ndim != 2 or vectors.shape[0] != len(load_nos):
+            raise ValueError(f'The load vectors should have one row per '
+                             + f'load. Got shape {vectors.shape} for '
+                             + f'{len(load_nos)} loads.')
+
+        order = np.argsort(load_nos)
+
+        self.load_nos = load_nos[order]
+        self.vectors = vectors[order]
+
+    @property
+    def no_dof(self) -> int:
+        """
+        The no. of degrees of freedom in each load vector.
+        """
+
+        return self.vectors.shape[1]
+
+    @property
+    def sparse(self) -> bool:
+        """
+        Whether the load vectors are stored as a ``scipy.sparse`` matrix.
+        """
+
+        return _is_sparse(self.vectors)
+
+    def _unit_vectors(self, load_nos: np.ndarray):
+        """
+        Gets the rows of ``self.vectors`` for a set of loads.
+
+        :param load_nos: The ``load_no`` of each load.
+        :return: A dense array or sparse matrix of shape
+            ``(len(load_nos), no_dof)``.
+        """
+
+        rows = np.searchsorted(self.load_nos, load_nos)
+        rows = np.minimum(rows, len(self.load_nos) - 1)
+
+        found = (len(self.load_nos) > 0) & (self.load_nos[rows] == load_nos)
+
+        if not np.all(found):
+            missing = [int(l) for l in np.asarray(load_nos)[~found]]
+
+            raise ValueError(f'No load vectors provided for loads: {missing}.')
+
+        return self.vectors[rows]
+
+    @staticmethod
+    def _table(source) -> Union[FactorTable, FactorMatrix]:
+        """
+        Gets the ``FactorTable`` or ``FactorMatrix`` of a source.
+        """
+
+        if isinstance(source, (FactorTable, FactorMatrix)):
+            return source
+
+        return source.factor_table()
+
+    @staticmethod
+    def _factor_chunks(table, chunk_size: int
+                       ) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Gets the factors of the combinations in a ``FactorTable`` or
+        ``FactorMatrix`` in chunks.
+
+        :return: A generator of ``(start, factors)`` tuples.
+        """
+
+        if isinstance(table, FactorTable):
+            yield from table.chunks(chunk_size = chunk_size)
+            return
+
+        for s in range(0, len(table), chunk_size):
+            yield s, np.asarray(table.factors[s:s + chunk_size],
+                                dtype = np.float64)
+
+    def chunks(self, source, *,
+               chunk_size: int = 1024) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Calculates the combined load vectors of the combinations of a
+        ``LoadCase`` a chunk at a time, with one matrix product per chunk.
+
+        :param source: A ``LoadCase`` (which cannot have combination filters),
+            its ``FactorTable``, or a ``FactorMatrix``.
+        :param chunk_size: The max. no. of combinations in each chunk.
+        :return: A generator of ``(start, vectors)`` tuples, where ``vectors``
+            is a dense array of shape ``(no_combinations_in_chunk, no_dof)``
+            containing the load vectors of combinations
+            ``start:start + len(vectors)``, in the same order as
+            ``LoadCase.generate_cases``.
+        """
+
+        table = self._table(source)
+        factor_chunks = self._factor_chunks(table, chunk_size)
+
+        unit = self._unit_vectors(table.load_nos)
+
+        if _is_sparse(unit):
+            # sparse @ dense gives a dense array, so multiply the transposes.
+            unit_t = unit.T.tocsr()
+
+            for s, factors in factor_chunks:
+                yield s, np.asarray(unit_t @ factors.T).T
+
+            return
+
+        for s, factors in factor_chunks:
+            yield s, factors @ unit
+
+    def assemble(self, source, *, chunk_size: int = 1024) -> np.ndarray:
+        """
+        Calculates the combined load vectors of every combination of a
+        ``LoadCase``.
+
+        :param source: A ``LoadCase`` (which cannot have combination filters),
+            its ``FactorTable``, or a ``FactorMatrix``.
+        :param chunk_size: The no. of combinations calculated at a time.
+        :return: An array of shape ``(no_combinations, no_dof)``. Use the
+            transpose as the right-hand sides of a solver.
+        """
+
+        table = self._table(source)
+
+        vectors = np.empty((len(table), self.no_dof))
+
+        for s, v in self.chunks(table, chunk_size = chunk_size):
+            vectors[s:s + len(v)] = v
+
+        return vectors
+
+    def solve(self, source, solver: Callable[[np.ndarray], np.ndarray], *,
+              chunk_size: int = 1024) -> np.ndarray:
+        """
+        Solves every combination of a ``LoadCase`` with a single solver, e.g.
+        one that re-uses a factorisation of the stiffness matrix such as
+        ``scipy.sparse.linalg.splu(K).solve``.
+
+        :param source: A ``LoadCase`` (which cannot have combination filters),
+            its ``FactorTable``, or a ``FactorMatrix``.
+        :param solver: A function that takes an array of right-hand sides of
+            shape ``(no_dof, n)`` and returns the solutions as an array of
+            shape ``(no_dof, n)``.
+        :param chunk_size: The no. of right-hand sides passed to the solver at
+            a time.
+        :return: An array of shape ``(no_combinations, no_dof)`` with the
+            solution of each combination.
+        """
+
+        table = self._table(source)
+
+        results = np.empty((len(table), self.no_dof))
+
+        for s, v in self.chunks(table, chunk_size = chunk_size):
+            results[s:s + len(v)] = np.asarray(solver(
+                np.ascontiguousarray(v.T))).T
+
+        return results
+
+    def __str__(self):
+
+        return (f'{type(self).__name__}: '
+                + f'loads: {list(self.load_nos)}, '
+                + f'dof: {self.no_dof}, '
+                + f'sparse: {self.sparse}')
+
+    def __repr__(self):
+
+        return (f'{type(self).__name__}('
+                + f'load_nos = {repr(self.load_nos)}, '
+                + f'vectors = {repr(self.vectors)}'
+                + ')')
@@ -0,0 +1,257 @@
+# coding=utf-8
+
+"""
+This file contains functions to compare two versions of a model and determine
+which load combinations have been added, removed or changed between them, so
+that only those combinations need to be re-analysed.
+"""
+
+import math
+from collections import namedtuple
+from typing import Dict, List, Tuple
+import numpy as np
+
+from LoadCombination.FactorTable import GroupTable, FactorTable
+
+# define a named tuple for the differences in a single LoadCase. Combinations
+# are identified by their index (the position of the combination in the list
+# returned by LoadCase.generate_cases). 'added' and 'changed' are arrays of
+# indices into the new LoadCase, 'removed' is an array of indices into the old
+# LoadCase, and 'unchanged' is a dictionary of {old_index: new_index} for the
+# combinations that are the same in both, so their results can be re-used.
+CaseDiff = namedtuple('CaseDiff', ['added', 'removed', 'changed',
+                                   'unchanged'])
+
+
+def _indices(n: int) -> np.ndarray:
+    """
+    Returns an array of the indices 0 to n - 1.
+    """
+
+    return np.arange(n, dtype = np.int64)
+
+
+def _no_combinations(load_case) -> int:
+    """
+    Gets the no. of combinations a ``LoadCase`` generates. If the case has
+    combination filters the combinations have to be generated to count them.
+    """
+
+    if len(load_case.filters) > 0:
+        return len(load_case.generate_cases())
+
+    return load_case.no_combinations
+
+
+def _option_keys(table: GroupTable) -> List[Tuple]:
+    """
+    Builds a key for each option in a ``GroupTable`` that can be compared with
+    the options from another ``GroupTable``. Options with the same key apply
+    the same factors to the same loads.
+    """
+
+    keys = []
+
+    for i in range(table.no_options):
+        present = table.present[i]
+        angle = table.angles[i]
+
+        keys.append((tuple(int(l) for l in table.load_nos[present]),
+                     tuple(float(f) for f in table.factors[i][present]),
+                     None if math.isnan(angle) else float(angle)))
+
+    return keys
+
+
+def _match_options(old_keys: List[Tuple],
+                   new_keys: List[Tuple]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Matches the options of the new version of a group to the options of the
+    old version. Options with the same key are matched first, in order. Any
+    remaining new options are then matched, in order, to the remaining old
+    options as changed options. Any new options left after that were added.
+
+    :param old_keys: The keys of the old options, from ``_option_keys``.
+    :param new_keys: The keys of the new options, from ``_option_keys``.
+    :return: A tuple of ``(mapping, changed)``. ``mapping`` is the old option
+        no. of each new option, or -1 if the option was added. ``changed`` is
+        ``True`` where a new option was matched to an old option with a
+        different key.
+    """
+
+    positions = {}
+
+    for i, k in enumerate(old_keys):
+        positions.setdefault(k, []).append(i)
+
+    mapping = np.full(len(new_keys), -1, dtype = np.int64)
+
+    for j, k in enumerate(new_keys):
+        if len(positions.get(k, [])) > 0:
+            mapping[j] = positions[k].pop(0)
+
+    used = set(mapping[mapping >= 0].tolist())
+    unused = np.array([i for i in range(len(old_keys)) if i not in used],
+                      dtype = np.int64)
+    unmatched = np.flatnonzero(mapping < 0)
+
+    n = min(len(unused), len(unmatched))
+
+    changed = np.zeros(len(new_keys), dtype = bool)
+    mapping[unmatched[:n]] = unused[:n]
+    changed[unmatched[:n]] = True
+
+    return mapping, changed
+
+
+def _replaced(old_count: int, new_count: int) -> CaseDiff:
+    """
+    Returns a ``CaseDiff`` where every old combination is removed and every
+    new combination is added.
+    """
+
+    return CaseDiff(added = _indices(new_count),
+                    removed = _indices(old_count),
+                    changed = _indices(0),
+                    unchanged = {})
+
+
+def diff_cases(old, new) -> CaseDiff:
+    """
+    Determines the combinations that differ between two versions of a
+    ``LoadCase``.
+
+    A combination is identified by the option it uses from each ``LoadGroup``
+    (matched by ``group_name``). The options of each group are matched between
+    the versions by the factors they apply to each load (so an option inserted
+    in the middle of a group does not change the options after it), and any
+    options left over are matched in order as changed options. A combination
+    is:
+
+    * added if it uses an option that did not exist in the old version.
+    * removed if it uses an option that does not exist in the new version.
+    * changed if it exists in both versions, but the factors applied to any of
+      its loads are different.
+    * unchanged otherwise. Its index may still differ between the versions,
+      e.g. if an option was added to a group, so the ``unchanged`` mapping
+      gives its index in both.
+
+    If the two versions have different ``LoadGroup`` objects, or either has
+    combination filters, the combinations cannot be matched and every
+    combination is treated as removed and re-added.
+
+    :param old: The old ``LoadCase``, or ``None`` if the case is new.
+    :param new: The new ``LoadCase``, or ``None`` if the case was deleted.
+    :return: A ``CaseDiff`` named tuple.
+    """
+
+    if old is None:
+        return _replaced(0, _no_combinations(new))
+
+    if new is None:
+        return _replaced(_no_combinations(old), 0)
+
+    if old.fingerprint == new.fingerprint:
+        indices = _indices(_no_combinations(new)).tolist()
+
+        return CaseDiff(added = _indices(0), removed = _indices(0),
+                        changed = _indices(0),
+                        unchanged = dict(zip(indices, indices)))
+
+    if (len(old.filters) > 0 or len(new.filters) > 0
+            or set(old.load_groups) != set(new.load_groups)):
+        return _replaced(_no_combinations(old), _no_combinations(new))
+
+    if len(new.load_groups) == 0:
+        return _replaced(0, 0)
+
+    old_table = old.factor_table()  # type: FactorTable
+    new_table = new.factor_table()  # type: FactorTable
+
+    old_names = [g.group_name for g in old_table.groups]
+    new_names = [g.group_name for g in new_table.groups]
+
+    # the old group matching each new group, and the new group matching each
+    # old group.
+    old_groups = [old_table.groups[old_names.index(n)] for n in new_names]
+    new_positions = [new_names.index(n) for n in old_names]
+
+    # the old option matching each option in each new group.
+    mappings = []
+    changed_options = []
+
+    for o, n in zip(old_groups, new_table.groups):
+        mapping, changed = _match_options(_option_keys(o), _option_keys(n))
+
+        mappings.append(mapping)
+        changed_options.append(changed)
+
+    new_indices = _indices(len(new_table))
+    new_options = new_table.unravel(new_indices)
+
+    # the old option used by each new combination from each group.
+    mapped = np.stack([m[new_options[:, g]] for g, m in enumerate(mappings)],
+                      axis = -1)
+
+    exists = (mapped >= 0).all(axis = 1)
+
+    changed = np.zeros(len(new_indices), dtype = bool)
+
+    for g, c in enumerate(changed_options):
+        changed |= c[new_options[:, g]]
+
+    same = exists & ~changed
+    old_same = old_table.ravel(mapped[same][:, new_positions])
+
+    # old combinations are removed if they use an option with no match.
+    old_indices = _indices(len(old_table))
+    old_options = old_table.unravel(old_indices)
+
+    removed = np.zeros(len(old_indices), dtype = bool)
+
+    for p, g in enumerate(new_positions):
+        used = np.zeros(old_groups[g].no_options, dtype = bool)
+        used[mappings[g][mappings[g] >= 0]] = True
+
+        removed |= ~used[old_options[:, p]]
+
+    return CaseDiff(added = new_indices[~exists],
+                    removed = old_indices[removed],
+                    changed = new_indices[exists & changed],
+                    unchanged = dict(zip(old_same.tolist(),
+                                         new_indices[same].tolist())))
+
+
+def diff_models(old, new) -> Dict[int, CaseDiff]:
+    """
+    Determines the combinations that differ between two versions of a
+    ``LoadCombinations`` object.
+
+    ``LoadCase`` objects are matched by ``case_no``. Cases with the same
+    fingerprint are skipped without generating their combinations.
+
+    :param old: The old ``LoadCombinations`` object.
+    :param new: The new ``LoadCombinations`` object.
+    :return: A dictionary ``{case_no: CaseDiff}`` containing only the cases
+        where at least one combination was added, removed or changed.
+    """
+
+    results = {}
+
+    case_nos = sorted(set(old.load_cases) | set(new.load_cases))
+
+    for case_no in case_nos:
+
+        old_case = old.load_cases.get(case_no)
+        new_case = new.load_cases.get(case_no)
+
+        if (old_case is not None and new_case is not None
+                and old_case.fingerprint == new_case.fingerprint):
+            continue
+
+        diff = diff_cases(old_case, new_case)
+
+        if any(len(d) > 0 for d in (diff.added, diff.removed, diff.changed)):
+            results[case_no] = diff
+
+    return results
@@ -0,0 +1,573 @@
+# coding=utf-8
+
+"""
+This file contains a ``CompiledModel`` class, which stores a whole
+``LoadCombinations`` model in a single versioned binary file that can be
+opened almost instantly, however many loads, groups and cases it contains.
+
+The ``Load``, ``LoadGroup`` and ``LoadCase`` objects are stored as NumPy
+structured arrays, with every name and abbreviation stored once in an interned
+string table. The file is opened with a memory map, and the objects are only
+built when they are first accessed.
+
+The file layout is:
+
+* 8 bytes: ``MAGIC``.
+* 8 bytes: the length of the header as a little-endian unsigned integer.
+* The header: a JSON object with the format version and the dtype, shape and
+  offset of each array, relative to the start of the data.
+* The data, starting on the first multiple of ``ALIGNMENT`` bytes after the
+  header. Each array starts on a multiple of ``ALIGNMENT`` bytes.
+"""
+
+from collections.abc import Mapping
+import importlib
+import json
+import os
+import struct
+import tempfile
+from typing import Callable, Dict, List
+import numpy as np
+
+from LoadCombination.Load import Load, ScalableLoad, RotatableLoad, WindLoad
+from LoadCombination.LoadGroup import (LoadGroup, FactoredGroup, ScaledGroup,
+                                       ExclusiveGroup, RotationalGroup,
+                                       WindGroup)
+from LoadCombination.LoadCase import LoadCase
+from LoadCombination.GroupFactor import GroupFactor
+
+# the classes that can be stored. A class's position in the tuple is stored in
+# the file, so new classes must only be added at the end.
+LOAD_TYPES = (Load, ScalableLoad, RotatableLoad, WindLoad)
+GROUP_TYPES = (LoadGroup, FactoredGroup, ScaledGroup, ExclusiveGroup,
+               RotationalGroup, WindGroup)
+
+# the dtypes of the arrays. String fields are indices into the string table,
+# with -1 for no string. '_start' and '_stop' fields give the rows of another
+# array that belong to the row.
+LOAD_DTYPE = np.dtype([('load_no', '<i8'),
+                       ('load_type', 'u1'),
+                       ('load_name', '<i4'),
+                       ('abbrev', '<i4'),
+                       ('load_value', '<f8'),
+                       ('angle', '<f8'),
+                       ('symmetrical', 'u1')])
+
+GROUP_DTYPE = np.dtype([('group_type', 'u1'),
+                        ('group_name', '<i4'),
+                        ('abbrev', '<i4'),
+                        ('loads_start', '<i8'),
+                        ('loads_stop', '<i8'),
+                        ('factors_start', '<i8'),
+                        ('factors_stop', '<i8'),
+                        ('scale_to', '<f8'),
+                        ('scale', 'u1'),
+                        ('angles_start', '<i8'),
+                        ('angles_stop', '<i8'),
+                        ('interp_func', '<i4')])
+
+CASE_DTYPE = np.dtype([('case_no', '<i8'),
+                       ('case_name', '<i4'),
+                       ('abbrev', '<i4'),
+                       ('groups_start', '<i8'),
+                       ('groups_stop', '<i8')])
+
+CASE_GROUP_DTYPE = np.dtype([('group', '<i4'),
+                             ('group_factor', '<f8')])
+
+
+def _function_name(func: Callable) -> str:
+    """
+    Gets the name a function is stored under, so that it can be imported again
+    when the model is loaded. Only module level functions can be stored.
+    """
+
+    name = f'{func.__module__}:{func.__qualname__}'
+
+    if '<' in func.__qualname__:
+        raise ValueError(f'Only module level functions can be stored in a '
+                         + f'CompiledModel. {name} cannot be stored.')
+
+    return name
+
+
+def _import_function(name: str) -> Callable:
+    """
+    Imports a function stored with ``_function_name``.
+    """
+
+    module, qualname = name.split(':')
+
+    func = importlib.import_module(module)
+
+    for attr in qualname.split('.'):
+        func = getattr(func, attr)
+
+    return func
+
+
+class _LazyMapping(Mapping):
+    """
+    A read-only dictionary whose values are only built when they are first
+    accessed.
+    """
+
+    def __init__(self, keys: Callable, build: Callable):
+        """
+        :param keys: A function with no arguments that returns the keys.
+        :param build: A function that builds the value for a key, raising a
+            ``KeyError`` if the key does not exist.
+        """
+
+        self._keys = keys
+        self._build = build
+        self._values = {}
+
+    def __getitem__(self, key):
+
+        if key not in self._values:
+            self._values[key] = self._build(key)
+
+        return self._values[key]
+
+    def __iter__(self):
+
+        return iter(self._keys())
+
+    def __len__(self):
+
+        return len(self._keys())
+
+    def __repr__(self):
+
+        return f'{type(self).__name__}(keys = {list(self)})'
+
+
+class CompiledModel:
+    """
+    A ``LoadCombinations`` model stored in a memory-mapped binary file. The
+    ``loads``, ``load_groups`` and ``load_cases`` properties behave like the
+    dictionaries of a ``LoadCombinations`` object, but each object is only
+    built the first time it is accessed.
+    """
+
+    MAGIC = b'LCMODEL\x00'
+    # incremented if the layout of the file changes.
+    FORMAT_VERSION = 1
+    ALIGNMENT = 64
+
+    def __init__(self, path: str):
+        """
+        Opens a file written by the ``save`` method. Only the header is read -
+        the arrays are memory-mapped.
+
+        :param path: The file to open.
+        """
+
+        self.path = path
+
+        with open(path, 'rb') as f:
+            magic = f.read(len(self.MAGIC))
+
+            if magic != self.MAGIC:
+                raise ValueError(f'{path} is not a CompiledModel file.')
+
+            header_length, = struct.unpack('<Q', f.read(8))
+            header = json.loads(f.read(header_length).decode('utf-8'))
+
+        if header['version'] != self.FORMAT_VERSION:
+            raise ValueError(f'Unsupported CompiledModel version: '
+                             + f'{header["version"]}. Expected version '
+                             + f'{self.FORMAT_VERSION}.')
+
+        # a plain ndarray view of the memory map, as indexing a np.memmap is
+        # much slower.
+        data = np.asarray(np.memmap(path, dtype = np.uint8, mode = 'r'))
+        data_start = self._align(len(self.MAGIC) + 8 + header_length)
+
+        self.arrays = {}
+
+        for name, a in header['arrays'].items():
+            dtype = np.lib.format.descr_to_dtype(
+                [tuple(d) for d in a['dtype']] if isinstance(a['dtype'], list)
+                else a['dtype'])
+            size = int(np.prod(a['shape'], dtype = np.int64)) * dtype.itemsize
+
+            offset = data_start + a['offset']
+
+            self.arrays[name] = data[offset:offset + size].view(
+                dtype).reshape(a['shape'])
+
+        self._strings = {}
+        self._sorted = {}
+        self._group_rows = None
+
+        self.loads = _LazyMapping(self._load_keys, self._build_load)
+        self.load_groups = _LazyMapping(self._group_keys, self._build_group)
+        self.load_cases = _LazyMapping(self._case_keys, self._build_case)
+
+    @classmethod
+    def open(cls, path: str) -> 'CompiledModel':
+        """
+        Opens a file written by the ``save`` method.
+
+        :param path: The file to open.
+        :return: A ``CompiledModel`` object.
+        """
+
+        return cls(path)
+
+    @classmethod
+    def save(cls, model, path: str):
+        """
+        Writes a ``LoadCombinations`` model to a binary file. The file is
+        written to a temporary file first and then moved into place.
+
+        Only the ``Load`` and ``LoadGroup`` classes in ``LOAD_TYPES`` and
+        ``GROUP_TYPES`` can be stored, any ``interp_func`` must be a module
+        level function, and the ``LoadCase`` objects cannot have filters.
+
+        :param model: The ``LoadCombinations`` object to store.
+        :param path: The file to write.
+        """
+
+        strings = {}
+
+        def intern(s: str) -> int:
+            if s is None:
+                return -1
+
+            return strings.setdefault(s, len(strings))
+
+        loads = np.zeros(len(model.loads), dtype = LOAD_DTYPE)
+
+        for i, l in enumerate(model.loads.values()):
+
+            if type(l) not in LOAD_TYPES:
+                raise ValueError(f'Loads of type {type(l).__name__} cannot be '
+                                 + f'stored in a CompiledModel.')
+
+            loads[i] = (l.load_no,
+                        LOAD_TYPES.index(type(l)),
+                        intern(l.load_name),
+                        intern(l.abbrev),
+                        getattr(l, 'load_value', np.nan),
+                        getattr(l, 'angle', np.nan),
+                        getattr(l, 'symmetrical', False))
+
+        groups = np.zeros(len(model.load_groups), dtype = GROUP_DTYPE)
+        group_rows = {}
+        group_loads = []
+        group_factors = []
+        group_angles = []
+
+        for i, lg in enumerate(model.load_groups.values()):
+
+            if type(lg) not in GROUP_TYPES:
+                raise ValueError(f'LoadGroups of type {type(lg).__name__} '
+                                 + f'cannot be stored in a CompiledModel.')
+
+            factors = getattr(lg, 'factors', ())
+            angles = getattr(lg, 'req_angles', ())
+            interp_func = getattr(lg, 'interp_func', None)
+
+            groups[i] = (GROUP_TYPES.index(type(lg)),
+                         intern(lg.group_name),
+                         intern(lg.abbrev),
+                         len(group_loads),
+                         len(group_loads) + len(lg.loads),
+                         len(group_factors),
+                         len(group_factors) + len(factors),
+                         getattr(lg, 'scale_to', np.nan),
+                         getattr(lg, 'scale', False),
+                         len(group_angles),
+                         len(group_angles) + len(angles),
+                         -1 if interp_func is None
+                         else intern(_function_name(interp_func)))
+
+            group_rows[lg.group_name] = i
+            group_loads += list(lg.loads.keys())
+            group_factors += list(factors)
+            group_angles += list(angles)
+
+        cases = np.zeros(len(model.load_cases), dtype = CASE_DTYPE)
+        case_groups = []
+
+        for i, lc in enumerate(model.load_cases.values()):
+
+            if len(lc.filters) > 0 or len(lc.group_filters) > 0:
+                raise ValueError(f'LoadCase {lc.case_no} has filters, which '
+                                 + f'cannot be stored in a CompiledModel.')
+
+            cases[i] = (lc.case_no,
+                        intern(lc.case_name),
+                        intern(lc.abbrev),
+                        len(case_groups),
+                        len(case_groups) + len(lc.load_groups))
+
+            case_groups += [(group_rows[k], g.group_factor)
+                            for k, g in lc.load_groups.items()]
+
+        encoded = [s.encode('utf-8') for s in strings]
+
+        arrays = {'strings': np.frombuffer(b''.join(encoded), dtype = np.uint8),
+                  'string_offsets': np.cumsum([0] + [len(s) for s in encoded],
+                                              dtype = np.int64),
+                  'loads': loads,
+                  # the rows of 'loads' sorted by load_no, for fast look-ups.
+                  'load_index': np.argsort(loads['load_no'],
+                                           kind = 'stable').astype(np.int64),
+                  'groups': groups,
+                  'group_loads': np.array(group_loads, dtype = '<i8'),
+                  'group_factors': np.array(group_factors, dtype = '<f8'),
+                  'group_angles': np.array(group_angles, dtype = '<f8'),
+                  'cases': cases,
+                  'case_index': np.argsort(cases['case_no'],
+                                           kind = 'stable').astype(np.int64),
+                  'case_groups': np.array(case_groups,
+                                          dtype = CASE_GROUP_DTYPE)}
+
+        cls._write(path, arrays)
+
+    @classmethod
+    def _align(cls, n: int) -> int:
+        """
+        Rounds a no. of bytes up to a multiple of ``ALIGNMENT``.
+        """
+
+        return -(-n // cls.ALIGNMENT) * cls.ALIGNMENT
+
+    @classmethod
+    def _write(cls, path: str, arrays: Dict[str, np.ndarray]):
+        """
+        Writes the header and arrays to a file. The offset of each array is
+        stored relative to the start of the data, which is the first multiple
+        of ``ALIGNMENT`` after the header.
+        """
+
+        entries = {}
+        offset = 0
+
+        for k, a in arrays.items():
+            entries[k] = {'dtype': np.lib.format.dtype_to_descr(a.dtype),
+                          'shape': list(a.shape),
+                          'offset': offset}
+
+            offset = cls._align(offset + a.nbytes)
+
+        header = json.dumps({'version': cls.FORMAT_VERSION,
+                             'arrays': entries}).encode('utf-8')
+
+        data_start = cls._align(len(cls.MAGIC) + 8 + len(header))
+
+        fd, temp = tempfile.mkstemp(
+            dir = os.path.dirname(os.path.abspath(path)), suffix = '.tmp')
+
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(cls.MAGIC)
+                f.write(struct.pack('<Q', len(header)))
+                f.write(header)
+
+                for k, a in arrays.items():
+                    f.seek(data_start + entries[k]['offset'])
+                    f.write(np.ascontiguousarray(a).tobytes())
+
+                f.truncate(data_start + offset)
+
+            os.replace(temp, path)
+
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+
+            raise
+
+    def string(self, index: int) -> str:
+        """
+        Gets a string from the string table.
+
+        :param index: The index of the string.
+        :return: The string, or ``None`` if the index is -1.
+        """
+
+        index = int(index)
+
+        if index < 0:
+            return None
+
+        if index not in self._strings:
+            offsets = self.arrays['string_offsets']
+
+            self._strings[index] = bytes(
+                self.arrays['strings'][offsets[index]:offsets[index + 1]]
+            ).decode('utf-8')
+
+        return self._strings[index]
+
+    @property
+    def load_nos(self) -> np.ndarray:
+        """
+        The ``load_no`` of every ``Load`` in the model, without building the
+        ``Load`` objects.
+        """
+
+        return self.arrays['loads']['load_no']
+
+    @property
+    def case_nos(self) -> np.ndarray:
+        """
+        The ``case_no`` of every ``LoadCase`` in the model, without building
+        the ``LoadCase`` objects.
+        """
+
+        return self.arrays['cases']['case_no']
+
+    def _find(self, values: np.ndarray, index_name: str, key: int) -> int:
+        """
+        Finds the row of ``values`` equal to ``key`` using the sorted index
+        stored in the array ``index_name``. The sorted values are only
+        calculated on the first lookup, so each lookup is a binary search.
+        """
+
+        if index_name not in self._sorted:
+            index = np.asarray(self.arrays[index_name])
+
+            self._sorted[index_name] = (np.asarray(values)[index], index)
+
+        sorted_values, index = self._sorted[index_name]
+
+        i = int(np.searchsorted(sorted_values, key))
+
+        if i >= len(index) or sorted_values[i] != key:
+            raise KeyError(key)
+
+        return int(index[i])
+
+    def _load_keys(self) -> List[int]:
+
+        return [int(l) for l in self.load_nos]
+
+    def _build_load(self, load_no: int) -> Load:
+        """
+        Builds the ``Load`` object for a ``load_no``.
+        """
+
+        row = self.arrays['loads'][self._find(self.load_nos, 'load_index',
+                                              load_no)]
+
+        load_type = LOAD_TYPES[row['load_type']]
+
+        kwargs = {'load_name': self.string(row['load_name']),
+                  'load_no': int(row['load_no']),
+                  'abbrev': self.string(row['abbrev'])}
+
+        if load_type is WindLoad:
+            kwargs['wind_speed'] = float(row['load_value'])
+        elif load_type is not Load:
+            kwargs['load_value'] = float(row['load_value'])
+
+        if issubclass(load_type, RotatableLoad):
+            kwargs['angle'] = float(row['angle'])
+            kwargs['symmetrical'] = bool(row['symmetrical'])
+
+        return load_type(**kwargs)
+
+    def _group_keys(self) -> List[str]:
+
+        return [self.string(n) for n in self.arrays['groups']['group_name']]
+
+    def _build_group(self, group_name: str) -> LoadGroup:
+        """
+        Builds the ``LoadGroup`` object for a ``group_name``. The group uses
+        the same ``Load`` objects as ``self.loads``.
+        """
+
+        if self._group_rows is None:
+            self._group_rows = {k: i for i, k in enumerate(self._group_keys())}
+
+        row = self.arrays['groups'][self._group_rows[group_name]]
+
+        group_type = GROUP_TYPES[row['group_type']]
+
+        kwargs = {'group_name': group_name,
+                  'loads': [self.loads[int(l)] for l in
+                            self.arrays['group_loads'][row['loads_start']:
+                                                       row['loads_stop']]],
+                  'abbrev': self.string(row['abbrev'])}
+
+        if issubclass(group_type, FactoredGroup):
+            kwargs['factors'] = tuple(
+                float(f) for f in self.arrays['group_factors'][
+                    row['factors_start']:row['factors_stop']])
+
+        if issubclass(group_type, ScaledGroup):
+            if group_type is WindGroup:
+                kwargs['scale_speed'] = float(row['scale_to'])
+            else:
+                kwargs['scale_to'] = float(row['scale_to'])
+
+            kwargs['scale'] = bool(row['scale'])
+
+        if issubclass(group_type, RotationalGroup):
+            kwargs['req_angles'] = tuple(
+                float(a) for a in self.arrays['group_angles'][
+                    row['angles_start']:row['angles_stop']])
+            kwargs['interp_func'] = _import_function(
+                self.string(row['interp_func']))
+
+        return group_type(**kwargs)
+
+    def _case_keys(self) -> List[int]:
+
+        return [int(c) for c in self.case_nos]
+
+    def _build_case(self, case_no: int) -> LoadCase:
+        """
+        Builds the ``LoadCase`` object for a ``case_no``. The case uses the
+        same ``LoadGroup`` objects as ``self.load_groups``.
+        """
+
+        row = self.arrays['cases'][self._find(self.case_nos, 'case_index',
+                                              case_no)]
+
+        groups = self.arrays['groups']
+        case_groups = self.arrays['case_groups'][row['groups_start']:
+                                                 row['groups_stop']]
+
+        return LoadCase(case_name = self.string(row['case_name']),
+                        case_no = int(row['case_no']),
+                        abbrev = self.string(row['abbrev']),
+                        load_groups = [
+                            GroupFactor(load_group = self.load_groups[
+                                self.string(groups[g]['group_name'])],
+                                        group_factor = float(f))
+                            for g, f in case_groups])
+
+    def to_combinations(self):
+        """
+        Builds every object in the model and adds them to a
+        ``LoadCombinations`` object.
+
+        :return: A ``LoadCombinations`` object.
+        """
+
+        # imported here as LoadCombinations imports this module.
+        from LoadCombination.LoadCombinations import LoadCombinations
+
+        model = LoadCombinations(loads = list(self.loads.values()))
+        model.add_group(list(self.load_groups.values()))
+        model.add_case(list(self.load_cases.values()))
+
+        return model
+
+    def __str__(self):
+
+        return (f'{type(self).__name__}: {self.path}, '
+                + f'loads: {len(self.arrays["loads"])}, '
+                + f'groups: {len(self.arrays["groups"])}, '
+                + f'cases: {len(self.arrays["cases"])}')
+
+    def __repr__(self):
+
+        return f'{type(self).__name__}(path = {repr(self.path)})'
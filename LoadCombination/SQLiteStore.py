@@ -0,0 +1,321 @@
+# coding=utf-8
+
+"""
+This file contains a ``SQLiteStore`` class, which stores the combinations
+generated by ``LoadCase`` and ``LoadCombinations`` objects in a local SQLite
+database so that they can be queried by any process without re-generating
+them.
+"""
+
+import sqlite3
+from typing import Dict, Iterator, List, Tuple
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS loads (
+    load_no INTEGER PRIMARY KEY,
+    load_name TEXT,
+    abbrev TEXT,
+    load_type TEXT,
+    load_value REAL,
+    angle REAL,
+    symmetrical INTEGER,
+    wind_speed REAL
+);
+CREATE TABLE IF NOT EXISTS groups (
+    group_name TEXT PRIMARY KEY,
+    abbrev TEXT,
+    group_type TEXT
+);
+CREATE TABLE IF NOT EXISTS cases (
+    case_no INTEGER PRIMARY KEY,
+    case_name TEXT,
+    abbrev TEXT
+);
+CREATE TABLE IF NOT EXISTS case_groups (
+    case_no INTEGER,
+    group_name TEXT,
+    group_factor REAL,
+    PRIMARY KEY (case_no, group_name)
+);
+CREATE TABLE IF NOT EXISTS combinations (
+    case_no INTEGER,
+    comb_no INTEGER,
+    title TEXT,
+    PRIMARY KEY (case_no, comb_no)
+);
+CREATE TABLE IF NOT EXISTS factors (
+    case_no INTEGER,
+    comb_no INTEGER,
+    load_no INTEGER,
+    factor REAL,
+    angle REAL,
+    PRIMARY KEY (case_no, comb_no, load_no)
+);
+CREATE INDEX IF NOT EXISTS factors_load_no ON factors (load_no);
+CREATE INDEX IF NOT EXISTS factors_angle ON factors (angle);
+'''
+
+
+class SQLiteStore:
+    """
+    Stores ``Load``, ``LoadGroup``, ``LoadCase`` and generated combination data
+    in a SQLite database.
+
+    The combinations are stored in two tables: ``combinations`` with one row
+    per combination, and ``factors`` with one row per ``Load`` per
+    combination, which is indexed by ``load_no`` and by ``angle``.
+    """
+
+    def __init__(self, path: str):
+        """
+        Constructor for the ``SQLiteStore`` object. The database is created if
+        it does not exist.
+
+        :param path: The path to the database file. Use ``':memory:'`` for an
+            in-memory database.
+        """
+
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    @staticmethod
+    def _load_cases(source) -> List:
+        """
+        Gets the ``LoadCase`` objects to store from a ``LoadCase`` or
+        ``LoadCombinations`` object.
+        """
+
+        if hasattr(source, 'load_cases'):
+            return list(source.load_cases.values())
+
+        return [source]
+
+    @staticmethod
+    def _rows(load_case) -> Iterator[Tuple[Tuple, List[Tuple]]]:
+        """
+        Generates the rows of the ``combinations`` and ``factors`` tables for
+        a ``LoadCase``, one combination at a time.
+        """
+
+        for comb_no, comb in enumerate(load_case.iter_cases()):
+
+            comb_row = (load_case.case_no, comb_no, comb.combination_title())
+
+            factor_rows = []
+
+            for l, (factor, load, LFs) in sorted(
+                    comb.list_loads_with_factors.items()):
+
+                angles = [LF.info['angle'] for LF in LFs if 'angle' in LF.info]
+
+                factor_rows.append((load_case.case_no, comb_no, l, factor,
+                                    angles[0] if len(angles) > 0 else None))
+
+            yield comb_row, factor_rows
+
+    def write(self, source, *, batch_size: int = 10000) -> int:
+        """
+        Generates the combinations from a ``LoadCase`` or ``LoadCombinations``
+        object and writes them to the database. Any existing data for the same
+        ``LoadCase`` objects is replaced.
+
+        The combinations are streamed from ``LoadCase.iter_cases`` and inserted
+        with ``executemany`` in batches, so the memory used depends on the
+        ``batch_size`` rather than the no. of combinations. Each ``LoadCase``
+        is written in a single transaction.
+
+        :param source: A ``LoadCase`` or ``LoadCombinations`` object.
+        :param batch_size: The no. of combinations inserted at a time.
+        :return: The no. of combinations written.
+        """
+
+        count = 0
+
+        for lc in self._load_cases(source):
+            with self.connection:
+                self._write_case(lc)
+
+                comb_rows = []
+                factor_rows = []
+
+                for comb_row, rows in self._rows(lc):
+                    comb_rows.append(comb_row)
+                    factor_rows.extend(rows)
+
+                    if len(comb_rows) == batch_size:
+                        count += self._insert(comb_rows, factor_rows)
+                        comb_rows = []
+                        factor_rows = []
+
+                count += self._insert(comb_rows, factor_rows)
+
+        return count
+
+    def _write_case(self, load_case):
+        """
+        Writes the details of a ``LoadCase`` and its ``LoadGroup`` and
+        ``Load`` objects, deleting any existing combinations for the case.
+        """
+
+        c = self.connection
+        case_no = load_case.case_no
+
+        for table in ('factors', 'combinations', 'case_groups'):
+            c.execute(f'DELETE FROM {table} WHERE case_no = ?', (case_no,))
+
+        c.execute('INSERT OR REPLACE INTO cases VALUES (?, ?, ?)',
+                  (case_no, load_case.case_name, load_case.abbrev))
+
+        for k, g in load_case.load_groups.items():
+            lg = g.load_group
+
+            c.execute('INSERT OR REPLACE INTO groups VALUES (?, ?, ?)',
+                      (k, lg.abbrev, type(lg).__name__))
+            c.execute('INSERT INTO case_groups VALUES (?, ?, ?)',
+                      (case_no, k, g.group_factor))
+
+            c.executemany('INSERT OR REPLACE INTO loads '
+                          + 'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                          [(l.load_no, l.load_name, l.abbrev, type(l).__name__,
+                            getattr(l, 'load_value', None),
+                            getattr(l, 'angle', None),
+                            getattr(l, 'symmetrical', None),
+                            getattr(l, 'wind_speed', None))
+                           for l in lg.loads.values()])
+
+    def _insert(self, comb_rows: List[Tuple], factor_rows: List[Tuple]) -> int:
+        """
+        Inserts a batch of rows into the ``combinations`` and ``factors``
+        tables.
+
+        :return: The no. of combinations inserted.
+        """
+
+        self.connection.executemany('INSERT INTO combinations '
+                                    + 'VALUES (?, ?, ?)', comb_rows)
+        self.connection.executemany('INSERT INTO factors '
+                                    + 'VALUES (?, ?, ?, ?, ?)', factor_rows)
+
+        return len(comb_rows)
+
+    @staticmethod
+    def _clauses(*, case_no: int = None, load_no: int = None,
+                 angle: float = None) -> Tuple[List[str], List]:
+        """
+        Builds the conditions of a ``WHERE`` clause on the ``factors`` table
+        (aliased as ``f``).
+
+        :return: A tuple of ``(clauses, params)``.
+        """
+
+        clauses = []
+        params = []
+
+        for column, value in (('case_no', case_no), ('load_no', load_no),
+                              ('angle', angle)):
+            if value is not None:
+                clauses.append(f'f.{column} = ?')
+                params.append(value)
+
+        return clauses, params
+
+    def combinations(self, *, case_no: int = None, load_no: int = None,
+                     angle: float = None) -> List[Tuple[int, int, str]]:
+        """
+        Finds the combinations that match all of the given criteria. The
+        ``load_no`` and ``angle`` criteria may be met by different loads in the
+        combination.
+
+        :param case_no: Only return combinations from this ``LoadCase``.
+        :param load_no: Only return combinations that use this ``Load``.
+        :param angle: Only return combinations with a ``Load`` at this angle.
+        :return: A list of ``(case_no, comb_no, title)`` tuples, sorted by
+            ``case_no`` and ``comb_no``.
+        """
+
+        clauses = []
+        params = []
+
+        if case_no is not None:
+            clauses.append('c.case_no = ?')
+            params.append(case_no)
+
+        # the load and angle criteria may be met by different loads in the
+        # combination, so each is checked separately.
+        for column, value in (('load_no', load_no), ('angle', angle)):
+            if value is not None:
+                clauses.append('EXISTS (SELECT 1 FROM factors f '
+                               + 'WHERE f.case_no = c.case_no '
+                               + 'AND f.comb_no = c.comb_no '
+                               + f'AND f.{column} = ?)')
+                params.append(value)
+
+        where = 'WHERE ' + ' AND '.join(clauses) if len(clauses) > 0 else ''
+
+        return self.connection.execute(
+            'SELECT c.case_no, c.comb_no, c.title FROM combinations c '
+            + f'{where} ORDER BY c.case_no, c.comb_no', params).fetchall()
+
+    def factor_rows(self, *, case_no: int = None, load_no: int = None,
+                    angle: float = None) -> List[Tuple[int, int, int, float,
+                                                       float]]:
+        """
+        Finds the factor rows that match all of the given criteria. All the
+        criteria apply to the same row.
+
+        :param case_no: Only return rows from this ``LoadCase``.
+        :param load_no: Only return rows for this ``Load``.
+        :param angle: Only return rows for loads at this angle.
+        :return: A list of ``(case_no, comb_no, load_no, factor, angle)``
+            tuples, sorted by ``case_no``, ``comb_no`` and ``load_no``.
+        """
+
+        clauses, params = self._clauses(case_no = case_no, load_no = load_no,
+                                        angle = angle)
+
+        where = 'WHERE ' + ' AND '.join(clauses) if len(clauses) > 0 else ''
+
+        return self.connection.execute(
+            'SELECT f.case_no, f.comb_no, f.load_no, f.factor, f.angle '
+            + f'FROM factors f {where} '
+            + 'ORDER BY f.case_no, f.comb_no, f.load_no', params).fetchall()
+
+    def combination_factors(self, case_no: int,
+                            comb_no: int) -> Dict[int, float]:
+        """
+        Gets the factors for a single combination.
+
+        :param case_no: The ``case_no`` of the ``LoadCase``.
+        :param comb_no: The position of the combination in the list returned
+            by ``LoadCase.generate_cases``.
+        :return: A dictionary ``{load_no: factor}``.
+        """
+
+        return dict(self.connection.execute(
+            'SELECT load_no, factor FROM factors '
+            + 'WHERE case_no = ? AND comb_no = ? ORDER BY load_no',
+            (case_no, comb_no)).fetchall())
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+
+        self.connection.close()
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        self.close()
+
+    def __str__(self):
+
+        return f'{type(self).__name__}: {self.path}'
+
+    def __repr__(self):
+
+        return f'{type(self).__name__}(path = {repr(self.path)})'
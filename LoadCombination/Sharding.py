@@ -0,0 +1,476 @@
+# coding=utf-8
+
+"""
+This file contains a ``JobSpec`` class, which splits the export of the
+combinations of a ``LoadCase`` or ``LoadCombinations`` object into a number of
+shards that can be generated independently, e.g. on separate machines, and
+then merged into a single file.
+
+A ``JobSpec`` is saved as a single self-contained file holding the model, the
+``RecordFormat`` and the range of combinations in each shard. Each shard is
+written with ``JobSpec.run_shard`` (or from the command line with
+``python -m LoadCombination.Sharding run <spec> <shard_no> <output>``), which
+writes the shard's lines plus a ``.json`` file recording the no. of lines and
+their checksum. ``JobSpec.merge`` then checks the shards against the spec and
+joins them, in order, into the same file ``Exporter.write`` would write.
+
+As the spec is pickled it should only be loaded from a trusted source.
+"""
+
+from collections import namedtuple
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+import zlib
+from typing import Dict, List, Union
+
+from LoadCombination.HelperFuncs import content_hash
+from LoadCombination.TextExport import (Exporter, RecordFormat, open_output,
+                                        _compression, _load_cases)
+
+# define a named tuple for a range of combinations from a single LoadCase.
+# 'start' and 'stop' are positions in the list returned by
+# LoadCase.generate_cases.
+ShardRange = namedtuple('ShardRange', ['case_no', 'start', 'stop'])
+
+
+class JobSpec:
+    """
+    A self-contained description of an export split into shards.
+
+    The combinations of every ``LoadCase`` are numbered in a single sequence,
+    in the order of the cases, and the sequence is split into ``no_shards``
+    shards of (nearly) equal size.
+    """
+
+    # incremented if the layout of the spec or shard files changes.
+    FORMAT_VERSION = 1
+    MAGIC = b'LCJOB'
+
+    def __init__(self, *, source, record_format: RecordFormat,
+                 counts: Dict[int, int], shards: List[List[ShardRange]]):
+        """
+        Constructor for the ``JobSpec`` object. Typically a ``JobSpec`` is
+        created with the ``build`` or ``load`` methods rather than directly.
+
+        :param source: The ``LoadCase`` or ``LoadCombinations`` object.
+        :param record_format: The ``RecordFormat`` used to write each line.
+        :param counts: The no. of combinations in each ``LoadCase``:
+            ``{case_no: count}``.
+        :param shards: The ranges of combinations in each shard.
+        """
+
+        self.source = source
+        self.record_format = record_format
+        self.counts = counts
+        self.shards = shards
+        self.key = content_hash(source.fingerprint,
+                                type(record_format).__qualname__,
+                                repr(record_format),
+                                tuple(counts.items()),
+                                tuple(tuple(s) for s in shards))
+
+    @classmethod
+    def build(cls, source, *, no_shards: int,
+              record_format: Union[str, RecordFormat] = 'text') -> 'JobSpec':
+        """
+        Builds a ``JobSpec`` for a ``LoadCase`` or ``LoadCombinations``
+        object.
+
+        The no. of combinations in cases without combination filters is
+        calculated directly. Cases with combination filters have to be
+        generated once to count them.
+
+        :param source: A ``LoadCase`` or ``LoadCombinations`` object.
+        :param no_shards: The no. of shards to split the combinations into.
+        :param record_format: A ``RecordFormat`` object, or the name of a
+            format in ``TextExport.FORMATS``. It must be possible to pickle it.
+        :return: A ``JobSpec`` object.
+        :raises ValueError: If the source (e.g. one of its filters) or the
+            record format cannot be pickled.
+        """
+
+        if no_shards < 1:
+            raise ValueError(f'no_shards must be >= 1. '
+                             + f'no_shards given was {no_shards}.')
+
+        record_format = Exporter(record_format).record_format
+
+        _check_picklable(source, record_format)
+
+        counts = {}
+
+        for lc in _load_cases(source):
+            if len(lc.filters) > 0:
+                counts[lc.case_no] = sum(1 for _ in lc.iter_cases())
+            else:
+                counts[lc.case_no] = lc.no_combinations
+
+        total = sum(counts.values())
+
+        shards = []
+
+        for k in range(no_shards):
+            # the range of the shard in the combined sequence of every case.
+            start = k * total // no_shards
+            stop = (k + 1) * total // no_shards
+
+            ranges = []
+            offset = 0
+
+            for case_no, count in counts.items():
+                s = max(start - offset, 0)
+                e = min(stop - offset, count)
+
+                if s < e:
+                    ranges.append(ShardRange(case_no, s, e))
+
+                offset += count
+
+            shards.append(ranges)
+
+        return cls(source = source, record_format = record_format,
+                   counts = counts, shards = shards)
+
+    @property
+    def no_shards(self) -> int:
+        """
+        The no. of shards in the spec.
+        """
+
+        return len(self.shards)
+
+    @property
+    def no_combinations(self) -> int:
+        """
+        The total no. of combinations in every shard.
+        """
+
+        return sum(self.counts.values())
+
+    def save(self, path: str):
+        """
+        Saves the spec to a single compressed file. The file is written to a
+        temporary file first and then moved into place.
+
+        :param path: The file to write.
+        """
+
+        data = pickle.dumps({'version': self.FORMAT_VERSION,
+                             'source': self.source,
+                             'record_format': self.record_format,
+                             'counts': self.counts,
+                             'shards': [[tuple(r) for r in s]
+                                        for s in self.shards]},
+                            protocol = pickle.HIGHEST_PROTOCOL)
+
+        _write_atomic(path, self.MAGIC + zlib.compress(data))
+
+    @classmethod
+    def load(cls, path: str) -> 'JobSpec':
+        """
+        Loads a spec saved with the ``save`` method. Only load specs from
+        trusted sources, as they are unpickled.
+
+        :param path: The file to load.
+        :return: A ``JobSpec`` object.
+        """
+
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        if not data.startswith(cls.MAGIC):
+            raise ValueError(f'{path} is not a JobSpec file.')
+
+        spec = pickle.loads(zlib.decompress(data[len(cls.MAGIC):]))
+
+        if spec['version'] != cls.FORMAT_VERSION:
+            raise ValueError(f'Unsupported JobSpec version: '
+                             + f'{spec["version"]}. Expected version '
+                             + f'{cls.FORMAT_VERSION}.')
+
+        return cls(source = spec['source'],
+                   record_format = spec['record_format'],
+                   counts = spec['counts'],
+                   shards = [[ShardRange(*r) for r in s]
+                             for s in spec['shards']])
+
+    def run_shard(self, shard_no: int, path: str) -> Dict:
+        """
+        Generates the lines of a single shard and writes them to an
+        uncompressed file, plus a ``path + '.json'`` file recording the no. of
+        lines and their checksum for ``merge`` to check.
+
+        :param shard_no: The shard to generate, from ``0`` to
+            ``no_shards - 1``.
+        :param path: The file to write the lines to.
+        :return: The contents of the ``.json`` file.
+        """
+
+        if not 0 <= shard_no < self.no_shards:
+            raise IndexError(f'shard_no must be between 0 and '
+                             + f'{self.no_shards - 1}. shard_no given was '
+                             + f'{shard_no}.')
+
+        cases = {lc.case_no: lc for lc in _load_cases(self.source)}
+        record = self.record_format.record
+
+        digest = hashlib.sha256()
+        count = 0
+
+        fd, temp = tempfile.mkstemp(
+            dir = os.path.dirname(os.path.abspath(path)), suffix = '.tmp')
+
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for case_no, start, stop in self.shards[shard_no]:
+                    lc = cases[case_no]
+                    lines = []
+
+                    for comb_no, comb in Exporter._iter_from(lc, start):
+                        if comb_no >= stop:
+                            break
+
+                        lines.append(record(lc, comb_no, comb))
+
+                        if len(lines) == 1024:
+                            count += self._write_lines(f, digest, lines)
+                            lines = []
+
+                    count += self._write_lines(f, digest, lines)
+
+            os.replace(temp, path)
+
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+
+            raise
+
+        expected = sum(r.stop - r.start for r in self.shards[shard_no])
+
+        if count != expected:
+            raise ValueError(f'Shard {shard_no} has {count} combinations. '
+                             + f'Expected {expected}. The model may have '
+                             + f'been changed since the JobSpec was built.')
+
+        result = {'version': self.FORMAT_VERSION,
+                  'key': self.key,
+                  'shard_no': shard_no,
+                  'count': count,
+                  'size': os.path.getsize(path),
+                  'sha256': digest.hexdigest()}
+
+        _write_atomic(path + '.json', json.dumps(result).encode('utf-8'))
+
+        return result
+
+    @staticmethod
+    def _write_lines(f, digest, lines: List[str]) -> int:
+        """
+        Writes a block of lines to a shard file, updating its checksum.
+
+        :return: The no. of lines written.
+        """
+
+        data = ''.join(lines).encode('utf-8')
+
+        f.write(data)
+        digest.update(data)
+
+        return len(lines)
+
+    def check_shard(self, shard_no: int, path: str) -> Dict:
+        """
+        Checks that a shard file is complete and was written for this spec.
+
+        :param shard_no: The shard no.
+        :param path: The file passed to ``run_shard``.
+        :return: The contents of the shard's ``.json`` file.
+        """
+
+        try:
+            with open(path + '.json') as f:
+                result = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ValueError(f'Shard {shard_no} has not been completed: '
+                             + f'{path}.json could not be read.') from e
+
+        expected = sum(r.stop - r.start for r in self.shards[shard_no])
+
+        if result.get('key') != self.key or result['shard_no'] != shard_no:
+            raise ValueError(f'Shard {shard_no} ({path}) was not written for '
+                             + f'this JobSpec.')
+
+        if result['count'] != expected:
+            raise ValueError(f'Shard {shard_no} has {result["count"]} '
+                             + f'combinations. Expected {expected}.')
+
+        if (not os.path.exists(path)
+                or os.path.getsize(path) != result['size']):
+            raise ValueError(f'Shard {shard_no} ({path}) is missing or the '
+                             + f'wrong size.')
+
+        return result
+
+    def merge(self, paths: List[str], path: str, *,
+              compression: str = 'infer', buffer_size: int = 1 << 20) -> int:
+        """
+        Joins the shard files into a single file, in order, with the header
+        and footer of the ``RecordFormat``. The result is the same as the file
+        written by ``Exporter.write`` for the same model and format.
+
+        Each shard is checked against its ``.json`` file and the spec, and its
+        checksum is verified as it is copied.
+
+        :param paths: The file written by ``run_shard`` for each shard, in
+            order of shard no.
+        :param path: The file to write.
+        :param compression: One of ``None``, ``'gzip'``, ``'lzma'`` or
+            ``'infer'`` to use the file extension.
+        :param buffer_size: The no. of bytes copied at a time.
+        :return: The no. of combinations written.
+        """
+
+        if len(paths) != self.no_shards:
+            raise ValueError(f'Expected {self.no_shards} shard files. '
+                             + f'{len(paths)} were given.')
+
+        results = [self.check_shard(k, p) for k, p in enumerate(paths)]
+
+        compression = _compression(path, compression)
+
+        fd, temp = tempfile.mkstemp(
+            dir = os.path.dirname(os.path.abspath(path)), suffix = '.tmp')
+        os.close(fd)
+
+        try:
+            with open_output(temp, compression = compression) as out:
+                # the lines are copied as bytes, so the header and footer are
+                # written as bytes too. Flushing the text stream instead would
+                # change the compressed output.
+                out.buffer.write(self.record_format.header(
+                    _load_cases(self.source)).encode('utf-8'))
+
+                for k, (p, result) in enumerate(zip(paths, results)):
+                    digest = hashlib.sha256()
+
+                    with open(p, 'rb') as f:
+                        while True:
+                            data = f.read(buffer_size)
+
+                            if len(data) == 0:
+                                break
+
+                            digest.update(data)
+                            out.buffer.write(data)
+
+                    if digest.hexdigest() != result['sha256']:
+                        raise ValueError(f'The checksum of shard {k} ({p}) '
+                                         + f'does not match.')
+
+                out.buffer.write(self.record_format.footer().encode('utf-8'))
+
+            os.replace(temp, path)
+
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+
+            raise
+
+        return sum(r['count'] for r in results)
+
+    def __str__(self):
+
+        return (f'{type(self).__name__}: '
+                + f'shards: {self.no_shards}, '
+                + f'combinations: {self.no_combinations}')
+
+
+def _check_picklable(source, record_format: RecordFormat):
+    """
+    Checks that a source and ``RecordFormat`` can be pickled, so that a
+    ``JobSpec`` built from them can be saved. If not, the filters of the
+    ``LoadCase`` objects are checked, as these are the most likely cause.
+
+    :raises ValueError: If they cannot be pickled.
+    """
+
+    try:
+        pickle.dumps((source, record_format),
+                     protocol = pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        for lc in _load_cases(source):
+            predicates = ([(f'group filter on {g}', p)
+                           for g, ps in lc.group_filters.items() for p in ps]
+                          + [('filter', p) for p in lc.filters])
+
+            for name, predicate in predicates:
+                try:
+                    pickle.dumps(predicate,
+                                 protocol = pickle.HIGHEST_PROTOCOL)
+                except Exception:
+                    raise ValueError(f'The {name} {repr(predicate)} of '
+                                     + f'LoadCase {lc.case_no} cannot be '
+                                     + 'pickled, so the JobSpec cannot be '
+                                     + 'saved. Use a module level function '
+                                     + 'or a class with a __call__ method '
+                                     + 'instead.') from e
+
+        raise ValueError(f'The source or record format cannot be pickled, so '
+                         + f'the JobSpec cannot be saved: {e}') from e
+
+
+def _write_atomic(path: str, data: bytes):
+    """
+    Writes a file by writing a temporary file and moving it into place, so the
+    file is never partially written.
+    """
+
+    fd, temp = tempfile.mkstemp(dir = os.path.dirname(os.path.abspath(path)),
+                                suffix = '.tmp')
+
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+
+        os.replace(temp, path)
+
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+
+        raise
+
+
+def main(args: List[str] = None) -> int:
+    """
+    Runs a single shard from the command line:
+
+        python -m LoadCombination.Sharding run <spec> <shard_no> <output>
+
+    :param args: The command line arguments. If ``None``, ``sys.argv[1:]``.
+    :return: The exit code.
+    """
+
+    args = sys.argv[1:] if args is None else args
+
+    if len(args) != 4 or args[0] != 'run':
+        print('usage: python -m LoadCombination.Sharding run <spec> '
+              + '<shard_no> <output>', file = sys.stderr)
+        return 2
+
+    spec = JobSpec.load(args[1])
+    result = spec.run_shard(int(args[2]), args[3])
+
+    print(json.dumps(result))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,452 @@
+# coding=utf-8
+
+"""
+This file contains a ``SharedEnvelope`` class, which superposes the results of
+a set of unit loads over every combination generated by a ``LoadCase`` across
+a pool of processes.
+
+The unit results and the ``FactorTable`` of the case are placed in a single
+``multiprocessing.shared_memory`` block, which the workers map rather than
+copy. The combinations and results are split into tiles of
+``chunk_size`` combinations by ``effect_chunk_size`` effects. Each worker
+writes the envelope of its tile into shared partial envelope arrays (one row
+per combination chunk), which are then reduced to the final envelope.
+
+Unlike the ``Envelope`` class, which uses the independence of the groups to
+avoid generating the combinations, every combination is calculated. This
+allows the combined results to be returned (see ``SharedEnvelope.superpose``)
+and gives a check on the ``Envelope`` class.
+"""
+
+import os
+from multiprocessing import Pool, shared_memory
+from typing import Dict, Iterator, List, Tuple, Union
+import numpy as np
+
+from LoadCombination.FactorTable import GroupTable, FactorTable
+
+
+class SharedArrays:
+    """
+    A set of NumPy arrays packed into a single
+    ``multiprocessing.shared_memory.SharedMemory`` block.
+
+    The ``spec`` of the block is a small picklable tuple, which is sent to
+    other processes so that they can ``attach`` to the block and get views
+    onto the arrays without copying them.
+    """
+
+    # each array starts on a multiple of ALIGNMENT bytes.
+    ALIGNMENT = 64
+
+    def __init__(self, shm: shared_memory.SharedMemory,
+                 layout: List[Tuple[str, str, Tuple[int, ...], int]], *,
+                 owner: bool = False):
+        """
+        Constructor for the ``SharedArrays`` object. Typically a
+        ``SharedArrays`` object is created with the ``create`` or ``attach``
+        methods rather than directly.
+
+        :param shm: The ``SharedMemory`` block.
+        :param layout: A list of ``(name, dtype, shape, offset)`` tuples, one
+            per array.
+        :param owner: If ``True`` the block is unlinked when the object is
+            closed.
+        """
+
+        self.shm = shm
+        self.layout = layout
+        self.owner = owner
+
+        self.arrays = {name: np.ndarray(shape, dtype = np.dtype(dtype),
+                                        buffer = shm.buf, offset = offset)
+                       for name, dtype, shape, offset in layout}
+
+    @classmethod
+    def _align(cls, n: int) -> int:
+        """
+        Rounds a no. of bytes up to a multiple of ``ALIGNMENT``.
+        """
+
+        return -(-n // cls.ALIGNMENT) * cls.ALIGNMENT
+
+    @classmethod
+    def create(cls, arrays: Dict[str, Union[np.ndarray,
+                                            Tuple[str, Tuple[int, ...]]]]
+               ) -> 'SharedArrays':
+        """
+        Creates a new shared memory block containing a set of arrays.
+
+        :param arrays: A dictionary of ``{name: array}``. The array is copied
+            into the block. Alternatively, give a ``(dtype, shape)`` tuple to
+            create an array filled with zeros.
+        :return: A ``SharedArrays`` object, which owns the block.
+        """
+
+        layout = []
+        offset = 0
+
+        for name, a in arrays.items():
+            if isinstance(a, tuple):
+                dtype, shape = np.dtype(a[0]), tuple(a[1])
+            else:
+                a = np.asarray(a)
+                dtype, shape = a.dtype, a.shape
+
+            layout.append((name, dtype.str, shape, offset))
+            offset = cls._align(offset + dtype.itemsize * int(np.prod(shape)))
+
+        # a SharedMemory block cannot have a size of 0.
+        shm = shared_memory.SharedMemory(create = True,
+                                         size = max(offset, cls.ALIGNMENT))
+
+        shared = cls(shm, layout, owner = True)
+
+        for name, a in arrays.items():
+            if not isinstance(a, tuple):
+                shared.arrays[name][...] = a
+
+        return shared
+
+    @property
+    def spec(self) -> Tuple[str, List[Tuple[str, str, Tuple[int, ...], int]]]:
+        """
+        The ``(name, layout)`` of the block, to pass to ``attach``.
+        """
+
+        return self.shm.name, self.layout
+
+    @classmethod
+    def attach(cls, name: str,
+               layout: List[Tuple[str, str, Tuple[int, ...], int]]
+               ) -> 'SharedArrays':
+        """
+        Attaches to an existing shared memory block.
+
+        :param name: The name of the block.
+        :param layout: The layout of the arrays in the block.
+        :return: A ``SharedArrays`` object, which does not own the block.
+        """
+
+        return cls(shared_memory.SharedMemory(name = name), layout)
+
+    def close(self):
+        """
+        Closes the block, and unlinks it if this object owns it. Any views
+        onto the arrays must have been deleted first.
+        """
+
+        self.arrays = {}
+        self.shm.close()
+
+        if self.owner:
+            self.shm.unlink()
+            self.owner = False
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        self.close()
+
+    def __str__(self):
+
+        return (f'{type(self).__name__}: {self.shm.name}, '
+                + f'arrays: {[name for name, *_ in self.layout]}')
+
+
+# the shared arrays and FactorTable of the current worker process, set by
+# _init_worker.
+_WORKER = {}
+
+
+def _init_worker(spec: Tuple[str, List]):
+    """
+    Attaches a worker process to the shared memory block. Used as the
+    ``initializer`` of the ``Pool``.
+    """
+
+    _set_worker(SharedArrays.attach(*spec))
+
+
+def _set_worker(shared: SharedArrays):
+    """
+    Rebuilds the ``FactorTable`` from the shared arrays. The ``GroupTable``
+    factors are views onto the block, not copies.
+    """
+
+    a = shared.arrays
+
+    groups = [GroupTable(group_name = str(g),
+                         load_nos = a[f'load_nos_{g}'],
+                         factors = a[f'factors_{g}'])
+              for g in range(int(a['no_groups'][0]))]
+
+    _WORKER['shared'] = shared
+    _WORKER['table'] = FactorTable(case_no = 0, case_name = '',
+                                   groups = groups)
+
+
+def _tile(task: Tuple[int, int, int, int, int]):
+    """
+    Superposes the unit results for a tile of combinations and effects, and
+    writes the envelope of the tile into the partial envelope arrays.
+
+    :param task: A tuple of ``(chunk_no, start, stop, effect_start,
+        effect_stop)``.
+    """
+
+    chunk_no, start, stop, e_start, e_stop = task
+
+    a = _WORKER['shared'].arrays
+    rows = _WORKER['table'].rows(np.arange(start, stop))
+
+    values = rows @ a['effects'][:, e_start:e_stop]
+
+    if 'combined' in a:
+        a['combined'][start:stop, e_start:e_stop] = values
+
+    argmax = values.argmax(axis = 0)
+    argmin = values.argmin(axis = 0)
+    effects = np.arange(e_stop - e_start)
+
+    a['max'][chunk_no, e_start:e_stop] = values[argmax, effects]
+    a['min'][chunk_no, e_start:e_stop] = values[argmin, effects]
+    a['argmax'][chunk_no, e_start:e_stop] = argmax + start
+    a['argmin'][chunk_no, e_start:e_stop] = argmin + start
+
+
+class SharedEnvelope:
+    """
+    The envelope of a set of effects over every combination generated by a
+    ``LoadCase``, calculated by superposing the unit results of each ``Load``
+    across a pool of processes that share the data in shared memory.
+
+    The ``max``, ``min``, ``argmax`` and ``argmin`` attributes match those of
+    the ``Envelope`` class.
+    """
+
+    def __init__(self, source, *, load_nos, effects,
+                 processes: int = None, chunk_size: int = 4096,
+                 effect_chunk_size: int = None):
+        """
+        Constructor for the ``SharedEnvelope`` object. The envelope is
+        calculated when the object is created.
+
+        :param source: The ``LoadCase`` to calculate the envelope for, or its
+            ``FactorTable``. A ``LoadCase`` cannot have combination filters.
+        :param load_nos: The ``load_no`` of each ``Load`` with results.
+        :param effects: An array of shape ``(len(load_nos), no_effects)``
+            containing the value of each effect under each ``Load`` with a
+            factor of 1.0. A 1D array is treated as a single effect.
+        :param processes: The no. of worker processes. If ``None``, the no. of
+            CPUs is used. If 1, the calculation is done in the current process.
+        :param chunk_size: The no. of combinations in each tile.
+        :param effect_chunk_size: The no. of effects in each tile. If ``None``
+            each tile contains every effect.
+        """
+
+        load_nos = np.asarray(load_nos, dtype = np.int64)
+        effects = np.asarray(effects, dtype = np.float64).reshape(
+            (len(load_nos), -1))
+
+        self.source = source
+        self.load_nos = load_nos
+        self.effects = effects
+
+        # sort the load_nos rather than the effects so that the effects are
+        # not copied.
+        self._order = np.argsort(load_nos)
+        self._sorted = load_nos[self._order]
+
+        self.processes = os.cpu_count() if processes is None else processes
+        self.chunk_size = chunk_size
+        self.effect_chunk_size = effect_chunk_size
+
+        self.max = None
+        self.min = None
+        self.argmax = None
+        self.argmin = None
+
+        self.update()
+
+    @property
+    def no_effects(self) -> int:
+        """
+        The no. of effects in the envelope.
+        """
+
+        return self.effects.shape[1]
+
+    def factor_table(self) -> FactorTable:
+        """
+        Gets the ``FactorTable`` of the source.
+        """
+
+        if isinstance(self.source, FactorTable):
+            return self.source
+
+        return self.source.factor_table()
+
+    def _rows(self, load_nos: np.ndarray) -> np.ndarray:
+        """
+        Gets the index into ``self.effects`` of each of a set of loads.
+
+        :param load_nos: The ``load_no`` of each load.
+        :return: An array of the rows.
+        :raises ValueError: If any loads have no effects.
+        """
+
+        rows = np.searchsorted(self._sorted, load_nos)
+        rows = np.minimum(rows, len(self._sorted) - 1)
+
+        found = (len(self._sorted) > 0) & (self._sorted[rows] == load_nos)
+
+        if not np.all(found):
+            missing = [int(l) for l in np.asarray(load_nos)[~found]]
+
+            raise ValueError(f'No effects provided for loads: {missing}.')
+
+        return self._order[rows]
+
+    def _unit_effects(self, load_nos: np.ndarray) -> np.ndarray:
+        """
+        Gets the rows of ``self.effects`` for a set of loads.
+
+        :param load_nos: The ``load_no`` of each load.
+        :return: An array of shape ``(len(load_nos), no_effects)``.
+        """
+
+        return self.effects[self._rows(load_nos)]
+
+    def _tasks(self, no_combinations: int) -> Iterator[Tuple[int, int, int,
+                                                             int, int]]:
+        """
+        Generates the ``(chunk_no, start, stop, effect_start, effect_stop)``
+        tuple of each tile.
+        """
+
+        effect_chunk_size = (self.no_effects if self.effect_chunk_size is None
+                             else self.effect_chunk_size)
+
+        for chunk_no, s in enumerate(range(0, no_combinations,
+                                           self.chunk_size)):
+            e = min(s + self.chunk_size, no_combinations)
+
+            for es in range(0, self.no_effects, max(effect_chunk_size, 1)):
+                yield (chunk_no, s, e, es,
+                       min(es + effect_chunk_size, self.no_effects))
+
+    def _run(self, combined: bool) -> Union[np.ndarray, None]:
+        """
+        Runs the superposition and reduces the partial envelopes.
+
+        :param combined: If ``True`` the combined results are also returned.
+        :return: The combined results, or ``None``.
+        """
+
+        table = self.factor_table()
+
+        if len(table) == 0:
+            raise ValueError('Cannot calculate the envelope of a LoadCase '
+                             + 'with no combinations.')
+
+        no_chunks = -(-len(table) // self.chunk_size)
+        partial = (no_chunks, self.no_effects)
+
+        rows = self._rows(table.load_nos)
+
+        # the effects are taken straight into shared memory below, rather
+        # than through a temporary copy.
+        arrays = {'no_groups': np.array([len(table.groups)]),
+                  'effects': (np.float64, (len(rows), self.no_effects))}
+
+        for g, group in enumerate(table.groups):
+            arrays[f'load_nos_{g}'] = group.load_nos
+            arrays[f'factors_{g}'] = group.factors
+
+        arrays.update({'max': (np.float64, partial),
+                       'min': (np.float64, partial),
+                       'argmax': (np.int64, partial),
+                       'argmin': (np.int64, partial)})
+
+        if combined:
+            arrays['combined'] = (np.float64, (len(table), self.no_effects))
+
+        with SharedArrays.create(arrays) as shared:
+            np.take(self.effects, rows, axis = 0,
+                    out = shared.arrays['effects'])
+
+            tasks = self._tasks(len(table))
+
+            if self.processes == 1:
+                _set_worker(shared)
+
+                try:
+                    for t in tasks:
+                        _tile(t)
+                finally:
+                    _WORKER.clear()
+
+            else:
+                with Pool(processes = self.processes,
+                          initializer = _init_worker,
+                          initargs = (shared.spec,)) as pool:
+                    for _ in pool.imap_unordered(_tile, tasks):
+                        pass
+
+            a = shared.arrays
+            effects = np.arange(self.no_effects)
+
+            # the first chunk with the max. value is taken, so that ties go to
+            # the first combination as with np.argmax.
+            k_max = a['max'].argmax(axis = 0)
+            k_min = a['min'].argmin(axis = 0)
+
+            self.max = a['max'][k_max, effects].copy()
+            self.min = a['min'][k_min, effects].copy()
+            self.argmax = a['argmax'][k_max, effects].copy()
+            self.argmin = a['argmin'][k_min, effects].copy()
+
+            values = a['combined'].copy() if combined else None
+
+            del a
+
+        return values
+
+    def update(self):
+        """
+        Re-calculates the envelope, e.g. after a change to the ``LoadCase``.
+        """
+
+        self._run(combined = False)
+
+    def superpose(self) -> np.ndarray:
+        """
+        Calculates the combined results of every combination. The envelope is
+        updated at the same time.
+
+        :return: An array of shape ``(no_combinations, no_effects)``, in the
+            same order as ``LoadCase.generate_cases``.
+        """
+
+        return self._run(combined = True)
+
+    def __str__(self):
+
+        return (f'{type(self).__name__}: '
+                + f'effects: {self.no_effects}, '
+                + f'processes: {self.processes}')
+
+    def __repr__(self):
+
+        return (f'{type(self).__name__}('
+                + f'source = {repr(self.source)}, '
+                + f'load_nos = {repr(self.load_nos)}, '
+                + f'effects = {repr(self.effects)}, '
+                + f'processes = {repr(self.processes)}, '
+                + f'chunk_size = {repr(self.chunk_size)}, '
+                + f'effect_chunk_size = {repr(self.effect_chunk_size)}'
+                + ')')
@@ -0,0 +1,323 @@
+# coding=utf-8
+
+"""
+This file contains a ``LoadTable`` class, which allows ``Combination``,
+``LoadFactor`` and ``LoadGroup`` objects to be pickled with references to
+their ``Load`` objects rather than copies of them.
+
+When objects are sent between processes (e.g. with ``multiprocessing.Pool``)
+every task is pickled separately, so every ``Load`` in every ``Combination`` is
+normally pickled again and again. If the loads are instead sent to each worker
+once in a ``LoadTable``, and the table is active while pickling, each ``Load``
+is pickled as a ``(table_id, load_no)`` reference:
+
+    table = LoadTable(model.loads)
+
+    with table, Pool(initializer = install_table,
+                     initargs = (table,)) as pool:
+        results = pool.map(func, combinations)
+
+The table is active in the worker processes as well, so combinations returned
+by the workers are also pickled by reference.
+
+Array-backed objects such as ``GroupTable`` and ``FactorTable`` do not need a
+table. They store their data in NumPy arrays, and NumPy arrays support
+out-of-band pickling themselves: if they are pickled with protocol 5 and a
+``buffer_callback``, the array data is passed to the callback as
+``pickle.PickleBuffer`` objects rather than copied into the pickle:
+
+    buffers = []
+    data = pickle.dumps(table, protocol = 5, buffer_callback = buffers.append)
+    table = pickle.loads(data, buffers = buffers)
+
+Run ``python -m LoadCombination.SharedLoads`` for a benchmark of the pickled
+size and pickling time of a batch of combinations.
+"""
+
+import copyreg
+import io
+import pickle
+import time
+import uuid
+from typing import Dict, List, Union
+
+# the tables installed in this process, by table_id.
+_TABLES = {}
+
+# the tables that are active for pickling, innermost last.
+_ACTIVE = []
+
+
+class LoadTable:
+    """
+    A table of ``Load`` objects shared between processes, so that objects that
+    refer to the loads can be pickled with references to them.
+    """
+
+    def __init__(self, loads: Union[Dict[int, 'Load'], List['Load']], *,
+                 table_id: str = None):
+        """
+        Constructor for the ``LoadTable`` object. The table is installed in the
+        current process.
+
+        :param loads: The loads, as a ``Dict[int, Load]`` or ``List[Load]``.
+        :param table_id: The id of the table. If ``None`` a unique id is
+            generated.
+        """
+
+        if isinstance(loads, dict):
+            loads = loads.values()
+
+        self.loads = {l.load_no: l for l in loads}
+        self.table_id = uuid.uuid4().hex[:16] if table_id is None else table_id
+
+        _TABLES[self.table_id] = self
+
+    def contains(self, load: 'Load') -> bool:
+        """
+        Checks if a ``Load`` object is in the table. The object itself must be
+        in the table, not just an equal ``Load``.
+
+        :param load: The ``Load`` to check.
+        """
+
+        return self.loads.get(load.load_no) is load
+
+    def uninstall(self):
+        """
+        Removes the table from the current process. Any references to it can no
+        longer be unpickled.
+        """
+
+        _TABLES.pop(self.table_id, None)
+
+        while self in _ACTIVE:
+            _ACTIVE.remove(self)
+
+    def __enter__(self):
+
+        _TABLES[self.table_id] = self
+        _ACTIVE.append(self)
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        if self in _ACTIVE:
+            _ACTIVE.remove(self)
+
+    def __reduce__(self):
+
+        # the loads in the table itself must be pickled in full, so pickle
+        # them with no table active.
+        active = list(_ACTIVE)
+        _ACTIVE.clear()
+
+        try:
+            data = pickle.dumps(list(self.loads.values()),
+                                protocol = pickle.HIGHEST_PROTOCOL)
+        finally:
+            _ACTIVE.extend(active)
+
+        return _restore_table, (self.table_id, data)
+
+    def __len__(self):
+
+        return len(self.loads)
+
+    def __str__(self):
+
+        return (f'{type(self).__name__}: {self.table_id}, '
+                + f'loads: {list(self.loads.keys())}')
+
+    def __repr__(self):
+
+        return (f'{type(self).__name__}('
+                + f'loads = {repr(list(self.loads.values()))}, '
+                + f'table_id = {repr(self.table_id)}'
+                + ')')
+
+
+def _restore_table(table_id: str, data: bytes) -> LoadTable:
+    """
+    Unpickles a ``LoadTable``. If the table is already installed in this
+    process the installed table is returned, so that the same ``Load`` objects
+    are used.
+    """
+
+    if table_id in _TABLES:
+        return _TABLES[table_id]
+
+    return LoadTable(pickle.loads(data), table_id = table_id)
+
+
+def install_table(table: LoadTable):
+    """
+    Installs a ``LoadTable`` and makes it active for the rest of the process.
+    Intended for use as the ``initializer`` of a ``multiprocessing.Pool``.
+
+    :param table: The ``LoadTable``.
+    """
+
+    table.__enter__()
+
+
+def active_table() -> Union[LoadTable, None]:
+    """
+    Gets the ``LoadTable`` that is active for pickling.
+
+    :return: The innermost active ``LoadTable``, or ``None``.
+    """
+
+    return _ACTIVE[-1] if len(_ACTIVE) > 0 else None
+
+
+def load_reference(load: 'Load') -> Union[tuple, None]:
+    """
+    Gets the arguments to pickle a ``Load`` by reference, if it is in the
+    active ``LoadTable``.
+
+    :param load: The ``Load``.
+    :return: A ``(table_id, load_no)`` tuple, or ``None`` if there is no
+        active table or the load is not in it.
+    """
+
+    table = active_table()
+
+    if table is None or not table.contains(load):
+        return None
+
+    return table.table_id, load.load_no
+
+
+def resolve_load(table_id: str, load_no: int) -> 'Load':
+    """
+    Gets a ``Load`` from an installed ``LoadTable``. Used when unpickling a
+    reference to a ``Load``.
+
+    :param table_id: The id of the ``LoadTable``.
+    :param load_no: The ``load_no`` of the ``Load``.
+    :return: The ``Load`` object.
+    """
+
+    if table_id not in _TABLES:
+        raise KeyError(f'LoadTable {table_id} is not installed in this '
+                       + f'process. Send the table to the process first, '
+                       + f'e.g. with install_table as a Pool initializer.')
+
+    return _TABLES[table_id].loads[load_no]
+
+
+def benchmark(*, no_loads: int = 200, no_combinations: int = 2000,
+              protocol: int = 5, repeat: int = 3) -> Dict[str, Dict[str, float]]:
+    """
+    Compares the size and time of pickling a batch of ``Combination`` objects
+    one at a time, as ``multiprocessing.Pool`` does, in three ways:
+
+    * ``'default'``: with the standard pickling of every object's
+      ``__dict__``.
+    * ``'compact'``: with the compact pickling of ``Combination`` and
+      ``LoadFactor`` objects, but no ``LoadTable``.
+    * ``'shared'``: with the compact pickling and an active ``LoadTable``.
+
+    :param no_loads: The no. of loads in the model.
+    :param no_combinations: The no. of combinations to pickle.
+    :param protocol: The pickle protocol.
+    :param repeat: The no. of times to repeat the timing. The best time is
+        reported.
+    :return: A dictionary ``{method: {'bytes': ..., 'dumps': ...,
+        'loads': ...}}`` with the total bytes, and the seconds to pickle and
+        unpickle the batch.
+    """
+
+    # imported here as the Load module imports this module.
+    from LoadCombination.Load import RotatableLoad
+    from LoadCombination.LoadFactor import LoadFactor
+    from LoadCombination.Combination import Combination
+
+    class DefaultPickler(pickle.Pickler):
+        """
+        A Pickler that ignores the compact pickling of ``Combination`` and
+        ``LoadFactor`` objects.
+        """
+
+        def reducer_override(self, obj):
+
+            if isinstance(obj, (Combination, LoadFactor)):
+                return copyreg.__newobj__, (type(obj),), obj.__dict__
+
+            return NotImplemented
+
+    def dumps(obj, default: bool) -> bytes:
+
+        if not default:
+            return pickle.dumps(obj, protocol = protocol)
+
+        f = io.BytesIO()
+        DefaultPickler(f, protocol = protocol).dump(obj)
+
+        return f.getvalue()
+
+    loads = [RotatableLoad(load_name = f'Load {i}', load_no = i,
+                           load_value = 1.0, angle = (i * 15.0) % 360,
+                           symmetrical = False, abbrev = f'L{i}')
+             for i in range(no_loads)]
+
+    combinations = [Combination(load_case_no = 1,
+                                load_case = 'Case 1',
+                                load_case_abbrev = 'C1',
+                                load_factors = [
+                                    LoadFactor(load = loads[(c + j * 7)
+                                                            % no_loads],
+                                               base_factor = 1.2,
+                                               rotational_factor = 0.5,
+                                               info = {'angle': 15.0 * j})
+                                    for j in range(8)])
+                    for c in range(no_combinations)]
+
+    def run(default: bool) -> Dict[str, float]:
+        best = None
+
+        for _ in range(repeat):
+            start = time.perf_counter()
+            data = [dumps(c, default) for c in combinations]
+            mid = time.perf_counter()
+
+            for d in data:
+                pickle.loads(d)
+
+            end = time.perf_counter()
+
+            if best is None or end - start < best['dumps'] + best['loads']:
+                best = {'bytes': sum(len(d) for d in data),
+                        'dumps': mid - start,
+                        'loads': end - mid}
+
+        return best
+
+    results = {'default': run(default = True),
+               'compact': run(default = False)}
+
+    table = LoadTable(loads)
+
+    try:
+        with table:
+            results['shared'] = run(default = False)
+    finally:
+        table.uninstall()
+
+    return results
+
+
+if __name__ == '__main__':
+
+    # use the imported module rather than __main__, so that the tables are
+    # registered in the module used by the Load class.
+    from LoadCombination.SharedLoads import benchmark
+
+    results = benchmark()
+
+    for method, r in results.items():
+        print(f'{method:>8}: {r["bytes"]:10d} bytes, '
+              + f'dumps {r["dumps"]:.4f} s, loads {r["loads"]:.4f} s, '
+              + f'size ratio {r["bytes"] / results["default"]["bytes"]:.3f}')
@@ -0,0 +1,347 @@
+# coding=utf-8
+
+"""
+This file contains a ``Superposition`` class, which combines the results of a
+set of unit loads for every combination generated by a ``LoadCase`` when the
+results are too large to hold in memory.
+
+The unit results are read from a memory-mapped ``.npy`` file with one row per
+``Load`` and one column per result. The combinations are multiplied by the
+unit results in blocks of rows (combinations) and columns (results), sized so
+that the blocks held in memory at any one time fit within a memory budget. The
+combined results or their envelope are written to memory-mapped ``.npy``
+files, so the output does not have to fit in memory either.
+"""
+
+import os
+import tempfile
+import time
+from typing import Dict, Iterator, Tuple, Union
+import numpy as np
+
+from LoadCombination.FactorTable import FactorTable
+from LoadCombination.FactorMatrix import FactorMatrix
+
+
+class Superposition:
+    """
+    Combines the results of each ``Load`` with a factor of 1.0 into the
+    results of every combination of a ``LoadCase``, out of core.
+    """
+
+    MAX = 'max.npy'
+    MIN = 'min.npy'
+    ARGMAX = 'argmax.npy'
+    ARGMIN = 'argmin.npy'
+
+    def __init__(self, source, unit_results: Union[str, np.ndarray], *,
+                 load_nos, memory_budget: int = 256 * 2 ** 20):
+        """
+        Constructor for the ``Superposition`` object.
+
+        :param source: The combinations to calculate. A ``LoadCase`` (which
+            cannot have combination filters), its ``FactorTable``, or a
+            ``FactorMatrix``. A memory-mapped ``FactorMatrix`` is read in
+            blocks like the unit results.
+        :param unit_results: The path to a ``.npy`` file, or an array, of shape
+            ``(len(load_nos), no_results)`` containing the value of each result
+            under each ``Load`` with a factor of 1.0. A file is memory-mapped
+            rather than loaded.
+        :param load_nos: The ``load_no`` of each row of the unit results, or
+            the path to a ``.npy`` file containing them.
+        :param memory_budget: The approx. no. of bytes of memory to use for
+            the blocks of factors, unit results and combined results.
+        """
+
+        if isinstance(unit_results, str):
+            unit_results = np.load(unit_results, mmap_mode = 'r',
+                                   allow_pickle = False)
+
+        if isinstance(load_nos, str):
+            load_nos = np.load(load_nos, allow_pickle = False)
+
+        load_nos = np.asarray(load_nos, dtype = np.int64)
+
+        if unit_results.ndim != 2 or len(unit_results) != len(load_nos):
+            raise ValueError(f'The unit results should have shape '
+                             + f'(len(load_nos), no_results). Got '
+                             + f'{unit_results.shape} for {len(load_nos)} '
+                             + f'loads.')
+
+        self.source = source
+        self.unit_results = unit_results
+        self.load_nos = load_nos
+        self.memory_budget = memory_budget
+
+        if isinstance(source, (FactorTable, FactorMatrix)):
+            self._table = source
+        else:
+            self._table = source.factor_table()
+
+        # the row of the unit results for each column of the factors.
+        self._rows = self._unit_rows(self._table.load_nos)
+
+        self.stats = {}
+
+        self.max = None
+        self.min = None
+        self.argmax = None
+        self.argmin = None
+
+    @property
+    def no_results(self) -> int:
+        """
+        The no. of results for each combination.
+        """
+
+        return self.unit_results.shape[1]
+
+    @property
+    def no_combinations(self) -> int:
+        """
+        The no. of combinations.
+        """
+
+        return len(self._table)
+
+    def _unit_rows(self, load_nos: np.ndarray) -> np.ndarray:
+        """
+        Gets the row of the unit results for each of a set of loads.
+
+        :param load_nos: The ``load_no`` of each load.
+        :return: An array of row nos.
+        """
+
+        order = np.argsort(self.load_nos)
+        sorted_nos = self.load_nos[order]
+
+        pos = np.searchsorted(sorted_nos, load_nos)
+        pos = np.minimum(pos, len(sorted_nos) - 1)
+
+        found = (len(sorted_nos) > 0) & (sorted_nos[pos] == load_nos)
+
+        if not np.all(found):
+            missing = [int(l) for l in np.asarray(load_nos)[~found]]
+
+            raise ValueError(f'No unit results provided for loads: '
+                             + f'{missing}.')
+
+        return order[pos]
+
+    def block_shape(self) -> Tuple[int, int]:
+        """
+        Works out the size of the blocks that fit in the memory budget. Up to
+        half the budget is used for a block of unit results, and the rest for
+        the blocks of factors and combined results.
+
+        :return: A tuple of ``(no_combinations, no_results)`` in each block.
+        """
+
+        no_loads = max(len(self._rows), 1)
+        itemsize = 8
+
+        cols = self.memory_budget // 2 // (itemsize * no_loads)
+        cols = int(min(max(cols, 1), max(self.no_results, 1)))
+
+        rows = (self.memory_budget - itemsize * no_loads * cols) \
+            // (itemsize * (no_loads + cols))
+        rows = int(min(max(rows, 1), max(self.no_combinations, 1)))
+
+        return rows, cols
+
+    def _factors(self, start: int, stop: int) -> np.ndarray:
+        """
+        Gets the factors for a block of combinations.
+        """
+
+        if isinstance(self._table, FactorMatrix):
+            return np.asarray(self._table.factors[start:stop],
+                              dtype = np.float64)
+
+        return self._table.rows(np.arange(start, stop))
+
+    def blocks(self) -> Iterator[Tuple[int, int, int, int, np.ndarray]]:
+        """
+        Iterates through the combined results one block at a time. Each block
+        of unit results is read once, and the blocks of combinations are
+        iterated for each of them.
+
+        :return: A generator of ``(start, stop, col_start, col_stop, values)``
+            tuples, where ``values`` is the combined results of combinations
+            ``start:stop`` for results ``col_start:col_stop``.
+        """
+
+        rows, cols = self.block_shape()
+
+        for cs in range(0, self.no_results, cols):
+            ce = min(cs + cols, self.no_results)
+
+            # only the rows of the loads in the combinations are read.
+            unit = np.asarray(self.unit_results[self._rows, cs:ce],
+                              dtype = np.float64)
+
+            for s in range(0, self.no_combinations, rows):
+                e = min(s + rows, self.no_combinations)
+
+                yield s, e, cs, ce, self._factors(s, e) @ unit
+
+    def _record(self, start_time: float) -> Dict[str, float]:
+        """
+        Records the throughput of a run.
+        """
+
+        seconds = time.perf_counter() - start_time
+        values = self.no_combinations * self.no_results
+        rows, cols = self.block_shape()
+
+        self.stats = {'values': values,
+                      'seconds': seconds,
+                      'values_per_second': values / seconds if seconds > 0
+                      else float('inf'),
+                      'block_rows': rows,
+                      'block_cols': cols}
+
+        return self.stats
+
+    @staticmethod
+    def _open_output(path: str, dtype, shape: Tuple[int, ...]):
+        """
+        Creates a memory-mapped ``.npy`` file in the same directory as
+        ``path``, to be moved to ``path`` once it is complete.
+
+        :return: A tuple of ``(temp_path, memmap)``.
+        """
+
+        fd, temp = tempfile.mkstemp(dir = os.path.dirname(os.path.abspath(path)),
+                                    suffix = '.npy.tmp')
+        os.close(fd)
+
+        return temp, np.lib.format.open_memmap(temp, mode = 'w+',
+                                               dtype = dtype, shape = shape)
+
+    def combine(self, path: str) -> Dict[str, float]:
+        """
+        Calculates the combined results of every combination and writes them
+        to a ``.npy`` file. The file is written to a temporary file and moved
+        into place once complete.
+
+        :param path: The ``.npy`` file to write. It will contain an array of
+            shape ``(no_combinations, no_results)``, in the same order as
+            ``LoadCase.generate_cases``.
+        :return: The throughput of the run. See ``self.stats``.
+        """
+
+        start_time = time.perf_counter()
+        shape = (self.no_combinations, self.no_results)
+
+        if 0 in shape:
+            # an empty file cannot be memory-mapped.
+            np.save(path, np.zeros(shape))
+
+            return self._record(start_time)
+
+        temp, out = self._open_output(path, np.float64, shape)
+
+        try:
+            for s, e, cs, ce, values in self.blocks():
+                out[s:e, cs:ce] = values
+
+            out.flush()
+            del out
+
+            os.replace(temp, path)
+
+        finally:
+            if os.path.exists(temp):
+                os.remove(temp)
+
+        return self._record(start_time)
+
+    def envelope(self, path: str) -> Dict[str, float]:
+        """
+        Calculates the max. and min. of each result over every combination,
+        and the combination that gives it, and writes them to ``.npy`` files
+        in a directory. The files are re-loaded memory-mapped into the
+        ``max``, ``min``, ``argmax`` and ``argmin`` attributes.
+
+        :param path: The directory to write the files to. It is created if it
+            does not exist.
+        :return: The throughput of the run. See ``self.stats``.
+        """
+
+        if self.no_combinations == 0:
+            raise ValueError('Cannot calculate the envelope of a LoadCase '
+                             + 'with no combinations.')
+
+        os.makedirs(path, exist_ok = True)
+
+        start_time = time.perf_counter()
+        shape = (self.no_results,)
+
+        names = (self.MAX, self.MIN, self.ARGMAX, self.ARGMIN)
+        dtypes = (np.float64, np.float64, np.int64, np.int64)
+
+        temps = []
+        outputs = []
+
+        for n, d in zip(names, dtypes):
+            temp, out = self._open_output(os.path.join(path, n), d, shape)
+            temps.append(temp)
+            outputs.append(out)
+
+        out_max, out_min, out_argmax, out_argmin = outputs
+
+        try:
+            for s, e, cs, ce, values in self.blocks():
+
+                argmax = values.argmax(axis = 0)
+                argmin = values.argmin(axis = 0)
+                cols = np.arange(ce - cs)
+
+                block_max = values[argmax, cols]
+                block_min = values[argmin, cols]
+
+                if s == 0:
+                    out_max[cs:ce] = block_max
+                    out_min[cs:ce] = block_min
+                    out_argmax[cs:ce] = argmax
+                    out_argmin[cs:ce] = argmin
+                    continue
+
+                # strictly greater / less, so that ties go to the first
+                # combination as with np.argmax.
+                new_max = block_max > out_max[cs:ce]
+                new_min = block_min < out_min[cs:ce]
+
+                out_max[cs:ce] = np.where(new_max, block_max, out_max[cs:ce])
+                out_min[cs:ce] = np.where(new_min, block_min, out_min[cs:ce])
+                out_argmax[cs:ce] = np.where(new_max, argmax + s,
+                                             out_argmax[cs:ce])
+                out_argmin[cs:ce] = np.where(new_min, argmin + s,
+                                             out_argmin[cs:ce])
+
+            for out in outputs:
+                out.flush()
+
+            del out_max, out_min, out_argmax, out_argmin, out
+            outputs.clear()
+
+            for n, temp in zip(names, temps):
+                os.replace(temp, os.path.join(path, n))
+
+        finally:
+            for temp in temps:
+                if os.path.exists(temp):
+                    os.remove(temp)
+
+        self.max, self.min, self.argmax, self.argmin = [
+            np.load(os.path.join(path, n), mmap_mode = 'r') for n in names]
+
+        return self._record(start_time)
+
+    def __str__(self):
+
+        return (f'{type(self).__name__}: '
+                + f'combinations: {self.no_combinations}, '
+                + f'results: {self.no_results}, '
+                + f'memory budget: {self.memory_budget} bytes')
@@ -0,0 +1,291 @@
+# coding=utf-8
+
+"""
+This file contains a ``TableCache`` class, which stores the ``FactorTable``
+generated by each ``LoadCase`` in a local directory so that it can be
+re-loaded, rather than re-generated, by later runs.
+"""
+
+import json
+import os
+import tempfile
+import time
+from typing import List
+import numpy as np
+
+from LoadCombination.FactorTable import GroupTable, FactorTable
+
+
+class TableCache:
+    """
+    An on-disk cache of ``FactorTable`` objects. Each table is stored in a
+    NumPy ``.npz`` file named after the fingerprint of the ``LoadCase`` that
+    generated it, so a table is re-used whenever a ``LoadCase`` with identical
+    groups, loads, factors, angles and interpolation functions is seen again.
+
+    Files are written atomically, so a cache directory can be shared between
+    processes. If the cache is given a ``max_size`` the least recently used
+    files are deleted once the size of the cache exceeds it. Temporary files
+    left behind by a process that died while writing are deleted once they
+    are older than ``TEMP_AGE`` seconds.
+    """
+
+    # incremented if the layout of the cache files changes, so old files are
+    # treated as misses rather than loaded incorrectly.
+    FORMAT_VERSION = 1
+    SUFFIX = '.npz'
+    TEMP_SUFFIX = '.tmp'
+    TEMP_AGE = 3600
+
+    def __init__(self, directory: str, *, max_size: int = None):
+        """
+        Constructor for the ``TableCache`` object.
+
+        :param directory: The directory to store the cache in. It is created if
+            it does not exist.
+        :param max_size: The max. total size of the cache files in bytes. If
+            ``None`` the cache is not limited.
+        """
+
+        self.directory = directory
+        self.max_size = max_size
+
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.directory, exist_ok = True)
+
+    def path(self, fingerprint: str) -> str:
+        """
+        Gets the path of the cache file for a given fingerprint.
+
+        :param fingerprint: The fingerprint of the ``LoadCase``.
+        :return: The path to the file.
+        """
+
+        return os.path.join(self.directory, fingerprint + self.SUFFIX)
+
+    def get(self, load_case) -> FactorTable:
+        """
+        Gets the ``FactorTable`` for a ``LoadCase`` from the cache.
+
+        :param load_case: The ``LoadCase`` to get the table for.
+        :return: The ``FactorTable``, or ``None`` if it is not in the cache.
+        """
+
+        path = self.path(load_case.fingerprint)
+
+        try:
+            table = self._read(path)
+        except (OSError, ValueError, KeyError):
+            # a missing, partially deleted or out of date file is a miss.
+            table = None
+
+        if table is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+
+        # record the use of the file for the LRU eviction.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return table
+
+    def put(self, load_case, table: FactorTable):
+        """
+        Stores the ``FactorTable`` for a ``LoadCase`` in the cache.
+
+        :param load_case: The ``LoadCase`` that generated the table.
+        :param table: The ``FactorTable`` to store.
+        """
+
+        self._write(self.path(load_case.fingerprint), table)
+        self.evict()
+
+    def factor_table(self, load_case) -> FactorTable:
+        """
+        Gets the ``FactorTable`` for a ``LoadCase``, loading it from the cache
+        if possible and otherwise generating it and storing it in the cache.
+
+        :param load_case: The ``LoadCase`` to get the table for.
+        :return: A ``FactorTable`` object.
+        """
+
+        table = self.get(load_case)
+
+        if table is None:
+            table = load_case.factor_table()
+            self.put(load_case, table)
+
+        return table
+
+    def _files(self) -> List[os.DirEntry]:
+        """
+        Gets the cache files in the directory.
+        """
+
+        with os.scandir(self.directory) as entries:
+            return [e for e in entries
+                    if e.is_file() and e.name.endswith(self.SUFFIX)]
+
+    @property
+    def size(self) -> int:
+        """
+        The total size of the cache files in bytes.
+        """
+
+        total = 0
+
+        for e in self._files():
+            try:
+                total += e.stat().st_size
+            except OSError:
+                # deleted by another process.
+                pass
+
+        return total
+
+    def _sweep(self):
+        """
+        Deletes temporary files older than ``TEMP_AGE``. Newer files may still
+        be being written by another process, so are left alone.
+        """
+
+        cutoff = time.time() - self.TEMP_AGE
+
+        with os.scandir(self.directory) as entries:
+            temps = [e for e in entries
+                     if e.is_file() and e.name.endswith(self.TEMP_SUFFIX)]
+
+        for e in temps:
+            try:
+                if e.stat().st_mtime < cutoff:
+                    os.remove(e.path)
+            except OSError:
+                # finished or deleted by another process.
+                pass
+
+    def evict(self):
+        """
+        Deletes the least recently used cache files until the size of the
+        cache is no more than ``max_size``, and any stale temporary files.
+        """
+
+        self._sweep()
+
+        if self.max_size is None:
+            return
+
+        files = []
+
+        for e in self._files():
+            try:
+                stat = e.stat()
+            except OSError:
+                continue
+
+            files.append((stat.st_mtime, stat.st_size, e.path))
+
+        total = sum(f[1] for f in files)
+
+        for mtime, size, path in sorted(files):
+
+            if total <= self.max_size:
+                break
+
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+            total -= size
+
+    def clear(self):
+        """
+        Deletes every file in the cache, and any stale temporary files.
+        """
+
+        self._sweep()
+
+        for e in self._files():
+            try:
+                os.remove(e.path)
+            except OSError:
+                pass
+
+    def _write(self, path: str, table: FactorTable):
+        """
+        Writes a ``FactorTable`` to a file. The file is written to a temporary
+        file first and then moved into place, so other processes never see a
+        partially written file.
+        """
+
+        meta = {'version': self.FORMAT_VERSION,
+                'case_no': table.case_no,
+                'case_name': table.case_name,
+                'abbrev': table.abbrev,
+                'groups': [g.group_name for g in table.groups]}
+
+        arrays = {'meta': np.array(json.dumps(meta))}
+
+        for i, g in enumerate(table.groups):
+            arrays[f'load_nos_{i}'] = g.load_nos
+            arrays[f'factors_{i}'] = g.factors
+            arrays[f'present_{i}'] = g.present
+            arrays[f'angles_{i}'] = g.angles
+
+        fd, temp = tempfile.mkstemp(dir = self.directory,
+                                    suffix = self.TEMP_SUFFIX)
+
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **arrays)
+
+            os.replace(temp, path)
+
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+
+            raise
+
+    def _read(self, path: str) -> FactorTable:
+        """
+        Reads a ``FactorTable`` from a file written by the ``_write`` method.
+        Returns ``None`` if the file was written by a different version.
+        """
+
+        with np.load(path, allow_pickle = False) as data:
+
+            meta = json.loads(str(data['meta']))
+
+            if meta['version'] != self.FORMAT_VERSION:
+                return None
+
+            groups = [GroupTable(group_name = name,
+                                 load_nos = data[f'load_nos_{i}'],
+                                 factors = data[f'factors_{i}'],
+                                 present = data[f'present_{i}'],
+                                 angles = data[f'angles_{i}'])
+                      for i, name in enumerate(meta['groups'])]
+
+        return FactorTable(case_no = meta['case_no'],
+                           case_name = meta['case_name'],
+                           abbrev = meta['abbrev'],
+                           groups = groups)
+
+    def __str__(self):
+
+        return (f'{type(self).__name__}: {self.directory}, '
+                + f'hits: {self.hits}, misses: {self.misses}')
+
+    def __repr__(self):
+
+        return (f'{type(self).__name__}('
+                + f'directory = {repr(self.directory)}, '
+                + f'max_size = {repr(self.max_size)}'
+                + ')')
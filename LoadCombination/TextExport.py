@@ -0,0 +1,727 @@
+# coding=utf-8
+
+"""
+This file contains classes to stream the combinations generated by
+``LoadCase`` and ``LoadCombinations`` objects into text or CSV files for
+import into analysis programs, with one line per combination.
+
+The layout of each line is defined by a ``RecordFormat`` object. Two formats
+are provided, and more can be added by sub-classing ``RecordFormat`` and adding
+them to ``FORMATS`` with ``register_format``:
+
+* ``'text'``: a ``TemplateFormat``, where each line is built from a
+  ``str.format`` template.
+* ``'csv'``: a ``CSVFormat``, where each line is a CSV row of ``case_no``,
+  ``comb_no``, ``title`` and then ``load_no``, ``factor`` pairs.
+
+The combinations are generated one at a time by ``LoadCase.iter_cases`` and
+the lines are written in blocks of ``buffer_size`` characters, so the memory
+used does not depend on the no. of combinations. Files can optionally be
+compressed with ``gzip`` or ``lzma``.
+
+``Exporter.write_resumable`` writes the combinations into a directory of part
+files and a manifest first, so that an export that is stopped part way through
+can be resumed from the last completed part.
+"""
+
+import csv
+import gzip
+import io
+import json
+import lzma
+import os
+import shutil
+import tempfile
+from itertools import islice
+from string import Formatter
+from typing import Dict, Iterator, List, TextIO, Tuple, Type, Union
+import numpy as np
+
+from LoadCombination.HelperFuncs import content_hash
+
+COMPRESSIONS = (None, 'gzip', 'lzma')
+
+# incremented if the layout of the manifest written by
+# Exporter.write_resumable changes.
+MANIFEST_VERSION = 1
+MANIFEST = 'manifest.json'
+
+
+def _load_cases(source) -> List:
+    """
+    Gets the ``LoadCase`` objects to export from a ``LoadCase`` or
+    ``LoadCombinations`` object.
+    """
+
+    if hasattr(source, 'load_cases'):
+        return list(source.load_cases.values())
+
+    return [source]
+
+
+def _compression(path: str, compression: str = 'infer') -> Union[str, None]:
+    """
+    Works out the compression to use for a file.
+
+    :param path: The file name.
+    :param compression: One of ``None``, ``'gzip'``, ``'lzma'`` or
+        ``'infer'``. If ``'infer'`` the compression is taken from the file
+        extension: ``.gz`` for ``gzip`` and ``.xz`` or ``.lzma`` for ``lzma``.
+    """
+
+    if compression == 'infer':
+        if path.endswith('.gz'):
+            return 'gzip'
+
+        if path.endswith(('.xz', '.lzma')):
+            return 'lzma'
+
+        return None
+
+    if compression not in COMPRESSIONS:
+        raise ValueError(f'compression must be one of {COMPRESSIONS} or '
+                         + f'\'infer\'. compression given was '
+                         + f'{repr(compression)}.')
+
+    return compression
+
+
+class _GzipFile(gzip.GzipFile):
+    """
+    A ``GzipFile`` written without a file name or time stamp in its header, so
+    that writing the same data always gives the same bytes.
+    """
+
+    def __init__(self, path: str, mode: str):
+
+        f = open(path, mode)
+
+        super().__init__(filename = '', mode = mode, fileobj = f, mtime = 0)
+
+        # myfileobj is closed when the GzipFile is closed.
+        self.myfileobj = f
+
+
+def open_output(path: str, *, compression: str = 'infer',
+                mode: str = 'w') -> TextIO:
+    """
+    Opens a text file for writing, optionally compressed. Lines are written
+    with ``'\\n'`` line endings on all platforms, and ``gzip`` files are
+    written without a time stamp, so the same data always gives the same
+    bytes.
+
+    :param path: The file to open.
+    :param compression: One of ``None``, ``'gzip'``, ``'lzma'`` or
+        ``'infer'``. See ``_compression``.
+    :param mode: ``'w'`` to overwrite the file, ``'a'`` to append to it.
+    :return: A text file object.
+    """
+
+    compression = _compression(path, compression)
+
+    if compression == 'gzip':
+        return io.TextIOWrapper(_GzipFile(path, mode + 'b'),
+                                encoding = 'utf-8', newline = '')
+
+    if compression == 'lzma':
+        return lzma.open(path, mode + 't', encoding = 'utf-8', newline = '')
+
+    return open(path, mode, encoding = 'utf-8', newline = '')
+
+
+class RecordFormat:
+    """
+    The base class for the record formats used by an ``Exporter``. A record
+    format converts each combination into a line of text.
+
+    Sub-classes must implement the ``record`` method, and can optionally
+    implement ``header`` and ``footer``. The ``repr`` of a format should
+    include all of its settings, as it is used to check that a resumed export
+    uses the same format as the original.
+    """
+
+    def header(self, load_cases: List) -> str:
+        """
+        Gets any text to write at the start of the file.
+
+        :param load_cases: The ``LoadCase`` objects being exported.
+        :return: The header text, including any line endings.
+        """
+
+        return ''
+
+    def record(self, load_case, comb_no: int, combination) -> str:
+        """
+        Converts a combination into a line of text.
+
+        :param load_case: The ``LoadCase`` the combination is from.
+        :param comb_no: The position of the combination in the list returned
+            by ``load_case.generate_cases``.
+        :param combination: The ``Combination`` object.
+        :return: The line of text, including the line ending.
+        """
+
+        raise NotImplementedError
+
+    def footer(self) -> str:
+        """
+        Gets any text to write at the end of the file.
+
+        :return: The footer text, including any line endings.
+        """
+
+        return ''
+
+
+class TemplateFormat(RecordFormat):
+    """
+    A ``RecordFormat`` that builds each line from a ``str.format`` template.
+
+    The line template can use the fields ``case_no``, ``case_name``,
+    ``case_abbrev``, ``comb_no``, ``title``, ``no_loads`` and ``pairs``.
+    ``pairs`` is built by formatting each ``Load`` in the combination with the
+    pair template, which can use the fields ``load_no``, ``load_name``,
+    ``abbrev`` and ``factor``.
+
+    The title of a combination is only generated if the template uses it, as
+    it is relatively slow to build.
+    """
+
+    def __init__(self, template: str = '{case_no} {comb_no} {pairs}', *,
+                 pair_template: str = '{load_no} {factor:g}',
+                 pair_separator: str = ' ',
+                 header: str = '',
+                 footer: str = ''):
+        """
+        Constructor for the ``TemplateFormat`` object.
+
+        :param template: The template for each line. A line ending is added.
+        :param pair_template: The template for each ``load_no``, factor pair.
+        :param pair_separator: The text placed between each pair.
+        :param header: Text written at the start of the file. A line ending is
+            added if it is not empty.
+        :param footer: Text written at the end of the file. A line ending is
+            added if it is not empty.
+        """
+
+        self.template = template
+        self.pair_template = pair_template
+        self.pair_separator = pair_separator
+        self._header = header
+        self._footer = footer
+
+        fields = {f for _, f, _, _ in Formatter().parse(template)
+                  if f is not None}
+
+        self._needs_title = 'title' in fields
+        self._needs_pairs = 'pairs' in fields
+
+    def header(self, load_cases: List) -> str:
+
+        return self._header + '\n' if len(self._header) > 0 else ''
+
+    def record(self, load_case, comb_no: int, combination) -> str:
+
+        loads = combination.list_loads_with_factors
+
+        if self._needs_pairs:
+            pairs = self.pair_separator.join(
+                self.pair_template.format(load_no = l,
+                                          load_name = load.load_name,
+                                          abbrev = load.abbrev,
+                                          factor = factor)
+                for l, (factor, load, LFs) in sorted(loads.items()))
+        else:
+            pairs = ''
+
+        if self._needs_title:
+            title = combination.combination_title()
+        else:
+            title = ''
+
+        return self.template.format(case_no = load_case.case_no,
+                                    case_name = load_case.case_name,
+                                    case_abbrev = load_case.abbrev,
+                                    comb_no = comb_no,
+                                    title = title,
+                                    no_loads = len(loads),
+                                    pairs = pairs) + '\n'
+
+    def footer(self) -> str:
+
+        return self._footer + '\n' if len(self._footer) > 0 else ''
+
+    def __repr__(self):
+
+        return (f'{type(self).__name__}('
+                + f'template = {repr(self.template)}, '
+                + f'pair_template = {repr(self.pair_template)}, '
+                + f'pair_separator = {repr(self.pair_separator)}, '
+                + f'header = {repr(self._header)}, '
+                + f'footer = {repr(self._footer)}'
+                + ')')
+
+
+class CSVFormat(RecordFormat):
+    """
+    A ``RecordFormat`` that writes each combination as a CSV row of
+    ``case_no``, ``comb_no``, ``title`` and then a ``load_no``, ``factor`` pair
+    for each ``Load`` in the combination. As the no. of loads varies between
+    combinations the rows have different lengths.
+    """
+
+    def __init__(self, *, delimiter: str = ',', title: bool = True,
+                 header: bool = True, precision: int = None):
+        """
+        Constructor for the ``CSVFormat`` object.
+
+        :param delimiter: The delimiter between values.
+        :param title: Include the combination title?
+        :param header: Write a header row?
+        :param precision: The no. of decimal places to write the factors to.
+            If ``None`` the factors are written with ``repr`` so that they can
+            be read back exactly.
+        """
+
+        self.delimiter = delimiter
+        self.title = title
+        self._header = header
+        self.precision = precision
+
+        self._init_writer()
+
+    def _init_writer(self):
+        """
+        Creates the ``csv.writer`` used to format each row.
+        """
+
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, delimiter = self.delimiter,
+                                  lineterminator = '\n')
+
+    def __getstate__(self):
+        # the writer and its buffer cannot be pickled, and are re-created when
+        # unpickled.
+        state = self.__dict__.copy()
+        state.pop('_buffer', None)
+        state.pop('_writer', None)
+
+        return state
+
+    def __setstate__(self, state):
+
+        self.__dict__.update(state)
+        self._init_writer()
+
+    def _row(self, row: List) -> str:
+        """
+        Converts a list of values into a line of CSV.
+        """
+
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._writer.writerow(row)
+
+        return self._buffer.getvalue()
+
+    def header(self, load_cases: List) -> str:
+
+        if not self._header:
+            return ''
+
+        if self.title:
+            return self._row(['case_no', 'comb_no', 'title', 'load_no',
+                              'factor', '...'])
+
+        return self._row(['case_no', 'comb_no', 'load_no', 'factor', '...'])
+
+    def record(self, load_case, comb_no: int, combination) -> str:
+
+        row = [load_case.case_no, comb_no]
+
+        if self.title:
+            row.append(combination.combination_title())
+
+        for l, (factor, load, LFs) in sorted(
+                combination.list_loads_with_factors.items()):
+
+            row.append(l)
+            row.append(repr(factor) if self.precision is None
+                       else f'{factor:.{self.precision}f}')
+
+        return self._row(row)
+
+    def __repr__(self):
+
+        return (f'{type(self).__name__}('
+                + f'delimiter = {repr(self.delimiter)}, '
+                + f'title = {repr(self.title)}, '
+                + f'header = {repr(self._header)}, '
+                + f'precision = {repr(self.precision)}'
+                + ')')
+
+
+# the record formats that can be referred to by name.
+FORMATS: Dict[str, Type[RecordFormat]] = {'text': TemplateFormat,
+                                          'csv': CSVFormat}
+
+
+def register_format(name: str, record_format: Type[RecordFormat]):
+    """
+    Adds a ``RecordFormat`` class to ``FORMATS`` so that it can be referred to
+    by name when creating an ``Exporter``.
+
+    :param name: The name of the format.
+    :param record_format: A sub-class of ``RecordFormat``. It must be possible
+        to create it with no arguments.
+    """
+
+    if not (isinstance(record_format, type)
+            and issubclass(record_format, RecordFormat)):
+        raise ValueError(f'record_format must be a sub-class of '
+                         + f'RecordFormat. record_format given was '
+                         + f'{repr(record_format)}.')
+
+    FORMATS[name] = record_format
+
+
+class Exporter:
+    """
+    Streams the combinations generated by a ``LoadCase`` or
+    ``LoadCombinations`` object into a text file, one line per combination.
+    """
+
+    def __init__(self, record_format: Union[str, RecordFormat] = 'text', *,
+                 buffer_size: int = 1 << 20):
+        """
+        Constructor for the ``Exporter`` object.
+
+        :param record_format: A ``RecordFormat`` object, or the name of a
+            format in ``FORMATS``.
+        :param buffer_size: The approx. no. of characters collected before
+            they are written to the file.
+        """
+
+        if isinstance(record_format, str):
+            if record_format not in FORMATS:
+                raise ValueError(f'record_format must be one of '
+                                 + f'{list(FORMATS)}. record_format given '
+                                 + f'was {repr(record_format)}.')
+
+            record_format = FORMATS[record_format]()
+
+        if buffer_size < 1:
+            raise ValueError(f'buffer_size must be >= 1. '
+                             + f'buffer_size given was {buffer_size}.')
+
+        self.record_format = record_format
+        self.buffer_size = buffer_size
+
+    def write_stream(self, source, stream: TextIO) -> int:
+        """
+        Writes the combinations from a ``LoadCase`` or ``LoadCombinations``
+        object to an open text stream.
+
+        :param source: A ``LoadCase`` or ``LoadCombinations`` object.
+        :param stream: The stream to write to.
+        :return: The no. of combinations written.
+        """
+
+        load_cases = _load_cases(source)
+        record = self.record_format.record
+
+        buffer = [self.record_format.header(load_cases)]
+        size = len(buffer[0])
+        count = 0
+
+        for lc in load_cases:
+            for comb_no, comb in enumerate(lc.iter_cases()):
+
+                line = record(lc, comb_no, comb)
+
+                buffer.append(line)
+                size += len(line)
+                count += 1
+
+                if size >= self.buffer_size:
+                    stream.write(''.join(buffer))
+
+                    buffer = []
+                    size = 0
+
+        buffer.append(self.record_format.footer())
+        stream.write(''.join(buffer))
+
+        return count
+
+    def write(self, source, path: str, *, compression: str = 'infer') -> int:
+        """
+        Writes the combinations from a ``LoadCase`` or ``LoadCombinations``
+        object to a file.
+
+        :param source: A ``LoadCase`` or ``LoadCombinations`` object.
+        :param path: The file to write.
+        :param compression: One of ``None``, ``'gzip'``, ``'lzma'`` or
+            ``'infer'`` to use the file extension.
+        :return: The no. of combinations written.
+        """
+
+        with open_output(path, compression = compression) as f:
+            return self.write_stream(source, f)
+
+    @staticmethod
+    def _iter_from(load_case, start: int,
+                   chunk_size: int = 1024) -> Iterator[Tuple[int, object]]:
+        """
+        Generates the combinations of a ``LoadCase`` from a given position
+        onwards. If the case has no combination filters the earlier
+        combinations are skipped by decoding the combinations directly from
+        their index, otherwise they have to be generated and discarded.
+
+        :param load_case: The ``LoadCase``.
+        :param start: The position of the first combination to generate.
+        :param chunk_size: The no. of combinations decoded at a time.
+        :return: A generator of ``(comb_no, Combination)`` tuples.
+        """
+
+        if start == 0 or len(load_case.filters) > 0:
+            yield from islice(enumerate(load_case.iter_cases()), start, None)
+            return
+
+        options = load_case.group_options()
+        total = load_case.no_combinations
+
+        for s in range(start, total, chunk_size):
+            e = min(s + chunk_size, total)
+
+            yield from zip(range(s, e),
+                           load_case._combinations(options, np.arange(s, e)))
+
+    def _key(self, source) -> str:
+        """
+        Builds a key identifying the output of an export, so that a resumed
+        export can check that neither the model nor the format has changed.
+        """
+
+        return content_hash(source.fingerprint,
+                            type(self.record_format).__qualname__,
+                            repr(self.record_format))
+
+    @staticmethod
+    def _write_manifest(work_dir: str, manifest: Dict):
+        """
+        Writes the manifest of a resumable export. The manifest is written to
+        a temporary file first and then moved into place, so it is never
+        partially written.
+        """
+
+        fd, temp = tempfile.mkstemp(dir = work_dir, suffix = '.tmp')
+
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(manifest, f)
+
+            os.replace(temp, os.path.join(work_dir, MANIFEST))
+
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+
+            raise
+
+    @staticmethod
+    def _read_manifest(work_dir: str, key: str) -> Union[Dict, None]:
+        """
+        Reads the manifest of a resumable export, dropping any parts whose
+        files are missing or the wrong size (and any later parts).
+
+        :return: The manifest, or ``None`` if there is no manifest or it is
+            for a different model, format or version.
+        """
+
+        try:
+            with open(os.path.join(work_dir, MANIFEST)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if (manifest.get('version') != MANIFEST_VERSION
+                or manifest.get('key') != key):
+            return None
+
+        parts = []
+
+        for p in manifest['parts']:
+            path = os.path.join(work_dir, p['file'])
+
+            if not os.path.exists(path) or os.path.getsize(path) != p['size']:
+                break
+
+            parts.append(p)
+
+        if len(parts) < len(manifest['parts']):
+            # rebuild the progress of each case from the parts that remain.
+            manifest['parts'] = parts
+            manifest['cases'] = {}
+
+            for p in parts:
+                manifest['cases'][str(p['case_no'])] = {'next': p['stop'],
+                                                        'complete': False}
+
+        return manifest
+
+    def _write_part(self, work_dir: str, load_case, start: int,
+                    lines: List[str], manifest: Dict, complete: bool):
+        """
+        Writes a part file containing the lines of a block of combinations,
+        and records it in the manifest. The part file is moved into place
+        before the manifest is updated, so the manifest only ever refers to
+        complete part files.
+        """
+
+        key = str(load_case.case_no)
+        stop = start + len(lines)
+
+        if len(lines) > 0:
+            name = f'{load_case.case_no}-{start:012d}.part'
+            data = ''.join(lines).encode('utf-8')
+
+            fd, temp = tempfile.mkstemp(dir = work_dir, suffix = '.tmp')
+
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+
+                os.replace(temp, os.path.join(work_dir, name))
+
+            except BaseException:
+                if os.path.exists(temp):
+                    os.remove(temp)
+
+                raise
+
+            manifest['parts'].append({'case_no': load_case.case_no,
+                                      'start': start,
+                                      'stop': stop,
+                                      'file': name,
+                                      'size': len(data)})
+
+        manifest['cases'][key] = {'next': stop, 'complete': complete}
+
+        self._write_manifest(work_dir, manifest)
+
+    def write_resumable(self, source, path: str, *,
+                        compression: str = 'infer',
+                        part_size: int = 100000,
+                        work_dir: str = None) -> int:
+        """
+        Writes the combinations from a ``LoadCase`` or ``LoadCombinations``
+        object to a file, in a way that can be resumed if it is stopped part
+        way through.
+
+        The combinations are first written into uncompressed part files of
+        ``part_size`` combinations each in ``work_dir``. Each part file is
+        written atomically, and after each part a manifest is written
+        recording the next combination to write for each ``LoadCase``. If the
+        method is called again with the same model and format it continues
+        from the manifest rather than starting again. Once every part is
+        written they are joined into the final file, which is the same, byte
+        for byte, as the file written by the ``write`` method, and
+        ``work_dir`` is deleted.
+
+        :param source: A ``LoadCase`` or ``LoadCombinations`` object.
+        :param path: The file to write.
+        :param compression: One of ``None``, ``'gzip'``, ``'lzma'`` or
+            ``'infer'`` to use the file extension.
+        :param part_size: The no. of combinations in each part file.
+        :param work_dir: The directory to write the part files and manifest
+            to. If ``None``, ``path + '.parts'`` is used.
+        :return: The no. of combinations written.
+        """
+
+        if part_size < 1:
+            raise ValueError(f'part_size must be >= 1. '
+                             + f'part_size given was {part_size}.')
+
+        compression = _compression(path, compression)
+
+        if work_dir is None:
+            work_dir = path + '.parts'
+
+        os.makedirs(work_dir, exist_ok = True)
+
+        key = self._key(source)
+        manifest = self._read_manifest(work_dir, key)
+
+        if manifest is None:
+            manifest = {'version': MANIFEST_VERSION,
+                        'key': key,
+                        'parts': [],
+                        'cases': {}}
+
+        load_cases = _load_cases(source)
+        record = self.record_format.record
+
+        for lc in load_cases:
+
+            progress = manifest['cases'].get(str(lc.case_no),
+                                             {'next': 0, 'complete': False})
+
+            if progress['complete']:
+                continue
+
+            start = progress['next']
+            lines = []
+
+            for comb_no, comb in self._iter_from(lc, start):
+
+                lines.append(record(lc, comb_no, comb))
+
+                if len(lines) == part_size:
+                    self._write_part(work_dir, lc, start, lines, manifest,
+                                     complete = False)
+
+                    start += len(lines)
+                    lines = []
+
+            self._write_part(work_dir, lc, start, lines, manifest,
+                             complete = True)
+
+        # join the parts into the final file, in the order of the cases.
+        order = {lc.case_no: i for i, lc in enumerate(load_cases)}
+        parts = sorted(manifest['parts'],
+                       key = lambda p: (order[p['case_no']], p['start']))
+
+        fd, temp = tempfile.mkstemp(dir = os.path.dirname(os.path.abspath(path)),
+                                    suffix = '.tmp')
+        os.close(fd)
+
+        try:
+            with open_output(temp, compression = compression) as f:
+                f.write(self.record_format.header(load_cases))
+
+                for p in parts:
+                    with open(os.path.join(work_dir, p['file']), 'r',
+                              encoding = 'utf-8', newline = '') as part:
+                        shutil.copyfileobj(part, f, self.buffer_size)
+
+                f.write(self.record_format.footer())
+
+            os.replace(temp, path)
+
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+
+            raise
+
+        shutil.rmtree(work_dir)
+
+        return sum(p['stop'] - p['start'] for p in parts)
+
+    def __repr__(self):
+
+        return (f'{type(self).__name__}('
+                + f'record_format = {repr(self.record_format)}, '
+                + f'buffer_size = {repr(self.buffer_size)}'
+                + ')')
@@ -0,0 +1,523 @@
+# coding=utf-8
+
+"""
+This file contains a ``UnitResults`` class, which stores the results of each
+``Load`` with a factor of 1.0 (e.g. member forces or reactions exported from
+an analysis program) as a single contiguous array with one row per
+``load_no``.
+
+The results are read from CSV files in chunks, so large exports can be read
+without holding the text in memory. Two layouts are supported:
+
+* Wide: one row per ``Load``, with a column per result.
+* Long: one row per ``Load`` per location (e.g. per member and position),
+  identified by one or more ``key_columns``, with a column per result
+  component. Each combination of location and component becomes a column of
+  the array.
+
+Once read, the array can be saved as ``.npy`` files and re-loaded
+memory-mapped, without parsing the CSV again.
+"""
+
+import csv
+import json
+import os
+from itertools import islice
+from typing import List, Sequence, Tuple
+import numpy as np
+
+
+def _blanks(values: Sequence[str]) -> List[str]:
+    """
+    Replaces blank cells in a column of strings with ``'nan'``, so that they
+    are read as ``NaN``.
+    """
+
+    return ['nan' if v.strip() == '' else v for v in values]
+
+
+def _infer(values: Sequence[str]) -> np.dtype:
+    """
+    Infers the dtype of a column of strings: ``int64`` if every value is an
+    integer, ``float64`` if every value is a number, otherwise a string.
+    Blank cells are ignored, and a column that is entirely blank is taken to
+    be ``float64``.
+    """
+
+    values = [v for v in values if v.strip() != '']
+
+    if len(values) == 0:
+        return np.dtype(np.float64)
+
+    for dtype in (np.int64, np.float64):
+        try:
+            np.asarray(values, dtype = dtype)
+        except ValueError:
+            continue
+
+        return np.dtype(dtype)
+
+    return np.dtype(str)
+
+
+def _convert(values: Sequence[str], dtype: np.dtype) -> np.ndarray:
+    """
+    Converts a column of strings to an array of an inferred dtype, falling
+    back to ``float64`` (with blank cells as ``NaN``) and then to strings if
+    a later chunk does not match.
+    """
+
+    if dtype.kind in 'iu':
+        try:
+            return np.asarray(values, dtype = dtype)
+        except ValueError:
+            pass
+
+    try:
+        return np.asarray(_blanks(values), dtype = np.float64)
+    except ValueError:
+        return np.asarray(values, dtype = str)
+
+
+def _floats(values: Sequence[str], *, column: str, lines: Sequence[int],
+            path: str) -> np.ndarray:
+    """
+    Converts a column of strings to ``float64``, with blank cells as ``NaN``.
+
+    :param values: The values to convert.
+    :param column: The name of the column, for error messages.
+    :param lines: The line of the file each value was read from.
+    :param path: The file the values were read from.
+    :return: The converted values.
+    :raises ValueError: If a value is not a number.
+    """
+
+    values = _blanks(values)
+
+    try:
+        return np.asarray(values, dtype = np.float64)
+    except ValueError as e:
+        error = e
+
+    # find the first value that could not be converted.
+    for v, line in zip(values, lines):
+        try:
+            float(v)
+        except ValueError:
+            raise ValueError(f'Non-numeric value {repr(v)} in column {column} '
+                             + f'on line {line} of {path}.') from None
+
+    raise error
+
+
+def _check_duplicates(chunks: Sequence[tuple], *, keys: Sequence[tuple],
+                      path: str):
+    """
+    Checks that no ``load_no`` & key pair was read from more than 1 row.
+
+    :param chunks: The ``(load_nos, ids, values, lines)`` read from each chunk.
+    :param keys: The key of each key id.
+    :param path: The file the values were read from.
+    :raises ValueError: If a pair is duplicated.
+    """
+
+    if len(chunks) == 0:
+        return
+
+    load_nos = np.concatenate([c[0] for c in chunks])
+    ids = np.concatenate([c[1] for c in chunks])
+    lines = np.concatenate([c[3] for c in chunks])
+
+    order = np.lexsort((lines, ids, load_nos))
+    load_nos, ids, lines = load_nos[order], ids[order], lines[order]
+
+    dupes = np.flatnonzero((load_nos[1:] == load_nos[:-1])
+                           & (ids[1:] == ids[:-1]))
+
+    if len(dupes) == 0:
+        return
+
+    i = dupes[np.argmin(lines[dupes + 1])]
+    key = '' if keys[ids[i]] == () else f' and key {keys[ids[i]]}'
+
+    raise ValueError(f'Duplicate results for load {load_nos[i]}{key} on '
+                     + f'lines {lines[i]} and {lines[i + 1]} of {path}.')
+
+
+def _find(sorted_nos: np.ndarray,
+          load_nos: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the position of each of a set of ``load_no`` in a sorted array.
+
+    :return: A tuple of ``(rows, found)``. ``rows`` is only valid where
+        ``found`` is ``True``.
+    """
+
+    if len(sorted_nos) == 0:
+        return (np.zeros(len(load_nos), dtype = np.int64),
+                np.zeros(len(load_nos), dtype = bool))
+
+    rows = np.minimum(np.searchsorted(sorted_nos, load_nos),
+                      len(sorted_nos) - 1)
+
+    return rows, sorted_nos[rows] == load_nos
+
+
+def referenced_loads(model) -> np.ndarray:
+    """
+    Gets the ``load_no`` of every ``Load`` used by the ``LoadGroup`` objects of
+    a ``LoadCase`` or of every ``LoadCase`` in a ``LoadCombinations`` object.
+
+    :param model: A ``LoadCase`` or ``LoadCombinations`` object.
+    :return: A sorted array of ``load_no``.
+    """
+
+    if hasattr(model, 'load_cases'):
+        cases = model.load_cases.values()
+    else:
+        cases = [model]
+
+    load_nos = {l for lc in cases for g in lc.load_groups.values()
+                for l in g.load_group.loads}
+
+    return np.array(sorted(load_nos), dtype = np.int64)
+
+
+class UnitResults:
+    """
+    The results of each ``Load`` with a factor of 1.0, as an array of shape
+    ``(len(load_nos), no_results)`` with the rows sorted by ``load_no``.
+    """
+
+    # incremented if the layout of the files changes.
+    FORMAT_VERSION = 1
+
+    VALUES = 'values.npy'
+    LOAD_NOS = 'load_nos.npy'
+    META = 'meta.json'
+
+    def __init__(self, *, load_nos, values: np.ndarray,
+                 keys: List[Tuple] = None, components: List[str] = None):
+        """
+        Constructor for the ``UnitResults`` object. Typically a
+        ``UnitResults`` object is created with the ``from_csv`` or ``load``
+        methods rather than directly.
+
+        :param load_nos: The ``load_no`` of each row of ``values``.
+        :param values: An array of shape ``(len(load_nos), no_results)``.
+            ``NaN`` where a ``Load`` has no result.
+        :param keys: The location of each group of columns, as a tuple of the
+            values of the key columns. ``[()]`` for the wide layout.
+        :param components: The name of each result component. Column
+            ``k * len(components) + c`` is component ``c`` at location ``k``.
+        """
+
+        load_nos = np.asarray(load_nos, dtype = np.int64)
+
+        if values.ndim != 2 or len(values) != len(load_nos):
+            raise ValueError(f'The values should have shape '
+                             + f'(len(load_nos), no_results). Got '
+                             + f'{values.shape} for {len(load_nos)} loads.')
+
+        if np.any(np.diff(load_nos) <= 0):
+            if len(np.unique(load_nos)) != len(load_nos):
+                raise ValueError('The load_nos should be unique.')
+
+            order = np.argsort(load_nos)
+            load_nos = load_nos[order]
+            values = values[order]
+
+        if components is None:
+            components = [str(i) for i in range(values.shape[1])]
+
+        if keys is None:
+            keys = [()]
+
+        self.load_nos = load_nos
+        self.values = values
+        self.keys = [tuple(k) for k in keys]
+        self.components = list(components)
+
+        if len(self.keys) * len(self.components) != values.shape[1]:
+            raise ValueError(f'Expected {len(self.keys)} keys x '
+                             + f'{len(self.components)} components = '
+                             + f'{len(self.keys) * len(self.components)} '
+                             + f'columns. Got {values.shape[1]}.')
+
+    @property
+    def no_results(self) -> int:
+        """
+        The no. of results (columns) for each ``Load``.
+        """
+
+        return self.values.shape[1]
+
+    @property
+    def columns(self) -> List[Tuple]:
+        """
+        The ``key + (component,)`` of each column of ``values``.
+        """
+
+        return [k + (c,) for k in self.keys for c in self.components]
+
+    @classmethod
+    def from_csv(cls, path: str, *, load_column: str = 'load_no',
+                 key_columns: Sequence[str] = (),
+                 value_columns: Sequence[str] = None,
+                 model = None, delimiter: str = ',',
+                 chunk_size: int = 100000) -> 'UnitResults':
+        """
+        Reads the results from a CSV file with a header row. The file is read
+        ``chunk_size`` rows at a time, and the dtype of each column is inferred
+        from the first chunk. Blank cells are read as ``NaN``.
+
+        :param path: The CSV file.
+        :param load_column: The column containing the ``load_no``.
+        :param key_columns: The columns that identify the location of each
+            row, for the long layout. Empty for the wide layout.
+        :param value_columns: The columns containing results. If ``None``,
+            every numeric column apart from the load and key columns is used.
+        :param model: An optional ``LoadCombinations`` or ``LoadCase`` object.
+            If given, the rows are aligned to the ``load_no`` of every
+            ``Load`` in the model (rows in the CSV for other loads are
+            ignored), and the results are validated with ``validate``.
+        :param delimiter: The CSV delimiter.
+        :param chunk_size: The no. of rows parsed at a time.
+        :return: A ``UnitResults`` object.
+        :raises ValueError: If a value column contains a value that is not a
+            number, a row has the wrong no. of values, or the same load & key
+            appears on more than 1 row.
+        """
+
+        key_columns = list(key_columns)
+
+        chunks = []
+        key_ids = {}
+
+        with open(path, newline = '', encoding = 'utf-8-sig') as f:
+            reader = csv.reader(f, delimiter = delimiter)
+            header = [h.strip() for h in next(reader)]
+
+            # keep the line no. of each row for error messages.
+            numbered = ((reader.line_num, r) for r in reader)
+
+            missing = [c for c in [load_column] + key_columns
+                       + list(value_columns or []) if c not in header]
+
+            if len(missing) > 0:
+                raise ValueError(f'Columns not found in {path}: {missing}.')
+
+            dtypes = None
+
+            while True:
+                batch = list(islice(numbered, chunk_size))
+
+                if len(batch) == 0:
+                    break
+
+                lines = [n for n, r in batch if len(r) > 0]
+                rows = [r for n, r in batch if len(r) > 0]
+
+                if len(rows) == 0:
+                    continue
+
+                for n, r in zip(lines, rows):
+                    if len(r) != len(header):
+                        raise ValueError(f'Expected {len(header)} values but '
+                                         + f'found {len(r)} on line {n} of '
+                                         + f'{path}.')
+
+                columns = dict(zip(header, zip(*rows)))
+
+                if dtypes is None:
+                    dtypes = {h: _infer(v) for h, v in columns.items()}
+
+                    if value_columns is None:
+                        value_columns = [h for h in header
+                                         if h != load_column
+                                         and h not in key_columns
+                                         and dtypes[h].kind in 'iuf']
+
+                load_nos = np.asarray(columns[load_column], dtype = np.int64)
+
+                values = np.empty((len(rows), len(value_columns)))
+
+                for i, c in enumerate(value_columns):
+                    values[:, i] = _floats(columns[c], column = c,
+                                           lines = lines, path = path)
+
+                if len(key_columns) == 0:
+                    ids = np.zeros(len(rows), dtype = np.int64)
+                    key_ids.setdefault((), 0)
+                else:
+                    keys = zip(*[_convert(columns[c], dtypes[c]).tolist()
+                                 for c in key_columns])
+
+                    ids = np.fromiter((key_ids.setdefault(k, len(key_ids))
+                                       for k in keys),
+                                      dtype = np.int64, count = len(rows))
+
+                chunks.append((load_nos, ids, values,
+                               np.asarray(lines, dtype = np.int64)))
+
+        if value_columns is None:
+            value_columns = []
+
+        _check_duplicates(chunks, keys = list(key_ids.keys()), path = path)
+
+        if model is None:
+            all_nos = [c[0] for c in chunks]
+            load_nos = np.unique(np.concatenate(all_nos)) if len(all_nos) > 0 \
+                else np.empty(0, dtype = np.int64)
+        else:
+            if hasattr(model, 'load_cases'):
+                load_nos = np.array(sorted(model.loads.keys()),
+                                    dtype = np.int64)
+            else:
+                load_nos = referenced_loads(model)
+
+        no_keys = max(len(key_ids), 1)
+        no_components = len(value_columns)
+
+        values = np.full((len(load_nos), no_keys, no_components), np.nan)
+
+        for nos, ids, v, _ in chunks:
+            rows, keep = _find(load_nos, nos)
+
+            values[rows[keep], ids[keep]] = v[keep]
+
+        results = cls(load_nos = load_nos,
+                      values = values.reshape((len(load_nos), -1)),
+                      keys = list(key_ids.keys()) or [()],
+                      components = value_columns)
+
+        if model is not None:
+            results.validate(model)
+
+        return results
+
+    def missing_loads(self, model) -> List[int]:
+        """
+        Finds the loads used by a model that have no results. A ``Load`` with
+        a row of all ``NaN`` is treated as having no results.
+
+        :param model: A ``LoadCombinations`` or ``LoadCase`` object.
+        :return: A list of the missing ``load_no``.
+        """
+
+        required = referenced_loads(model)
+
+        rows, found = _find(self.load_nos, required)
+
+        if self.no_results > 0:
+            found[found] = ~np.all(np.isnan(self.values[rows[found]]), axis = 1)
+
+        return [int(l) for l in required[~found]]
+
+    def validate(self, model):
+        """
+        Checks that every ``Load`` used by the cases of a model has results.
+
+        :param model: A ``LoadCombinations`` or ``LoadCase`` object.
+        :raises ValueError: If any loads are missing.
+        """
+
+        missing = self.missing_loads(model)
+
+        if len(missing) > 0:
+            raise ValueError(f'No unit results provided for loads: '
+                             + f'{missing}.')
+
+    def take(self, load_nos) -> np.ndarray:
+        """
+        Gets the results for a set of loads, e.g. the ``load_nos`` of a
+        ``FactorTable`` or ``FactorMatrix``, so that
+        ``factors @ results.take(load_nos)`` gives the combined results.
+
+        :param load_nos: The ``load_no`` of each load.
+        :return: An array of shape ``(len(load_nos), no_results)``.
+        """
+
+        load_nos = np.asarray(load_nos, dtype = np.int64)
+
+        rows, found = _find(self.load_nos, load_nos)
+
+        if not np.all(found):
+            missing = [int(l) for l in load_nos[~found]]
+
+            raise ValueError(f'No unit results provided for loads: '
+                             + f'{missing}.')
+
+        return self.values[rows]
+
+    def save(self, path: str):
+        """
+        Saves the results to a directory of ``.npy`` files plus a
+        ``meta.json`` file, which is written last so that a directory without
+        it is known to be incomplete.
+
+        :param path: The directory. It is created if it does not exist.
+        """
+
+        os.makedirs(path, exist_ok = True)
+
+        meta_path = os.path.join(path, self.META)
+
+        if os.path.exists(meta_path):
+            # mark any existing results in the directory as incomplete.
+            os.remove(meta_path)
+
+        np.save(os.path.join(path, self.VALUES),
+                np.ascontiguousarray(self.values, dtype = np.float64))
+        np.save(os.path.join(path, self.LOAD_NOS), self.load_nos)
+
+        meta = {'version': self.FORMAT_VERSION,
+                'keys': [list(k) for k in self.keys],
+                'components': self.components}
+
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, path: str, *, mmap_mode: str = 'r') -> 'UnitResults':
+        """
+        Loads results saved with the ``save`` method.
+
+        :param path: The directory passed to ``save``.
+        :param mmap_mode: The ``mmap_mode`` passed to ``np.load``. The default
+            of ``'r'`` maps the values read-only rather than reading them. Use
+            ``None`` to load them into memory.
+        :return: A ``UnitResults`` object.
+        """
+
+        with open(os.path.join(path, cls.META)) as f:
+            meta = json.load(f)
+
+        if meta['version'] != cls.FORMAT_VERSION:
+            raise ValueError(f'Unsupported UnitResults version: '
+                             + f'{meta["version"]}. Expected version '
+                             + f'{cls.FORMAT_VERSION}.')
+
+        values = np.load(os.path.join(path, cls.VALUES), mmap_mode = mmap_mode,
+                         allow_pickle = False)
+        load_nos = np.load(os.path.join(path, cls.LOAD_NOS),
+                           allow_pickle = False)
+
+        return cls(load_nos = load_nos, values = values,
+                   keys = [tuple(k) for k in meta['keys']],
+                   components = meta['components'])
+
+    def __str__(self):
+
+        return (f'{type(self).__name__}: '
+                + f'loads: {list(self.load_nos)}, '
+                + f'results: {self.no_results}')
+
+    def __repr__(self):
+
+        return (f'{type(self).__name__}('
+                + f'load_nos = {repr(self.load_nos)}, '
+                + f'values = {repr(self.values)}, '
+                + f'keys = {repr(self.keys)}, '
+                + f'components = {repr(self.components)}'
+                + ')')
@@ -0,0 +1,300 @@
+# coding=utf-8
+
+"""
+This file contains a ``UtilisationEnvelope`` class, which finds the
+combinations that give the highest utilisation for checks that are not linear
+in the load factors, e.g. the interaction of axial force and bending moment in
+a member.
+
+Each check is a vectorized function that takes the combined values of a set of
+concurrent effects for a chunk of combinations and returns the utilisation of
+each combination. The combinations are streamed in chunks and only the worst
+``top_n`` combinations of each check (and the concurrent effects that gave
+them) are kept, so the memory used does not depend on the no. of
+combinations.
+"""
+
+import heapq
+from collections import namedtuple
+from typing import Callable, Iterator, List, Sequence, Tuple
+import numpy as np
+
+from LoadCombination.FactorTable import FactorTable
+from LoadCombination.FactorMatrix import FactorMatrix
+
+# define a named tuple for the critical combinations of a check
+Critical = namedtuple('Critical', ['utilisation', 'case_no', 'comb_id',
+                                   'effects'])
+
+
+class UtilisationCheck:
+    """
+    A non-linear check of a set of concurrent effects.
+    """
+
+    def __init__(self, *, name: str,
+                 func: Callable[[np.ndarray], np.ndarray],
+                 effects: Sequence[int], labels: Sequence[str] = None,
+                 top_n: int = 10):
+        """
+        Constructor for the ``UtilisationCheck`` object.
+
+        :param name: The name of the check.
+        :param func: A vectorized function that takes an array of shape
+            ``(n, len(effects))`` containing the combined value of each effect
+            in ``n`` combinations, and returns an array of shape ``(n,)`` with
+            the utilisation of each combination. ``NaN`` utilisations are
+            ignored.
+        :param effects: The columns of the unit results passed to ``func``.
+        :param labels: The name of each effect, for reporting. If ``None``,
+            the column nos. are used.
+        :param top_n: The no. of critical combinations to keep.
+        """
+
+        self.name = name
+        self.func = func
+        self.effects = [int(e) for e in effects]
+        self.labels = ([str(e) for e in self.effects] if labels is None
+                       else list(labels))
+        self.top_n = top_n
+
+        if len(self.labels) != len(self.effects):
+            raise ValueError(f'Expected {len(self.effects)} labels for check '
+                             + f'{name}. Got {len(self.labels)}.')
+
+    def __str__(self):
+
+        return (f'{type(self).__name__}: {self.name}, '
+                + f'effects: {self.labels}, top_n: {self.top_n}')
+
+    def __repr__(self):
+
+        return (f'{type(self).__name__}('
+                + f'name = {repr(self.name)}, '
+                + f'func = {repr(self.func)}, '
+                + f'effects = {repr(self.effects)}, '
+                + f'labels = {repr(self.labels)}, '
+                + f'top_n = {repr(self.top_n)}'
+                + ')')
+
+
+class UtilisationEnvelope:
+    """
+    The critical combinations of a set of ``UtilisationCheck`` objects over
+    every combination of one or more ``LoadCase`` objects, calculated from
+    the value of each effect under each ``Load`` with a factor of 1.0.
+    """
+
+    def __init__(self, source, *, load_nos, effects,
+                 checks: List[UtilisationCheck], chunk_size: int = 4096):
+        """
+        Constructor for the ``UtilisationEnvelope`` object. The envelope is
+        calculated when the object is created.
+
+        :param source: The combinations to check. A ``LoadCase`` (which cannot
+            have combination filters), its ``FactorTable``, a
+            ``LoadCombinations`` object or a ``FactorMatrix``.
+        :param load_nos: The ``load_no`` of each ``Load`` with results.
+        :param effects: An array of shape ``(len(load_nos), no_effects)``
+            containing the value of each effect under each ``Load`` with a
+            factor of 1.0. Only the columns used by the checks are read, so
+            this may be a memory-mapped array.
+        :param checks: The checks to carry out.
+        :param chunk_size: The no. of combinations evaluated at a time.
+        """
+
+        load_nos = np.asarray(load_nos, dtype = np.int64)
+
+        if not isinstance(effects, np.ndarray):
+            effects = np.asarray(effects, dtype = np.float64)
+
+        if effects.ndim != 2 or len(effects) != len(load_nos):
+            raise ValueError(f'The effects should have shape '
+                             + f'(len(load_nos), no_effects). Got '
+                             + f'{effects.shape} for {len(load_nos)} loads.')
+
+        names = [c.name for c in checks]
+
+        if len(set(names)) != len(names):
+            raise ValueError(f'Check names should be unique: {names}.')
+
+        self.source = source
+        self.load_nos = load_nos
+        self.effects = effects
+        self.checks = list(checks)
+        self.chunk_size = chunk_size
+
+        self.critical = {}
+        self.no_combinations = 0
+
+        self.update()
+
+    def _tables(self) -> Iterator:
+        """
+        Gets the ``FactorTable`` or ``FactorMatrix`` objects of the source.
+        """
+
+        if isinstance(self.source, (FactorTable, FactorMatrix)):
+            return iter([self.source])
+
+        if hasattr(self.source, 'load_cases'):
+            return iter(self.source.factor_tables().values())
+
+        return iter([self.source.factor_table()])
+
+    @staticmethod
+    def _chunks(table, chunk_size: int) -> Iterator[Tuple[np.ndarray,
+                                                          np.ndarray,
+                                                          np.ndarray]]:
+        """
+        Iterates through the factors of a ``FactorTable`` or ``FactorMatrix``.
+
+        :return: A generator of ``(case_nos, comb_ids, factors)`` tuples.
+        """
+
+        if isinstance(table, FactorMatrix):
+            for s in range(0, len(table), chunk_size):
+                e = min(s + chunk_size, len(table))
+
+                yield (np.asarray(table.case_nos[s:e]),
+                       np.asarray(table.comb_ids[s:e]),
+                       np.asarray(table.factors[s:e], dtype = np.float64))
+
+            return
+
+        for s, factors in table.chunks(chunk_size = chunk_size):
+            yield (np.full(len(factors), table.case_no, dtype = np.int64),
+                   np.arange(s, s + len(factors), dtype = np.int64),
+                   factors)
+
+    def _unit_effects(self, load_nos: np.ndarray,
+                      columns: np.ndarray) -> np.ndarray:
+        """
+        Gets the unit results of a set of loads for a set of columns.
+
+        :param load_nos: The ``load_no`` of each load.
+        :param columns: The columns to get.
+        :return: An array of shape ``(len(load_nos), len(columns))``.
+        """
+
+        order = np.argsort(self.load_nos)
+        sorted_nos = self.load_nos[order]
+
+        pos = np.minimum(np.searchsorted(sorted_nos, load_nos),
+                         max(len(sorted_nos) - 1, 0))
+
+        if len(sorted_nos) == 0:
+            found = np.zeros(len(load_nos), dtype = bool)
+        else:
+            found = sorted_nos[pos] == load_nos
+
+        if not np.all(found):
+            missing = [int(l) for l in np.asarray(load_nos)[~found]]
+
+            raise ValueError(f'No effects provided for loads: {missing}.')
+
+        return np.asarray(self.effects[:, columns],
+                          dtype = np.float64)[order[pos]]
+
+    def update(self):
+        """
+        Re-calculates the critical combinations, e.g. after a change to the
+        ``LoadCase``.
+        """
+
+        # the columns used by any check, and the position of each check's
+        # columns in them.
+        columns = np.unique(np.concatenate(
+            [c.effects for c in self.checks] + [[]]).astype(np.int64))
+        positions = [np.searchsorted(columns, c.effects) for c in self.checks]
+
+        heaps = {c.name: [] for c in self.checks}
+        count = 0
+
+        for table in self._tables():
+
+            unit = self._unit_effects(table.load_nos, columns)
+
+            for case_nos, comb_ids, factors in self._chunks(table,
+                                                            self.chunk_size):
+                values = factors @ unit
+
+                for check, pos in zip(self.checks, positions):
+                    self._push(heaps[check.name], check, values[:, pos],
+                               case_nos, comb_ids, count)
+
+                count += len(factors)
+
+        self.no_combinations = count
+
+        # sort with the highest utilisation first, and the first combination
+        # first where there are ties.
+        self.critical = {name: [Critical(u, c, i, e) for u, o, c, i, e
+                                in sorted(heap, key = lambda h: (-h[0], -h[1]))]
+                         for name, heap in heaps.items()}
+
+    @staticmethod
+    def _push(heap: List, check: UtilisationCheck, values: np.ndarray,
+              case_nos: np.ndarray, comb_ids: np.ndarray, offset: int):
+        """
+        Evaluates a check for a chunk of combinations and adds the worst of
+        them to the heap of critical combinations.
+
+        :param heap: A min-heap of ``(utilisation, -order, case_no, comb_id,
+            effects)`` tuples, holding at most ``check.top_n`` items.
+        :param check: The ``UtilisationCheck``.
+        :param values: The combined values of the check's effects.
+        :param case_nos: The ``case_no`` of each combination.
+        :param comb_ids: The combination id of each combination.
+        :param offset: The no. of combinations in previous chunks, so that
+            ties are broken in favour of the first combination.
+        """
+
+        utilisation = np.asarray(check.func(values), dtype = np.float64)
+
+        if utilisation.shape != (len(values),):
+            raise ValueError(f'Check {check.name} should return an array of '
+                             + f'shape ({len(values)},). Got '
+                             + f'{utilisation.shape}.')
+
+        candidates = np.flatnonzero(~np.isnan(utilisation))
+
+        if check.top_n <= 0 or len(candidates) == 0:
+            return
+
+        if len(candidates) > check.top_n:
+            # only the worst top_n in the chunk can enter the heap. Any ties
+            # with the top_n-th value are kept until sorted, so that the first
+            # combinations are kept.
+            u = utilisation[candidates]
+            threshold = -np.partition(-u, check.top_n - 1)[check.top_n - 1]
+
+            candidates = candidates[u >= threshold]
+            order = np.lexsort((candidates, -utilisation[candidates]))
+            candidates = candidates[order[:check.top_n]]
+
+        for i in candidates:
+            item = (float(utilisation[i]), -(offset + int(i)),
+                    int(case_nos[i]), int(comb_ids[i]),
+                    dict(zip(check.labels, values[i].tolist())))
+
+            if len(heap) < check.top_n:
+                heapq.heappush(heap, item)
+            elif item[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, item)
+
+    def __str__(self):
+
+        return (f'{type(self).__name__}: '
+                + f'checks: {[c.name for c in self.checks]}, '
+                + f'combinations: {self.no_combinations}')
+
+    def __repr__(self):
+
+        return (f'{type(self).__name__}('
+                + f'source = {repr(self.source)}, '
+                + f'load_nos = {repr(self.load_nos)}, '
+                + f'effects = {repr(self.effects)}, '
+                + f'checks = {repr(self.checks)}, '
+                + f'chunk_size = {repr(self.chunk_size)}'
+                + ')')
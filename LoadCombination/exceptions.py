@@ -58,4 +58,20 @@ class InvalidCombinationFactor(LoadCombinationException):
     ``(LoadGroup, combination_factor)`` is not a ``Tuple[LoadGroup, float]``.
     """
 
-    pass
\ No newline at end of file
+    pass
+
+class LoadCaseExistsException(LoadCombinationException):
+    """
+    This exception is raised when a ``LoadCase`` already exists in a
+    ``LoadCombinations`` object.
+    """
+
+    pass
+
+class LoadCaseNotPresentException(LoadCombinationException):
+    """
+    This exception is raised when a ``LoadCase`` does not exist in a
+    ``LoadCombinations`` object but is expected by a method.
+    """
+
+    pass
@@ -0,0 +1,79 @@
+# coding=utf-8
+
+"""
+Simple models shared by the unit tests.
+"""
+
+from LoadCombination.LoadCombinations import LoadCombinations
+from LoadCombination.LoadCase import LoadCase
+from LoadCombination.LoadGroup import (FactoredGroup, ExclusiveGroup,
+                                       RotationalGroup)
+from LoadCombination.Load import Load, ScalableLoad, RotatableLoad
+from LoadCombination.GroupFactor import GroupFactor
+
+
+def dead_live_model() -> LoadCombinations:
+    """
+    Builds a ``LoadCombinations`` object with 2 cases: 'Dead' (case 1) uses
+    group G (load 1, factors 0.9 & 1.2), and 'Dead + Live' (case 2) uses G
+    plus an ``ExclusiveGroup`` Q (loads 2 & 3) with a group factor of 1.5.
+    """
+
+    l1 = Load(load_name = 'G1', load_no = 1, abbrev = 'G1')
+    l2 = ScalableLoad(load_name = 'Q1', load_no = 2, load_value = 5.0,
+                      abbrev = 'Q1')
+    l3 = ScalableLoad(load_name = 'Q2', load_no = 3, load_value = 2.5,
+                      abbrev = 'Q2')
+
+    LG1 = FactoredGroup(group_name = 'G', loads = [l1],
+                        factors = (0.9, 1.2))
+    LG2 = ExclusiveGroup(group_name = 'Q', loads = [l2, l3],
+                         factors = (1.0,), scale_to = 5.0)
+
+    LC1 = LoadCase(case_name = 'Dead', case_no = 1,
+                   load_groups = [GroupFactor(load_group = LG1,
+                                              group_factor = 1.0)])
+    LC2 = LoadCase(case_name = 'Dead + Live', case_no = 2,
+                   load_groups = [GroupFactor(load_group = LG1,
+                                              group_factor = 1.0),
+                                  GroupFactor(load_group = LG2,
+                                              group_factor = 1.5)])
+
+    LC = LoadCombinations()
+    LC.add_case([LC1, LC2])
+
+    return LC
+
+
+def dead_wind_model() -> LoadCombinations:
+    """
+    Builds a ``LoadCombinations`` object with 2 cases: 'Dead' (case 1) uses
+    group G (load 1, factors 0.9 & 1.2), and 'Dead + Wind' (case 2) uses G
+    plus a ``RotationalGroup`` W (loads 2 & 3 at 0 & 90 degrees).
+    """
+
+    l1 = Load(load_name = 'G1', load_no = 1, abbrev = 'G1')
+    l2 = RotatableLoad(load_name = 'W0', load_no = 2, load_value = 1.0,
+                       angle = 0.0, symmetrical = True, abbrev = 'W0')
+    l3 = RotatableLoad(load_name = 'W90', load_no = 3, load_value = 1.0,
+                       angle = 90.0, symmetrical = True, abbrev = 'W90')
+
+    LG1 = FactoredGroup(group_name = 'G', loads = [l1],
+                        factors = (0.9, 1.2))
+    LG2 = RotationalGroup(group_name = 'W', loads = [l2, l3],
+                          factors = (1.0,), scale_to = 1.0, scale = False,
+                          req_angles = [0.0, 90.0])
+
+    LC1 = LoadCase(case_name = 'Dead', case_no = 1,
+                   load_groups = [GroupFactor(load_group = LG1,
+                                              group_factor = 1.0)])
+    LC2 = LoadCase(case_name = 'Dead + Wind', case_no = 2,
+                   load_groups = [GroupFactor(load_group = LG1,
+                                              group_factor = 1.0),
+                                  GroupFactor(load_group = LG2,
+                                              group_factor = 1.0)])
+
+    LC = LoadCombinations()
+    LC.add_case([LC1, LC2])
+
+    return LC
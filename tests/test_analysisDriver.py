@@ -0,0 +1,278 @@
+# coding=utf-8
+
+"""
+Unit tests for the AnalysisDriver class.
+"""
+
+import os
+import tempfile
+import threading
+import time
+from unittest import TestCase
+from LoadCombination.AnalysisDriver import (AnalysisDriver, canonical_factors,
+                                            combination_key, solver_key)
+from LoadCombination.LoadCombinations import LoadCombinations
+from LoadCombination.LoadCase import LoadCase
+from LoadCombination.LoadGroup import FactoredGroup, ExclusiveGroup
+from LoadCombination.Load import Load, ScalableLoad
+from LoadCombination.GroupFactor import GroupFactor
+
+
+def fake_solver(factors):
+    """
+    A fake non-linear solver. It must be at module level to be used with a
+    process pool.
+    """
+
+    return sum(l * f ** 2 for l, f in factors.items())
+
+
+def other_solver(factors):
+    """
+    A different fake solver, for checking that its results are not mixed
+    with those of ``fake_solver``.
+    """
+
+    return sum(l * f for l, f in factors.items())
+
+
+class CountingSolver:
+    """
+    A fake solver that records the factors it is called with, and the max. no.
+    of calls running at once.
+    """
+
+    def __init__(self, *, delay: float = 0.0, fail_on: int = None):
+
+        self.calls = []
+        self.running = 0
+        self.max_running = 0
+        self.delay = delay
+        self.fail_on = fail_on
+        self.lock = threading.Lock()
+
+    def __call__(self, factors):
+
+        with self.lock:
+            if self.fail_on is not None and len(self.calls) == self.fail_on:
+                raise RuntimeError('Solver failed.')
+
+            self.calls.append(factors)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+
+        time.sleep(self.delay)
+
+        with self.lock:
+            self.running -= 1
+
+        return fake_solver(factors)
+
+
+class TestAnalysisDriver(TestCase):
+
+    def build_model(self):
+        """
+        Builds a ``LoadCombinations`` object for use in the tests. The 6
+        combinations only contain 3 unique sets of factors: 1.2 G1,
+        1.2 G1 + 1.5 Q1 and 1.2 G1 + 3.0 Q2.
+        """
+
+        l1 = Load(load_name = 'G1', load_no = 1, abbrev = 'G1')
+        l2 = ScalableLoad(load_name = 'Q1', load_no = 2, load_value = 5.0,
+                          abbrev = 'Q1')
+        l3 = ScalableLoad(load_name = 'Q2', load_no = 3, load_value = 2.5,
+                          abbrev = 'Q2')
+
+        LG1 = FactoredGroup(group_name = 'G', loads = [l1],
+                            factors = (1.2,))
+        LG2 = ExclusiveGroup(group_name = 'Q', loads = [l2, l3],
+                             factors = (0.0, 1.0), scale_to = 5.0)
+        LG3 = FactoredGroup(group_name = 'Q1', loads = [l2],
+                            factors = (0.0, 1.0))
+
+        LC1 = LoadCase(case_name = 'Dead + Live', case_no = 1,
+                       load_groups = [GroupFactor(load_group = LG1,
+                                                  group_factor = 1.0),
+                                      GroupFactor(load_group = LG2,
+                                                  group_factor = 1.5)])
+        LC2 = LoadCase(case_name = 'Dead + Q1', case_no = 2,
+                       load_groups = [GroupFactor(load_group = LG1,
+                                                  group_factor = 1.0),
+                                      GroupFactor(load_group = LG3,
+                                                  group_factor = 1.5)])
+
+        LC = LoadCombinations()
+        LC.add_case([LC1, LC2])
+
+        return LC
+
+    def expected(self, LC):
+        """
+        Solves every combination one at a time.
+        """
+
+        return {(lc.case_no, i): fake_solver(
+                    {l: f for l, (f, load, LFs)
+                     in comb.list_loads_with_factors.items() if f != 0.0})
+                for lc in LC.load_cases.values()
+                for i, comb in enumerate(lc.generate_cases())}
+
+    def test_canonical_factors(self):
+
+        self.assertEqual(first = ((1, 1.2), (3, 0.5)),
+                         second = canonical_factors({3: 0.5, 2: 0.0,
+                                                     1: 0.1 * 12}))
+        self.assertEqual(first = combination_key({1: 1.2, 2: 0.0}),
+                         second = combination_key({1: 0.4 * 3}))
+        self.assertNotEqual(first = combination_key({1: 1.2}),
+                            second = combination_key({1: 1.2, 2: 1.0}))
+
+    def test_analysisDriver_memoize(self):
+
+        LC = self.build_model()
+        solver = CountingSolver(delay = 0.01)
+
+        driver = AnalysisDriver(LC, solver, max_workers = 4,
+                                max_in_flight = 2)
+
+        print(driver)
+
+        progress = []
+        results = driver.run(progress = progress.append)
+
+        self.assertEqual(first = self.expected(LC), second = results)
+
+        stats = driver.stats()
+
+        print(stats)
+
+        self.assertEqual(first = 6, second = stats['total'])
+        self.assertEqual(first = 6, second = stats['done'])
+        self.assertEqual(first = 3, second = stats['solved'])
+        self.assertEqual(first = 3, second = stats['memoized'])
+        self.assertEqual(first = 0, second = stats['in_flight'])
+        self.assertEqual(first = 0.0, second = stats['eta'])
+        self.assertGreater(stats['throughput'], 0)
+
+        self.assertEqual(first = 3, second = len(solver.calls))
+        self.assertLessEqual(solver.max_running, 2)
+
+        # combinations waiting on the same key are reported together.
+        done = [p['done'] for p in progress]
+
+        self.assertEqual(first = sorted(set(done)), second = done)
+        self.assertEqual(first = 6, second = done[-1])
+
+        # loads with a factor of 0.0 are not passed to the solver.
+        self.assertIn({1: 1.2}, solver.calls)
+
+    def test_analysisDriver_resume(self):
+
+        LC = self.build_model()
+
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, 'results.db')
+
+            solver = CountingSolver(fail_on = 2)
+            driver = AnalysisDriver(LC, solver, path = path, max_workers = 1,
+                                    max_in_flight = 1)
+
+            self.assertRaises(RuntimeError, driver.run)
+            self.assertEqual(first = 2, second = len(solver.calls))
+
+            # the re-run should only solve the remaining combinations.
+            solver = CountingSolver()
+            driver = AnalysisDriver(LC, solver, path = path)
+
+            results = driver.run()
+
+            self.assertEqual(first = self.expected(LC), second = results)
+            self.assertEqual(first = 1, second = len(solver.calls))
+            self.assertEqual(first = 2, second = driver.stats()['stored'])
+
+            # a third run should not solve anything.
+            solver = CountingSolver()
+            driver = AnalysisDriver(LC, solver, path = path)
+
+            self.assertEqual(first = self.expected(LC), second = driver.run())
+            self.assertEqual(first = 0, second = len(solver.calls))
+
+    def test_analysisDriver_solver(self):
+        """
+        Test that results saved by one solver are not used by another.
+        """
+
+        LC = self.build_model()
+
+        self.assertEqual(first = solver_key(CountingSolver()),
+                         second = solver_key(CountingSolver(fail_on = 1)))
+        self.assertNotEqual(first = solver_key(fake_solver),
+                            second = solver_key(other_solver))
+
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, 'results.db')
+
+            AnalysisDriver(LC, fake_solver, path = path).run()
+
+            driver = AnalysisDriver(LC, other_solver, path = path)
+
+            self.assertRaises(ValueError, driver.run)
+
+            # the run_id can be given explicitly.
+            path = os.path.join(d, 'results2.db')
+
+            AnalysisDriver(LC, fake_solver, path = path,
+                           run_id = 'v1').run()
+
+            driver = AnalysisDriver(LC, other_solver, path = path,
+                                    run_id = 'v1')
+
+            self.assertEqual(first = self.expected(LC), second = driver.run())
+            self.assertEqual(first = 3, second = driver.stats()['stored'])
+
+            driver = AnalysisDriver(LC, fake_solver, path = path,
+                                    run_id = 'v2')
+
+            self.assertRaises(ValueError, driver.run)
+
+    def test_analysisDriver_process(self):
+
+        LC = self.build_model()
+
+        driver = AnalysisDriver(LC, fake_solver, executor = 'process',
+                                max_workers = 2)
+
+        self.assertEqual(first = self.expected(LC), second = driver.run())
+
+    def test_analysisDriver_filters(self):
+
+        LC = self.build_model()
+        lc = LC.load_cases[1]
+        lc.add_filter(lambda c: 3 not in c.list_loads_with_factors)
+
+        driver = AnalysisDriver(lc, fake_solver)
+
+        results = driver.run()
+
+        self.assertEqual(first = {(1, i): fake_solver(
+                                      {l: f for l, (f, load, LFs)
+                                       in comb.list_loads_with_factors.items()
+                                       if f != 0.0})
+                                  for i, comb
+                                  in enumerate(lc.generate_cases())},
+                         second = results)
+
+        # the total should only include the combinations kept by the filter.
+        stats = driver.stats()
+
+        self.assertEqual(first = 2, second = len(results))
+        self.assertEqual(first = 2, second = stats['total'])
+        self.assertEqual(first = 0.0, second = stats['eta'])
+
+    def test_analysisDriver_errors(self):
+
+        LC = self.build_model()
+
+        self.assertRaises(ValueError, AnalysisDriver, LC, fake_solver,
+                          executor = 'cluster')
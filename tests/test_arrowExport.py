@@ -0,0 +1,112 @@
+# coding=utf-8
+
+"""
+Unit tests for the ArrowExport module.
+"""
+
+import importlib.util
+import os
+import tempfile
+from unittest import TestCase, skipIf
+from LoadCombination.ArrowExport import (_column_batches, record_batches,
+                                         write_arrow, write_parquet)
+from tests.models import dead_wind_model
+
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+
+class TestArrowExport(TestCase):
+
+    def test_column_batches_wide(self):
+        """
+        Test the wide layout.
+        """
+
+        LC = dead_wind_model()
+
+        batches = list(_column_batches(LC, batch_size = 4))
+
+        self.assertEqual(first = [4, 2],
+                         second = [len(b['case_no']) for b in batches])
+
+        columns = {k: batches[0][k] + batches[1][k] for k in batches[0]}
+
+        self.assertEqual(first = ['case_no', 'comb_no', 'title', 'angles',
+                                  'load_1', 'load_2', 'load_3'],
+                         second = list(columns.keys()))
+        self.assertEqual(first = [1, 1, 2, 2, 2, 2],
+                         second = columns['case_no'])
+        self.assertEqual(first = [0, 1, 0, 1, 2, 3],
+                         second = columns['comb_no'])
+        self.assertEqual(first = [0.9, 1.2, 0.9, 1.2, 0.9, 1.2],
+                         second = columns['load_1'])
+        self.assertEqual(first = [[], [], [0.0], [0.0], [90.0], [90.0]],
+                         second = columns['angles'])
+
+        combs = LC.load_cases[2].generate_cases()
+
+        self.assertEqual(first = [c.combination_title() for c in combs],
+                         second = columns['title'][2:])
+
+    def test_column_batches_long(self):
+        """
+        Test the long layout.
+        """
+
+        LC = dead_wind_model()
+
+        batches = list(_column_batches(LC.load_cases[2], layout = 'long'))
+
+        self.assertEqual(first = 1, second = len(batches))
+
+        batch = batches[0]
+        rows = list(zip(batch['comb_no'], batch['load_no'], batch['angle']))
+
+        for comb_no, load_no, angle in rows:
+            self.assertTrue(load_no == 1 or angle in (0.0, 90.0))
+
+        self.assertEqual(first = [(0, 1, None)], second = rows[:1])
+
+        self.assertRaises(ValueError, list, _column_batches(LC,
+                                                            layout = 'other'))
+
+    @skipIf(HAS_PYARROW, 'pyarrow is installed.')
+    def test_missing_pyarrow(self):
+        """
+        Test that a helpful error is raised if pyarrow is not installed.
+        """
+
+        self.assertRaises(ImportError, list, record_batches(dead_wind_model()))
+
+    @skipIf(not HAS_PYARROW, 'pyarrow is not installed.')
+    def test_write_arrow_parquet(self):
+        """
+        Test writing Arrow and Parquet files.
+        """
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        LC = dead_wind_model()
+
+        with tempfile.TemporaryDirectory() as d:
+
+            path = os.path.join(d, 'combs.arrow')
+
+            self.assertEqual(first = 6,
+                             second = write_arrow(LC, path, batch_size = 4))
+
+            with pa.memory_map(path) as source:
+                table = pa.ipc.open_file(source).read_all()
+
+            self.assertEqual(first = [1, 1, 2, 2, 2, 2],
+                             second = table.column('case_no').to_pylist())
+
+            path = os.path.join(d, 'combs.parquet')
+
+            rows = write_parquet(LC, path, layout = 'long', batch_size = 4)
+
+            file = pq.ParquetFile(path)
+
+            self.assertEqual(first = rows, second = file.metadata.num_rows)
+            self.assertEqual(first = 2, second = file.num_row_groups)
@@ -0,0 +1,127 @@
+# coding=utf-8
+
+"""
+Unit tests for the Envelope class.
+"""
+
+from unittest import TestCase
+import numpy as np
+from LoadCombination.Envelope import Envelope
+from LoadCombination.LoadCase import LoadCase
+from LoadCombination.LoadGroup import FactoredGroup, ExclusiveGroup
+from LoadCombination.Load import Load, ScalableLoad
+from LoadCombination.GroupFactor import GroupFactor
+from LoadCombination.HelperFuncs import load_filter
+
+
+class TestEnvelope(TestCase):
+
+    def build_case(self):
+        """
+        Builds a simple ``LoadCase`` for use in the tests.
+        """
+
+        l1 = Load(load_name = 'G1', load_no = 1, abbrev = 'G1')
+        l2 = ScalableLoad(load_name = 'Q1', load_no = 2, load_value = 5.0,
+                          abbrev = 'Q1')
+        l3 = ScalableLoad(load_name = 'Q2', load_no = 3, load_value = 2.5,
+                          abbrev = 'Q2')
+
+        LG1 = FactoredGroup(group_name = 'G', loads = [l1],
+                            factors = (0.9, 1.2))
+        LG2 = ExclusiveGroup(group_name = 'Q', loads = [l2, l3],
+                             factors = (-1.0, 1.0), scale_to = 5.0)
+
+        return LoadCase(case_name = 'Test Case', case_no = 1,
+                        load_groups = [GroupFactor(load_group = LG1,
+                                                   group_factor = 1.0),
+                                       GroupFactor(load_group = LG2,
+                                                   group_factor = 1.5)],
+                        abbrev = 'TC')
+
+    def check(self, envelope: Envelope):
+        """
+        Checks an envelope against the envelope of the full table of factors.
+        """
+
+        table = envelope.load_case.factor_table()
+        values = table.matrix() @ envelope._unit_effects(table.load_nos)
+
+        self.assertTrue(np.allclose(values.max(axis = 0), envelope.max))
+        self.assertTrue(np.allclose(values.min(axis = 0), envelope.min))
+
+        effects = np.arange(envelope.no_effects)
+
+        self.assertTrue(np.allclose(values[envelope.argmax, effects],
+                                    envelope.max))
+        self.assertTrue(np.allclose(values[envelope.argmin, effects],
+                                    envelope.min))
+
+    def test_envelope_basic(self):
+        """
+        Test that the envelope matches the envelope of every combination.
+        """
+
+        LC = self.build_case()
+
+        effects = np.array([[1.0, -2.0, 0.5],
+                            [3.0, 1.0, -1.0],
+                            [-0.5, 2.0, 4.0]])
+
+        env = Envelope(LC, load_nos = [1, 2, 3], effects = effects)
+
+        print(env)
+
+        self.check(env)
+
+        # the argmax can be used to get the combination.
+        comb = LC.combination(int(env.argmax[0]))
+        value = sum(f * effects[l - 1, 0]
+                    for l, (f, load, LFs)
+                    in comb.list_loads_with_factors.items())
+
+        self.assertAlmostEqual(first = env.max[0], second = value)
+
+        self.assertRaises(ValueError, Envelope, LC, load_nos = [1, 2],
+                          effects = effects[:2])
+
+    def test_envelope_update(self):
+        """
+        Test that only the changed groups are re-calculated.
+        """
+
+        LC = self.build_case()
+
+        effects = np.array([[1.0, -2.0],
+                            [3.0, 1.0],
+                            [-0.5, 2.0]])
+
+        env = Envelope(LC, load_nos = [1, 2, 3], effects = effects)
+
+        self.assertEqual(first = [], second = env.update())
+
+        # a change of group_factor only re-scales the contributions.
+        LC.load_groups['G'].group_factor = 1.35
+
+        self.assertEqual(first = [], second = env.update())
+        self.check(env)
+
+        LC.load_groups['G'].group_factor = -1.0
+
+        self.assertEqual(first = [], second = env.update())
+        self.check(env)
+
+        LC.load_groups['G'].load_group.factors = (0.9, 1.2, 1.35)
+
+        self.assertEqual(first = ['G'], second = env.update())
+        self.check(env)
+
+        LC.load_groups['Q'].load_group.scale_to = 2.5
+
+        self.assertEqual(first = ['Q'], second = env.update())
+        self.check(env)
+
+        LC.add_group_filter(group_name = 'Q', predicate = load_filter(3))
+
+        self.assertEqual(first = ['Q'], second = env.update())
+        self.check(env)
@@ -0,0 +1,75 @@
+# coding=utf-8
+
+"""
+Unit tests for the FactorMatrix class.
+"""
+
+import os
+import tempfile
+from unittest import TestCase
+import numpy as np
+from LoadCombination.FactorMatrix import FactorMatrix
+from tests.models import dead_live_model
+
+
+class TestFactorMatrix(TestCase):
+
+    def test_factorMatrix_directory(self):
+        """
+        Test saving to a directory and re-loading with memory-mapping.
+        """
+
+        LC = dead_live_model()
+        tables = LC.factor_tables()
+
+        with tempfile.TemporaryDirectory() as d:
+
+            path = os.path.join(d, 'matrix')
+
+            LC.save_factor_matrix(path, chunk_size = 3)
+
+            matrix = FactorMatrix.load(path)
+
+            print(matrix)
+
+            self.assertIsInstance(matrix.factors, np.memmap)
+            self.assertEqual(first = [1, 2, 3], second = list(matrix.load_nos))
+            self.assertEqual(first = 6, second = len(matrix))
+            self.assertEqual(first = [1, 1, 2, 2, 2, 2],
+                             second = list(matrix.case_nos))
+            self.assertEqual(first = [0, 1, 0, 1, 2, 3],
+                             second = list(matrix.comb_ids))
+
+            self.assertTrue(np.allclose(tables[2].matrix(), matrix.case(2)))
+            self.assertTrue(np.allclose([0.9, 1.2], matrix.case(1)[:, 0]))
+            self.assertTrue(np.allclose([0.0, 0.0], matrix.case(1)[:, 1]))
+            self.assertTrue(np.allclose([0.0, 0.0, 3.0, 3.0],
+                                        matrix.column(3)[2:]))
+
+            self.assertEqual(first = 'Dead + Live',
+                             second = matrix.cases[1]['case_name'])
+
+            self.assertRaises(KeyError, matrix.case, 3)
+            self.assertRaises(KeyError, matrix.column, 4)
+
+            del matrix
+
+    def test_factorMatrix_npz(self):
+        """
+        Test saving to a single .npz file.
+        """
+
+        LC = dead_live_model()
+
+        with tempfile.TemporaryDirectory() as d:
+
+            path = os.path.join(d, 'matrix.npz')
+
+            LC.load_cases[2].save_factor_matrix(path)
+
+            matrix = FactorMatrix.load(path)
+
+        self.assertEqual(first = [2], second = [c['case_no']
+                                                for c in matrix.cases])
+        self.assertTrue(np.allclose(LC.load_cases[2].factor_table().matrix(),
+                                    matrix.factors))
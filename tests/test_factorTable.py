@@ -0,0 +1,153 @@
+# coding=utf-8
+
+from unittest import TestCase
+import numpy as np
+from LoadCombination.FactorTable import GroupTable, FactorTable
+from LoadCombination.LoadCase import LoadCase
+from LoadCombination.LoadGroup import (LoadGroup, FactoredGroup, ExclusiveGroup,
+                                       WindGroup)
+from LoadCombination.Load import Load, ScalableLoad, WindLoad
+from LoadCombination.GroupFactor import GroupFactor
+
+
+class TestFactorTable(TestCase):
+
+    def build_case(self):
+        """
+        Builds a ``LoadCase`` for use in the tests.
+        """
+
+        l1 = Load(load_name = 'G1', load_no = 1, abbrev = 'G1')
+        l2 = ScalableLoad(load_name = 'Q1', load_no = 2, load_value = 5.0,
+                          abbrev = 'Q1')
+        l3 = ScalableLoad(load_name = 'Q2', load_no = 3, load_value = 2.5,
+                          abbrev = 'Q2')
+        l4 = WindLoad(load_name = 'WUx', load_no = 4, wind_speed = 69.0,
+                      angle = 0.0, symmetrical = True, abbrev = 'WUx')
+        l5 = WindLoad(load_name = 'WUz', load_no = 5, wind_speed = 69.0,
+                      angle = 90.0, symmetrical = True, abbrev = 'WUz')
+
+        LG1 = FactoredGroup(group_name = 'G', loads = [l1],
+                            factors = (0.9, 1.2))
+        LG2 = ExclusiveGroup(group_name = 'Q', loads = [l2, l3],
+                             factors = (0.0, 1.0), scale_to = 5.0)
+        LG3 = WindGroup(group_name = 'W', loads = [l4, l5], factors = (1.0,),
+                        scale_speed = 45.0, scale = True,
+                        req_angles = (0.0, 45.0, 90.0, 135.0, 180.0))
+
+        return LoadCase(case_name = 'Test Case', case_no = 1,
+                        load_groups = [GroupFactor(load_group = LG1,
+                                                   group_factor = 1.0),
+                                       GroupFactor(load_group = LG2,
+                                                   group_factor = 1.5),
+                                       GroupFactor(load_group = LG3,
+                                                   group_factor = 1.0)],
+                        abbrev = 'TC')
+
+    def test_groupTable_from_options(self):
+        """
+        Test building a GroupTable from the output of a LoadGroup.
+        """
+
+        l1 = ScalableLoad(load_name = 'Q1', load_no = 2, load_value = 5.0)
+        l2 = ScalableLoad(load_name = 'Q2', load_no = 1, load_value = 2.5)
+
+        LG = ExclusiveGroup(group_name = 'Q', loads = [l1, l2],
+                            factors = (0.0, 1.0), scale_to = 5.0)
+
+        GT = GroupTable.from_options(group_name = 'Q',
+                                     options = tuple(LG.generate_groups()))
+
+        print(GT)
+
+        self.assertEqual(first = [1, 2], second = list(GT.load_nos))
+        self.assertEqual(first = 4, second = GT.no_options)
+
+        expected = np.array([[0.0, 0.0], [0.0, 0.0], [0.0, 1.0], [2.0, 0.0]])
+        self.assertTrue(np.array_equal(expected, GT.factors))
+
+        # zero factors are still present
+        expected = np.array([[False, True], [True, False],
+                             [False, True], [True, False]])
+        self.assertTrue(np.array_equal(expected, GT.present))
+        self.assertTrue(np.all(np.isnan(GT.angles)))
+
+        self.assertTrue(np.array_equal(expected * 1.0,
+                                       GT.scaled(2.0).present * 1.0))
+        self.assertTrue(np.array_equal(GT.factors * 2.0,
+                                       GT.scaled(2.0).factors))
+
+    def test_factorTable_rows(self):
+        """
+        Test that the rows of the FactorTable match the generated combinations.
+        """
+
+        LC = self.build_case()
+        FT = LC.factor_table()
+
+        print(FT)
+
+        combs = LC.generate_cases()
+
+        self.assertEqual(first = len(combs), second = len(FT))
+        self.assertEqual(first = (2, 4, 5), second = FT.shape)
+        self.assertEqual(first = [1, 2, 3, 4, 5], second = list(FT.load_nos))
+
+        matrix = FT.matrix()
+        present = FT.present_rows(np.arange(len(FT)))
+
+        for i, c in enumerate(combs):
+            loads = c.list_loads_with_factors
+
+            for j, l in enumerate(FT.load_nos):
+                if l in loads:
+                    self.assertAlmostEqual(first = loads[l][0],
+                                           second = matrix[i, j])
+                    self.assertTrue(present[i, j])
+                else:
+                    self.assertEqual(first = 0.0, second = matrix[i, j])
+                    self.assertFalse(present[i, j])
+
+        angles = FT.angles(np.arange(len(FT)))
+
+        self.assertTrue(np.all(np.isnan(angles[:, :2])))
+        self.assertEqual(first = [0.0, 45.0, 90.0, 135.0, 180.0],
+                         second = list(np.unique(angles[:, 2])))
+
+        # check the chunks cover the whole table.
+        chunks = list(FT.chunks(chunk_size = 7))
+
+        self.assertEqual(first = [0, 7, 14, 21, 28, 35],
+                         second = [s for s, r in chunks])
+        self.assertTrue(np.array_equal(matrix,
+                                       np.concatenate([r for s, r in chunks])))
+
+    def test_factorTable_ravel(self):
+        """
+        Test the ravel and unravel methods.
+        """
+
+        FT = self.build_case().factor_table()
+
+        indices = np.arange(len(FT))
+        options = FT.unravel(indices)
+
+        # the first group varies fastest
+        self.assertEqual(first = [0, 0, 0], second = list(options[0]))
+        self.assertEqual(first = [1, 0, 0], second = list(options[1]))
+        self.assertEqual(first = [0, 1, 0], second = list(options[2]))
+
+        self.assertTrue(np.array_equal(indices, FT.ravel(options)))
+
+        self.assertRaises(IndexError, FT.rows, [len(FT)])
+        self.assertRaises(IndexError, FT.rows, [-1])
+
+    def test_factorTable_empty(self):
+        """
+        Test an empty FactorTable.
+        """
+
+        FT = FactorTable(case_no = 1, case_name = 'Empty', groups = [])
+
+        self.assertEqual(first = 0, second = len(FT))
+        self.assertEqual(first = (0, 0), second = FT.matrix().shape)
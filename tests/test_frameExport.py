@@ -0,0 +1,76 @@
+# coding=utf-8
+
+"""
+Unit tests for the FrameExport module.
+"""
+
+import importlib.util
+from unittest import TestCase, skipIf
+import numpy as np
+from LoadCombination.FrameExport import _frame_data
+from tests.models import dead_wind_model
+
+HAS_PANDAS = importlib.util.find_spec('pandas') is not None
+
+
+class TestFrameExport(TestCase):
+
+    def test_frame_data(self):
+        """
+        Test the arrays used to build the DataFrame.
+        """
+
+        LC = dead_wind_model()
+
+        metadata, factors, columns = _frame_data(LC.factor_tables())
+
+        self.assertEqual(first = ['load_1', 'load_2', 'load_3'],
+                         second = columns)
+        self.assertEqual(first = ['case_no', 'case_name', 'abbrev', 'comb_no',
+                                  'angle_W'],
+                         second = list(metadata.keys()))
+
+        self.assertEqual(first = [1, 1, 2, 2, 2, 2],
+                         second = list(metadata['case_no']))
+        self.assertEqual(first = [0, 1, 0, 1, 2, 3],
+                         second = list(metadata['comb_no']))
+
+        codes, categories = metadata['case_name']
+
+        self.assertEqual(first = ['Dead', 'Dead', 'Dead + Wind', 'Dead + Wind',
+                                  'Dead + Wind', 'Dead + Wind'],
+                         second = [categories[c] for c in codes])
+
+        self.assertTrue(np.array_equal([np.nan, np.nan, 0.0, 0.0, 90.0, 90.0],
+                                       metadata['angle_W'], equal_nan = True))
+
+        self.assertTrue(np.allclose(LC.load_cases[2].factor_table().matrix(),
+                                    factors[2:]))
+
+    @skipIf(not HAS_PANDAS, 'pandas is not installed.')
+    def test_to_frame(self):
+        """
+        Test building the DataFrame.
+        """
+
+        LC = dead_wind_model()
+
+        frame = LC.to_frame()
+
+        self.assertEqual(first = 6, second = len(frame))
+        self.assertEqual(first = 'category', second = str(frame['case_name'].dtype))
+        self.assertEqual(first = [0.9, 1.2], second = list(frame['load_1'][:2]))
+
+        frame = LC.load_cases[1].to_frame()
+
+        self.assertEqual(first = ['case_no', 'case_name', 'abbrev', 'comb_no',
+                                  'load_1'],
+                         second = list(frame.columns))
+
+    @skipIf(HAS_PANDAS, 'pandas is installed.')
+    def test_missing_pandas(self):
+        """
+        Test that a helpful error is raised if pandas is not installed.
+        """
+
+        self.assertRaises(ImportError, dead_wind_model().to_frame)
@@ -1,9 +1,27 @@
 # coding=utf-8
 
+import functools
 import math
+import pickle
 from unittest import TestCase, expectedFailure
 from LoadCombination.HelperFuncs import linear_interp, sine_interp_90, sine_interp
 from LoadCombination.HelperFuncs import wind_interp_85
+from LoadCombination.HelperFuncs import callable_key, code_key, content_hash
+from LoadCombination.HelperFuncs import angle_filter
+
+
+# a global read by the functions in test_helperFuncs_callable_key.
+LIMIT = 1.0
+
+
+def above_limit(x):
+
+    return x > LIMIT
+
+
+def countdown(n):
+
+    return n if n <= 0 else countdown(n - 1)
 
 
 class test_helper_funcs(TestCase):
@@ -180,3 +198,69 @@ class test_helper_funcs(TestCase):
     def test_helperFuncs_req_angles_chooser(self):
 
         self.fail("Method req_angles_chooser not tested as not currently used.")
+
+    def test_helperFuncs_callable_key(self):
+        """
+        Test that functions that differ only in a constant or a default
+        argument have different keys.
+        """
+
+        def scale():
+            return lambda x: x * 0.9
+
+        self.assertEqual(first = callable_key(scale()),
+                         second = callable_key(scale()))
+        self.assertNotEqual(first = callable_key(lambda x: x * 0.9),
+                            second = callable_key(lambda x: x * 0.8))
+        self.assertNotEqual(first = content_hash(lambda a, b, k = 2: a * k),
+                            second = content_hash(lambda a, b, k = 3: a * k))
+        self.assertNotEqual(first = content_hash(lambda a, *, k = 2: a * k),
+                            second = content_hash(lambda a, *, k = 3: a * k))
+
+        # constants in nested code objects are included.
+        self.assertNotEqual(
+            first = code_key(compile('lambda x: x * 0.5', '<test>', 'eval')),
+            second = code_key(compile('lambda x: x * 0.6', '<test>', 'eval')))
+
+        # as are the values captured by a closure.
+        def scale_by(c):
+            return lambda x: x * c
+
+        self.assertNotEqual(first = callable_key(scale_by(0.9)),
+                            second = callable_key(scale_by(0.8)))
+
+        # and the arguments of a partial.
+        self.assertEqual(first = callable_key(functools.partial(max, 1)),
+                         second = callable_key(functools.partial(max, 1)))
+        self.assertNotEqual(first = callable_key(functools.partial(max, 1)),
+                            second = callable_key(functools.partial(max, 2)))
+
+        # the filters built by angle_filter can be pickled, and their
+        # fingerprint depends on the angles.
+        predicate = pickle.loads(pickle.dumps(angle_filter([0.0, 360.0])))
+
+        self.assertEqual(first = content_hash(angle_filter([0.0])),
+                         second = content_hash(predicate))
+        self.assertNotEqual(first = content_hash(angle_filter([0.0])),
+                            second = content_hash(angle_filter([90.0])))
+
+    def test_helperFuncs_callable_key_globals(self):
+        """
+        Test that the key of a function changes when a global it reads
+        changes, and that recursive functions can be keyed.
+        """
+
+        global LIMIT
+
+        key = callable_key(above_limit)
+
+        try:
+            LIMIT = 2.0
+
+            self.assertNotEqual(first = key, second = callable_key(above_limit))
+        finally:
+            LIMIT = 1.0
+
+        self.assertEqual(first = key, second = callable_key(above_limit))
+        self.assertEqual(first = callable_key(countdown),
+                         second = callable_key(countdown))
@@ -3,7 +3,7 @@ Unittest for the Load class.
 """
 
 from unittest import TestCase
-from LoadCombination.Load import Load
+from LoadCombination.Load import Load, ScalableLoad
 
 
 class TestLoad(TestCase):
@@ -84,3 +84,48 @@ class TestLoad(TestCase):
         l.abbrev = abbrev
 
         self.assertEqual(first = l.abbrev, second = abbrev)
+
+    def test_load_version(self):
+        """
+        Test that the version is incremented when the load changes, and that
+        it does not affect equality.
+        """
+
+        l = Load(load_name = 'Test Load', load_no = 1, abbrev = 'TL')
+        l2 = Load(load_name = 'Test Load', load_no = 1, abbrev = 'TL')
+
+        version = l.version
+
+        l.abbrev = 'TL2'
+
+        self.assertGreater(l.version, version)
+
+        l.abbrev = 'TL'
+
+        self.assertEqual(first = l2, second = l)
+
+    def test_load_fingerprint(self):
+        """
+        Test that the fingerprint depends only on the contents of the load.
+        """
+
+        l = Load(load_name = 'Test Load', load_no = 1, abbrev = 'TL')
+        l2 = Load(load_name = 'Test Load', load_no = 1, abbrev = 'TL')
+
+        fingerprint = l.fingerprint
+
+        self.assertEqual(first = fingerprint, second = l2.fingerprint)
+
+        l.abbrev = 'TL2'
+
+        self.assertNotEqual(first = fingerprint, second = l.fingerprint)
+
+        l.abbrev = 'TL'
+
+        self.assertEqual(first = fingerprint, second = l.fingerprint)
+
+        # a different type of load with the same properties is different.
+        l3 = ScalableLoad(load_name = 'Test Load', load_no = 1,
+                          load_value = 1.0, abbrev = 'TL')
+
+        self.assertNotEqual(first = fingerprint, second = l3.fingerprint)
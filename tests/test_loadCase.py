@@ -1,15 +1,18 @@
 # coding=utf-8
 
 from unittest import TestCase
+import numpy as np
 from LoadCombination.LoadCase import LoadCase
-from LoadCombination.LoadGroup import LoadGroup, FactoredGroup, ScaledGroup, WindGroup
+from LoadCombination.LoadGroup import (LoadGroup, FactoredGroup, ScaledGroup, WindGroup,
+                                       ExclusiveGroup)
 from LoadCombination.Load import Load, ScalableLoad, RotatableLoad, WindLoad
 from LoadCombination.exceptions import (LoadGroupExistsException, LoadGroupNotPresentException,
                                         InvalidCombinationFactor)
 from LoadCombination.LoadFactor import LoadFactor
 from LoadCombination.GroupFactor import GroupFactor
-from LoadCombination.HelperFuncs import wind_interp_85
+from LoadCombination.HelperFuncs import wind_interp_85, angle_filter, load_filter
 from LoadCombination.Combination import Combination
+from LoadCombination.LoadIndex import LoadIndex
 
 class TestLoadCase(TestCase):
 
@@ -718,3 +721,249 @@ class TestLoadCase(TestCase):
                     C15, C16]
 
         self.assertEqual(first = list(LC.generate_cases()), second = expected)
+
+    def test_loadCase_generate_index(self):
+        """
+        Test the generate_index method.
+        """
+
+        l1 = Load(load_name = 'G1 - Mechanical Dead Load', load_no = 1,
+                  abbrev = 'G1')
+        l2 = ScalableLoad(load_name = 'Q1 - 5kPa Live Load', load_no = 2,
+                          load_value = 5, abbrev = 'Q1')
+
+        LG1 = LoadGroup(group_name = 'Group 1', loads = [l1], abbrev = 'Gp 1')
+        LG2 = FactoredGroup(group_name = 'Group 2', loads = [l2],
+                            factors = (-1.0, 1.0), abbrev = 'Gp 2')
+
+        LC = LoadCase(case_name = 'Test Case', case_no = 1,
+                      load_groups = [GroupFactor(load_group = LG1,
+                                                 group_factor = 1.2),
+                                     GroupFactor(load_group = LG2,
+                                                 group_factor = 1.5)],
+                      abbrev = 'TC')
+
+        index = LC.generate_index()
+
+        self.assertEqual(first = [1, 2], second = index.load_nos)
+        self.assertEqual(first = [0, 1], second = list(index.combinations(2)))
+        self.assertEqual(first = [-1.5, 1.5], second = list(index.factors(2)))
+        self.assertEqual(first = [1.2, 1.2], second = list(index.factors(1)))
+
+    def test_loadCase_filters(self):
+        """
+        Test the group and combination filters.
+        """
+
+        l1 = Load(load_name = 'G1 - Mechanical Dead Load', load_no = 1,
+                  abbrev = 'G1')
+        l2 = ScalableLoad(load_name = 'Q1 - 5kPa Live Load', load_no = 2,
+                          load_value = 5, abbrev = 'Q1')
+        l3 = ScalableLoad(load_name = 'Q2 - 2.5kPa Live Load', load_no = 3,
+                          load_value = 2.5, abbrev = 'Q2')
+        l4_1 = WindLoad(load_name = 'WUx - Wind Load', load_no = 4,
+                        wind_speed = 69.0, angle = 0.0, symmetrical = True,
+                        abbrev = 'WUx')
+        l4_2 = WindLoad(load_name = 'WUz - Wind Load', load_no = 5,
+                        wind_speed = 69.0, angle = 90.0, symmetrical = True,
+                        abbrev = 'WUz')
+
+        LG1 = LoadGroup(group_name = 'Group 1', loads = [l1], abbrev = 'Gp 1')
+        LG2 = ExclusiveGroup(group_name = 'Group 2', loads = [l2, l3],
+                             factors = (1.0,), scale_to = 5.0,
+                             abbrev = 'Gp 2')
+        LG3 = WindGroup(group_name = 'Group 3', loads = [l4_1, l4_2],
+                        factors = (1.0,), scale_speed = 69.0, scale = True,
+                        req_angles = (0, 45, 90, 135, 180, 225, 270, 315),
+                        abbrev = 'Gp 3')
+
+        LC = LoadCase(case_name = 'Test Case', case_no = 1,
+                      load_groups = [GroupFactor(load_group = LG1,
+                                                 group_factor = 1.2),
+                                     GroupFactor(load_group = LG2,
+                                                 group_factor = 1.5),
+                                     GroupFactor(load_group = LG3,
+                                                 group_factor = 1.0)],
+                      abbrev = 'TC')
+
+        all_combs = LC.generate_cases()
+
+        self.assertEqual(first = 16, second = len(all_combs))
+
+        LC.add_group_filter(group_name = 'Group 3',
+                            predicate = angle_filter([0, 90, 180, 270]))
+
+        combs = LC.generate_cases()
+
+        self.assertEqual(first = 8, second = len(combs))
+        self.assertEqual(first = [c for c in all_combs
+                                  if c.load_factors[max(c.load_factors)][0].info['angle']
+                                  in [0, 90, 180, 270]],
+                         second = combs)
+
+        LC.add_group_filter(load_group = LG2, predicate = load_filter(3))
+
+        combs = LC.generate_cases()
+
+        self.assertEqual(first = 4, second = len(combs))
+
+        for c in combs:
+            self.assertTrue(c.load_exists(load_no = 3))
+            self.assertFalse(c.load_exists(load_no = 2))
+
+        # now apply a whole combination filter
+        LC.add_filter(lambda c: c.load_exists(load_no = 5))
+
+        index = LoadIndex()
+        combs = LC.generate_cases(load_index = index)
+
+        self.assertEqual(first = 2, second = len(combs))
+        self.assertEqual(first = [0, 1], second = list(index.combinations(5)))
+
+        LC.clear_filters()
+
+        self.assertEqual(first = all_combs, second = LC.generate_cases())
+
+        self.assertRaises(LoadGroupNotPresentException, LC.add_group_filter,
+                          group_name = 'Group 4', predicate = load_filter(1))
+
+    def test_loadCase_sample(self):
+        """
+        Test the combination, sample_indices and sample methods.
+        """
+
+        l1 = Load(load_name = 'G1 - Mechanical Dead Load', load_no = 1,
+                  abbrev = 'G1')
+        l2 = ScalableLoad(load_name = 'Q1 - 5kPa Live Load', load_no = 2,
+                          load_value = 5, abbrev = 'Q1')
+        l3 = ScalableLoad(load_name = 'Q2 - 2.5kPa Live Load', load_no = 3,
+                          load_value = 2.5, abbrev = 'Q2')
+
+        LG1 = FactoredGroup(group_name = 'Group 1', loads = [l1],
+                            factors = (0.9, 1.0, 1.2), abbrev = 'Gp 1')
+        LG2 = ExclusiveGroup(group_name = 'Group 2', loads = [l2, l3],
+                             factors = (-1.0, 1.0), scale_to = 5.0,
+                             abbrev = 'Gp 2')
+
+        LC = LoadCase(case_name = 'Test Case', case_no = 1,
+                      load_groups = [GroupFactor(load_group = LG1,
+                                                 group_factor = 1.0),
+                                     GroupFactor(load_group = LG2,
+                                                 group_factor = 1.5)],
+                      abbrev = 'TC')
+
+        combs = LC.generate_cases()
+
+        self.assertEqual(first = len(combs), second = LC.no_combinations)
+
+        for i, c in enumerate(combs):
+            self.assertEqual(first = c, second = LC.combination(i))
+
+        self.assertRaises(IndexError, LC.combination, len(combs))
+
+        # samples are reproducible from the seed
+        indices = LC.sample_indices(50, seed = 1)
+
+        self.assertTrue(np.array_equal(indices,
+                                       LC.sample_indices(50, seed = 1)))
+        self.assertTrue(np.all((indices >= 0) & (indices < len(combs))))
+
+        sample = LC.sample(50, seed = 1)
+
+        self.assertEqual(first = [combs[i] for i in indices], second = sample)
+
+        rows = LC.sample(50, seed = 1, as_factors = True)
+
+        self.assertTrue(np.allclose(LC.factor_table().matrix()[indices], rows))
+
+        # without replacement every combination is drawn once.
+        indices = LC.sample_indices(len(combs), seed = 2, replace = False)
+
+        self.assertEqual(first = list(range(len(combs))),
+                         second = sorted(indices))
+
+        self.assertRaises(ValueError, LC.sample_indices, len(combs) + 1,
+                          replace = False)
+
+        # group filters restrict the sample space
+        LC.add_group_filter(group_name = 'Group 2', predicate = load_filter(3))
+
+        self.assertEqual(first = 6, second = LC.no_combinations)
+
+        for c in LC.sample(20, seed = 3):
+            self.assertFalse(c.load_exists(load_no = 2))
+
+        # but combination filters cannot be applied.
+        LC.add_filter(lambda c: True)
+
+        self.assertRaises(ValueError, LC.sample, 1)
+
+    def test_loadCase_combination_cache(self):
+        """
+        Test the combination cache.
+        """
+
+        l1 = Load(load_name = 'G1 - Mechanical Dead Load', load_no = 1,
+                  abbrev = 'G1')
+        l2 = ScalableLoad(load_name = 'Q1 - 5kPa Live Load', load_no = 2,
+                          load_value = 5, abbrev = 'Q1')
+        l3 = ScalableLoad(load_name = 'Q2 - 2.5kPa Live Load', load_no = 3,
+                          load_value = 2.5, abbrev = 'Q2')
+
+        LG1 = FactoredGroup(group_name = 'Group 1', loads = [l1],
+                            factors = (0.9, 1.0, 1.2), abbrev = 'Gp 1')
+        LG2 = ExclusiveGroup(group_name = 'Group 2', loads = [l2, l3],
+                             factors = (-1.0, 1.0), scale_to = 5.0,
+                             abbrev = 'Gp 2')
+
+        LC = LoadCase(case_name = 'Test Case', case_no = 1,
+                      load_groups = [GroupFactor(load_group = LG1,
+                                                 group_factor = 1.0),
+                                     GroupFactor(load_group = LG2,
+                                                 group_factor = 1.5)],
+                      abbrev = 'TC')
+        LC2 = LoadCase(case_name = 'Test Case', case_no = 1,
+                       load_groups = [GroupFactor(load_group = LG1,
+                                                  group_factor = 1.0),
+                                      GroupFactor(load_group = LG2,
+                                                  group_factor = 1.5)],
+                       abbrev = 'TC')
+
+        self.assertIsNone(LC.combination_cache)
+
+        LC.set_combination_cache(max_entries = 4)
+
+        cache = LC.combination_cache
+
+        c = LC.combination(5)
+
+        self.assertIs(c, LC.combination(5))
+        self.assertEqual(first = c, second = LC2.combination(5))
+        self.assertEqual(first = (1, 1), second = (cache.hits, cache.misses))
+
+        # the cache does not affect equality.
+        self.assertEqual(first = LC2, second = LC)
+
+        LC.sample(20, seed = 1)
+
+        self.assertEqual(first = 4, second = len(cache))
+        self.assertEqual(first = 22, second = cache.hits + cache.misses)
+
+        # changing a group clears the cache.
+        LG1.factors = (0.9, 1.35)
+
+        self.assertEqual(first = LC2.combination(3),
+                         second = LC.combination(3))
+        self.assertEqual(first = 1, second = len(cache))
+
+        # the cache can also be limited by size.
+        LC.set_combination_cache(max_bytes = 4096)
+
+        LC.sample(100, seed = 1)
+
+        self.assertLessEqual(LC.combination_cache.nbytes, 4096)
+        self.assertGreater(len(LC.combination_cache), 0)
+
+        LC.set_combination_cache()
+
+        self.assertIsNone(LC.combination_cache)
@@ -4,6 +4,7 @@
 Unit test for the LoadGroup class.
 """
 
+import pickle
 from unittest import TestCase
 from LoadCombination.LoadGroup import LoadGroup, LoadFactor
 from LoadCombination.Load import Load, RotatableLoad, ScalableLoad, WindLoad
@@ -365,3 +366,99 @@ class TestLoadGroup(TestCase):
         # the following should return true because l1 and l2 share the same
         # load_no
         self.assertTrue(LG.load_exists(load = l2))
+
+    def test_loadGroup_cached_groups(self):
+        """
+        Test that the output of generate_groups is cached, and that the cache
+        is discarded when the group or its loads change.
+        """
+
+        l1 = Load(load_name = 'Load 1', load_no = 1, abbrev = 'L1')
+        l2 = ScalableLoad(load_name = 'Load 2', load_no = 2, load_value = 5.0,
+                          abbrev = 'L2')
+
+        LG = LoadGroup(group_name = 'Group 1', loads = [l1, l2], abbrev = 'G1')
+
+        options = LG.cached_groups(group_factor = 1.5)
+
+        self.assertEqual(first = tuple(LG.generate_groups(group_factor = 1.5)),
+                         second = options)
+        self.assertIs(options, LG.cached_groups(group_factor = 1.5))
+        self.assertIsNot(options, LG.cached_groups(group_factor = 1.0))
+
+        # changing a load discards the cache.
+        version = LG.version
+        l2.load_value = 10.0
+
+        self.assertGreater(LG.version, version)
+        self.assertIsNot(options, LG.cached_groups(group_factor = 1.5))
+
+        # as does changing the group.
+        options = LG.cached_groups(group_factor = 1.5)
+        LG.abbrev = 'G2'
+
+        self.assertIsNot(options, LG.cached_groups(group_factor = 1.5))
+
+        # loads removed from the group no longer affect it.
+        options = LG.cached_groups(group_factor = 1.5)
+        LG.del_load(load_no = 2)
+        options = LG.cached_groups(group_factor = 1.5)
+        version = LG.version
+        l2.load_value = 5.0
+
+        self.assertEqual(first = version, second = LG.version)
+        self.assertIs(options, LG.cached_groups(group_factor = 1.5))
+
+    def test_loadGroup_cache_eq_pickle(self):
+        """
+        Test that the cache does not affect equality, and that a pickled group
+        is still notified of changes to its loads.
+        """
+
+        l1 = Load(load_name = 'Load 1', load_no = 1, abbrev = 'L1')
+
+        LG1 = LoadGroup(group_name = 'Group 1', loads = [l1], abbrev = 'G1')
+        LG2 = LoadGroup(group_name = 'Group 1', loads = [l1], abbrev = 'G1')
+
+        LG1.cached_groups()
+        LG1.abbrev = 'G1'
+
+        self.assertEqual(first = LG1, second = LG2)
+
+        LG3 = pickle.loads(pickle.dumps(LG1))
+
+        self.assertEqual(first = LG1, second = LG3)
+
+        options = LG3.cached_groups()
+        LG3.loads[1].load_name = 'Load 1a'
+
+        self.assertIsNot(options, LG3.cached_groups())
+        self.assertEqual(first = 'Load 1a',
+                         second = LG3.cached_groups()[0][0].load.load_name)
+
+    def test_loadGroup_fingerprint(self):
+        """
+        Test that the fingerprint of a group changes when its loads change.
+        """
+
+        l1 = Load(load_name = 'Load 1', load_no = 1, abbrev = 'L1')
+        l2 = Load(load_name = 'Load 1', load_no = 1, abbrev = 'L1')
+
+        LG1 = LoadGroup(group_name = 'Group 1', loads = [l1], abbrev = 'G1')
+        LG2 = LoadGroup(group_name = 'Group 1', loads = [l2], abbrev = 'G1')
+
+        fingerprint = LG1.fingerprint
+
+        self.assertEqual(first = fingerprint, second = LG2.fingerprint)
+
+        l1.load_name = 'Load 1a'
+
+        self.assertNotEqual(first = fingerprint, second = LG1.fingerprint)
+
+        l1.load_name = 'Load 1'
+
+        self.assertEqual(first = fingerprint, second = LG1.fingerprint)
+
+        LG2.abbrev = 'G2'
+
+        self.assertNotEqual(first = fingerprint, second = LG2.fingerprint)
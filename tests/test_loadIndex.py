@@ -0,0 +1,111 @@
+# coding=utf-8
+
+import os
+import tempfile
+from unittest import TestCase
+from LoadCombination.LoadIndex import LoadIndex
+from LoadCombination.LoadCase import LoadCase
+from LoadCombination.LoadGroup import LoadGroup, FactoredGroup, ExclusiveGroup
+from LoadCombination.Load import Load, ScalableLoad
+from LoadCombination.GroupFactor import GroupFactor
+
+
+class TestLoadIndex(TestCase):
+
+    def build_case(self):
+        """
+        Builds a simple ``LoadCase`` for use in the tests.
+        """
+
+        l1 = Load(load_name = 'G1', load_no = 1, abbrev = 'G1')
+        l2 = ScalableLoad(load_name = 'Q1', load_no = 2, load_value = 5.0,
+                          abbrev = 'Q1')
+        l3 = ScalableLoad(load_name = 'Q2', load_no = 3, load_value = 2.5,
+                          abbrev = 'Q2')
+
+        LG1 = FactoredGroup(group_name = 'G', loads = [l1],
+                            factors = (0.9, 1.2))
+        LG2 = ExclusiveGroup(group_name = 'Q', loads = [l2, l3],
+                             factors = (1.0,), scale_to = 5.0)
+
+        return LoadCase(case_name = 'Test Case', case_no = 1,
+                        load_groups = [GroupFactor(load_group = LG1,
+                                                   group_factor = 1.0),
+                                       GroupFactor(load_group = LG2,
+                                                   group_factor = 1.5)],
+                        abbrev = 'TC')
+
+    def test_loadIndex_basic(self):
+        """
+        Test that the index matches the generated combinations.
+        """
+
+        LC = self.build_case()
+
+        index = LoadIndex()
+        combs = LC.generate_cases(load_index = index)
+
+        print(index)
+
+        self.assertEqual(first = [1, 2, 3], second = index.load_nos)
+        self.assertEqual(first = 3, second = len(index))
+        self.assertTrue(2 in index)
+        self.assertFalse(4 in index)
+
+        self.assertEqual(first = [0, 1, 2, 3],
+                         second = list(index.combinations(1)))
+        self.assertEqual(first = [0, 1], second = list(index.combinations(2)))
+        self.assertEqual(first = [2, 3], second = list(index.combinations(3)))
+
+        for load_no in index.load_nos:
+            for i, f in zip(index.combinations(load_no),
+                            index.factors(load_no)):
+                expected = combs[i].list_loads_with_factors[load_no][0]
+                self.assertAlmostEqual(first = expected, second = f)
+
+        self.assertEqual(first = [1], second = index.affected_cases(3))
+
+        # loads not in the index feed no combinations.
+        self.assertEqual(first = 0, second = len(index.combinations(4)))
+
+    def test_loadIndex_case_no(self):
+        """
+        Test that the index can be restricted to a single case.
+        """
+
+        LC1 = self.build_case()
+        LC2 = self.build_case()
+        LC2.case_no = 2
+
+        index = LoadIndex()
+        LC2.generate_cases(load_index = index)
+        LC1.generate_cases(load_index = index)
+
+        self.assertEqual(first = [1, 1, 2, 2], second = list(index.cases(2)))
+        self.assertEqual(first = [0, 1],
+                         second = list(index.combinations(2, case_no = 2)))
+        self.assertEqual(first = [1, 2], second = index.affected_cases(3))
+        self.assertEqual(first = 0,
+                         second = len(index.combinations(2, case_no = 3)))
+
+    def test_loadIndex_save_load(self):
+        """
+        Test that the index can be saved and re-loaded.
+        """
+
+        index = self.build_case().generate_index()
+
+        with tempfile.TemporaryDirectory() as d:
+            file = os.path.join(d, 'index.npz')
+            index.save(file)
+            index2 = LoadIndex.load(file)
+
+        self.assertEqual(first = index.load_nos, second = index2.load_nos)
+
+        for load_no in index.load_nos:
+            self.assertEqual(first = list(index.combinations(load_no)),
+                             second = list(index2.combinations(load_no)))
+            self.assertEqual(first = list(index.factors(load_no)),
+                             second = list(index2.factors(load_no)))
+            self.assertEqual(first = list(index.cases(load_no)),
+                             second = list(index2.cases(load_no)))
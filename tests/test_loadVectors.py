@@ -0,0 +1,145 @@
+# coding=utf-8
+
+"""
+Unit tests for the LoadVectors class.
+"""
+
+import importlib.util
+from unittest import TestCase, skipIf
+import numpy as np
+from LoadCombination.LoadVectors import LoadVectors
+from LoadCombination.LoadCase import LoadCase
+from LoadCombination.LoadGroup import FactoredGroup, ExclusiveGroup
+from LoadCombination.Load import Load, ScalableLoad
+from LoadCombination.GroupFactor import GroupFactor
+
+HAS_SCIPY = importlib.util.find_spec('scipy') is not None
+
+
+class TestLoadVectors(TestCase):
+
+    def build_case(self):
+        """
+        Builds a simple ``LoadCase`` for use in the tests.
+        """
+
+        l1 = Load(load_name = 'G1', load_no = 1, abbrev = 'G1')
+        l2 = ScalableLoad(load_name = 'Q1', load_no = 2, load_value = 5.0,
+                          abbrev = 'Q1')
+        l3 = ScalableLoad(load_name = 'Q2', load_no = 3, load_value = 2.5,
+                          abbrev = 'Q2')
+
+        LG1 = FactoredGroup(group_name = 'G', loads = [l1],
+                            factors = (0.9, 1.2))
+        LG2 = ExclusiveGroup(group_name = 'Q', loads = [l2, l3],
+                             factors = (0.0, 1.0), scale_to = 5.0)
+
+        return LoadCase(case_name = 'Test Case', case_no = 1,
+                        load_groups = [GroupFactor(load_group = LG1,
+                                                   group_factor = 1.0),
+                                       GroupFactor(load_group = LG2,
+                                                   group_factor = 1.5)],
+                        abbrev = 'TC')
+
+    def vectors(self):
+        """
+        The unit load vectors of loads 3, 1, 2 and 4, in that order.
+        """
+
+        return [3, 1, 2, 4], np.array([[0.0, 0.0, 2.0, 0.0, 0.0],
+                                       [1.0, 1.0, 1.0, 1.0, 1.0],
+                                       [0.0, -3.0, 0.0, 0.0, 0.5],
+                                       [9.0, 9.0, 9.0, 9.0, 9.0]])
+
+    def expected(self, LC: LoadCase) -> np.ndarray:
+        """
+        Assembles the load vectors one combination at a time.
+        """
+
+        load_nos, vectors = self.vectors()
+        rows = {l: vectors[i] for i, l in enumerate(load_nos)}
+
+        return np.array([sum(f * rows[l] for l, (f, load, LFs)
+                             in c.list_loads_with_factors.items())
+                         for c in LC.generate_cases()])
+
+    def test_loadVectors_assemble(self):
+
+        LC = self.build_case()
+        load_nos, vectors = self.vectors()
+
+        LV = LoadVectors(load_nos = load_nos, vectors = vectors)
+
+        print(LV)
+
+        self.assertEqual(first = 5, second = LV.no_dof)
+        self.assertFalse(LV.sparse)
+
+        result = LV.assemble(LC, chunk_size = 4)
+
+        self.assertEqual(first = (LC.no_combinations, 5),
+                         second = result.shape)
+        self.assertTrue(np.allclose(self.expected(LC), result))
+
+        # the chunks should cover every combination.
+        chunks = list(LV.chunks(LC.factor_table(), chunk_size = 4))
+
+        self.assertEqual(first = [0, 4],
+                         second = [s for s, v in chunks])
+        self.assertTrue(np.allclose(result, np.vstack([v for s, v in chunks])))
+
+    def test_loadVectors_solve(self):
+
+        LC = self.build_case()
+        load_nos, vectors = self.vectors()
+
+        LV = LoadVectors(load_nos = load_nos, vectors = vectors)
+
+        K = np.diag([1.0, 2.0, 4.0, 5.0, 10.0]) + 0.1
+
+        calls = []
+
+        def solver(rhs):
+            calls.append(rhs.shape)
+            return np.linalg.solve(K, rhs)
+
+        result = LV.solve(LC, solver, chunk_size = 3)
+
+        self.assertEqual(first = [(5, 3), (5, 3), (5, 2)], second = calls)
+        self.assertTrue(np.allclose(np.linalg.solve(K, self.expected(LC).T).T,
+                                    result))
+
+    def test_loadVectors_missing_load(self):
+
+        LC = self.build_case()
+
+        LV = LoadVectors(load_nos = [1, 2], vectors = np.ones((2, 3)))
+
+        self.assertRaises(ValueError, LV.assemble, LC)
+        self.assertRaises(ValueError, LoadVectors, load_nos = [1, 2, 3],
+                          vectors = np.ones((2, 3)))
+
+    @skipIf(not HAS_SCIPY, 'scipy is not installed.')
+    def test_loadVectors_sparse(self):
+
+        import scipy.sparse
+        import scipy.sparse.linalg
+
+        LC = self.build_case()
+        load_nos, vectors = self.vectors()
+
+        LV = LoadVectors(load_nos = load_nos,
+                         vectors = scipy.sparse.csr_matrix(vectors))
+
+        self.assertTrue(LV.sparse)
+
+        result = LV.assemble(LC, chunk_size = 3)
+
+        self.assertIsInstance(result, np.ndarray)
+        self.assertTrue(np.allclose(self.expected(LC), result))
+
+        K = scipy.sparse.csc_matrix(np.diag([1.0, 2.0, 4.0, 5.0, 10.0]))
+
+        result = LV.solve(LC, scipy.sparse.linalg.splu(K).solve)
+
+        self.assertTrue(np.allclose(self.expected(LC) / K.diagonal(), result))
@@ -1,13 +1,17 @@
 # coding=utf-8
 
 from unittest import TestCase
+import numpy as np
 from LoadCombination.LoadCombinations import LoadCombinations
-from LoadCombination.Load import Load
-from LoadCombination.LoadGroup import LoadGroup
+from LoadCombination.Load import Load, ScalableLoad
+from LoadCombination.LoadGroup import LoadGroup, ExclusiveGroup, FactoredGroup
+from LoadCombination.HelperFuncs import load_filter
 from LoadCombination.GroupFactor import GroupFactor
 from LoadCombination.LoadCase import LoadCase
 from LoadCombination.exceptions import (LoadExistsException,
-                                        LoadNotPresentException)
+                                        LoadNotPresentException,
+                                        LoadCaseExistsException,
+                                        LoadCaseNotPresentException)
 
 class TestLoadCombination(TestCase):
 
@@ -182,3 +186,237 @@ class TestLoadCombination(TestCase):
         self.assertTrue(LC.load_exists(load=l1))
         self.assertFalse(LC.load_exists(load=le))
         self.assertFalse(LC.load_exists(load=l3))
+
+    def test_add_case(self):
+        """
+        Test the add_case, case_exists and del_case methods.
+        """
+
+        l1 = Load(load_name='Load 1',
+                  load_no=1,
+                  abbrev='l1')
+
+        l2 = Load(load_name='Load 2',
+                  load_no=2,
+                  abbrev='l2')
+
+        LG1 = LoadGroup(group_name='Group 1', loads=[l1], abbrev='G1')
+        LG2 = LoadGroup(group_name='Group 2', loads=[l2], abbrev='G2')
+
+        LC1 = LoadCase(case_name='Case 1', case_no=1,
+                       load_groups=[GroupFactor(load_group=LG1,
+                                                group_factor=1.0)])
+        LC2 = LoadCase(case_name='Case 2', case_no=2,
+                       load_groups=[GroupFactor(load_group=LG1,
+                                                group_factor=1.2),
+                                    GroupFactor(load_group=LG2,
+                                                group_factor=1.5)])
+
+        LC = LoadCombinations()
+        LC.add_case([LC1, LC2])
+
+        self.assertEqual(first={1: LC1, 2: LC2}, second=LC.load_cases)
+        self.assertEqual(first={'Group 1': LG1, 'Group 2': LG2},
+                         second=LC.load_groups)
+        self.assertEqual(first={1: l1, 2: l2}, second=LC.loads)
+
+        self.assertEqual(first=1, second=LC.case_exists(case_no=1))
+        self.assertEqual(first=2, second=LC.case_exists(load_case=LC2))
+        self.assertFalse(LC.case_exists(case_no=3))
+
+        self.assertRaises(LoadCaseExistsException, LC.add_case, LC1)
+
+        LC.del_case(load_case_no=1)
+
+        self.assertEqual(first={2: LC2}, second=LC.load_cases)
+        self.assertRaises(LoadCaseNotPresentException, LC.del_case,
+                          load_case=LC1)
+
+    def test_generate_index(self):
+        """
+        Test the generate_cases and generate_index methods.
+        """
+
+        l1 = Load(load_name='Load 1',
+                  load_no=1,
+                  abbrev='l1')
+
+        l2 = Load(load_name='Load 2',
+                  load_no=2,
+                  abbrev='l2')
+
+        LG1 = LoadGroup(group_name='Group 1', loads=[l1], abbrev='G1')
+        LG2 = LoadGroup(group_name='Group 2', loads=[l2], abbrev='G2')
+
+        LC1 = LoadCase(case_name='Case 1', case_no=1,
+                       load_groups=[GroupFactor(load_group=LG1,
+                                                group_factor=1.0)])
+        LC2 = LoadCase(case_name='Case 2', case_no=2,
+                       load_groups=[GroupFactor(load_group=LG1,
+                                                group_factor=1.2),
+                                    GroupFactor(load_group=LG2,
+                                                group_factor=1.5)])
+
+        LC = LoadCombinations()
+        LC.load_cases = [LC1, LC2]
+
+        combs = LC.generate_cases()
+
+        self.assertEqual(first=[1, 2], second=list(combs.keys()))
+        self.assertEqual(first=LC1.generate_cases(), second=combs[1])
+
+        index = LC.generate_index()
+
+        self.assertEqual(first=[1, 2], second=index.affected_cases(1))
+        self.assertEqual(first=[2], second=index.affected_cases(2))
+        self.assertEqual(first=[1.0, 1.2], second=list(index.factors(1)))
+
+    def test_factor_tables(self):
+        """
+        Test that the factor_tables method re-uses the group tables across
+        cases.
+        """
+
+        l1 = Load(load_name='Load 1',
+                  load_no=1,
+                  abbrev='l1')
+
+        l2 = ScalableLoad(load_name='Load 2',
+                          load_no=2,
+                          load_value=5.0,
+                          abbrev='l2')
+
+        l3 = ScalableLoad(load_name='Load 3',
+                          load_no=3,
+                          load_value=2.5,
+                          abbrev='l3')
+
+        LG1 = LoadGroup(group_name='Group 1', loads=[l1], abbrev='G1')
+        LG2 = ExclusiveGroup(group_name='Group 2', loads=[l2, l3],
+                             abbrev='G2', factors=(0.5, 1.0), scale_to=5.0)
+
+        LC1 = LoadCase(case_name='Case 1', case_no=1,
+                       load_groups=[GroupFactor(load_group=LG1,
+                                                group_factor=1.0),
+                                    GroupFactor(load_group=LG2,
+                                                group_factor=1.0)])
+        LC2 = LoadCase(case_name='Case 2', case_no=2,
+                       load_groups=[GroupFactor(load_group=LG1,
+                                                group_factor=1.2),
+                                    GroupFactor(load_group=LG2,
+                                                group_factor=1.5)])
+        LC2.add_group_filter(predicate=load_filter(3), group_name='Group 2')
+
+        LC = LoadCombinations()
+        LC.add_case([LC1, LC2])
+
+        tables = LC.factor_tables()
+        group_tables = LC.group_tables()
+
+        # the unscaled table is only built once per group.
+        self.assertIs(group_tables['Group 2'], LG2.group_table())
+
+        self.assertEqual(first=[1, 2], second=list(tables.keys()))
+        self.assertEqual(first=4, second=len(tables[1]))
+        self.assertEqual(first=2, second=len(tables[2]))
+
+        # the tables match the generated combinations.
+        for case_no, combs in LC.generate_cases().items():
+
+            table = tables[case_no]
+            matrix = table.matrix()
+
+            self.assertEqual(first=len(combs), second=len(matrix))
+
+            for comb, row in zip(combs, matrix):
+                factors = comb.list_loads_with_factors
+                expected = [factors[l][0] if l in factors else 0.0
+                            for l in table.load_nos]
+                self.assertTrue(np.allclose(expected, row))
+
+        # changing the group clears the table.
+        LG2.factors = (1.0,)
+
+        self.assertIsNot(group_tables['Group 2'], LG2.group_table())
+        self.assertEqual(first=2, second=len(LC.factor_tables()[1]))
+
+    def test_update_factor_tables(self):
+        """
+        Test that update_factor_tables only patches what has changed.
+        """
+
+        l1 = Load(load_name='Load 1',
+                  load_no=1,
+                  abbrev='l1')
+
+        l2 = ScalableLoad(load_name='Load 2',
+                          load_no=2,
+                          load_value=5.0,
+                          abbrev='l2')
+
+        l3 = ScalableLoad(load_name='Load 3',
+                          load_no=3,
+                          load_value=2.5,
+                          abbrev='l3')
+
+        LG1 = FactoredGroup(group_name='Group 1', loads=[l1], abbrev='G1',
+                            factors=(0.9, 1.2))
+        LG2 = ExclusiveGroup(group_name='Group 2', loads=[l2, l3],
+                             abbrev='G2', factors=(1.0,), scale_to=5.0)
+
+        LC1 = LoadCase(case_name='Case 1', case_no=1,
+                       load_groups=[GroupFactor(load_group=LG1,
+                                                group_factor=1.0)])
+        LC2 = LoadCase(case_name='Case 2', case_no=2,
+                       load_groups=[GroupFactor(load_group=LG1,
+                                                group_factor=1.0),
+                                    GroupFactor(load_group=LG2,
+                                                group_factor=1.5)])
+
+        LC = LoadCombinations()
+        LC.add_case([LC1, LC2])
+
+        report = LC.update_factor_tables()
+
+        self.assertEqual(first=[1, 2], second=report.added)
+
+        table = LC.tables[2]
+
+        # nothing has changed.
+        report = LC.update_factor_tables()
+
+        self.assertEqual(first=([], [], [], {}), second=tuple(report))
+
+        # changing a group factor only patches that group.
+        LC2.load_groups['Group 2'].group_factor = 1.2
+        report = LC.update_factor_tables()
+
+        self.assertEqual(first={2: ['Group 2']}, second=report.patched)
+        self.assertIs(table, LC.tables[2])
+
+        # changing a load patches every case using it.
+        l1.load_name = 'Load 1a'
+        l3.load_value = 5.0
+        report = LC.update_factor_tables()
+
+        self.assertEqual(first={1: ['Group 1'], 2: ['Group 1', 'Group 2']},
+                         second=report.patched)
+
+        # adding a group re-builds the case, deleting a case removes it.
+        LC1.add_group(GroupFactor(load_group=LG2, group_factor=1.5))
+        LC.del_case(load_case_no=2)
+        report = LC.update_factor_tables()
+
+        self.assertEqual(first=[1], second=report.rebuilt)
+        self.assertEqual(first=[2], second=report.removed)
+        self.assertEqual(first=[1], second=list(LC.tables.keys()))
+
+        # the patched tables match freshly generated tables.
+        LC.add_case(LC2)
+        LC.update_factor_tables()
+
+        for case_no, fresh in LC.factor_tables().items():
+            self.assertTrue(np.array_equal(fresh.matrix(),
+                                           LC.tables[case_no].matrix()))
+            self.assertEqual(first=list(fresh.load_nos),
+                             second=list(LC.tables[case_no].load_nos))
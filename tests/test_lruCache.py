@@ -0,0 +1,66 @@
+# coding=utf-8
+
+"""
+Unit tests for the LRUCache class.
+"""
+
+from unittest import TestCase
+from LoadCombination.LRUCache import LRUCache
+
+
+class TestLRUCache(TestCase):
+
+    def test_lruCache_entries(self):
+        """
+        Test that the least recently used entries are discarded.
+        """
+
+        cache = LRUCache(max_entries = 2)
+
+        print(cache)
+        print(repr(cache))
+
+        cache.put(1, 'a')
+        cache.put(2, 'b')
+
+        self.assertEqual(first = 'a', second = cache.get(1))
+
+        cache.put(3, 'c')
+
+        self.assertEqual(first = 2, second = len(cache))
+        self.assertTrue(1 in cache)
+        self.assertFalse(2 in cache)
+        self.assertIsNone(cache.get(2))
+
+        self.assertEqual(first = (1, 1), second = (cache.hits, cache.misses))
+
+        self.assertEqual(first = 'd', second = cache.get_or_put(4, lambda: 'd'))
+        self.assertEqual(first = 'd', second = cache.get_or_put(4, lambda: 'e'))
+
+        cache.clear()
+
+        self.assertEqual(first = 0, second = len(cache))
+
+    def test_lruCache_bytes(self):
+        """
+        Test that the cache is limited by size.
+        """
+
+        cache = LRUCache(max_bytes = 10, sizeof = len)
+
+        cache.put(1, 'aaaa')
+        cache.put(2, 'bbbb')
+        cache.put(3, 'cccc')
+
+        self.assertEqual(first = 8, second = cache.nbytes)
+        self.assertEqual(first = [False, True, True],
+                         second = [k in cache for k in (1, 2, 3)])
+
+        # values larger than the cache are not kept, and do not evict others.
+        cache.put(4, 'd' * 11)
+
+        self.assertEqual(first = [False, True, True, False],
+                         second = [k in cache for k in (1, 2, 3, 4)])
+        self.assertEqual(first = 8, second = cache.nbytes)
+
+        self.assertRaises(ValueError, LRUCache, max_entries = -1)
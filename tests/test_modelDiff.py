@@ -0,0 +1,131 @@
+# coding=utf-8
+
+"""
+Unit tests for the ModelDiff module.
+"""
+
+import copy
+from unittest import TestCase
+from LoadCombination.ModelDiff import diff_cases
+from tests.models import dead_live_model
+
+
+class TestModelDiff(TestCase):
+
+    def test_fingerprint(self):
+        """
+        Test that the fingerprints of identical models match, and change when
+        the model changes.
+        """
+
+        LC = dead_live_model()
+        LC2 = copy.deepcopy(LC)
+
+        self.assertEqual(first = LC.fingerprint, second = LC2.fingerprint)
+        self.assertEqual(first = LC.load_cases[2].fingerprint,
+                         second = LC2.load_cases[2].fingerprint)
+
+        LC2.loads[3].load_value = 3.0
+
+        self.assertNotEqual(first = LC.fingerprint, second = LC2.fingerprint)
+
+        # case 1 does not use load 3.
+        self.assertEqual(first = LC.load_cases[1].fingerprint,
+                         second = LC2.load_cases[1].fingerprint)
+        self.assertNotEqual(first = LC.load_cases[2].fingerprint,
+                            second = LC2.load_cases[2].fingerprint)
+
+    def test_diff_unchanged(self):
+        """
+        Test that there are no differences between identical models.
+        """
+
+        LC = dead_live_model()
+
+        self.assertEqual(first = {}, second = LC.diff(copy.deepcopy(LC)))
+
+    def test_diff_changed(self):
+        """
+        Test that only the combinations using a changed load are changed.
+        """
+
+        old = dead_live_model()
+        new = copy.deepcopy(old)
+
+        new.loads[3].load_value = 3.0
+
+        diff = new.diff(old)
+
+        self.assertEqual(first = [2], second = list(diff.keys()))
+        self.assertEqual(first = [], second = list(diff[2].added))
+        self.assertEqual(first = [], second = list(diff[2].removed))
+
+        # the combinations using load 3 are the last 2.
+        self.assertEqual(first = [2, 3], second = list(diff[2].changed))
+        self.assertEqual(first = {0: 0, 1: 1}, second = diff[2].unchanged)
+
+    def test_diff_added_removed(self):
+        """
+        Test that combinations are added and removed when options are added
+        to a group, or cases are added and deleted.
+        """
+
+        old = dead_live_model()
+        new = copy.deepcopy(old)
+
+        new.load_groups['G'].factors = (0.9, 1.2, 1.35)
+        new.del_case(load_case_no = 1)
+
+        diff = new.diff(old)
+
+        self.assertEqual(first = [0, 1], second = list(diff[1].removed))
+        self.assertEqual(first = [], second = list(diff[1].added))
+
+        # in case 2 group G varies fastest, so the new option is every 3rd
+        # combination.
+        self.assertEqual(first = [2, 5], second = list(diff[2].added))
+        self.assertEqual(first = [], second = list(diff[2].removed))
+        self.assertEqual(first = [], second = list(diff[2].changed))
+
+        diff = diff_cases(new.load_cases[2], old.load_cases[2])
+
+        self.assertEqual(first = [2, 5], second = list(diff.removed))
+
+    def test_diff_inserted(self):
+        """
+        Test that the unchanged combinations are mapped to their new index
+        when an option is inserted at the start of the first group.
+        """
+
+        old = dead_live_model()
+        new = copy.deepcopy(old)
+
+        new.load_groups['G'].factors = (0.8, 0.9, 1.2)
+
+        diff = new.diff(old)
+
+        self.assertEqual(first = [0], second = list(diff[1].added))
+        self.assertEqual(first = {0: 1, 1: 2}, second = diff[1].unchanged)
+
+        self.assertEqual(first = [0, 3], second = list(diff[2].added))
+        self.assertEqual(first = [], second = list(diff[2].removed))
+        self.assertEqual(first = [], second = list(diff[2].changed))
+        self.assertEqual(first = {0: 1, 1: 2, 2: 4, 3: 5},
+                         second = diff[2].unchanged)
+
+        # the mapped combinations should be the same.
+        for case_no in (1, 2):
+            old_combs = old.load_cases[case_no].generate_cases()
+            new_combs = new.load_cases[case_no].generate_cases()
+
+            for o, n in diff[case_no].unchanged.items():
+                self.assertEqual(
+                    first = old_combs[o].list_loads_with_factors,
+                    second = new_combs[n].list_loads_with_factors)
+
+        # removing the option again maps the combinations back.
+        diff = diff_cases(new.load_cases[2], old.load_cases[2])
+
+        self.assertEqual(first = [0, 3], second = list(diff.removed))
+        self.assertEqual(first = {1: 0, 2: 1, 4: 2, 5: 3},
+                         second = diff.unchanged)
@@ -0,0 +1,144 @@
+# coding=utf-8
+
+"""
+Unit tests for the CompiledModel class.
+"""
+
+import os
+import tempfile
+from unittest import TestCase
+from LoadCombination.ModelFile import CompiledModel
+from LoadCombination.LoadCombinations import LoadCombinations
+from LoadCombination.LoadCase import LoadCase
+from LoadCombination.LoadGroup import (LoadGroup, FactoredGroup, ExclusiveGroup,
+                                       RotationalGroup, WindGroup)
+from LoadCombination.Load import Load, ScalableLoad, RotatableLoad, WindLoad
+from LoadCombination.GroupFactor import GroupFactor
+
+
+class TestCompiledModel(TestCase):
+
+    def build_model(self):
+        """
+        Builds a ``LoadCombinations`` object with each type of ``Load`` and
+        ``LoadGroup`` for use in the tests.
+        """
+
+        l1 = Load(load_name = 'G1', load_no = 1, abbrev = 'G1')
+        l2 = ScalableLoad(load_name = 'Q1', load_no = 2, load_value = 2.5,
+                          abbrev = 'Q1')
+        l3 = ScalableLoad(load_name = 'Q2', load_no = 3, load_value = 5.0,
+                          abbrev = 'Q2')
+        l4 = RotatableLoad(load_name = 'E0', load_no = 4, load_value = 1.0,
+                           angle = 0.0, symmetrical = True, abbrev = 'E0')
+        l5 = RotatableLoad(load_name = 'E90', load_no = 5, load_value = 1.0,
+                           angle = 90.0, symmetrical = True, abbrev = 'E90')
+        l6 = WindLoad(load_name = 'W0', load_no = 6, wind_speed = 40.0,
+                      angle = 0.0, symmetrical = False, abbrev = 'W0')
+        l7 = WindLoad(load_name = 'W90', load_no = 7, wind_speed = 40.0,
+                      angle = 90.0, symmetrical = False, abbrev = 'W90')
+
+        LG1 = LoadGroup(group_name = 'Self Weight', loads = [l1],
+                        abbrev = 'SW')
+        LG2 = FactoredGroup(group_name = 'Dead', loads = [l1],
+                            factors = (0.9, 1.2), abbrev = 'G')
+        LG3 = ExclusiveGroup(group_name = 'Live', loads = [l3, l2],
+                             factors = (0.0, 1.5), scale_to = 5.0,
+                             abbrev = 'Q')
+        LG4 = RotationalGroup(group_name = 'EQ', loads = [l4, l5],
+                              factors = (1.0,), scale_to = 1.0, scale = False,
+                              req_angles = (0.0, 45.0, 90.0), abbrev = 'E')
+        LG5 = WindGroup(group_name = 'Wind', loads = [l6, l7],
+                        factors = (1.0,), scale_speed = 45.0, scale = True,
+                        req_angles = (0.0, 90.0), abbrev = 'W')
+
+        LC1 = LoadCase(case_name = 'Dead + Live', case_no = 10,
+                       load_groups = [GroupFactor(load_group = LG2),
+                                      GroupFactor(load_group = LG3,
+                                                  group_factor = 1.0)],
+                       abbrev = 'G+Q')
+        LC2 = LoadCase(case_name = 'Wind', case_no = 2,
+                       load_groups = [GroupFactor(load_group = LG1),
+                                      GroupFactor(load_group = LG5,
+                                                  group_factor = -1.0)])
+        LC3 = LoadCase(case_name = 'Earthquake', case_no = 5,
+                       load_groups = [GroupFactor(load_group = LG1),
+                                      GroupFactor(load_group = LG4)])
+
+        LC = LoadCombinations()
+        LC.add_group([LG1, LG2, LG3, LG4, LG5])
+        LC.add_case([LC1, LC2, LC3])
+
+        return LC
+
+    def test_compiledModel_round_trip(self):
+        """
+        Test saving and opening a model.
+        """
+
+        LC = self.build_model()
+
+        with tempfile.TemporaryDirectory() as d:
+
+            path = os.path.join(d, 'model.lcm')
+
+            LC.save_model(path)
+
+            model = CompiledModel.open(path)
+
+            print(model)
+
+            self.assertEqual(first = list(LC.loads.keys()),
+                             second = list(model.load_nos))
+            self.assertEqual(first = [10, 2, 5], second = list(model.case_nos))
+
+            # nothing is built until it is accessed.
+            self.assertEqual(first = {}, second = model.load_cases._values)
+
+            lc = model.load_cases[2]
+
+            self.assertEqual(first = LC.load_cases[2], second = lc)
+            self.assertEqual(first = [1, 6, 7],
+                             second = sorted(model.loads._values))
+            self.assertIs(lc.load_groups['Wind'].load_group,
+                          model.load_groups['Wind'])
+            self.assertIs(model.load_groups['Wind'].loads[6], model.loads[6])
+
+            self.assertEqual(first = [c.combination_title()
+                                      for c in LC.load_cases[2].generate_cases()],
+                             second = [c.combination_title()
+                                       for c in lc.generate_cases()])
+
+            self.assertEqual(first = LC, second = model.to_combinations())
+
+            self.assertRaises(KeyError, model.load_cases.__getitem__, 3)
+            self.assertRaises(KeyError, model.loads.__getitem__, 8)
+            self.assertRaises(KeyError, model.load_groups.__getitem__, 'X')
+
+            del model
+
+    def test_compiledModel_errors(self):
+        """
+        Test that models which cannot be stored are rejected.
+        """
+
+        LC = self.build_model()
+
+        with tempfile.TemporaryDirectory() as d:
+
+            path = os.path.join(d, 'model.lcm')
+
+            LC.load_cases[10].add_filter(lambda c: True)
+
+            self.assertRaises(ValueError, LC.save_model, path)
+
+            LC.load_cases[10].clear_filters()
+            LC.load_groups['EQ'].interp_func = lambda x, y: (1.0, 0.0)
+
+            self.assertRaises(ValueError, LC.save_model, path)
+            self.assertFalse(os.path.exists(path))
+
+            with open(path, 'wb') as f:
+                f.write(b'not a model')
+
+            self.assertRaises(ValueError, CompiledModel.open, path)
@@ -1107,3 +1107,47 @@ class TestRotationalGroup(TestCase):
         LC_act = tuple(LG.generate_groups())
 
         self.assertEqual(first = tuple(LG.generate_groups()), second = LC)
+
+    def test_RotationalGroup_cache(self):
+        """
+        Test that angles_with_symmetry, scale_factors and the generated groups
+        are updated when the loads or group change.
+        """
+
+        l1 = RotatableLoad(load_name = 'Load 1', load_no = 1, load_value = 5.0,
+                           angle = 0.0, symmetrical = True)
+        l2 = RotatableLoad(load_name = 'Load 2', load_no = 2, load_value = 5.0,
+                           angle = 90.0, symmetrical = False)
+
+        LG = RotationalGroup(group_name = 'Group 1', loads = [l1, l2],
+                             factors = (1.0,), scale_to = 10.0, scale = True,
+                             req_angles = (0.0, 90.0, 180.0, 270.0))
+
+        self.assertEqual(first = {1: 2.0, 2: 2.0}, second = LG.scale_factors())
+        self.assertEqual(first = (1, -1.0, True),
+                         second = LG.angles_with_symmetry[180.0])
+        self.assertNotIn(270.0, LG.angles_with_symmetry)
+
+        l2.symmetrical = True
+        l1.load_value = 2.5
+
+        self.assertEqual(first = {1: 4.0, 2: 2.0}, second = LG.scale_factors())
+        self.assertEqual(first = (2, -1.0, True),
+                         second = LG.angles_with_symmetry[270.0])
+
+        # the returned dictionary is a copy and cannot change the cache.
+        LG.angles_with_symmetry[45.0] = (1, 1.0, False)
+
+        self.assertNotIn(45.0, LG.angles_with_symmetry)
+
+        options = LG.cached_groups()
+
+        LG.req_angles = (0.0, 90.0)
+
+        self.assertEqual(first = 4, second = len(options))
+        self.assertEqual(first = 2, second = len(LG.cached_groups()))
+
+        LG.scale_to = 5.0
+
+        self.assertEqual(first = 2.0,
+                         second = LG.cached_groups()[0][0].scale_factor)
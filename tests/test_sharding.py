@@ -0,0 +1,206 @@
+# coding=utf-8
+
+"""
+Unit tests for the Sharding module.
+"""
+
+import functools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase
+from LoadCombination.Sharding import JobSpec, ShardRange
+from LoadCombination.TextExport import Exporter, TemplateFormat
+from LoadCombination.HelperFuncs import load_filter
+from tests.models import dead_wind_model
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def factor_above(limit: float, option) -> bool:
+    """
+    A group filter for the tests. It must be at module level to be pickled.
+    """
+
+    return option[0].factor > limit
+
+
+class TestSharding(TestCase):
+
+    def test_jobSpec_build(self):
+        """
+        Test splitting the combinations into shards.
+        """
+
+        spec = JobSpec.build(dead_wind_model(), no_shards = 4)
+
+        print(spec)
+
+        self.assertEqual(first = {1: 2, 2: 4}, second = spec.counts)
+        self.assertEqual(first = [[ShardRange(1, 0, 1)],
+                                  [ShardRange(1, 1, 2), ShardRange(2, 0, 1)],
+                                  [ShardRange(2, 1, 2)],
+                                  [ShardRange(2, 2, 4)]],
+                         second = spec.shards)
+
+        # more shards than combinations gives empty shards.
+        spec = JobSpec.build(dead_wind_model(), no_shards = 8)
+
+        self.assertEqual(first = 6,
+                         second = sum(len(s) for s in spec.shards))
+
+        self.assertRaises(ValueError, JobSpec.build, dead_wind_model(),
+                          no_shards = 0)
+
+        # filters that differ only in a constant give different keys, even
+        # when they keep the same combinations.
+        keys = []
+
+        for limit in (1.0, 1.1):
+            LC = dead_wind_model()
+            LC.load_cases[1].add_group_filter(
+                predicate = functools.partial(factor_above, limit),
+                group_name = 'G')
+
+            keys.append(JobSpec.build(LC, no_shards = 2).key)
+
+        self.assertNotEqual(first = keys[0], second = keys[1])
+
+    def test_jobSpec_filters(self):
+        """
+        Test saving and loading a spec with filters.
+        """
+
+        LC = dead_wind_model()
+        LC.load_cases[2].add_group_filter(group_name = 'G',
+                                          predicate = load_filter(1))
+        LC.load_cases[2].add_group_filter(
+            group_name = 'G', predicate = functools.partial(factor_above, 1.0))
+
+        with tempfile.TemporaryDirectory() as d:
+
+            spec_path = os.path.join(d, 'job.spec')
+
+            JobSpec.build(LC, no_shards = 2).save(spec_path)
+
+            spec = JobSpec.load(spec_path)
+
+            self.assertEqual(first = {1: 2, 2: 2}, second = spec.counts)
+
+            paths = [os.path.join(d, f'shard-{k}.txt')
+                     for k in range(spec.no_shards)]
+
+            for k, p in enumerate(paths):
+                spec.run_shard(k, p)
+
+            expected_path = os.path.join(d, 'expected.txt')
+
+            Exporter('text').write(LC, expected_path)
+
+            self.assertEqual(first = 4, second = spec.merge(
+                paths, os.path.join(d, 'combs.txt')))
+
+            with open(expected_path, 'rb') as f:
+                expected = f.read()
+
+            with open(os.path.join(d, 'combs.txt'), 'rb') as f:
+                self.assertEqual(first = expected, second = f.read())
+
+        # a filter that cannot be pickled is reported when the spec is built.
+        LC.load_cases[1].add_filter(lambda c: True)
+
+        with self.assertRaisesRegex(ValueError, 'filter .*LoadCase 1'):
+            JobSpec.build(LC, no_shards = 2)
+
+    def test_jobSpec_subprocess(self):
+        """
+        Test running each shard in a separate process and merging the output.
+        """
+
+        LC = dead_wind_model()
+        fmt = TemplateFormat('{case_no} {comb_no} {title}',
+                             header = 'START', footer = 'END')
+
+        with tempfile.TemporaryDirectory() as d:
+
+            spec_path = os.path.join(d, 'job.spec')
+
+            JobSpec.build(LC, no_shards = 3, record_format = fmt).save(
+                spec_path)
+
+            spec = JobSpec.load(spec_path)
+            paths = [os.path.join(d, f'shard-{k}.txt')
+                     for k in range(spec.no_shards)]
+
+            for k, p in enumerate(paths):
+                output = subprocess.run([sys.executable, '-m',
+                                         'LoadCombination.Sharding', 'run',
+                                         spec_path, str(k), p],
+                                        cwd = ROOT, check = True,
+                                        capture_output = True, text = True)
+
+                self.assertEqual(first = 2,
+                                 second = json.loads(output.stdout)['count'])
+
+            for name in ('combs.txt', 'combs.txt.gz'):
+                expected_path = os.path.join(d, 'expected-' + name)
+                path = os.path.join(d, name)
+
+                Exporter(fmt).write(LC, expected_path)
+
+                self.assertEqual(first = 6, second = spec.merge(paths, path))
+
+                with open(expected_path, 'rb') as f:
+                    expected = f.read()
+
+                with open(path, 'rb') as f:
+                    self.assertEqual(first = expected, second = f.read())
+
+            # a corrupted shard is detected.
+            with open(paths[1], 'r+b') as f:
+                f.write(b'X')
+
+            self.assertRaises(ValueError, spec.merge, paths,
+                              os.path.join(d, 'bad.txt'))
+
+            # a missing shard is detected.
+            os.remove(paths[2] + '.json')
+
+            self.assertRaises(ValueError, spec.check_shard, 2, paths[2])
+            self.assertRaises(ValueError, spec.merge, paths[:2],
+                              os.path.join(d, 'bad.txt'))
+            self.assertFalse(os.path.exists(os.path.join(d, 'bad.txt')))
+
+        # the CSV format can also be used.
+        with tempfile.TemporaryDirectory() as d:
+
+            spec_path = os.path.join(d, 'job.spec')
+
+            JobSpec.build(LC, no_shards = 2, record_format = 'csv').save(
+                spec_path)
+
+            spec = JobSpec.load(spec_path)
+            paths = [os.path.join(d, f'shard-{k}.csv')
+                     for k in range(spec.no_shards)]
+
+            for k, p in enumerate(paths):
+                subprocess.run([sys.executable, '-m',
+                                'LoadCombination.Sharding', 'run',
+                                spec_path, str(k), p],
+                               cwd = ROOT, check = True,
+                               capture_output = True, text = True)
+
+            expected_path = os.path.join(d, 'expected.csv')
+            path = os.path.join(d, 'combs.csv')
+
+            Exporter('csv').write(LC, expected_path)
+
+            self.assertEqual(first = 6, second = spec.merge(paths, path))
+
+            with open(expected_path, 'rb') as f:
+                expected = f.read()
+
+            with open(path, 'rb') as f:
+                self.assertEqual(first = expected, second = f.read())
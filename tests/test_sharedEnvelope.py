@@ -0,0 +1,162 @@
+# coding=utf-8
+
+"""
+Unit tests for the SharedEnvelope and SharedArrays classes.
+"""
+
+from unittest import TestCase
+import numpy as np
+from LoadCombination.SharedEnvelope import SharedEnvelope, SharedArrays
+from LoadCombination.Envelope import Envelope
+from LoadCombination.LoadCase import LoadCase
+from LoadCombination.LoadGroup import FactoredGroup, ExclusiveGroup
+from LoadCombination.Load import Load, ScalableLoad
+from LoadCombination.GroupFactor import GroupFactor
+
+
+class TestSharedEnvelope(TestCase):
+
+    def build_case(self):
+        """
+        Builds a simple ``LoadCase`` for use in the tests.
+        """
+
+        l1 = Load(load_name = 'G1', load_no = 1, abbrev = 'G1')
+        l2 = ScalableLoad(load_name = 'Q1', load_no = 2, load_value = 5.0,
+                          abbrev = 'Q1')
+        l3 = ScalableLoad(load_name = 'Q2', load_no = 3, load_value = 2.5,
+                          abbrev = 'Q2')
+        l4 = ScalableLoad(load_name = 'W1', load_no = 4, load_value = 1.0,
+                          abbrev = 'W1')
+
+        LG1 = FactoredGroup(group_name = 'G', loads = [l1],
+                            factors = (0.9, 1.2))
+        LG2 = ExclusiveGroup(group_name = 'Q', loads = [l2, l3],
+                             factors = (-1.0, 0.0, 1.0), scale_to = 5.0)
+        LG3 = FactoredGroup(group_name = 'W', loads = [l4],
+                            factors = (-1.0, 0.0, 0.5, 1.0))
+
+        return LoadCase(case_name = 'Test Case', case_no = 1,
+                        load_groups = [GroupFactor(load_group = LG1,
+                                                   group_factor = 1.0),
+                                       GroupFactor(load_group = LG2,
+                                                   group_factor = 1.5),
+                                       GroupFactor(load_group = LG3,
+                                                   group_factor = 1.0)],
+                        abbrev = 'TC')
+
+    def effects(self):
+
+        rng = np.random.default_rng(seed = 1)
+
+        return rng.normal(size = (4, 7))
+
+    def check(self, envelope: SharedEnvelope):
+        """
+        Checks an envelope against the envelope of the full table of factors.
+        """
+
+        table = envelope.factor_table()
+        values = table.matrix() @ envelope._unit_effects(table.load_nos)
+
+        self.assertTrue(np.allclose(values.max(axis = 0), envelope.max))
+        self.assertTrue(np.allclose(values.min(axis = 0), envelope.min))
+        self.assertEqual(first = list(values.argmax(axis = 0)),
+                         second = list(envelope.argmax))
+        self.assertEqual(first = list(values.argmin(axis = 0)),
+                         second = list(envelope.argmin))
+
+    def test_sharedEnvelope_in_process(self):
+
+        LC = self.build_case()
+
+        env = SharedEnvelope(LC, load_nos = [1, 2, 3, 4],
+                             effects = self.effects(), processes = 1,
+                             chunk_size = 5, effect_chunk_size = 3)
+
+        print(env)
+
+        self.check(env)
+
+    def test_sharedEnvelope_pool(self):
+
+        LC = self.build_case()
+
+        env = SharedEnvelope(LC, load_nos = [4, 3, 2, 1],
+                             effects = self.effects()[::-1], processes = 2,
+                             chunk_size = 4, effect_chunk_size = 2)
+
+        self.check(env)
+
+        # should match the Envelope class.
+        other = Envelope(LC, load_nos = [1, 2, 3, 4], effects = self.effects())
+
+        self.assertTrue(np.allclose(other.max, env.max))
+        self.assertTrue(np.allclose(other.min, env.min))
+
+    def test_sharedEnvelope_superpose(self):
+
+        LC = self.build_case()
+        table = LC.factor_table()
+
+        env = SharedEnvelope(table, load_nos = [1, 2, 3, 4],
+                             effects = self.effects(), processes = 2,
+                             chunk_size = 7)
+
+        values = env.superpose()
+
+        self.assertEqual(first = (LC.no_combinations, 7),
+                         second = values.shape)
+        self.assertTrue(np.allclose(table.matrix() @ self.effects(), values))
+
+        self.check(env)
+
+    def test_sharedEnvelope_update(self):
+
+        LC = self.build_case()
+
+        env = SharedEnvelope(LC, load_nos = [1, 2, 3, 4],
+                             effects = self.effects(), processes = 1)
+
+        LC.set_factor(group_name = 'Q', load_factor = -2.0)
+
+        env.update()
+
+        self.check(env)
+
+    def test_sharedEnvelope_missing_load(self):
+
+        LC = self.build_case()
+
+        self.assertRaises(ValueError, SharedEnvelope, LC,
+                          load_nos = [1, 2, 3], effects = self.effects()[:3],
+                          processes = 1)
+
+
+class TestSharedArrays(TestCase):
+
+    def test_sharedArrays(self):
+
+        a = np.arange(10.0)
+        b = np.arange(6, dtype = np.int32).reshape((2, 3))
+
+        with SharedArrays.create({'a': a, 'b': b,
+                                  'c': (np.float64, (3, 2))}) as shared:
+
+            print(shared)
+
+            other = SharedArrays.attach(*shared.spec)
+
+            self.assertTrue(np.array_equal(a, other.arrays['a']))
+            self.assertTrue(np.array_equal(b, other.arrays['b']))
+            self.assertEqual(first = np.int32,
+                             second = other.arrays['b'].dtype)
+            self.assertTrue(np.array_equal(np.zeros((3, 2)),
+                                           other.arrays['c']))
+
+            # the arrays should be shared, not copied.
+            other.arrays['c'][1, 1] = 5.0
+
+            self.assertEqual(first = 5.0, second = shared.arrays['c'][1, 1])
+
+            other.close()
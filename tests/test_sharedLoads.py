@@ -0,0 +1,237 @@
+# coding=utf-8
+
+"""
+Unit tests for the LoadTable class and the compact pickling of Combination,
+LoadFactor and LoadGroup objects.
+"""
+
+import pickle
+from multiprocessing import Pool
+from unittest import TestCase
+import numpy as np
+from LoadCombination.SharedLoads import (LoadTable, install_table,
+                                         active_table, benchmark)
+from LoadCombination.Load import Load, ScalableLoad, RotatableLoad
+from LoadCombination.LoadFactor import LoadFactor
+from LoadCombination.Combination import Combination
+from LoadCombination.LoadGroup import ScaledGroup, FactoredGroup
+from LoadCombination.LoadCase import LoadCase
+from LoadCombination.GroupFactor import GroupFactor
+
+
+def _combination_title(comb: Combination) -> str:
+    """
+    A function for the Pool tests. It must be at module level to be pickled.
+    """
+
+    return comb.combination_title()
+
+
+class TestSharedLoads(TestCase):
+
+    def build_combination(self):
+        """
+        Builds a list of ``Load`` objects and a ``Combination`` for use in the
+        tests.
+        """
+
+        l1 = Load(load_name = 'G1', load_no = 1, abbrev = 'G1')
+        l2 = ScalableLoad(load_name = 'Q1', load_no = 2, load_value = 2.5,
+                          abbrev = 'Q1')
+        l3 = RotatableLoad(load_name = 'W0', load_no = 3, load_value = 1.0,
+                           angle = 0.0, symmetrical = True, abbrev = 'W0')
+
+        comb = Combination(load_case_no = 1, load_case = 'Case 1',
+                           load_case_abbrev = 'C1',
+                           load_factors = [
+                               LoadFactor(load = l1, base_factor = 1.2),
+                               LoadFactor(load = l2, base_factor = 1.5,
+                                          scale_factor = 0.4),
+                               LoadFactor(load = l3, base_factor = 1.0,
+                                          rotational_factor = 0.5,
+                                          symmetry_factor = -1.0,
+                                          info = {'angle': 180.0})
+                           ])
+
+        return [l1, l2, l3], comb
+
+    def test_load_factor(self):
+
+        loads, comb = self.build_combination()
+
+        LF = comb.load_factors[3][0]
+
+        result = pickle.loads(pickle.dumps(LF))
+
+        self.assertEqual(first = LF, second = result)
+        self.assertEqual(first = LF.info, second = result.info)
+        self.assertEqual(first = -0.5, second = result.factor)
+
+        LF = comb.load_factors[1][0]
+
+        result = pickle.loads(pickle.dumps(LF))
+
+        self.assertEqual(first = LF, second = result)
+        self.assertEqual(first = {}, second = result.info)
+
+    def test_combination(self):
+
+        loads, comb = self.build_combination()
+
+        result = pickle.loads(pickle.dumps(comb))
+
+        self.assertEqual(first = comb, second = result)
+        self.assertEqual(first = comb.combination_title(),
+                         second = result.combination_title())
+        self.assertEqual(first = comb.list_loads_with_factors.keys(),
+                         second = result.list_loads_with_factors.keys())
+
+        # the LoadFactors should share the same Load objects.
+        self.assertIs(result.load_factors[1][0].load,
+                      result.list_loads_with_factors[1][1])
+
+    def test_shared(self):
+
+        loads, comb = self.build_combination()
+
+        table = LoadTable(loads)
+
+        try:
+            default = pickle.dumps(comb)
+
+            with table:
+                self.assertIs(active_table(), table)
+
+                shared = pickle.dumps(comb)
+
+            self.assertIsNone(active_table())
+            self.assertLess(len(shared), len(default))
+
+            result = pickle.loads(shared)
+
+            self.assertEqual(first = comb, second = result)
+
+            # the loads should be the same objects as in the table.
+            for l in loads:
+                self.assertIs(result.load_factors[l.load_no][0].load, l)
+
+        finally:
+            table.uninstall()
+
+        self.assertRaises(KeyError, pickle.loads, shared)
+
+    def test_load_table(self):
+
+        loads, comb = self.build_combination()
+
+        table = LoadTable(loads)
+
+        try:
+            with table:
+                data = pickle.dumps(table)
+
+            # unpickling the table in the same process returns the installed
+            # table.
+            self.assertIs(pickle.loads(data), table)
+
+        finally:
+            table.uninstall()
+
+        result = pickle.loads(data)
+
+        try:
+            self.assertEqual(first = table.table_id, second = result.table_id)
+            self.assertEqual(first = 3, second = len(result))
+            self.assertEqual(first = loads[1], second = result.loads[2])
+
+        finally:
+            result.uninstall()
+
+    def test_load_group(self):
+
+        loads, comb = self.build_combination()
+
+        group = ScaledGroup(group_name = 'Live', loads = loads[1:],
+                            factors = (0.0, 1.0),
+                            scale_to = 5.0, scale = True, abbrev = 'Q')
+
+        table = LoadTable(loads)
+
+        try:
+            with table:
+                result = pickle.loads(pickle.dumps(group))
+
+            self.assertIs(result.loads[2], loads[1])
+            self.assertEqual(first = group.scale_to, second = result.scale_to)
+
+        finally:
+            table.uninstall()
+
+    def test_out_of_band(self):
+        """
+        Test that the arrays of ``GroupTable`` and ``FactorTable`` objects are
+        passed as out-of-band buffers with protocol 5.
+        """
+
+        loads, comb = self.build_combination()
+
+        LG1 = FactoredGroup(group_name = 'G', loads = loads[:1],
+                            factors = (0.9, 1.2))
+        LG2 = ScaledGroup(group_name = 'Live', loads = loads[1:],
+                          factors = (0.0, 1.0),
+                          scale_to = 5.0, scale = True, abbrev = 'Q')
+
+        LC = LoadCase(case_name = 'Case 1', case_no = 1,
+                      load_groups = [GroupFactor(load_group = LG1,
+                                                 group_factor = 1.0),
+                                     GroupFactor(load_group = LG2,
+                                                 group_factor = 1.5)])
+
+        for table, values in ((LG2.group_table(), lambda t: t.factors),
+                              (LC.factor_table(), lambda t: t.matrix())):
+            buffers = []
+
+            data = pickle.dumps(table, protocol = 5,
+                                buffer_callback = buffers.append)
+
+            self.assertGreater(len(buffers), 0)
+            self.assertTrue(all(isinstance(b, pickle.PickleBuffer)
+                                for b in buffers))
+
+            # the array data is not in the pickle itself.
+            self.assertLess(len(data),
+                            len(pickle.dumps(table, protocol = 5)))
+
+            result = pickle.loads(data, buffers = buffers)
+
+            self.assertTrue(np.array_equal(values(table), values(result)))
+
+    def test_pool(self):
+
+        loads, comb = self.build_combination()
+
+        table = LoadTable(loads)
+
+        try:
+            with table, Pool(processes = 2, initializer = install_table,
+                             initargs = (table,)) as pool:
+                results = pool.map(_combination_title, [comb] * 4)
+
+        finally:
+            table.uninstall()
+
+        self.assertEqual(first = [comb.combination_title()] * 4,
+                         second = results)
+
+    def test_benchmark(self):
+
+        results = benchmark(no_loads = 20, no_combinations = 50, repeat = 1)
+
+        print(results)
+
+        self.assertEqual(first = {'default', 'compact', 'shared'},
+                         second = set(results.keys()))
+        self.assertLess(results['compact']['bytes'],
+                        results['default']['bytes'])
+        self.assertLess(results['shared']['bytes'],
+                        results['compact']['bytes'])
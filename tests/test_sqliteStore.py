@@ -0,0 +1,67 @@
+# coding=utf-8
+
+"""
+Unit tests for the SQLiteStore class.
+"""
+
+import os
+import tempfile
+from unittest import TestCase
+from LoadCombination.SQLiteStore import SQLiteStore
+from tests.models import dead_wind_model
+
+
+class TestSQLiteStore(TestCase):
+
+    def test_sqliteStore_write_query(self):
+        """
+        Test writing and querying combinations.
+        """
+
+        LC = dead_wind_model()
+
+        with tempfile.TemporaryDirectory() as d:
+
+            path = os.path.join(d, 'combs.sqlite')
+
+            with SQLiteStore(path) as store:
+                self.assertEqual(first = 6,
+                                 second = store.write(LC, batch_size = 3))
+
+            # the data can be read by a separate connection.
+            with SQLiteStore(path) as store:
+
+                print(store)
+
+                combs = store.combinations(case_no = 2)
+                expected = LC.load_cases[2].generate_cases()
+
+                self.assertEqual(first = [(2, i, c.combination_title())
+                                          for i, c in enumerate(expected)],
+                                 second = combs)
+
+                self.assertEqual(first = [(2, 2), (2, 3)],
+                                 second = [c[:2] for c
+                                           in store.combinations(angle = 90.0)])
+                self.assertEqual(first = 6,
+                                 second = len(store.combinations(load_no = 1)))
+                self.assertEqual(first = [(2, 0), (2, 1)],
+                                 second = [c[:2] for c in store.combinations(
+                                     load_no = 1, angle = 0.0)])
+
+                rows = store.factor_rows(load_no = 1, case_no = 1)
+
+                self.assertEqual(first = [(1, 0, 1, 0.9, None),
+                                          (1, 1, 1, 1.2, None)],
+                                 second = rows)
+
+                self.assertEqual(first = {1: 1.2, 3: 1.0},
+                                 second = store.combination_factors(2, 3))
+
+                # re-writing a case replaces it.
+                LC.load_cases[1].load_groups['G'].load_group.factors = (1.35,)
+
+                self.assertEqual(first = 1,
+                                 second = store.write(LC.load_cases[1]))
+                self.assertEqual(first = [(1, 0, 1, 1.35, None)],
+                                 second = store.factor_rows(case_no = 1))
@@ -0,0 +1,173 @@
+# coding=utf-8
+
+"""
+Unit tests for the Superposition class.
+"""
+
+import os
+import tempfile
+from unittest import TestCase
+import numpy as np
+from LoadCombination.Superposition import Superposition
+from LoadCombination.FactorMatrix import FactorMatrix
+from LoadCombination.LoadCombinations import LoadCombinations
+from LoadCombination.LoadCase import LoadCase
+from LoadCombination.LoadGroup import FactoredGroup, ExclusiveGroup
+from LoadCombination.Load import Load, ScalableLoad
+from LoadCombination.GroupFactor import GroupFactor
+
+
+class TestSuperposition(TestCase):
+
+    def build_case(self):
+        """
+        Builds a simple ``LoadCase`` for use in the tests.
+        """
+
+        l1 = Load(load_name = 'G1', load_no = 1, abbrev = 'G1')
+        l2 = ScalableLoad(load_name = 'Q1', load_no = 2, load_value = 5.0,
+                          abbrev = 'Q1')
+        l3 = ScalableLoad(load_name = 'Q2', load_no = 3, load_value = 2.5,
+                          abbrev = 'Q2')
+        l4 = ScalableLoad(load_name = 'W1', load_no = 4, load_value = 1.0,
+                          abbrev = 'W1')
+
+        LG1 = FactoredGroup(group_name = 'G', loads = [l1],
+                            factors = (0.9, 1.2))
+        LG2 = ExclusiveGroup(group_name = 'Q', loads = [l2, l3],
+                             factors = (-1.0, 0.0, 1.0), scale_to = 5.0)
+        LG3 = FactoredGroup(group_name = 'W', loads = [l4],
+                            factors = (-1.0, 0.0, 0.5, 1.0))
+
+        return LoadCase(case_name = 'Test Case', case_no = 1,
+                        load_groups = [GroupFactor(load_group = LG1,
+                                                   group_factor = 1.0),
+                                       GroupFactor(load_group = LG2,
+                                                   group_factor = 1.5),
+                                       GroupFactor(load_group = LG3,
+                                                   group_factor = 1.0)],
+                        abbrev = 'TC')
+
+    def unit_results(self):
+        """
+        Random unit results for loads 5, 4, 3, 2 and 1, in that order. Load 5
+        is not used by the case.
+        """
+
+        rng = np.random.default_rng(seed = 1)
+
+        return np.array([5, 4, 3, 2, 1]), rng.normal(size = (5, 23))
+
+    def expected(self, LC):
+
+        load_nos, unit = self.unit_results()
+
+        return LC.factor_table().matrix() @ unit[[4, 3, 2, 1]]
+
+    def test_superposition_combine(self):
+
+        LC = self.build_case()
+        load_nos, unit = self.unit_results()
+
+        with tempfile.TemporaryDirectory() as d:
+
+            np.save(os.path.join(d, 'unit.npy'), unit)
+            np.save(os.path.join(d, 'load_nos.npy'), load_nos)
+
+            # a small budget so that there are several blocks each way.
+            sp = Superposition(LC, os.path.join(d, 'unit.npy'),
+                               load_nos = os.path.join(d, 'load_nos.npy'),
+                               memory_budget = 512)
+
+            print(sp)
+
+            self.assertIsInstance(sp.unit_results, np.memmap)
+
+            rows, cols = sp.block_shape()
+
+            self.assertLess(rows, LC.no_combinations)
+            self.assertLess(cols, 23)
+
+            stats = sp.combine(os.path.join(d, 'combined.npy'))
+
+            print(stats)
+
+            self.assertEqual(first = LC.no_combinations * 23,
+                             second = stats['values'])
+            self.assertGreater(stats['values_per_second'], 0)
+
+            values = np.load(os.path.join(d, 'combined.npy'))
+
+            self.assertTrue(np.allclose(self.expected(LC), values))
+            self.assertEqual(first = ['combined.npy', 'load_nos.npy',
+                                      'unit.npy'],
+                             second = sorted(os.listdir(d)))
+
+    def test_superposition_envelope(self):
+
+        LC = self.build_case()
+        load_nos, unit = self.unit_results()
+
+        expected = self.expected(LC)
+
+        with tempfile.TemporaryDirectory() as d:
+
+            sp = Superposition(LC, unit, load_nos = load_nos,
+                               memory_budget = 400)
+
+            sp.envelope(os.path.join(d, 'env'))
+
+            self.assertTrue(np.allclose(expected.max(axis = 0), sp.max))
+            self.assertTrue(np.allclose(expected.min(axis = 0), sp.min))
+            self.assertEqual(first = list(expected.argmax(axis = 0)),
+                             second = list(sp.argmax))
+            self.assertEqual(first = list(expected.argmin(axis = 0)),
+                             second = list(sp.argmin))
+
+            self.assertEqual(first = ['argmax.npy', 'argmin.npy', 'max.npy',
+                                      'min.npy'],
+                             second = sorted(os.listdir(os.path.join(d,
+                                                                     'env'))))
+
+            del sp
+
+    def test_superposition_factor_matrix(self):
+
+        LC1 = self.build_case()
+        LC2 = self.build_case()
+        LC2.case_no = 2
+        LC2.set_factor(group_name = 'Q', load_factor = 0.5)
+
+        LC = LoadCombinations()
+        LC.add_case([LC1, LC2])
+
+        load_nos, unit = self.unit_results()
+
+        with tempfile.TemporaryDirectory() as d:
+
+            LC.save_factor_matrix(os.path.join(d, 'factors'))
+
+            matrix = FactorMatrix.load(os.path.join(d, 'factors'))
+
+            sp = Superposition(matrix, unit, load_nos = load_nos,
+                               memory_budget = 1000)
+
+            sp.combine(os.path.join(d, 'combined.npy'))
+
+            values = np.load(os.path.join(d, 'combined.npy'))
+
+            self.assertTrue(np.allclose(np.vstack([self.expected(LC1),
+                                                   self.expected(LC2)]),
+                                        values))
+
+            del matrix, sp
+
+    def test_superposition_missing_load(self):
+
+        LC = self.build_case()
+        load_nos, unit = self.unit_results()
+
+        self.assertRaises(ValueError, Superposition, LC, unit[:3],
+                          load_nos = load_nos[:3])
+        self.assertRaises(ValueError, Superposition, LC, unit,
+                          load_nos = load_nos[:3])
@@ -0,0 +1,219 @@
+# coding=utf-8
+
+"""
+Unit tests for the TableCache class.
+"""
+
+import os
+import tempfile
+from unittest import TestCase
+import numpy as np
+from LoadCombination.TableCache import TableCache
+from LoadCombination.LoadCombinations import LoadCombinations
+from LoadCombination.LoadCase import LoadCase
+from LoadCombination.LoadGroup import FactoredGroup, RotationalGroup
+from LoadCombination.Load import Load, RotatableLoad
+from LoadCombination.GroupFactor import GroupFactor
+
+
+# a global read by the group filter in test_tableCache_filter_global.
+LIMIT = 1.0
+
+
+class TestTableCache(TestCase):
+
+    def build_case(self, case_no: int = 1):
+        """
+        Builds a simple ``LoadCase`` for use in the tests.
+        """
+
+        l1 = Load(load_name = 'G1', load_no = 1, abbrev = 'G1')
+        l2 = RotatableLoad(load_name = 'W0', load_no = 2, load_value = 1.0,
+                           angle = 0.0, symmetrical = True, abbrev = 'W0')
+        l3 = RotatableLoad(load_name = 'W90', load_no = 3, load_value = 1.0,
+                           angle = 90.0, symmetrical = True, abbrev = 'W90')
+
+        LG1 = FactoredGroup(group_name = 'G', loads = [l1],
+                            factors = (0.9, 1.2))
+        LG2 = RotationalGroup(group_name = 'W', loads = [l2, l3],
+                              factors = (1.0,), scale_to = 1.0, scale = False,
+                              req_angles = [0.0, 45.0, 90.0, 135.0])
+
+        return LoadCase(case_name = 'Test Case', case_no = case_no,
+                        load_groups = [GroupFactor(load_group = LG1,
+                                                   group_factor = 1.0),
+                                       GroupFactor(load_group = LG2,
+                                                   group_factor = 1.5)],
+                        abbrev = 'TC')
+
+    def test_tableCache_basic(self):
+        """
+        Test that a table can be stored and re-loaded.
+        """
+
+        LC = self.build_case()
+
+        with tempfile.TemporaryDirectory() as d:
+
+            cache = TableCache(d)
+
+            self.assertIsNone(cache.get(LC))
+
+            table = cache.factor_table(LC)
+
+            cache2 = TableCache(d)
+            table2 = cache2.factor_table(self.build_case())
+
+            print(cache)
+
+            self.assertEqual(first = 2, second = cache.misses)
+            self.assertEqual(first = 1, second = cache2.hits)
+            self.assertEqual(first = 1, second = len(os.listdir(d)))
+
+            self.assertEqual(first = table.case_name, second = table2.case_name)
+            self.assertEqual(first = list(table.load_nos),
+                             second = list(table2.load_nos))
+            self.assertTrue(np.array_equal(table.matrix(), table2.matrix()))
+
+            all_indices = np.arange(len(table))
+            self.assertTrue(np.array_equal(table.angles(all_indices),
+                                           table2.angles(all_indices),
+                                           equal_nan = True))
+
+            # changing the case means the cached table is not used.
+            LC.load_groups['W'].load_group.req_angles = [0.0, 90.0]
+
+            self.assertIsNone(cache.get(LC))
+            self.assertEqual(first = 4, second = len(cache.factor_table(LC)))
+
+    def test_tableCache_filter_constant(self):
+        """
+        Test that changing only a constant in a group filter means the cached
+        table is not used.
+        """
+
+        LC = self.build_case()
+        LC.add_group_filter(predicate = lambda o: o[0].factor > 1.0,
+                            group_name = 'G')
+
+        LC2 = self.build_case()
+        LC2.add_group_filter(predicate = lambda o: o[0].factor > 0.5,
+                             group_name = 'G')
+
+        with tempfile.TemporaryDirectory() as d:
+
+            cache = TableCache(d)
+
+            table = cache.factor_table(LC)
+
+            self.assertIsNone(cache.get(LC2))
+
+            table2 = cache.factor_table(LC2)
+
+            self.assertEqual(first = 0, second = cache.hits)
+            self.assertEqual(first = 2 * len(table), second = len(table2))
+
+    def test_tableCache_filter_global(self):
+        """
+        Test that changing a global read by a group filter means the cached
+        table is not used.
+        """
+
+        global LIMIT
+
+        LC = self.build_case()
+        LC.add_group_filter(predicate = lambda o: o[0].factor > LIMIT,
+                            group_name = 'G')
+
+        with tempfile.TemporaryDirectory() as d:
+
+            cache = TableCache(d)
+
+            table = cache.factor_table(LC)
+
+            try:
+                LIMIT = 0.5
+
+                self.assertIsNone(cache.get(LC))
+                self.assertEqual(first = 2 * len(table),
+                                 second = len(cache.factor_table(LC)))
+            finally:
+                LIMIT = 1.0
+
+            self.assertIsNotNone(cache.get(LC))
+
+    def test_tableCache_evict(self):
+        """
+        Test that the least recently used tables are evicted.
+        """
+
+        with tempfile.TemporaryDirectory() as d:
+
+            cache = TableCache(d)
+
+            LC1 = self.build_case(case_no = 1)
+            LC2 = self.build_case(case_no = 2)
+            LC3 = self.build_case(case_no = 3)
+
+            cache.factor_table(LC1)
+            size = cache.size
+
+            cache.max_size = 2 * size
+
+            cache.factor_table(LC2)
+            os.utime(cache.path(LC1.fingerprint),
+                     ns = (0, 0))  # make LC1 the oldest.
+            cache.factor_table(LC2)
+            cache.factor_table(LC3)
+
+            self.assertLessEqual(cache.size, 2 * size)
+            self.assertIsNone(cache.get(LC1))
+            self.assertIsNotNone(cache.get(LC2))
+            self.assertIsNotNone(cache.get(LC3))
+
+            cache.clear()
+
+            self.assertEqual(first = 0, second = cache.size)
+
+    def test_tableCache_sweep(self):
+        """
+        Test that stale temporary files are deleted on eviction, and recent
+        ones are left alone.
+        """
+
+        with tempfile.TemporaryDirectory() as d:
+
+            cache = TableCache(d)
+
+            stale = os.path.join(d, 'stale.tmp')
+            recent = os.path.join(d, 'recent.tmp')
+
+            for path in (stale, recent):
+                with open(path, 'wb') as f:
+                    f.write(b'partial')
+
+            os.utime(stale, ns = (0, 0))
+
+            cache.factor_table(self.build_case())
+
+            self.assertFalse(os.path.exists(stale))
+            self.assertTrue(os.path.exists(recent))
+
+    def test_factor_tables_cache(self):
+        """
+        Test the cache parameter of LoadCombinations.factor_tables.
+        """
+
+        LC = LoadCombinations()
+        LC.add_case(self.build_case())
+
+        with tempfile.TemporaryDirectory() as d:
+
+            cache = TableCache(d)
+
+            tables = LC.factor_tables(cache = cache)
+            tables2 = LC.factor_tables(cache = cache)
+
+            self.assertEqual(first = 1, second = cache.hits)
+            self.assertTrue(np.array_equal(tables[1].matrix(),
+                                           tables2[1].matrix()))
@@ -0,0 +1,236 @@
+# coding=utf-8
+
+"""
+Unit tests for the TextExport module.
+"""
+
+import csv
+import gzip
+import io
+import json
+import lzma
+import os
+import tempfile
+from unittest import TestCase
+from LoadCombination.TextExport import (Exporter, TemplateFormat, CSVFormat,
+                                        RecordFormat, FORMATS, register_format)
+from tests.models import dead_wind_model
+
+
+class TestTextExport(TestCase):
+
+    def test_templateFormat(self):
+        """
+        Test writing combinations with a TemplateFormat.
+        """
+
+        LC = dead_wind_model()
+
+        fmt = TemplateFormat('C{case_no}.{comb_no}: {pairs}',
+                             pair_template = '{load_no}*{factor:.2f}',
+                             pair_separator = ', ',
+                             header = 'COMBINATIONS',
+                             footer = 'END')
+
+        print(repr(fmt))
+
+        stream = io.StringIO()
+
+        self.assertEqual(first = 6,
+                         second = Exporter(fmt).write_stream(LC, stream))
+
+        lines = stream.getvalue().split('\n')
+
+        self.assertEqual(first = 'COMBINATIONS', second = lines[0])
+        self.assertEqual(first = 'C1.0: 1*0.90', second = lines[1])
+        self.assertEqual(first = 'C2.3: 1*1.20, 3*1.00', second = lines[6])
+        self.assertEqual(first = ['END', ''], second = lines[7:])
+
+        # the title is only generated if it is used.
+        comb = LC.load_cases[2].combination(3)
+
+        self.assertEqual(first = f'{comb.combination_title()}\n',
+                         second = TemplateFormat('{title}').record(
+                             LC.load_cases[2], 3, comb))
+
+    def test_csvFormat(self):
+        """
+        Test writing combinations with a CSVFormat, and that the output does
+        not depend on the buffer size or compression.
+        """
+
+        LC = dead_wind_model()
+
+        expected = None
+
+        with tempfile.TemporaryDirectory() as d:
+            for name, opener in (('combs.csv', open),
+                                 ('combs.csv.gz', gzip.open),
+                                 ('combs.csv.xz', lzma.open)):
+
+                for buffer_size in (1, 1 << 20):
+                    path = os.path.join(d, name)
+
+                    self.assertEqual(first = 6,
+                                     second = LC.export(
+                                         path, record_format = 'csv',
+                                         buffer_size = buffer_size))
+
+                    with opener(path, 'rb') as f:
+                        data = f.read()
+
+                    if expected is None:
+                        expected = data
+
+                    self.assertEqual(first = expected, second = data)
+
+        rows = list(csv.reader(io.StringIO(expected.decode('utf-8'))))
+
+        self.assertEqual(first = ['case_no', 'comb_no', 'title', 'load_no',
+                                  'factor', '...'],
+                         second = rows[0])
+
+        comb = LC.load_cases[2].combination(3)
+
+        self.assertEqual(first = ['2', '3', comb.combination_title(),
+                                  '1', '1.2', '3', '1.0'],
+                         second = rows[6])
+
+    def test_exporter_errors(self):
+        """
+        Test the Exporter input checks and the format registry.
+        """
+
+        self.assertRaises(ValueError, Exporter, 'xml')
+        self.assertRaises(ValueError, Exporter, 'text', buffer_size = 0)
+        self.assertRaises(ValueError, register_format, 'bad', str)
+        self.assertRaises(ValueError, dead_wind_model().export,
+                          'combs.txt', compression = 'zip')
+
+        class NoFormat(RecordFormat):
+
+            def record(self, load_case, comb_no, combination):
+                return f'{load_case.case_no} {comb_no}\n'
+
+        register_format('no', NoFormat)
+
+        try:
+            stream = io.StringIO()
+
+            Exporter('no').write_stream(dead_wind_model(), stream)
+
+            self.assertEqual(first = '1 0\n1 1\n2 0\n2 1\n2 2\n2 3\n',
+                             second = stream.getvalue())
+        finally:
+            del FORMATS['no']
+
+    def test_write_resumable(self):
+        """
+        Test that an export that is stopped part way through can be resumed,
+        and gives the same file as an export that was not stopped.
+        """
+
+        class StoppingFormat(TemplateFormat):
+            """
+            A TemplateFormat that raises an error after a given no. of records.
+            """
+
+            stop_after = None
+            count = 0
+
+            def record(self, load_case, comb_no, combination):
+
+                if self.count == self.stop_after:
+                    raise KeyboardInterrupt
+
+                self.count += 1
+
+                return super().record(load_case, comb_no, combination)
+
+        LC = dead_wind_model()
+
+        for name in ('combs.txt', 'combs.txt.gz', 'combs.txt.xz'):
+            with tempfile.TemporaryDirectory() as d:
+
+                fmt = StoppingFormat('{case_no} {comb_no} {title}',
+                                     header = 'START', footer = 'END')
+                exporter = Exporter(fmt)
+
+                expected_path = os.path.join(d, 'expected-' + name)
+                path = os.path.join(d, name)
+
+                self.assertEqual(first = 6,
+                                 second = exporter.write(LC, expected_path))
+
+                # stop after the first part of case 2 is written.
+                fmt.count = 0
+                fmt.stop_after = 5
+
+                self.assertRaises(KeyboardInterrupt, exporter.write_resumable,
+                                  LC, path, part_size = 2)
+
+                self.assertFalse(os.path.exists(path))
+
+                with open(os.path.join(path + '.parts',
+                                       'manifest.json')) as f:
+                    manifest = json.load(f)
+
+                self.assertEqual(first = {'1': {'next': 2, 'complete': True},
+                                          '2': {'next': 2, 'complete': False}},
+                                 second = manifest['cases'])
+
+                # resuming only writes the last part of case 2.
+                fmt.count = 0
+                fmt.stop_after = None
+
+                self.assertEqual(first = 6,
+                                 second = exporter.write_resumable(
+                                     LC, path, part_size = 2))
+                self.assertEqual(first = 2, second = fmt.count)
+
+                with open(expected_path, 'rb') as f:
+                    expected = f.read()
+
+                with open(path, 'rb') as f:
+                    self.assertEqual(first = expected, second = f.read())
+
+                self.assertFalse(os.path.exists(path + '.parts'))
+
+    def test_write_resumable_changed_model(self):
+        """
+        Test that the parts of an export are not re-used if the model has
+        changed since they were written.
+        """
+
+        LC = dead_wind_model()
+
+        with tempfile.TemporaryDirectory() as d:
+
+            path = os.path.join(d, 'combs.txt')
+
+            class StoppingFormat(TemplateFormat):
+
+                stop = True
+
+                def record(self, load_case, comb_no, combination):
+
+                    if self.stop and load_case.case_no == 2:
+                        raise KeyboardInterrupt
+
+                    return super().record(load_case, comb_no, combination)
+
+            fmt = StoppingFormat()
+
+            self.assertRaises(KeyboardInterrupt,
+                              Exporter(fmt).write_resumable, LC, path,
+                              part_size = 1)
+
+            LC.load_cases[1].load_groups['G'].load_group.factors = (1.35,)
+            fmt.stop = False
+
+            self.assertEqual(first = 3,
+                             second = Exporter(fmt).write_resumable(LC, path))
+
+            with open(path) as f:
+                self.assertEqual(first = '1 0 1 1.35', second = f.readline()
+                                 .strip())
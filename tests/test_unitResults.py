@@ -0,0 +1,240 @@
+# coding=utf-8
+
+"""
+Unit tests for the UnitResults class.
+"""
+
+import os
+import tempfile
+from unittest import TestCase
+import numpy as np
+from LoadCombination.UnitResults import UnitResults, referenced_loads
+from LoadCombination.Load import Load
+from tests.models import dead_live_model
+
+
+class TestUnitResults(TestCase):
+
+    def build_model(self):
+        """
+        Builds a ``LoadCombinations`` object for use in the tests. Load 4 is
+        in the model but not used by any case.
+        """
+
+        LC = dead_live_model()
+        LC.add_load(Load(load_name = 'G2', load_no = 4, abbrev = 'G2'))
+
+        return LC
+
+    def write(self, d: str, name: str, text: str) -> str:
+
+        path = os.path.join(d, name)
+
+        with open(path, 'w') as f:
+            f.write(text)
+
+        return path
+
+    def test_unitResults_wide(self):
+
+        with tempfile.TemporaryDirectory() as d:
+            path = self.write(d, 'wide.csv',
+                              'load_no,name,R1,R2\n'
+                              '3,Q2,5.0,6\n'
+                              '1,G1,1.0,2\n'
+                              '\n'
+                              '2,Q1,3.5,4\n')
+
+            results = UnitResults.from_csv(path, chunk_size = 2)
+
+            print(results)
+
+            self.assertEqual(first = [1, 2, 3],
+                             second = list(results.load_nos))
+            self.assertEqual(first = ['R1', 'R2'],
+                             second = results.components)
+            self.assertTrue(np.array_equal(np.array([[1.0, 2.0],
+                                                     [3.5, 4.0],
+                                                     [5.0, 6.0]]),
+                                           results.values))
+            self.assertTrue(results.values.flags['C_CONTIGUOUS'])
+
+            self.assertTrue(np.array_equal(np.array([[5.0, 6.0],
+                                                     [1.0, 2.0]]),
+                                           results.take([3, 1])))
+            self.assertRaises(ValueError, results.take, [5])
+
+    def test_unitResults_long(self):
+
+        with tempfile.TemporaryDirectory() as d:
+            path = self.write(d, 'long.csv',
+                              'Case;Member;Pos;N;M\n'
+                              '1;B1;0.0;10;1.5\n'
+                              '1;B1;0.5;10;2.5\n'
+                              '1;C1;0.0;-5;0.0\n'
+                              '2;B1;0.0;1;0.1\n'
+                              '2;C1;0.0;-1;0.0\n'
+                              '2;B1;0.5;1;0.2\n'
+                              '3;B1;0.5;2;0.4\n')
+
+            results = UnitResults.from_csv(path, load_column = 'Case',
+                                           key_columns = ['Member', 'Pos'],
+                                           delimiter = ';', chunk_size = 3)
+
+            self.assertEqual(first = [('B1', 0.0), ('B1', 0.5), ('C1', 0.0)],
+                             second = results.keys)
+            self.assertEqual(first = 6, second = results.no_results)
+            self.assertEqual(first = ('C1', 0.0, 'N'),
+                             second = results.columns[4])
+            self.assertTrue(np.allclose([1.0, 0.1, 1.0, 0.2, -1.0, 0.0],
+                                        results.values[1]))
+
+            # load 3 has no results for B1 at 0.0 or C1.
+            self.assertTrue(np.isnan(results.values[2, 0]))
+            self.assertEqual(first = 0.4, second = results.values[2, 3])
+
+    def test_unitResults_blanks(self):
+        """
+        Test that blank cells are read as NaN, whether they are in the first
+        chunk or a later one.
+        """
+
+        with tempfile.TemporaryDirectory() as d:
+            path = self.write(d, 'first.csv',
+                              'load_no,Fx,Fy\n'
+                              '1,,2.0\n'
+                              '2,3.0,4.0\n'
+                              '3,5.0,6.0\n')
+
+            results = UnitResults.from_csv(path, chunk_size = 2)
+
+            self.assertEqual(first = ['Fx', 'Fy'], second = results.components)
+            self.assertTrue(np.isnan(results.values[0, 0]))
+            self.assertEqual(first = 5.0, second = results.values[2, 0])
+
+            path = self.write(d, 'later.csv',
+                              'load_no,Fx,Fy\n'
+                              '1,1.0,2.0\n'
+                              '2,3.0,4.0\n'
+                              '3, ,6.0\n')
+
+            results = UnitResults.from_csv(path, chunk_size = 2)
+
+            self.assertEqual(first = ['Fx', 'Fy'], second = results.components)
+            self.assertTrue(np.isnan(results.values[2, 0]))
+            self.assertEqual(first = 6.0, second = results.values[2, 1])
+
+            path = self.write(d, 'text.csv',
+                              'load_no,Fx,Fy\n'
+                              '1,1.0,2.0\n'
+                              '2,3.0,4.0\n'
+                              '3,n/a,6.0\n')
+
+            with self.assertRaisesRegex(ValueError, 'Fx.*line 4'):
+                UnitResults.from_csv(path, value_columns = ['Fx', 'Fy'],
+                                     chunk_size = 2)
+
+    def test_unitResults_bad_rows(self):
+        """
+        Test that short or long rows and duplicated loads are rejected, with the
+        line they are on.
+        """
+
+        with tempfile.TemporaryDirectory() as d:
+            path = self.write(d, 'short.csv',
+                              'load_no,Fx,Fy\n'
+                              '1,1.0,2.0\n'
+                              '2,3.0,4.0\n'
+                              '3,5.0\n')
+
+            with self.assertRaisesRegex(ValueError, 'found 2 on line 4'):
+                UnitResults.from_csv(path, chunk_size = 2)
+
+            path = self.write(d, 'long.csv',
+                              'load_no,Fx,Fy\n'
+                              '1,1.0,2.0,7.0\n')
+
+            with self.assertRaisesRegex(ValueError, 'found 4 on line 2'):
+                UnitResults.from_csv(path)
+
+            path = self.write(d, 'wide.csv',
+                              'load_no,Fx,Fy\n'
+                              '1,1.0,2.0\n'
+                              '2,3.0,4.0\n'
+                              '1,5.0,6.0\n')
+
+            with self.assertRaisesRegex(ValueError, 'load 1 on lines 2 and 4'):
+                UnitResults.from_csv(path, chunk_size = 2)
+
+            path = self.write(d, 'long.csv',
+                              'load_no,node,Fx\n'
+                              '1,A,1.0\n'
+                              '1,B,2.0\n'
+                              '1,B,3.0\n')
+
+            with self.assertRaisesRegex(ValueError,
+                                        "load 1 and key \\('B',\\) on lines 3 "
+                                        + 'and 4'):
+                UnitResults.from_csv(path, key_columns = ['node'])
+
+    def test_unitResults_model(self):
+
+        LC = self.build_model()
+
+        self.assertEqual(first = [1, 2, 3],
+                         second = list(referenced_loads(LC)))
+
+        with tempfile.TemporaryDirectory() as d:
+            path = self.write(d, 'wide.csv',
+                              'load_no,R1\n'
+                              '1,1.0\n'
+                              '2,2.0\n'
+                              '3,3.0\n'
+                              '9,9.0\n')
+
+            results = UnitResults.from_csv(path, model = LC)
+
+            # aligned to every load in the model. Load 9 is ignored, and load
+            # 4 is not used by the cases so it does not need results.
+            self.assertEqual(first = [1, 2, 3, 4],
+                             second = list(results.load_nos))
+            self.assertTrue(np.isnan(results.values[3, 0]))
+            self.assertEqual(first = [], second = results.missing_loads(LC))
+
+            path = self.write(d, 'missing.csv',
+                              'load_no,R1\n'
+                              '1,1.0\n'
+                              '3,3.0\n')
+
+            self.assertRaises(ValueError, UnitResults.from_csv, path,
+                              model = LC)
+
+            results = UnitResults.from_csv(path)
+
+            self.assertEqual(first = [2], second = results.missing_loads(LC))
+
+            self.assertRaises(ValueError, UnitResults.from_csv, path,
+                              value_columns = ['R2'])
+
+    def test_unitResults_save(self):
+
+        with tempfile.TemporaryDirectory() as d:
+            path = self.write(d, 'long.csv',
+                              'load_no,node,Fx,Fz\n'
+                              '1,10,1.0,2.0\n'
+                              '1,11,3.0,4.0\n'
+                              '2,10,5.0,6.0\n'
+                              '2,11,7.0,8.0\n')
+
+            results = UnitResults.from_csv(path, key_columns = ['node'])
+            results.save(os.path.join(d, 'results'))
+
+            loaded = UnitResults.load(os.path.join(d, 'results'))
+
+            self.assertIsInstance(loaded.values, np.memmap)
+            self.assertTrue(np.array_equal(results.values, loaded.values))
+            self.assertTrue(np.array_equal(results.load_nos, loaded.load_nos))
+            self.assertEqual(first = [(10,), (11,)], second = loaded.keys)
+            self.assertEqual(first = ['Fx', 'Fz'], second = loaded.components)
+
+            del loaded
@@ -0,0 +1,227 @@
+# coding=utf-8
+
+"""
+Unit tests for the UtilisationEnvelope class.
+"""
+
+import os
+import tempfile
+from unittest import TestCase
+import numpy as np
+from LoadCombination.Utilisation import UtilisationEnvelope, UtilisationCheck
+from LoadCombination.FactorMatrix import FactorMatrix
+from LoadCombination.LoadCombinations import LoadCombinations
+from LoadCombination.LoadCase import LoadCase
+from LoadCombination.LoadGroup import FactoredGroup, ExclusiveGroup
+from LoadCombination.Load import Load, ScalableLoad
+from LoadCombination.GroupFactor import GroupFactor
+
+
+def interaction(values: np.ndarray) -> np.ndarray:
+    """
+    A simple M-N interaction check, with capacities of 100 and 20.
+    """
+
+    return np.abs(values[:, 0]) / 100.0 + np.abs(values[:, 1]) / 20.0
+
+
+class TestUtilisation(TestCase):
+
+    def build_case(self, case_no: int = 1):
+        """
+        Builds a simple ``LoadCase`` for use in the tests.
+        """
+
+        l1 = Load(load_name = 'G1', load_no = 1, abbrev = 'G1')
+        l2 = ScalableLoad(load_name = 'Q1', load_no = 2, load_value = 5.0,
+                          abbrev = 'Q1')
+        l3 = ScalableLoad(load_name = 'Q2', load_no = 3, load_value = 2.5,
+                          abbrev = 'Q2')
+        l4 = ScalableLoad(load_name = 'W1', load_no = 4, load_value = 1.0,
+                          abbrev = 'W1')
+
+        LG1 = FactoredGroup(group_name = 'G', loads = [l1],
+                            factors = (0.9, 1.2))
+        LG2 = ExclusiveGroup(group_name = 'Q', loads = [l2, l3],
+                             factors = (-1.0, 0.0, 1.0), scale_to = 5.0)
+        LG3 = FactoredGroup(group_name = 'W', loads = [l4],
+                            factors = (-1.0, 0.0, 0.5, 1.0))
+
+        return LoadCase(case_name = f'Case {case_no}', case_no = case_no,
+                        load_groups = [GroupFactor(load_group = LG1,
+                                                   group_factor = 1.0),
+                                       GroupFactor(load_group = LG2,
+                                                   group_factor = 1.5),
+                                       GroupFactor(load_group = LG3,
+                                                   group_factor = 1.0)],
+                        abbrev = f'C{case_no}')
+
+    def effects(self):
+        """
+        Unit results for loads 1 to 4 with columns N1, M1, N2, M2.
+        """
+
+        return np.array([[-50.0, 2.0, -40.0, 1.0],
+                         [-20.0, 5.0, -10.0, -3.0],
+                         [-10.0, -4.0, 5.0, 6.0],
+                         [5.0, 8.0, 2.0, -7.0]])
+
+    def checks(self, top_n: int = 3):
+
+        return [UtilisationCheck(name = 'Member 1', func = interaction,
+                                 effects = [0, 1], labels = ['N', 'M'],
+                                 top_n = top_n),
+                UtilisationCheck(name = 'Member 2', func = interaction,
+                                 effects = [2, 3], labels = ['N', 'M'],
+                                 top_n = top_n)]
+
+    def brute_force(self, LC: LoadCase, effects: np.ndarray,
+                    columns, top_n: int):
+        """
+        Calculates the utilisation of every combination and sorts it.
+        """
+
+        values = LC.factor_table().matrix() @ effects[:, columns]
+        utilisation = interaction(values)
+
+        order = sorted(range(len(utilisation)),
+                       key = lambda i: (-utilisation[i], i))
+
+        return [(utilisation[i], i, values[i]) for i in order[:top_n]]
+
+    def test_utilisation_basic(self):
+
+        LC = self.build_case()
+
+        env = UtilisationEnvelope(LC, load_nos = [1, 2, 3, 4],
+                                  effects = self.effects(),
+                                  checks = self.checks(), chunk_size = 5)
+
+        print(env)
+        print(env.critical)
+
+        self.assertEqual(first = LC.no_combinations,
+                         second = env.no_combinations)
+
+        for name, columns in (('Member 1', [0, 1]), ('Member 2', [2, 3])):
+            expected = self.brute_force(LC, self.effects(), columns, 3)
+            critical = env.critical[name]
+
+            self.assertEqual(first = 3, second = len(critical))
+
+            for (u, i, values), c in zip(expected, critical):
+                self.assertAlmostEqual(first = u, second = c.utilisation)
+                self.assertEqual(first = i, second = c.comb_id)
+                self.assertEqual(first = 1, second = c.case_no)
+                self.assertAlmostEqual(first = values[0],
+                                       second = c.effects['N'])
+                self.assertAlmostEqual(first = values[1],
+                                       second = c.effects['M'])
+
+        # the concurrent effects should match the combination.
+        c = env.critical['Member 1'][0]
+        comb = LC.combination(c.comb_id)
+        N = sum(f * self.effects()[l - 1, 0]
+                for l, (f, load, LFs) in comb.list_loads_with_factors.items())
+
+        self.assertAlmostEqual(first = N, second = c.effects['N'])
+
+    def test_utilisation_chunk_size(self):
+        """
+        The result should not depend on the chunk size.
+        """
+
+        LC = self.build_case()
+
+        results = [UtilisationEnvelope(LC, load_nos = [1, 2, 3, 4],
+                                       effects = self.effects(),
+                                       checks = self.checks(top_n = 4),
+                                       chunk_size = chunk_size).critical
+                   for chunk_size in (1, 3, 7, 1000)]
+
+        for r in results[1:]:
+            self.assertEqual(first = results[0], second = r)
+
+    def test_utilisation_ties_and_nan(self):
+        """
+        Ties should go to the first combination, and NaN utilisations should
+        be ignored.
+        """
+
+        LC = self.build_case()
+
+        def constant(values):
+            u = np.ones(len(values))
+            u[values[:, 0] > 0] = np.nan
+            return u
+
+        check = UtilisationCheck(name = 'Constant', func = constant,
+                                 effects = [3], top_n = 2)
+
+        env = UtilisationEnvelope(LC, load_nos = [1, 2, 3, 4],
+                                  effects = self.effects(), checks = [check],
+                                  chunk_size = 7)
+
+        values = LC.factor_table().matrix() @ self.effects()[:, 3]
+        expected = [int(i) for i in np.flatnonzero(values <= 0)[:2]]
+
+        self.assertEqual(first = expected,
+                         second = [c.comb_id for c in env.critical['Constant']])
+
+    def test_utilisation_multiple_cases(self):
+
+        LC1 = self.build_case(1)
+        LC2 = self.build_case(2)
+        LC2.set_factor(group_name = 'W', load_factor = 2.0)
+
+        LC = LoadCombinations()
+        LC.add_case([LC1, LC2])
+
+        env = UtilisationEnvelope(LC, load_nos = [1, 2, 3, 4],
+                                  effects = self.effects(),
+                                  checks = self.checks(top_n = 1))
+
+        self.assertEqual(first = LC1.no_combinations + LC2.no_combinations,
+                         second = env.no_combinations)
+
+        best = max((self.brute_force(c, self.effects(), [0, 1], 1)[0][0],
+                    c.case_no) for c in (LC1, LC2))
+
+        critical = env.critical['Member 1'][0]
+
+        self.assertAlmostEqual(first = best[0], second = critical.utilisation)
+        self.assertEqual(first = best[1], second = critical.case_no)
+
+        # a FactorMatrix should give the same result.
+        with tempfile.TemporaryDirectory() as d:
+            LC.save_factor_matrix(os.path.join(d, 'factors'))
+
+            matrix = FactorMatrix.load(os.path.join(d, 'factors'))
+
+            other = UtilisationEnvelope(matrix, load_nos = [1, 2, 3, 4],
+                                        effects = self.effects(),
+                                        checks = self.checks(top_n = 1))
+
+            self.assertEqual(first = env.critical, second = other.critical)
+
+            del matrix, other
+
+    def test_utilisation_errors(self):
+
+        LC = self.build_case()
+
+        bad = UtilisationCheck(name = 'Bad', func = lambda v: v,
+                               effects = [0, 1])
+
+        self.assertRaises(ValueError, UtilisationEnvelope, LC,
+                          load_nos = [1, 2, 3, 4], effects = self.effects(),
+                          checks = [bad])
+        self.assertRaises(ValueError, UtilisationEnvelope, LC,
+                          load_nos = [1, 2, 3], effects = self.effects()[:3],
+                          checks = self.checks())
+        self.assertRaises(ValueError, UtilisationEnvelope, LC,
+                          load_nos = [1, 2, 3, 4], effects = self.effects(),
+                          checks = self.checks() + self.checks())
+        self.assertRaises(ValueError, UtilisationCheck, name = 'Labels',
+                          func = interaction, effects = [0, 1],
+                          labels = ['N'])